@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mede o tempo de geração de laudos técnicos em PDF.
+
+Cada renderização cria um `LaudoTecnicoPDF` novo, como a janela de laudos e
+a aba de inspeções fazem, e grava o PDF em uma pasta temporária. O tempo por
+laudo é mostrado para 1, 100 e 1000 renderizações (ou para as quantidades
+informadas). Com --sem-cache o modelo (estilos, fontes, estilos de tabela)
+é montado de novo a cada laudo, como antes do registro de modelos:
+
+    python benchmark_laudos.py
+    python benchmark_laudos.py --sem-cache
+    python benchmark_laudos.py 1 10 50
+"""
+
+import os
+import sys
+import tempfile
+import time
+from utils.pdf_generator import LaudoTecnicoPDF
+from utils.pdf_templates import descartar_templates
+
+DADOS = {
+    'titulo': "Laudo Técnico - Vaso de Pressão - VP-001",
+    'equipamento_tag': "VP-001",
+    'equipamento_tipo': "Vaso de Pressão",
+    'equipamento_categoria': "Categoria III",
+    'equipamento_fabricante': "Metalúrgica ABC",
+    'equipamento_ano': "2010",
+    'equipamento_pressao': "12.5",
+    'equipamento_volume': "3.2",
+    'inspecao_data': "10/03/2024",
+    'inspecao_tipo': "Periódica",
+    'inspecao_responsavel': "Eng. Responsável (CREA 12345)",
+    'inspecao_resultado': "Aprovado",
+    'inspecao_proxima': "10/03/2025",
+    'ensaios_realizados': "- Exame Visual Externo<br/>- Medição de Espessura",
+    'nao_conformidades': "Nenhuma não conformidade encontrada.",
+    'recomendacoes': "Manter o plano de inspeção vigente.",
+    'conclusao': "Equipamento aprovado.",
+}
+
+
+def medir(quantidade: int, pasta: str, sem_cache: bool = False) -> float:
+    """Tempo médio (ms) por laudo em `quantidade` renderizações."""
+    caminho = os.path.join(pasta, "laudo.pdf")
+    inicio = time.perf_counter()
+    for _ in range(quantidade):
+        if sem_cache:
+            descartar_templates()
+        LaudoTecnicoPDF().renderizar(DADOS, caminho)
+    return (time.perf_counter() - inicio) * 1000 / quantidade
+
+
+if __name__ == "__main__":
+    sem_cache = '--sem-cache' in sys.argv
+    quantidades = [int(valor) for valor in sys.argv[1:] if valor != '--sem-cache'] or [1, 100, 1000]
+    with tempfile.TemporaryDirectory() as pasta:
+        for quantidade in quantidades:
+            print(f"{quantidade:>5} laudo(s): {medir(quantidade, pasta, sem_cache):7.2f} ms por laudo")
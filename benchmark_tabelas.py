@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mede o tempo e a memória para exibir listagens grandes.
+
+Compara o preenchimento antigo (um QTableWidgetItem por célula, como a aba de
+inspeções e a tabela de equipamentos por empresa faziam) com o
+`ColumnTableModel` exibido por uma QTableView. Os registros são sintéticos,
+com as mesmas colunas das telas. Cada medição roda em um processo separado,
+para que a memória de uma não conte na outra; a memória é o aumento do
+conjunto residente (RSS) do processo durante a carga.
+
+    python benchmark_tabelas.py
+    python benchmark_tabelas.py 10000 50000
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QTableView
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt
+from ui.table_model import ColumnTableModel, Column, display_text
+
+TABELAS = ('inspecoes', 'equipamentos_empresa')
+VARIANTES = ('widget', 'modelo')
+RESULTADOS = ('Aprovado', 'Reprovado', 'Pendente')
+
+
+def memoria_mb():
+    """Conjunto residente do processo (MB), ou None se não houver como medir."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return None
+
+
+def registros(tabela: str, quantidade: int) -> list:
+    if tabela == 'inspecoes':
+        return [{
+            'id': n, 'equipamento_tag': f"VP-{n:05d}", 'equipamento_nome': 'Vaso de Pressão',
+            'engenheiro_nome': f"Engenheiro {n % 40}", 'data_inspecao': f"{2020 + n % 6}-{n % 12 + 1:02d}-15",
+            'tipo_inspecao': 'Periódica', 'resultado': RESULTADOS[n % 3],
+            'recomendacoes': 'Manter o plano de inspeção vigente e verificar a válvula de segurança.',
+        } for n in range(1, quantidade + 1)]
+    return [{
+        'id': n, 'tag': f"VP-{n:05d}", 'categoria': 'Vaso de Pressão', 'fabricante': 'Metalúrgica ABC',
+        'ano_fabricacao': 2000 + n % 25, 'pressao_projeto': 12.5, 'pressao_trabalho': 10.0,
+        'volume': 3.2, 'fluido': 'Ar comprimido', 'ativo': 1,
+        'urgencia': (None, 'atrasada', 'urgente', 'alta', 'media')[n % 5],
+    } for n in range(1, quantidade + 1)]
+
+
+def preencher_widget(tabela: str, dados: list):
+    """Preenchimento antigo: um QTableWidgetItem por célula."""
+    if tabela == 'inspecoes':
+        table = QTableWidget()
+        table.setColumnCount(7)
+        for inspecao in dados:
+            row = table.rowCount()
+            table.insertRow(row)
+            id_item = QTableWidgetItem(str(inspecao['id']))
+            id_item.setData(Qt.UserRole, inspecao['id'])
+            table.setItem(row, 0, id_item)
+            table.setItem(row, 1, QTableWidgetItem(f"{inspecao['equipamento_tag']} - {inspecao['equipamento_nome']}"))
+            table.setItem(row, 2, QTableWidgetItem(inspecao['engenheiro_nome']))
+            table.setItem(row, 3, QTableWidgetItem(inspecao['data_inspecao']))
+            table.setItem(row, 4, QTableWidgetItem(inspecao['tipo_inspecao']))
+            result_item = QTableWidgetItem(inspecao['resultado'])
+            result_item.setForeground(QColor('#28a745'))
+            table.setItem(row, 5, result_item)
+            table.setItem(row, 6, QTableWidgetItem(inspecao['recomendacoes'][:50] + '...'))
+        return table
+
+    campos = ('tag', 'categoria', 'fabricante', 'ano_fabricacao', 'pressao_projeto',
+              'pressao_trabalho', 'volume', 'fluido')
+    table = QTableWidget()
+    table.setColumnCount(9)
+    table.setRowCount(len(dados))
+    for i, equipamento in enumerate(dados):
+        for col, campo in enumerate(campos):
+            item = QTableWidgetItem(str(equipamento[campo]))
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            table.setItem(i, col, item)
+        table.item(i, 0).setData(Qt.UserRole, equipamento['id'])
+        table.setItem(i, 8, QTableWidgetItem("Ativo"))
+        if equipamento['urgencia']:
+            for col in range(9):
+                table.item(i, col).setBackground(QColor('#fdd'))
+                table.item(i, col).setForeground(QColor('#000'))
+    return table
+
+
+def preencher_modelo(tabela: str, dados: list):
+    """Preenchimento atual: `ColumnTableModel` (valores por coluna) em uma QTableView."""
+    if tabela == 'inspecoes':
+        colunas = [
+            Column("ID", lambda i: display_text(i['id']), user_role=lambda i: i['id']),
+            Column("Equipamento", lambda i: f"{i['equipamento_tag']} - {i['equipamento_nome']}"),
+            Column("Engenheiro", lambda i: i['engenheiro_nome']),
+            Column("Data", lambda i: i['data_inspecao']),
+            Column("Tipo", lambda i: i['tipo_inspecao']),
+            Column("Resultado", lambda i: i['resultado']),
+            Column("Recomendações", lambda i: i['recomendacoes'][:50] + '...'),
+        ]
+        model = ColumnTableModel(colunas, row_state=lambda i: i['resultado'],
+                                 colors=lambda estado, col: (None, QColor('#28a745')) if col == 5 else None)
+    else:
+        campos = ('tag', 'categoria', 'fabricante', 'ano_fabricacao', 'pressao_projeto',
+                  'pressao_trabalho', 'volume', 'fluido')
+        colunas = [Column(campo, lambda e, campo=campo: display_text(e[campo])) for campo in campos]
+        colunas[0].user_role = lambda e: e['id']
+        colunas.append(Column("Status", lambda e: "Ativo"))
+        model = ColumnTableModel(colunas, row_state=lambda e: e['urgencia'],
+                                 colors=lambda estado, col: (QColor('#fdd'), QColor('#000')))
+    model.set_rows(dados)
+    table = QTableView()
+    table.setModel(model)
+    return table
+
+
+def medir(tabela: str, variante: str, quantidade: int) -> tuple:
+    """Tempo (ms) até a tabela ser desenhada e aumento de memória (MB)."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    dados = registros(tabela, quantidade)
+    memoria_antes = memoria_mb()
+    inicio = time.perf_counter()
+    table = (preencher_widget if variante == 'widget' else preencher_modelo)(tabela, dados)
+    table.resize(1200, 800)
+    table.show()
+    app.processEvents()
+    tempo = (time.perf_counter() - inicio) * 1000
+    memoria_depois = memoria_mb()
+    memoria = None if memoria_antes is None else memoria_depois - memoria_antes
+    return tempo, memoria
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--medir']:
+        tabela, variante, quantidade = sys.argv[2], sys.argv[3], int(sys.argv[4])
+        tempo, memoria = medir(tabela, variante, quantidade)
+        print(f"{tempo} {memoria if memoria is not None else -1}")
+        sys.exit(0)
+
+    quantidades = [int(valor) for valor in sys.argv[1:]] or [50000]
+    for quantidade in quantidades:
+        for tabela in TABELAS:
+            for variante in VARIANTES:
+                saida = subprocess.run(
+                    [sys.executable, __file__, '--medir', tabela, variante, str(quantidade)],
+                    capture_output=True, text=True, check=True
+                ).stdout.split()
+                tempo, memoria = float(saida[-2]), float(saida[-1])
+                memoria_txt = f"{memoria:7.1f} MB" if memoria >= 0 else "   (memória indisponível)"
+                print(f"{quantidade:>6} linhas  {tabela:<21} {variante:<7} {tempo:9.0f} ms  {memoria_txt}")
@@ -8,22 +8,46 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Configurações do banco de dados
+DB_BACKEND = os.getenv('DB_BACKEND', 'sqlserver')  # 'sqlserver' ou 'sqlite'
+DB_SQLITE_PATH = os.getenv('DB_SQLITE_PATH', 'database/sistema_inspecao.db')
 DB_SERVER = os.getenv('DB_SERVER', 'localhost')
 DB_NAME = os.getenv('DB_NAME', 'sistema_inspecao')
 DB_USERNAME = os.getenv('DB_USERNAME', 'sa')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 
+# Configurações do pool de conexões
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # em segundos
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', 300))  # em segundos
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))  # em segundos
+
+# Réplica local (SQLite) das tabelas para as listagens
+LOCAL_REPLICA_ENABLED = os.getenv('LOCAL_REPLICA_ENABLED', 'False').lower() == 'true'
+LOCAL_REPLICA_PATH = os.getenv('LOCAL_REPLICA_PATH', 'cache/replica.db')
+LOCAL_REPLICA_SYNC_INTERVAL = float(os.getenv('LOCAL_REPLICA_SYNC_INTERVAL', 5))  # em segundos
+
 # Configurações de e-mail
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
 SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
 FROM_EMAIL = os.getenv('FROM_EMAIL', '')
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'sim')  # STARTTLS (false para servidores locais de teste)
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 30))  # em segundos
+EMAIL_SMTP_SESSIONS = int(os.getenv('EMAIL_SMTP_SESSIONS', 2))  # sessões SMTP em paralelo na entrega da fila
+EMAIL_RATE_LIMIT = float(os.getenv('EMAIL_RATE_LIMIT', 5))  # e-mails por segundo (0 = sem limite)
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 5))
+EMAIL_RETRY_SECONDS = int(os.getenv('EMAIL_RETRY_SECONDS', 60))  # espera da 1ª nova tentativa; dobra a cada falha
 
 # Configurações de notificação
 DAYS_BEFORE_REMINDER = int(os.getenv('DAYS_BEFORE_REMINDER', 30))
 REMINDER_HOUR = os.getenv('REMINDER_HOUR', '08:00')
 
+# Agendador de tarefas (services/scheduler.py)
+SCHEDULER_WORKERS = int(os.getenv('SCHEDULER_WORKERS', 4))  # tarefas executadas ao mesmo tempo
+SCHEDULER_RELOAD_SECONDS = int(os.getenv('SCHEDULER_RELOAD_SECONDS', 60))  # releitura das tarefas agendadas por outros processos
+
 # Configurações de log
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FILE = os.getenv('LOG_FILE', 'logs/sistema.log')
@@ -40,6 +64,9 @@ SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', 30))  # em minutos
 # Configurações de relatórios
 REPORT_TEMPLATE_PATH = os.getenv('REPORT_TEMPLATE_PATH', 'templates/relatorio.html')
 REPORT_OUTPUT_PATH = os.getenv('REPORT_OUTPUT_PATH', 'relatorios/')
+PDF_FONT_PATH = os.getenv('PDF_FONT_PATH', '')  # fonte TrueType embutida nos laudos (vazio = Helvetica)
+PDF_FONT_BOLD_PATH = os.getenv('PDF_FONT_BOLD_PATH', '')
+LAUDO_BATCH_WORKERS = int(os.getenv('LAUDO_BATCH_WORKERS', 0))  # processos da geração em lote (0 = um por núcleo)
 
 # Configurações de armazenamento
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads/')
@@ -48,6 +75,7 @@ ALLOWED_EXTENSIONS = {
     'pdf', 'doc', 'docx', 'xls', 'xlsx',
     'jpg', 'jpeg', 'png', 'tiff'
 }
+DOCUMENT_GC_GRACE_HOURS = int(os.getenv('DOCUMENT_GC_GRACE_HOURS', 24))  # documentos sem relatório mantidos por este tempo
 
 # Configurações de backup
 BACKUP_PATH = os.getenv('BACKUP_PATH', 'backups/')
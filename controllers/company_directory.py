@@ -0,0 +1,108 @@
+"""
+Cadastro de empresas (usuários do tipo 'cliente') mantido em memória.
+
+Todas as empresas são lidas em uma única consulta e guardadas em um mapa
+ID -> dados; as buscas por ID ou nome e a resolução de vários IDs de uma vez
+não vão ao banco. O cache é descartado com `invalidate()` quando os usuários
+mudam (escritas do `AuthController` ou alteração detectada na tabela
+`usuarios`) e recarregado no próximo acesso.
+"""
+import logging
+import threading
+import traceback
+from contextlib import closing
+from typing import Optional
+from database.health import retry_on_disconnect
+
+logger = logging.getLogger(__name__)
+
+
+def company_name(nome, empresa, company_id) -> str:
+    """Nome exibido da empresa: campo 'empresa' se preenchido, senão 'nome'."""
+    return empresa or nome or f"Cliente ID {company_id}"
+
+
+class CompanyDirectory:
+    """
+    Cache das empresas clientes.
+
+    Args:
+        pool: Pool de conexões (`DatabaseConnection().pool`)
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._companies = None
+        self.loads = 0
+
+    @retry_on_disconnect
+    def _fetch(self) -> Optional[dict]:
+        """Lê todas as empresas (ativas e inativas). Retorna None em caso de erro."""
+        try:
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT id, nome, empresa, email, ativo
+                    FROM usuarios
+                    WHERE tipo_acesso = 'cliente'
+                    ORDER BY nome
+                """)
+                companies = {}
+                for row in cursor.fetchall():
+                    companies[row[0]] = {
+                        'id': row[0],
+                        'nome': company_name(row[1], row[2], row[0]),
+                        'nome_usuario': row[1],
+                        'empresa': row[2],
+                        'email': row[3],
+                        'ativo': bool(row[4])
+                    }
+                self.loads += 1
+                logger.debug(f"Cadastro de empresas carregado: {len(companies)} empresas")
+                return companies
+        except Exception as e:
+            logger.error(f"Erro ao carregar cadastro de empresas: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+
+    def _all(self) -> dict:
+        with self._lock:
+            if self._companies is None:
+                # Falhas não são guardadas: a próxima chamada tenta de novo
+                companies = self._fetch()
+                if companies is None:
+                    return {}
+                self._companies = companies
+            return self._companies
+
+    def invalidate(self):
+        """Descarta o cache; a próxima consulta recarrega do banco."""
+        with self._lock:
+            self._companies = None
+
+    def get(self, company_id: int) -> Optional[dict]:
+        """Dados da empresa pelo ID (ativa ou não), ou None."""
+        return self._all().get(company_id)
+
+    def resolve_many(self, company_ids) -> dict:
+        """
+        Resolve vários IDs de uma vez.
+
+        Returns:
+            dict: {id: nome da empresa} para os IDs encontrados
+        """
+        companies = self._all()
+        return {company_id: companies[company_id]['nome']
+                for company_id in set(company_ids) if company_id in companies}
+
+    def id_by_name(self, name: str) -> Optional[int]:
+        """ID da empresa ativa cujo campo 'empresa' ou 'nome' é igual ao informado."""
+        for company in self._all().values():
+            if company['ativo'] and name in (company['empresa'], company['nome_usuario']):
+                return company['id']
+        return None
+
+    def active(self) -> list[dict]:
+        """Empresas ativas ordenadas pelo nome do usuário, como {'id', 'nome'}."""
+        return [{'id': company['id'], 'nome': company['nome']}
+                for company in self._all().values() if company['ativo']]
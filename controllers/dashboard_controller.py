@@ -0,0 +1,203 @@
+"""
+Resumo de conformidade por empresa, exibido no painel do administrador.
+
+Os números saem de duas consultas agrupadas: equipamentos ativos por faixa de
+urgência da manutenção (FAIXAS_URGENCIA) e inspeções não canceladas por
+resultado. O resultado fica materializado na tabela `resumo_conformidade`,
+junto com a assinatura (versão máxima, quantidade de linhas) de `equipamentos`
+e `inspecoes` no momento do cálculo.
+
+`resumo()` devolve o resumo guardado em memória. O cache é descartado com
+`invalidate()` quando essas tabelas mudam (a interface usa o ChangeTracker) e
+na virada do dia. No próximo acesso a tabela é relida e só é recalculada se a
+assinatura mudou ou se ela é de outro dia. A tarefa noturna
+`resumo_conformidade` do agendador (services/scheduler.py) também a recalcula.
+
+Uso:
+    python -m controllers.dashboard_controller   # recalcula e mostra o resumo
+"""
+import logging
+import threading
+import traceback
+from contextlib import closing
+from datetime import date, datetime
+from typing import Optional
+from database.change_tracking import ChangeTracker
+from database.health import retry_on_disconnect
+from database.models import DatabaseModels
+from controllers.equipment_controller import urgencia_sql
+
+logger = logging.getLogger(__name__)
+
+# Tabelas cujas alterações mudam o resumo
+ORIGENS = ('equipamentos', 'inspecoes')
+
+# Contadores de cada empresa, na ordem das colunas de `resumo_conformidade`
+CONTADORES = ('equipamentos', 'atrasados', 'vence_7', 'vence_15', 'vence_30',
+              'aprovadas', 'reprovadas', 'pendentes')
+
+# Contador de cada faixa de urgência (ver FAIXAS_URGENCIA)
+CONTADOR_DA_URGENCIA = {'atrasada': 'atrasados', 'urgente': 'vence_7',
+                        'alta': 'vence_15', 'media': 'vence_30'}
+
+
+class DashboardController:
+    """
+    Resumo de conformidade com cache.
+
+    Args:
+        db_models: `DatabaseModels` (o resumo é lido e gravado no servidor)
+    """
+
+    def __init__(self, db_models: DatabaseModels):
+        self.pool = db_models.db.pool
+        self.dialect = db_models.db.dialect
+        self.tracker = ChangeTracker(self.pool, ORIGENS)
+        self._lock = threading.Lock()
+        self._resumo = None
+        self._dia = None
+        self.recalculos = 0
+
+    def invalidate(self):
+        """Descarta o cache; o próximo `resumo()` confere a tabela no banco."""
+        with self._lock:
+            self._resumo = None
+
+    def resumo(self) -> list[dict]:
+        """
+        Contadores por empresa: {'empresa_id', 'equipamentos', 'atrasados',
+        'vence_7', 'vence_15', 'vence_30', 'aprovadas', 'reprovadas', 'pendentes'}.
+
+        As faixas de vencimento são exclusivas (vence_15: de 8 a 15 dias).
+        Retorna [] em caso de erro; falhas não são guardadas no cache.
+        """
+        with self._lock:
+            hoje = date.today()
+            if self._resumo is None or self._dia != hoje:
+                resumo = self._carregar(hoje)
+                if resumo is None:
+                    return []
+                self._resumo, self._dia = resumo, hoje
+            return self._resumo
+
+    @staticmethod
+    def totais(resumo: list[dict]) -> dict:
+        """Soma dos contadores de todas as empresas."""
+        return {contador: sum(linha[contador] for linha in resumo) for contador in CONTADORES}
+
+    def _assinatura(self) -> Optional[str]:
+        """Versão máxima e quantidade de linhas das tabelas de origem, como texto."""
+        versoes = self.tracker.fetch_versions()
+        if versoes is None:
+            return None
+        return ";".join(f"{tabela}:{versoes[tabela][0]}:{versoes[tabela][1]}" for tabela in ORIGENS)
+
+    @retry_on_disconnect
+    def _carregar(self, hoje: date) -> Optional[list[dict]]:
+        """Lê o resumo materializado ou o recalcula se estiver desatualizado."""
+        try:
+            assinatura = self._assinatura()
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(f"""
+                    SELECT empresa_id, {', '.join(CONTADORES)}, assinatura, atualizado_em
+                    FROM resumo_conformidade
+                """)
+                rows = cursor.fetchall()
+                if (assinatura is not None and rows
+                        and all(row[-2] == assinatura and row[-1].date() == hoje for row in rows)):
+                    logger.debug(f"Resumo de conformidade lido da tabela ({len(rows)} empresas)")
+                    return [dict(zip(('empresa_id',) + CONTADORES, row[:-2])) for row in rows]
+                return self._recalcular(conn, cursor, assinatura)
+        except Exception as e:
+            logger.error(f"Erro ao carregar resumo de conformidade: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+
+    def atualizar_resumo(self) -> list[dict]:
+        """
+        Recalcula o resumo e regrava `resumo_conformidade` (tarefa noturna).
+
+        Raises:
+            Exception: Erros do banco são repassados ao agendador
+        """
+        assinatura = self._assinatura()
+        with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            resumo = self._recalcular(conn, cursor, assinatura)
+        with self._lock:
+            self._resumo, self._dia = resumo, date.today()
+        return resumo
+
+    def _recalcular(self, conn, cursor, assinatura: Optional[str]) -> list[dict]:
+        """
+        Calcula os contadores com as consultas agrupadas e regrava a tabela.
+
+        A assinatura é lida antes das consultas: uma escrita concorrente faz o
+        próximo acesso recalcular de novo.
+        """
+        inicio = datetime.now()
+        empresas = {}
+
+        def contadores(empresa_id):
+            if empresa_id not in empresas:
+                empresas[empresa_id] = {'empresa_id': empresa_id, **dict.fromkeys(CONTADORES, 0)}
+            return empresas[empresa_id]
+
+        cursor.execute(f"""
+            SELECT empresa_id, urgencia, COUNT_BIG(*) FROM (
+                SELECT e.empresa_id, {urgencia_sql()} AS urgencia
+                FROM equipamentos e
+                WHERE e.empresa_id IS NOT NULL
+                  AND (e.ativo = 1 OR (e.ativo IS NULL AND e.status = 'ativo'))
+            ) equipamentos_ativos
+            GROUP BY empresa_id, urgencia
+        """)
+        for empresa_id, urgencia, quantidade in cursor.fetchall():
+            linha = contadores(empresa_id)
+            linha['equipamentos'] += quantidade
+            if urgencia:
+                linha[CONTADOR_DA_URGENCIA[urgencia]] += quantidade
+
+        cursor.execute("""
+            SELECT empresa_id, situacao, COUNT_BIG(*) FROM (
+                SELECT e.empresa_id,
+                       CASE WHEN i.resultado LIKE 'Aprovado%' THEN 'aprovadas'
+                            WHEN i.resultado = 'Reprovado' THEN 'reprovadas'
+                            WHEN i.resultado = 'Pendente' THEN 'pendentes'
+                       END AS situacao
+                FROM inspecoes i
+                JOIN equipamentos e ON e.id = i.equipamento_id
+                WHERE e.empresa_id IS NOT NULL
+                  AND (i.status IS NULL OR i.status <> 'cancelada')
+            ) inspecoes_validas
+            WHERE situacao IS NOT NULL
+            GROUP BY empresa_id, situacao
+        """)
+        for empresa_id, situacao, quantidade in cursor.fetchall():
+            contadores(empresa_id)[situacao] += quantidade
+
+        resumo = sorted(empresas.values(), key=lambda linha: linha['empresa_id'])
+        agora = inicio.replace(microsecond=0)
+        cursor.execute("DELETE FROM resumo_conformidade")
+        if resumo:
+            self.dialect.prepare_bulk(cursor)
+            cursor.executemany(f"""
+                INSERT INTO resumo_conformidade (empresa_id, {', '.join(CONTADORES)}, assinatura, atualizado_em)
+                VALUES (?, {', '.join('?' for _ in CONTADORES)}, ?, ?)
+            """, [(linha['empresa_id'], *(linha[c] for c in CONTADORES), assinatura, agora)
+                  for linha in resumo])
+        conn.commit()
+        self.recalculos += 1
+        logger.info(f"Resumo de conformidade recalculado: {len(resumo)} empresas em "
+                    f"{(datetime.now() - inicio).total_seconds() * 1000:.0f} ms")
+        return resumo
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    controller = DashboardController(DatabaseModels())
+    resumo = controller.atualizar_resumo()
+    print(f"{'Empresa':>8} " + " ".join(f"{contador:>12}" for contador in CONTADORES))
+    for linha in resumo:
+        print(f"{linha['empresa_id']:>8} " + " ".join(f"{linha[c]:>12}" for c in CONTADORES))
+    totais = DashboardController.totais(resumo)
+    print(f"{'Total':>8} " + " ".join(f"{totais[c]:>12}" for c in CONTADORES))
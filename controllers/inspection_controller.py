@@ -1,218 +1,240 @@
 from database.models import DatabaseModels
 import logging
-from datetime import datetime, timedelta
+from contextlib import closing
+from database.health import retry_on_disconnect
+from database.change_tracking import read_watermark, version_filter, fetch_deleted_ids
+from database.paging import PAGE_SIZE, keyset_condition, keyset_params
+from datetime import datetime
 import traceback
 from db.models import InspecaoModel
-import sqlite3
+from services.due_dates import DueDateEngine
 
 logger = logging.getLogger(__name__)
 
 class InspectionController:
+    # Colunas e JOINs comuns às listagens de inspeções
+    _LIST_QUERY = """
+        SELECT 
+            i.id,
+            i.equipamento_id,
+            i.data_inspecao,
+            i.tipo_inspecao,
+            i.resultado,
+            i.recomendacoes,
+            i.proxima_inspecao,
+            i.engenheiro_id,
+            i.status,
+            i.prazo_proxima_inspecao,
+            e.tag AS equipamento_tag,
+            e.categoria AS equipamento_categoria,
+            u.nome AS engenheiro_nome
+        FROM dbo.inspecoes i
+        JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+        JOIN dbo.usuarios u ON i.engenheiro_id = u.id
+    """
+
     def __init__(self, db_models: DatabaseModels):
         logger.debug("Iniciando InspectionController")
         self.db_models = db_models
         self.model = InspecaoModel(db_models)
-        self.connection = None
-        self._ensure_connection()
+        self.pool = db_models.db.pool
+        self.dialect = db_models.db.dialect
+        self.prazos = DueDateEngine(db_models)
         
-    def _ensure_connection(self):
-        """Garante que a conexão com o banco de dados está ativa"""
-        try:
-            if self.connection is None or self.connection.closed:
-                self.connection = self.db_models.db.get_connection()
-                logger.debug("Nova conexão com o banco de dados estabelecida")
-            # Teste simples para verificar se a conexão está ativa
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            cursor.close()
-            logger.debug("Conexão com o banco de dados está ativa")
-            return True
-        except Exception as e:
-            logger.error(f"Erro ao verificar conexão: {str(e)}")
-            # Tenta reconectar
-            try:
-                self.connection = self.db_models.db.get_connection()
-                logger.debug("Reconexão com o banco de dados estabelecida")
-                return True
-            except Exception as e2:
-                logger.error(f"Falha ao reconectar: {str(e2)}")
-                return False
-                
     def force_sync(self):
-        """Força a sincronização com o banco de dados"""
-        try:
-            if self._ensure_connection():
-                # Forçar commit de quaisquer transações pendentes
-                self.connection.commit()
-                logger.debug("Sincronização forçada com o banco de dados realizada com sucesso")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Erro ao forçar sincronização: {str(e)}")
-            return False
+        """
+        Mantido por compatibilidade.
+
+        Cada operação usa uma conexão própria do pool e confirma sua transação,
+        então não há transação pendente para sincronizar.
+        """
+        return True
         
     def criar_inspecao(self, equipamento_id: int, engenheiro_id: int, 
                       data_inspecao: str, tipo_inspecao: str,
                       resultado: str = None, recomendacoes: str = None) -> tuple[bool, str]:
         """Cria uma nova inspeção no sistema"""
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Criando inspeção para equipamento {equipamento_id}")
             logger.debug(f"Parâmetros - engenheiro: {engenheiro_id}, data: {data_inspecao}, tipo: {tipo_inspecao}")
-            
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            # Converte a data para o formato correto do SQL Server
-            if isinstance(data_inspecao, str):
-                try:
-                    data_obj = datetime.strptime(data_inspecao, "%Y-%m-%d")
-                except ValueError:
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                # Converte a data para o formato correto do SQL Server
+                if isinstance(data_inspecao, str):
                     try:
-                        data_obj = datetime.strptime(data_inspecao, "%d/%m/%Y")
+                        data_obj = datetime.strptime(data_inspecao, "%Y-%m-%d")
                     except ValueError:
-                        return False, "Formato de data inválido. Use YYYY-MM-DD ou DD/MM/YYYY"
-            else:
-                # Se já é um objeto date, converte para datetime
-                data_obj = datetime.combine(data_inspecao, datetime.min.time())
-            
-            # Formata a data no estilo ISO que o SQL Server aceita
-            data_formatada = data_obj.isoformat(timespec='seconds')
-            
-            # Define valores padrão para campos obrigatórios se não fornecidos
-            resultado = resultado or "Pendente"
-            recomendacoes = recomendacoes or ""
-            
-            # Calcula a próxima inspeção (6 meses após a data atual)
-            proxima_inspecao = data_obj + timedelta(days=180)
-            
-            insert_query = """
-                INSERT INTO dbo.inspecoes (
-                    equipamento_id, engenheiro_id, data_inspecao, 
-                    tipo_inspecao, resultado, recomendacoes,
-                    proxima_inspecao, status, prazo_proxima_inspecao
+                        try:
+                            data_obj = datetime.strptime(data_inspecao, "%d/%m/%Y")
+                        except ValueError:
+                            return False, "Formato de data inválido. Use YYYY-MM-DD ou DD/MM/YYYY"
+                else:
+                    # Se já é um objeto date, converte para datetime
+                    data_obj = datetime.combine(data_inspecao, datetime.min.time())
+            
+                # Formata a data no estilo ISO que o SQL Server aceita
+                data_formatada = data_obj.isoformat(timespec='seconds')
+            
+                # Define valores padrão para campos obrigatórios se não fornecidos
+                resultado = resultado or "Pendente"
+                recomendacoes = recomendacoes or ""
+            
+                # A próxima inspeção é calculada depois da inserção (prazos NR-13)
+                insert_query = """
+                    INSERT INTO dbo.inspecoes (
+                        equipamento_id, engenheiro_id, data_inspecao, 
+                        tipo_inspecao, resultado, recomendacoes, status
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """
+            
+                values = (
+                    equipamento_id, engenheiro_id, data_formatada, 
+                    tipo_inspecao, resultado, recomendacoes, 'Ativo'
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
             
-            values = (
-                equipamento_id, engenheiro_id, data_formatada, 
-                tipo_inspecao, resultado, recomendacoes,
-                proxima_inspecao.isoformat(timespec='seconds'),
-                'Ativo',
-                proxima_inspecao.isoformat(timespec='seconds')
-            )
-            
-            logger.debug(f"Query: {insert_query}")
-            logger.debug(f"Valores: {values}")
+                logger.debug(f"Query: {insert_query}")
+                logger.debug(f"Valores: {values}")
             
-            cursor.execute(insert_query, values)
+                cursor.execute(insert_query, values)
             
-            # Verifica se a operação teve sucesso
-            rows_affected = cursor.rowcount
-            logger.debug(f"Linhas afetadas: {rows_affected}")
+                # Verifica se a operação teve sucesso
+                rows_affected = cursor.rowcount
+                logger.debug(f"Linhas afetadas: {rows_affected}")
             
-            if rows_affected == 0:
-                logger.warning("Nenhuma linha inserida")
-                return False, "Falha ao inserir a inspeção"
+                if rows_affected == 0:
+                    logger.warning("Nenhuma linha inserida")
+                    return False, "Falha ao inserir a inspeção"
                 
-            # Obtém o ID da inspeção inserida
-            cursor.execute("SELECT @@IDENTITY")
-            inspection_id = cursor.fetchone()[0]
-            logger.debug(f"ID da inspeção inserida: {inspection_id}")
-            
-            # Força a sincronização
-            self.force_sync()
-            
-            logger.info(f"Inspeção #{inspection_id} criada com sucesso para equipamento {equipamento_id}")
-            return True, f"Inspeção #{inspection_id} criada com sucesso!"
+                # Obtém o ID da inspeção inserida
+                inspection_id = self.dialect.last_insert_id(cursor)
+                logger.debug(f"ID da inspeção inserida: {inspection_id}")
+            
+                # Recalcula os prazos do equipamento e guarda o mais próximo na inspeção
+                self.prazos.recalcular([equipamento_id], cursor)
+                cursor.execute("SELECT data_proxima_inspecao FROM dbo.equipamentos WHERE id = ?",
+                               (equipamento_id,))
+                row = cursor.fetchone()
+                proxima_inspecao = row[0] if row else None
+                if proxima_inspecao is not None:
+                    if isinstance(proxima_inspecao, str):
+                        proxima_inspecao = datetime.fromisoformat(proxima_inspecao[:10])
+                    proxima_inspecao = datetime.combine(proxima_inspecao, datetime.min.time())
+                    cursor.execute("""
+                        UPDATE dbo.inspecoes SET proxima_inspecao = ?, prazo_proxima_inspecao = ?
+                        WHERE id = ?
+                    """, (proxima_inspecao, (proxima_inspecao - data_obj).days, inspection_id))
+            
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
+            
+                logger.info(f"Inspeção #{inspection_id} criada com sucesso para equipamento {equipamento_id}")
+                return True, f"Inspeção #{inspection_id} criada com sucesso!"
             
         except Exception as e:
             logger.error(f"Erro ao criar inspeção: {str(e)}")
             logger.error(traceback.format_exc())
-            if 'conn' in locals():
-                conn.rollback()
             return False, f"Erro ao criar inspeção: {str(e)}"
             
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            
-    def get_all_inspections(self):
-        """Retorna todas as inspeções"""
-        # Garante que a conexão está ativa
-        self._ensure_connection()
-        
-        query = """
-            SELECT 
-                i.id,
-                i.equipamento_id,
-                i.data_inspecao,
-                i.tipo_inspecao,
-                i.resultado,
-                i.recomendacoes,
-                i.proxima_inspecao,
-                i.engenheiro_id,
-                i.status,
-                i.prazo_proxima_inspecao,
-                e.tag AS equipamento_tag,
-                e.categoria AS equipamento_categoria,
-                u.nome AS engenheiro_nome
-            FROM dbo.inspecoes i
-            JOIN dbo.equipamentos e ON i.equipamento_id = e.id
-            JOIN dbo.usuarios u ON i.engenheiro_id = u.id
+    @retry_on_disconnect
+    def get_all_inspections(self, since: int = None, consistent: bool = False):
+        """
+        Retorna todas as inspeções.
+
+        Args:
+            since: Marca d'água (rowversion) de uma consulta anterior. Se
+                informada, retorna um delta {'rows', 'deleted', 'version'} com
+                as inspeções inseridas/alteradas e os IDs excluídos desde então.
+            consistent: Lê do servidor mesmo com a réplica local habilitada
+        """
+        filtro, params = "", ()
+        if since is not None:
+            filtro, params = f"WHERE {version_filter('i', 'e', 'u')}", (since,) * 3
+        query = f"""
+            {self._LIST_QUERY}
+            {filtro}
             ORDER BY i.data_inspecao DESC
         """
-        conn = self.connection
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(query)
-            columns = [column[0] for column in cursor.description]
-            result = []
-            for row in cursor.fetchall():
-                result.append(dict(zip(columns, row)))
-            return result
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                if since is not None:
+                    versao = read_watermark(cursor)
+                cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                result = []
+                for row in cursor.fetchall():
+                    result.append(dict(zip(columns, row)))
+                if since is not None:
+                    return {
+                        'rows': result,
+                        'deleted': fetch_deleted_ids(cursor, 'inspecoes', since),
+                        'version': versao
+                    }
+                return result
         except Exception as e:
             logger.error(f"Erro ao buscar inspeções: {str(e)}")
+            return [] if since is None else None
+        
+    @retry_on_disconnect
+    def get_inspections_page(self, after_date=None, after_id: int = None,
+                             limit: int = PAGE_SIZE, consistent: bool = False) -> list[dict]:
+        """
+        Retorna uma página de inspeções, das mais recentes para as mais antigas.
+
+        Args:
+            after_date: Data da última linha da página anterior (None na primeira página)
+            after_id: ID da última linha da página anterior
+            limit: Quantidade máxima de linhas
+            consistent: Lê do servidor mesmo com a réplica local habilitada
+        """
+        filtro, params = "", ()
+        if after_date is not None:
+            filtro = f"WHERE {keyset_condition(('i.data_inspecao', 'i.id'), descending=True)}"
+            params = keyset_params((after_date, after_id))
+        query = self.dialect.limit(f"""
+            SELECT * FROM ({self._LIST_QUERY}
+            {filtro}) i
+            ORDER BY i.data_inspecao DESC, i.id DESC
+        """)
+        try:
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(query, params + (limit,))
+                columns = [column[0] for column in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Erro ao buscar página de inspeções: {str(e)}")
             return []
-        finally:
-            cursor.close()
         
-    def get_filtered_inspections(self, filters):
-        """Retorna inspeções com base nos filtros aplicados
+    @retry_on_disconnect
+    def count_inspections(self, consistent: bool = False) -> int:
+        """Retorna a quantidade de inspeções listadas por get_all_inspections (None em caso de erro)."""
+        try:
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT COUNT_BIG(*)
+                    FROM dbo.inspecoes i
+                    JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+                    JOIN dbo.usuarios u ON i.engenheiro_id = u.id
+                """)
+                return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erro ao contar inspeções: {str(e)}")
+            return None
         
+    def filtered_query(self, filters) -> tuple[str, list]:
+        """
+        Monta a consulta de inspeções com os filtros (sem ORDER BY).
+
+        Usada pela listagem filtrada e pela exportação (services/export.py).
+
         Args:
-            filters (dict): Dicionário com os filtros a serem aplicados
-        
+            filters (dict): date_from/date_to, equipment_id, tipo_inspecao,
+                resultado e status
+
         Returns:
-            list: Lista de inspeções que atendem aos filtros
+            tuple: (SQL, parâmetros)
         """
-        query_parts = [
-            """
-            SELECT 
-                i.id,
-                i.equipamento_id,
-                i.data_inspecao,
-                i.tipo_inspecao,
-                i.resultado,
-                i.recomendacoes,
-                i.proxima_inspecao,
-                i.engenheiro_id,
-                i.status,
-                i.prazo_proxima_inspecao,
-                e.tag AS equipamento_tag,
-                e.categoria AS equipamento_categoria,
-                u.nome AS engenheiro_nome
-            FROM dbo.inspecoes i
-            JOIN dbo.equipamentos e ON i.equipamento_id = e.id
-            JOIN dbo.usuarios u ON i.engenheiro_id = u.id
-            WHERE 1=1
-            """
-        ]
+        query_parts = [self._LIST_QUERY, "WHERE 1=1"]
         params = []
         
         # Filtro por data
@@ -241,28 +263,35 @@ class InspectionController:
             query_parts.append("AND i.status = ?")
             params.append(filters['status'])
         
-        # Ordena por data (mais recente primeiro)
-        query_parts.append("ORDER BY i.data_inspecao DESC")
+        return " ".join(query_parts), params
+
+    @retry_on_disconnect
+    def get_filtered_inspections(self, filters):
+        """Retorna inspeções com base nos filtros aplicados
         
-        # Monta a query completa
-        query = " ".join(query_parts)
+        Args:
+            filters (dict): Dicionário com os filtros a serem aplicados
         
-        # Executa a consulta
-        conn = self.connection
-        cursor = conn.cursor()
+        Returns:
+            list: Lista de inspeções que atendem aos filtros
+        """
+        query, params = self.filtered_query(filters)
         
+        # Ordena por data (mais recente primeiro)
+        query += " ORDER BY i.data_inspecao DESC"
+        
+        # Executa a consulta
         try:
-            cursor.execute(query, params)
-            columns = [column[0] for column in cursor.description]
-            result = []
-            for row in cursor.fetchall():
-                result.append(dict(zip(columns, row)))
-            return result
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                result = []
+                for row in cursor.fetchall():
+                    result.append(dict(zip(columns, row)))
+                return result
         except Exception as e:
             logger.error(f"Erro ao buscar inspeções filtradas: {str(e)}")
             return []
-        finally:
-            cursor.close()
             
     def get_inspection_by_id(self, inspection_id):
         """Retorna uma inspeção específica pelo ID"""
@@ -277,255 +306,232 @@ class InspectionController:
             logger.error(f"Erro ao obter inspeção {inspection_id}: {str(e)}")
             return None
             
+    @retry_on_disconnect
     def get_inspections_by_engineer(self, engineer_id: int) -> list[dict]:
         """Retorna as inspeções de um engenheiro específico"""
         try:
             logger.debug(f"Buscando inspeções do engenheiro {engineer_id}")
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT i.id, i.equipamento_id, i.engenheiro_id, 
-                       i.data_inspecao, i.tipo_inspecao,
-                       e.tag as equipamento_tag, e.categoria as equipamento_categoria,
-                       u.nome as engenheiro_nome
-                FROM inspecoes i
-                JOIN equipamentos e ON i.equipamento_id = e.id
-                JOIN usuarios u ON i.engenheiro_id = u.id
-                WHERE i.engenheiro_id = ?
-            """, (engineer_id,))
-            
-            inspections = []
-            for row in cursor.fetchall():
-                inspections.append({
-                    'id': row[0],
-                    'equipamento_id': row[1],
-                    'engenheiro_id': row[2],
-                    'data': row[3],
-                    'tipo': row[4],
-                    'equipamento_tag': row[5],
-                    'equipamento_categoria': row[6],
-                    'engenheiro_nome': row[7]
-                })
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT i.id, i.equipamento_id, i.engenheiro_id, 
+                           i.data_inspecao, i.tipo_inspecao,
+                           e.tag as equipamento_tag, e.categoria as equipamento_categoria,
+                           u.nome as engenheiro_nome
+                    FROM inspecoes i
+                    JOIN equipamentos e ON i.equipamento_id = e.id
+                    JOIN usuarios u ON i.engenheiro_id = u.id
+                    WHERE i.engenheiro_id = ?
+                """, (engineer_id,))
+            
+                inspections = []
+                for row in cursor.fetchall():
+                    inspections.append({
+                        'id': row[0],
+                        'equipamento_id': row[1],
+                        'engenheiro_id': row[2],
+                        'data': row[3],
+                        'tipo': row[4],
+                        'equipamento_tag': row[5],
+                        'equipamento_categoria': row[6],
+                        'engenheiro_nome': row[7]
+                    })
                 
-            logger.debug(f"Encontradas {len(inspections)} inspeções para o engenheiro {engineer_id}")
-            return inspections
+                logger.debug(f"Encontradas {len(inspections)} inspeções para o engenheiro {engineer_id}")
+                return inspections
             
         except Exception as e:
             logger.error(f"Erro ao buscar inspeções do engenheiro {engineer_id}: {str(e)}")
             logger.error(traceback.format_exc())
             return []
             
-        finally:
-            cursor.close()
-            
-    def get_inspections_by_company(self, company_id: int) -> list[dict]:
+    @retry_on_disconnect
+    def get_inspections_by_company(self, company_id: int, consistent: bool = False) -> list[dict]:
         """Retorna as inspeções de uma empresa específica"""
         try:
             logger.debug(f"Buscando inspeções da empresa ID: {company_id}")
-            self._ensure_connection()
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT i.id, i.equipamento_id, i.engenheiro_id, 
-                       i.data_inspecao, i.tipo_inspecao, i.resultado,
-                       e.tag as equipamento_tag, e.categoria as equipamento_categoria,
-                       u.nome as engenheiro_nome
-                FROM inspecoes i
-                JOIN equipamentos e ON i.equipamento_id = e.id
-                JOIN usuarios u ON i.engenheiro_id = u.id
-                WHERE e.empresa_id = ?
-            """, (company_id,))
-            
-            inspections = []
-            for row in cursor.fetchall():
-                inspections.append({
-                    'id': row[0],
-                    'equipamento_id': row[1],
-                    'engenheiro_id': row[2],
-                    'data': row[3],
-                    'tipo': row[4],
-                    'resultado': row[5],
-                    'equipamento_tag': row[6],
-                    'equipamento_categoria': row[7],
-                    'engenheiro_nome': row[8]
-                })
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT i.id, i.equipamento_id, i.engenheiro_id, 
+                           i.data_inspecao, i.tipo_inspecao, i.resultado,
+                           e.tag as equipamento_tag, e.categoria as equipamento_categoria,
+                           u.nome as engenheiro_nome
+                    FROM inspecoes i
+                    JOIN equipamentos e ON i.equipamento_id = e.id
+                    JOIN usuarios u ON i.engenheiro_id = u.id
+                    WHERE e.empresa_id = ?
+                """, (company_id,))
+            
+                inspections = []
+                for row in cursor.fetchall():
+                    inspections.append({
+                        'id': row[0],
+                        'equipamento_id': row[1],
+                        'engenheiro_id': row[2],
+                        'data': row[3],
+                        'tipo': row[4],
+                        'resultado': row[5],
+                        'equipamento_tag': row[6],
+                        'equipamento_categoria': row[7],
+                        'engenheiro_nome': row[8]
+                    })
                 
-            logger.debug(f"Encontradas {len(inspections)} inspeções para a empresa ID: {company_id}")
-            return inspections
+                logger.debug(f"Encontradas {len(inspections)} inspeções para a empresa ID: {company_id}")
+                return inspections
             
         except Exception as e:
             logger.error(f"Erro ao buscar inspeções da empresa {company_id}: {str(e)}")
             logger.error(traceback.format_exc())
             return []
             
-        finally:
-            cursor.close()
-            
     def update_inspection(self, inspection_id: int, **kwargs) -> tuple[bool, str]:
         """Atualiza os dados de uma inspeção"""
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Atualizando inspeção {inspection_id} com parâmetros: {kwargs}")
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            # Verifica se a inspeção existe
-            cursor.execute("SELECT id FROM inspecoes WHERE id = ?", (inspection_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Inspeção {inspection_id} não encontrada")
-                return False, f"Inspeção {inspection_id} não encontrada"
-            
-            update_fields = []
-            values = []
-            
-            for field, value in kwargs.items():
-                if value is not None:
-                    update_fields.append(f"{field} = ?")
-                    values.append(value)
-                    logger.debug(f"Campo a atualizar: {field} = {value}")
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                # Verifica se a inspeção existe
+                cursor.execute("SELECT equipamento_id FROM inspecoes WHERE id = ?", (inspection_id,))
+                row = cursor.fetchone()
+                if not row:
+                    logger.warning(f"Inspeção {inspection_id} não encontrada")
+                    return False, f"Inspeção {inspection_id} não encontrada"
+                equipamentos = {row[0]}
+            
+                update_fields = []
+                values = []
+            
+                for field, value in kwargs.items():
+                    if value is not None:
+                        update_fields.append(f"{field} = ?")
+                        values.append(value)
+                        logger.debug(f"Campo a atualizar: {field} = {value}")
                     
-            if not update_fields:
-                logger.warning("Nenhum campo para atualizar")
-                return False, "Nenhum campo para atualizar"
+                if not update_fields:
+                    logger.warning("Nenhum campo para atualizar")
+                    return False, "Nenhum campo para atualizar"
                 
-            values.append(inspection_id)
+                values.append(inspection_id)
             
-            update_query = f"""
-                UPDATE inspecoes
-                SET {', '.join(update_fields)}
-                WHERE id = ?
-            """
-            logger.debug(f"Query de atualização: {update_query}")
-            logger.debug(f"Valores: {values}")
+                update_query = f"""
+                    UPDATE inspecoes
+                    SET {', '.join(update_fields)}
+                    WHERE id = ?
+                """
+                logger.debug(f"Query de atualização: {update_query}")
+                logger.debug(f"Valores: {values}")
+            
+                cursor.execute(update_query, values)
             
-            cursor.execute(update_query, values)
+                # Verifica se alguma linha foi afetada
+                rows_affected = cursor.rowcount
+                logger.debug(f"Linhas afetadas: {rows_affected}")
             
-            # Verifica se alguma linha foi afetada
-            rows_affected = cursor.rowcount
-            logger.debug(f"Linhas afetadas: {rows_affected}")
+                if rows_affected == 0:
+                    logger.warning(f"Nenhuma linha afetada na atualização da inspeção {inspection_id}")
+                    return False, "Nenhuma alteração realizada"
             
-            if rows_affected == 0:
-                logger.warning(f"Nenhuma linha afetada na atualização da inspeção {inspection_id}")
-                return False, "Nenhuma alteração realizada"
+                if kwargs.get('equipamento_id') is not None:
+                    equipamentos.add(kwargs['equipamento_id'])
+                self.prazos.recalcular(equipamentos, cursor)
             
-            # Força a sincronização
-            self.force_sync()
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
             
-            logger.info(f"Inspeção {inspection_id} atualizada com sucesso. Linhas afetadas: {rows_affected}")
-            return True, "Inspeção atualizada com sucesso!"
+                logger.info(f"Inspeção {inspection_id} atualizada com sucesso. Linhas afetadas: {rows_affected}")
+                return True, "Inspeção atualizada com sucesso!"
             
         except Exception as e:
             logger.error(f"Erro ao atualizar inspeção {inspection_id}: {str(e)}")
             logger.error(traceback.format_exc())
-            if 'conn' in locals():
-                conn.rollback()
             return False, f"Erro ao atualizar inspeção: {str(e)}"
             
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            
     def cancel_inspection(self, inspection_id: int) -> tuple[bool, str]:
         """Cancela uma inspeção"""
         try:
             logger.debug(f"Cancelando inspeção {inspection_id}")
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE inspecoes
-                SET status = 'cancelada'
-                WHERE id = ?
-            """, (inspection_id,))
-            
-            conn.commit()
-            logger.info(f"Inspeção {inspection_id} cancelada com sucesso")
-            return True, "Inspeção cancelada com sucesso!"
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    UPDATE inspecoes
+                    SET status = 'cancelada'
+                    WHERE id = ?
+                """, (inspection_id,))
+                cursor.execute("SELECT equipamento_id FROM inspecoes WHERE id = ?", (inspection_id,))
+                self.prazos.recalcular([row[0] for row in cursor.fetchall()], cursor)
+            
+                conn.commit()
+                self.db_models.db.written()
+                logger.info(f"Inspeção {inspection_id} cancelada com sucesso")
+                return True, "Inspeção cancelada com sucesso!"
             
         except Exception as e:
             logger.error(f"Erro ao cancelar inspeção {inspection_id}: {str(e)}")
             logger.error(traceback.format_exc())
             return False, f"Erro ao cancelar inspeção: {str(e)}"
             
-        finally:
-            cursor.close()
-            
+    @retry_on_disconnect
     def get_available_equipment(self) -> list[dict]:
         """Retorna os equipamentos disponíveis para inspeção"""
         try:
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT e.id, e.tipo, e.empresa, e.localizacao, e.codigo_projeto,
-                       e.pressao_maxima, e.temperatura_maxima, e.status
-                FROM equipamentos e
-                LEFT JOIN inspecoes i ON e.id = i.equipamento_id
-                WHERE e.status = 'ativo'
-                AND (i.id IS NULL OR i.data < DATEADD(month, -6, GETDATE()))
-            """)
-            
-            equipment = []
-            for row in cursor.fetchall():
-                equipment.append({
-                    'id': row[0],
-                    'tipo': row[1],
-                    'empresa': row[2],
-                    'localizacao': row[3],
-                    'codigo': row[4],
-                    'pressao': row[5],
-                    'temperatura': row[6],
-                    'status': row[7]
-                })
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT e.id, e.tipo, e.empresa, e.localizacao, e.codigo_projeto,
+                           e.pressao_maxima, e.temperatura_maxima, e.status
+                    FROM equipamentos e
+                    LEFT JOIN inspecoes i ON e.id = i.equipamento_id
+                    WHERE e.status = 'ativo'
+                    AND (i.id IS NULL OR i.data_inspecao < DATEADD(month, -6, GETDATE()))
+                """)
+            
+                equipment = []
+                for row in cursor.fetchall():
+                    equipment.append({
+                        'id': row[0],
+                        'tipo': row[1],
+                        'empresa': row[2],
+                        'localizacao': row[3],
+                        'codigo': row[4],
+                        'pressao': row[5],
+                        'temperatura': row[6],
+                        'status': row[7]
+                    })
                 
-            return equipment
+                return equipment
             
         except Exception as e:
             logger.error(f"Erro ao buscar equipamentos disponíveis: {str(e)}")
             return []
             
-        finally:
-            cursor.close()
-            
+    @retry_on_disconnect
     def get_equipment_by_company(self, company: str) -> list[dict]:
         """Retorna os equipamentos de uma empresa específica"""
         try:
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT id, tipo, empresa, localizacao, codigo_projeto, 
-                       pressao_maxima, temperatura_maxima, status
-                FROM equipamentos
-                WHERE empresa = ? AND status = 'ativo'
-            """, (company,))
-            
-            equipment = []
-            for row in cursor.fetchall():
-                equipment.append({
-                    'id': row[0],
-                    'tipo': row[1],
-                    'empresa': row[2],
-                    'localizacao': row[3],
-                    'codigo': row[4],
-                    'pressao': row[5],
-                    'temperatura': row[6],
-                    'status': row[7]
-                })
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT id, tipo, empresa, localizacao, codigo_projeto, 
+                           pressao_maxima, temperatura_maxima, status
+                    FROM equipamentos
+                    WHERE empresa = ? AND status = 'ativo'
+                """, (company,))
+            
+                equipment = []
+                for row in cursor.fetchall():
+                    equipment.append({
+                        'id': row[0],
+                        'tipo': row[1],
+                        'empresa': row[2],
+                        'localizacao': row[3],
+                        'codigo': row[4],
+                        'pressao': row[5],
+                        'temperatura': row[6],
+                        'status': row[7]
+                    })
                 
-            return equipment
+                return equipment
             
         except Exception as e:
             logger.error(f"Erro ao buscar equipamentos da empresa {company}: {str(e)}")
             return []
             
-        finally:
-            cursor.close()
-            
     def create_inspection(self, inspection_data):
         """Cria uma nova inspeção"""
         try:
@@ -566,23 +572,15 @@ class InspectionController:
             return False, "ID da inspeção não fornecido"
             
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Excluindo inspeção {inspection_id}")
-            conn = self.connection
-            cursor = conn.cursor()
-            
             # Verificar se a inspeção existe
             existing_inspection = self.model.get_by_id(inspection_id)
             if not existing_inspection:
                 logger.warning(f"Inspeção {inspection_id} não encontrada")
                 return False, f"Inspeção {inspection_id} não encontrada"
             
-            # Iniciar uma transação para garantir atomicidade
-            conn.execute("BEGIN TRANSACTION")
-            
-            try:
+            # Relatórios e inspeção são excluídos na mesma conexão e transação
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
                 # 1. Primeiro, excluir os relatórios associados à inspeção
                 logger.debug(f"Excluindo relatórios associados à inspeção {inspection_id}")
                 cursor.execute("DELETE FROM relatorios WHERE inspecao_id = ?", (inspection_id,))
@@ -591,25 +589,18 @@ class InspectionController:
                 
                 # 2. Agora, excluir a inspeção
                 logger.debug(f"Excluindo inspeção {inspection_id}")
-                success = self.model.delete(inspection_id)
+                cursor.execute("DELETE FROM inspecoes WHERE id = ?", (inspection_id,))
                 
-                if success:
+                if cursor.rowcount > 0:
+                    self.prazos.recalcular([existing_inspection['equipamento_id']], cursor)
                     # Confirmar a transação
                     conn.commit()
-                    
-                    # Força a sincronização
-                    self.force_sync()
-                    
+                    self.db_models.db.written()
                     return True, f"Inspeção {inspection_id} e {deleted_reports_count} relatórios associados excluídos com sucesso"
                 else:
                     # Reverter alterações em caso de falha
                     conn.rollback()
                     return False, f"Erro ao excluir inspeção {inspection_id}"
-                    
-            except Exception as e:
-                # Reverter alterações em caso de exceção
-                conn.rollback()
-                raise e
                 
         except Exception as e:
             logger.error(f"Erro ao excluir inspeção {inspection_id}: {str(e)}")
@@ -708,29 +699,29 @@ class InspectionController:
             """
             
             # Executa o comando
-            self.cursor.execute(sql, (
-                equipamento_id,
-                engenheiro_id,
-                data,
-                tipo,
-                resultado,
-                recomendacoes
-            ))
-            
-            # Confirma a transação
-            self.conn.commit()
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(sql, (
+                    equipamento_id,
+                    engenheiro_id,
+                    data,
+                    tipo,
+                    resultado,
+                    recomendacoes
+                ))
+                
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
             
             logging.info(f"Inspeção adicionada com sucesso: equipamento_id={equipamento_id}, engenheiro_id={engenheiro_id}")
             return True
             
-        except sqlite3.Error as e:
-            # Reverte a transação em caso de erro
-            self.conn.rollback()
+        except self.dialect.errors as e:
+            # A transação é desfeita ao devolver a conexão ao pool
             logging.error(f"Erro ao adicionar inspeção: {str(e)}")
             return False
         except Exception as e:
-            # Reverte a transação em caso de erro
-            self.conn.rollback()
+            # A transação é desfeita ao devolver a conexão ao pool
             logging.error(f"Erro inesperado ao adicionar inspeção: {str(e)}")
             return False
 
@@ -746,73 +737,67 @@ class InspectionController:
             tuple: (bool, str) - Sucesso e mensagem
         """
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Atualizando inspeção {inspection_id} com dados: {inspection_data}")
             
-            # Verificar se a inspeção existe
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT id FROM dbo.inspecoes WHERE id = ?", (inspection_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Inspeção {inspection_id} não encontrada")
-                return False, f"Inspeção {inspection_id} não encontrada"
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                # Verificar se a inspeção existe
+                cursor.execute("SELECT equipamento_id FROM dbo.inspecoes WHERE id = ?", (inspection_id,))
+                row = cursor.fetchone()
+                if not row:
+                    logger.warning(f"Inspeção {inspection_id} não encontrada")
+                    return False, f"Inspeção {inspection_id} não encontrada"
+                equipamento_anterior = row[0]
             
-            # Verificar campos obrigatórios
-            required_fields = ['equipamento_id', 'engenheiro_id', 'data_inspecao', 
-                              'tipo_inspecao', 'resultado']
-            for field in required_fields:
-                if field not in inspection_data or not inspection_data[field]:
-                    logger.warning(f"Campo obrigatório ausente: {field}")
-                    return False, f"Campo obrigatório ausente: {field}"
+                # Verificar campos obrigatórios
+                required_fields = ['equipamento_id', 'engenheiro_id', 'data_inspecao', 
+                                  'tipo_inspecao', 'resultado']
+                for field in required_fields:
+                    if field not in inspection_data or not inspection_data[field]:
+                        logger.warning(f"Campo obrigatório ausente: {field}")
+                        return False, f"Campo obrigatório ausente: {field}"
+            
+                # Construir a query de atualização
+                update_fields = []
+                update_values = []
             
-            # Construir a query de atualização
-            update_fields = []
-            update_values = []
+                for field, value in inspection_data.items():
+                    if field != 'id':  # Não atualiza o ID
+                        update_fields.append(f"{field} = ?")
+                        update_values.append(value)
+                        logger.debug(f"Campo a atualizar: {field} = {value}")
             
-            for field, value in inspection_data.items():
-                if field != 'id':  # Não atualiza o ID
-                    update_fields.append(f"{field} = ?")
-                    update_values.append(value)
-                    logger.debug(f"Campo a atualizar: {field} = {value}")
+                if not update_fields:
+                    logger.warning("Nenhum campo para atualizar")
+                    return False, "Nenhum campo para atualizar"
             
-            if not update_fields:
-                logger.warning("Nenhum campo para atualizar")
-                return False, "Nenhum campo para atualizar"
+                # Adiciona o ID para a cláusula WHERE
+                update_values.append(inspection_id)
             
-            # Adiciona o ID para a cláusula WHERE
-            update_values.append(inspection_id)
+                # Executa a atualização
+                update_query = f"UPDATE dbo.inspecoes SET {', '.join(update_fields)} WHERE id = ?"
+                logger.debug(f"Query de atualização: {update_query}")
+                logger.debug(f"Valores: {update_values}")
             
-            # Executa a atualização
-            update_query = f"UPDATE dbo.inspecoes SET {', '.join(update_fields)} WHERE id = ?"
-            logger.debug(f"Query de atualização: {update_query}")
-            logger.debug(f"Valores: {update_values}")
+                cursor.execute(update_query, update_values)
             
-            cursor.execute(update_query, update_values)
+                # Verifica se alguma linha foi afetada
+                rows_affected = cursor.rowcount
+                logger.debug(f"Linhas afetadas: {rows_affected}")
             
-            # Verifica se alguma linha foi afetada
-            rows_affected = cursor.rowcount
-            logger.debug(f"Linhas afetadas: {rows_affected}")
+                if rows_affected == 0:
+                    logger.warning(f"Nenhuma linha afetada na atualização da inspeção {inspection_id}")
+                    return False, "Nenhuma alteração realizada"
             
-            if rows_affected == 0:
-                logger.warning(f"Nenhuma linha afetada na atualização da inspeção {inspection_id}")
-                return False, "Nenhuma alteração realizada"
+                self.prazos.recalcular({equipamento_anterior, inspection_data['equipamento_id']}, cursor)
             
-            # Força a sincronização
-            self.force_sync()
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
             
-            logger.info(f"Inspeção {inspection_id} atualizada com sucesso. Campos: {', '.join(update_fields)}")
-            return True, f"Inspeção {inspection_id} atualizada com sucesso"
+                logger.info(f"Inspeção {inspection_id} atualizada com sucesso. Campos: {', '.join(update_fields)}")
+                return True, f"Inspeção {inspection_id} atualizada com sucesso"
             
         except Exception as e:
             logger.error(f"Erro ao atualizar inspeção {inspection_id}: {str(e)}")
             logger.error(traceback.format_exc())
-            if 'cursor' in locals():
-                cursor.close()
-            if hasattr(self, 'connection') and self.connection:
-                self.connection.rollback()
             return False, f"Erro ao atualizar inspeção: {str(e)}"
-        
-        finally:
-            if 'cursor' in locals():
-                cursor.close() 
\ No newline at end of file
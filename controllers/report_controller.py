@@ -1,393 +1,456 @@
 from database.models import DatabaseModels
 import logging
+from contextlib import closing
+from database.health import retry_on_disconnect
+from database.change_tracking import read_watermark, version_filter, fetch_deleted_ids
+from database.paging import PAGE_SIZE, keyset_condition, keyset_params
 from datetime import datetime
+import os
 import traceback
+from services.document_store import DocumentStore
 
 logger = logging.getLogger(__name__)
 
 class ReportController:
+    # Colunas e JOINs comuns às listagens de relatórios
+    _LIST_QUERY = """
+        SELECT 
+            r.id,
+            r.inspecao_id,
+            r.data_emissao,
+            r.link_arquivo,
+            r.observacoes,
+            i.tipo_inspecao,
+            i.resultado as inspecao_resultado,
+            e.tag as equipamento_tag,
+            e.categoria as equipamento_categoria,
+            u.nome as engenheiro_nome
+        FROM dbo.relatorios r
+        JOIN dbo.inspecoes i ON r.inspecao_id = i.id
+        JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+        JOIN dbo.usuarios u ON i.engenheiro_id = u.id
+    """
+
     def __init__(self, db_models: DatabaseModels):
         logger.debug("Iniciando ReportController")
         self.db_models = db_models
-        self.connection = None
-        self._ensure_connection()
+        self.pool = db_models.db.pool
+        self.dialect = db_models.db.dialect
+        self.documentos = DocumentStore(db_models)
+        
+    def _arquivar(self, link_arquivo: str) -> tuple:
+        """
+        Guarda o arquivo do relatório no repositório de documentos.
+
+        Returns:
+            tuple: (caminho no repositório, SHA-256); links que não são um
+            arquivo local (ex.: endereço de rede indisponível) ficam como estão
+        """
+        if not link_arquivo or not os.path.isfile(link_arquivo):
+            return link_arquivo, None
+        documento = self.documentos.guardar(link_arquivo)
+        return documento.caminho, documento.sha256
         
-    def _ensure_connection(self):
-        """Garante que a conexão com o banco de dados está ativa"""
-        try:
-            if self.connection is None or self.connection.closed:
-                self.connection = self.db_models.db.get_connection()
-                logger.debug("Nova conexão com o banco de dados estabelecida")
-            # Teste simples para verificar se a conexão está ativa
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            cursor.close()
-            logger.debug("Conexão com o banco de dados está ativa")
-            return True
-        except Exception as e:
-            logger.error(f"Erro ao verificar conexão: {str(e)}")
-            # Tenta reconectar
-            try:
-                self.connection = self.db_models.db.get_connection()
-                logger.debug("Reconexão com o banco de dados estabelecida")
-                return True
-            except Exception as e2:
-                logger.error(f"Falha ao reconectar: {str(e2)}")
-                return False
-                
     def force_sync(self):
-        """Força a sincronização com o banco de dados"""
-        try:
-            if self._ensure_connection():
-                # Forçar commit de quaisquer transações pendentes
-                self.connection.commit()
-                logger.debug("Sincronização forçada com o banco de dados realizada com sucesso")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Erro ao forçar sincronização: {str(e)}")
-            return False
-            
+        """
+        Mantido por compatibilidade.
+
+        Cada operação usa uma conexão própria do pool e confirma sua transação,
+        então não há transação pendente para sincronizar.
+        """
+        return True
+        
     def criar_relatorio(self, inspecao_id: int, data_emissao: str, 
                       link_arquivo: str, observacoes: str = None) -> tuple[bool, str]:
         """Cria um novo relatório no sistema"""
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Criando relatório para inspeção {inspecao_id}")
             logger.debug(f"Parâmetros - data: {data_emissao}, arquivo: {link_arquivo}, obs: {observacoes}")
-            
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            # Verifica se a inspeção existe
-            cursor.execute("SELECT id FROM inspecoes WHERE id = ?", (inspecao_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Inspeção {inspecao_id} não encontrada")
-                return False, "Inspeção não encontrada"
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                # Verifica se a inspeção existe
+                cursor.execute("SELECT id FROM inspecoes WHERE id = ?", (inspecao_id,))
+                if not cursor.fetchone():
+                    logger.warning(f"Inspeção {inspecao_id} não encontrada")
+                    return False, "Inspeção não encontrada"
                 
-            # Converte a data para datetime se for string
-            if isinstance(data_emissao, str):
-                try:
-                    # Se a data contém horas, minutos e segundos
-                    if len(data_emissao) > 10:
-                        try:
-                            data_obj = datetime.strptime(data_emissao, "%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            data_obj = datetime.strptime(data_emissao[:10], "%Y-%m-%d")
-                    else:
-                        data_obj = datetime.strptime(data_emissao, "%Y-%m-%d")
-                except ValueError as e:
-                    logger.error(f"Formato de data inválido: {data_emissao}")
-                    logger.error(str(e))
-                    return False, "Formato de data inválido. Use YYYY-MM-DD HH:MM:SS ou YYYY-MM-DD"
-            else:
-                data_obj = data_emissao
+                # Converte a data para datetime se for string
+                if isinstance(data_emissao, str):
+                    try:
+                        # Se a data contém horas, minutos e segundos
+                        if len(data_emissao) > 10:
+                            try:
+                                data_obj = datetime.strptime(data_emissao, "%Y-%m-%d %H:%M:%S")
+                            except ValueError:
+                                data_obj = datetime.strptime(data_emissao[:10], "%Y-%m-%d")
+                        else:
+                            data_obj = datetime.strptime(data_emissao, "%Y-%m-%d")
+                    except ValueError as e:
+                        logger.error(f"Formato de data inválido: {data_emissao}")
+                        logger.error(str(e))
+                        return False, "Formato de data inválido. Use YYYY-MM-DD HH:MM:SS ou YYYY-MM-DD"
+                else:
+                    data_obj = data_emissao
                 
-            # Formata a data como string simples YYYY-MM-DD
-            data_formatada = data_obj.strftime('%Y-%m-%d')
-            logger.debug(f"Data formatada: {data_formatada}")
+                # Formata a data como string simples YYYY-MM-DD
+                data_formatada = data_obj.strftime('%Y-%m-%d')
+                logger.debug(f"Data formatada: {data_formatada}")
             
-            # Verifica se já existe um relatório para esta inspeção
-            cursor.execute("SELECT id FROM relatorios WHERE inspecao_id = ?", (inspecao_id,))
-            existing_report = cursor.fetchone()
+                # Verifica se já existe um relatório para esta inspeção
+                cursor.execute("SELECT id FROM relatorios WHERE inspecao_id = ?", (inspecao_id,))
+                existing_report = cursor.fetchone()
             
-            if existing_report:
-                logger.warning(f"Já existe um relatório para a inspeção {inspecao_id}")
-                return False, f"Já existe um relatório para a inspeção {inspecao_id}"
+                if existing_report:
+                    logger.warning(f"Já existe um relatório para a inspeção {inspecao_id}")
+                    return False, f"Já existe um relatório para a inspeção {inspecao_id}"
+            
+                try:
+                    link_arquivo, documento_sha256 = self._arquivar(link_arquivo)
+                except ValueError as e:
+                    logger.warning(f"Arquivo do relatório recusado: {str(e)}")
+                    return False, str(e)
             
-            # Insere o relatório sem usar CONVERT no SQL
-            insert_query = """
-                INSERT INTO relatorios (inspecao_id, data_emissao, link_arquivo, observacoes)
-                VALUES (?, ?, ?, ?)
-            """
+                # Insere o relatório sem usar CONVERT no SQL
+                insert_query = """
+                    INSERT INTO relatorios (inspecao_id, data_emissao, link_arquivo, observacoes,
+                                            documento_sha256)
+                    VALUES (?, ?, ?, ?, ?)
+                """
             
-            values = (inspecao_id, data_formatada, link_arquivo, observacoes)
-            logger.debug(f"Query: {insert_query}")
-            logger.debug(f"Valores: {values}")
+                values = (inspecao_id, data_formatada, link_arquivo, observacoes, documento_sha256)
+                logger.debug(f"Query: {insert_query}")
+                logger.debug(f"Valores: {values}")
             
-            cursor.execute(insert_query, values)
+                cursor.execute(insert_query, values)
             
-            # Verificar se a inserção foi bem-sucedida
-            rows_affected = cursor.rowcount
-            logger.debug(f"Linhas afetadas: {rows_affected}")
+                # Verificar se a inserção foi bem-sucedida
+                rows_affected = cursor.rowcount
+                logger.debug(f"Linhas afetadas: {rows_affected}")
             
-            if rows_affected == 0:
-                logger.warning("Nenhuma linha inserida")
-                conn.rollback()
-                return False, "Falha ao inserir o relatório"
+                if rows_affected == 0:
+                    logger.warning("Nenhuma linha inserida")
+                    conn.rollback()
+                    return False, "Falha ao inserir o relatório"
             
-            # Obter o ID do relatório inserido
-            cursor.execute("SELECT @@IDENTITY")
-            report_id = cursor.fetchone()[0]
-            logger.debug(f"ID do relatório inserido: {report_id}")
+                # Obter o ID do relatório inserido
+                report_id = self.dialect.last_insert_id(cursor)
+                logger.debug(f"ID do relatório inserido: {report_id}")
             
-            # Forçar sincronização após a operação
-            self.force_sync()
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
             
-            return True, f"Relatório #{report_id} criado com sucesso!"
+                return True, f"Relatório #{report_id} criado com sucesso!"
             
         except Exception as e:
             logger.error(f"Erro ao criar relatório: {str(e)}")
             logger.error(traceback.format_exc())
-            if 'conn' in locals():
-                conn.rollback()
             return False, f"Erro ao criar relatório: {str(e)}"
             
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            
-    def get_all_reports(self) -> list[dict]:
-        """Retorna todos os relatórios do sistema"""
+    @retry_on_disconnect
+    def get_all_reports(self, since: int = None, consistent: bool = False):
+        """
+        Retorna todos os relatórios do sistema.
+
+        Args:
+            since: Marca d'água (rowversion) de uma consulta anterior. Se
+                informada, retorna um delta {'rows', 'deleted', 'version'} com
+                os relatórios inseridos/alterados e os IDs excluídos desde então.
+            consistent: Lê do servidor mesmo com a réplica local habilitada
+        """
         try:
             logger.debug("Buscando todos os relatórios")
-            conn = self.db_models.db.get_connection()
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT 
-                    r.id,
-                    r.inspecao_id,
-                    r.data_emissao,
-                    r.link_arquivo,
-                    r.observacoes,
-                    i.tipo_inspecao,
-                    i.resultado as inspecao_resultado,
-                    e.tag as equipamento_tag,
-                    e.categoria as equipamento_categoria,
-                    u.nome as engenheiro_nome
-                FROM dbo.relatorios r
-                JOIN dbo.inspecoes i ON r.inspecao_id = i.id
-                JOIN dbo.equipamentos e ON i.equipamento_id = e.id
-                JOIN dbo.usuarios u ON i.engenheiro_id = u.id
-                ORDER BY r.data_emissao DESC
-            """
-            
-            cursor.execute(query)
-            columns = [column[0] for column in cursor.description]
-            result = []
-            for row in cursor.fetchall():
-                result.append(dict(zip(columns, row)))
-                logger.debug(f"Relatório {row[0]}: {dict(zip(columns, row))}")
-            
-            logger.debug(f"Encontrados {len(result)} relatórios")
-            return result
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                filtro, params = "", ()
+                if since is not None:
+                    versao = read_watermark(cursor)
+                    filtro, params = f"WHERE {version_filter('r', 'i', 'e', 'u')}", (since,) * 4
+                query = f"""
+                    {self._LIST_QUERY}
+                    {filtro}
+                    ORDER BY r.data_emissao DESC
+                """
+            
+                cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                result = []
+                for row in cursor.fetchall():
+                    result.append(dict(zip(columns, row)))
+                    logger.debug(f"Relatório {row[0]}: {dict(zip(columns, row))}")
+            
+                logger.debug(f"Encontrados {len(result)} relatórios")
+                if since is not None:
+                    return {
+                        'rows': result,
+                        'deleted': fetch_deleted_ids(cursor, 'relatorios', since),
+                        'version': versao
+                    }
+                return result
             
         except Exception as e:
             logger.error(f"Erro ao buscar relatórios: {str(e)}")
             logger.error(traceback.format_exc())
+            return [] if since is None else None
+            
+    @retry_on_disconnect
+    def get_reports_page(self, after_date=None, after_id: int = None,
+                         limit: int = PAGE_SIZE, consistent: bool = False) -> list[dict]:
+        """
+        Retorna uma página de relatórios, dos mais recentes para os mais antigos.
+
+        Args:
+            after_date: Data de emissão da última linha da página anterior (None na primeira página)
+            after_id: ID da última linha da página anterior
+            limit: Quantidade máxima de linhas
+            consistent: Lê do servidor mesmo com a réplica local habilitada
+        """
+        try:
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                filtro, params = "", ()
+                if after_date is not None:
+                    filtro = f"WHERE {keyset_condition(('r.data_emissao', 'r.id'), descending=True)}"
+                    params = keyset_params((after_date, after_id))
+                cursor.execute(self.dialect.limit(f"""
+                    SELECT * FROM ({self._LIST_QUERY}
+                    {filtro}) r
+                    ORDER BY r.data_emissao DESC, r.id DESC
+                """), params + (limit,))
+                columns = [column[0] for column in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Erro ao buscar página de relatórios: {str(e)}")
+            logger.error(traceback.format_exc())
             return []
             
-        finally:
-            cursor.close()
+    @retry_on_disconnect
+    def count_reports(self, consistent: bool = False) -> int:
+        """Retorna a quantidade de relatórios listados por get_all_reports (None em caso de erro)."""
+        try:
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT COUNT_BIG(*)
+                    FROM dbo.relatorios r
+                    JOIN dbo.inspecoes i ON r.inspecao_id = i.id
+                    JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+                    JOIN dbo.usuarios u ON i.engenheiro_id = u.id
+                """)
+                return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erro ao contar relatórios: {str(e)}")
+            return None
             
+    def filtered_query(self, filters) -> tuple[str, list]:
+        """
+        Monta a consulta de relatórios com os filtros (sem ORDER BY).
+
+        Args:
+            filters (dict): date_from/date_to (data de emissão), equipment_id
+                e engineer_id
+
+        Returns:
+            tuple: (SQL, parâmetros)
+        """
+        query_parts = [self._LIST_QUERY, "WHERE 1=1"]
+        params = []
+        if filters.get('date_from') and filters.get('date_to'):
+            query_parts.append("AND r.data_emissao BETWEEN ? AND ?")
+            params.extend((filters['date_from'], filters['date_to']))
+        if filters.get('equipment_id'):
+            query_parts.append("AND i.equipamento_id = ?")
+            params.append(filters['equipment_id'])
+        if filters.get('engineer_id'):
+            query_parts.append("AND i.engenheiro_id = ?")
+            params.append(filters['engineer_id'])
+        return " ".join(query_parts), params
+            
+    @retry_on_disconnect
     def get_reports_by_engineer(self, engineer_id: int) -> list[dict]:
         """Retorna os relatórios de um engenheiro específico"""
         try:
             logger.debug(f"Buscando relatórios do engenheiro {engineer_id}")
-            conn = self.db_models.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT r.id, r.inspecao_id, r.engenheiro_responsavel, 
-                       r.data_emissao, r.link_arquivo,
-                       i.equipamento_id, i.tipo_inspecao,
-                       e.tipo as equipamento_tipo, e.empresa as equipamento_empresa,
-                       u.nome as engenheiro_nome
-                FROM relatorios r
-                JOIN inspecoes i ON r.inspecao_id = i.id
-                JOIN equipamentos e ON i.equipamento_id = e.id
-                JOIN usuarios u ON r.engenheiro_responsavel = u.id
-                WHERE r.engenheiro_responsavel = ?
-            """, (engineer_id,))
-            
-            reports = []
-            for row in cursor.fetchall():
-                reports.append({
-                    'id': row[0],
-                    'inspecao_id': row[1],
-                    'engenheiro_id': row[2],
-                    'data': row[3],
-                    'arquivo': row[4],
-                    'equipamento_id': row[5],
-                    'tipo_inspecao': row[6],
-                    'equipamento_tipo': row[7],
-                    'equipamento_empresa': row[8],
-                    'engenheiro_nome': row[9]
-                })
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT r.id, r.inspecao_id, r.engenheiro_responsavel, 
+                           r.data_emissao, r.link_arquivo,
+                           i.equipamento_id, i.tipo_inspecao,
+                           e.tipo as equipamento_tipo, e.empresa as equipamento_empresa,
+                           u.nome as engenheiro_nome
+                    FROM relatorios r
+                    JOIN inspecoes i ON r.inspecao_id = i.id
+                    JOIN equipamentos e ON i.equipamento_id = e.id
+                    JOIN usuarios u ON r.engenheiro_responsavel = u.id
+                    WHERE r.engenheiro_responsavel = ?
+                """, (engineer_id,))
+            
+                reports = []
+                for row in cursor.fetchall():
+                    reports.append({
+                        'id': row[0],
+                        'inspecao_id': row[1],
+                        'engenheiro_id': row[2],
+                        'data': row[3],
+                        'arquivo': row[4],
+                        'equipamento_id': row[5],
+                        'tipo_inspecao': row[6],
+                        'equipamento_tipo': row[7],
+                        'equipamento_empresa': row[8],
+                        'engenheiro_nome': row[9]
+                    })
                 
-            logger.debug(f"Encontrados {len(reports)} relatórios para o engenheiro {engineer_id}")
-            return reports
+                logger.debug(f"Encontrados {len(reports)} relatórios para o engenheiro {engineer_id}")
+                return reports
             
         except Exception as e:
             logger.error(f"Erro ao buscar relatórios do engenheiro {engineer_id}: {str(e)}")
             logger.error(traceback.format_exc())
             return []
             
-        finally:
-            cursor.close()
-            
-    def get_reports_by_company(self, company_id: int) -> list[dict]:
+    @retry_on_disconnect
+    def get_reports_by_company(self, company_id: int, consistent: bool = False) -> list[dict]:
         """Retorna os relatórios de uma empresa específica"""
         try:
             logger.debug(f"Buscando relatórios da empresa ID: {company_id}")
-            self._ensure_connection()
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT r.id, r.inspecao_id, 
-                       r.data_emissao, r.link_arquivo, r.observacoes,
-                       i.equipamento_id, i.tipo_inspecao, i.engenheiro_id,
-                       e.tag as equipamento_tag, e.categoria as equipamento_categoria,
-                       u.nome as engenheiro_nome
-                FROM relatorios r
-                JOIN inspecoes i ON r.inspecao_id = i.id
-                JOIN equipamentos e ON i.equipamento_id = e.id
-                JOIN usuarios u ON i.engenheiro_id = u.id
-                WHERE e.empresa_id = ?
-            """, (company_id,))
-            
-            reports = []
-            for row in cursor.fetchall():
-                reports.append({
-                    'id': row[0],
-                    'inspecao_id': row[1],
-                    'data_emissao': row[2],
-                    'link_arquivo': row[3],
-                    'observacoes': row[4],
-                    'equipamento_id': row[5],
-                    'tipo_inspecao': row[6],
-                    'engenheiro_id': row[7],
-                    'equipamento_tag': row[8],
-                    'equipamento_categoria': row[9],
-                    'engenheiro_nome': row[10]
-                })
+            with self.db_models.db.read_pool(consistent).connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    SELECT r.id, r.inspecao_id, 
+                           r.data_emissao, r.link_arquivo, r.observacoes,
+                           i.equipamento_id, i.tipo_inspecao, i.engenheiro_id,
+                           e.tag as equipamento_tag, e.categoria as equipamento_categoria,
+                           u.nome as engenheiro_nome
+                    FROM relatorios r
+                    JOIN inspecoes i ON r.inspecao_id = i.id
+                    JOIN equipamentos e ON i.equipamento_id = e.id
+                    JOIN usuarios u ON i.engenheiro_id = u.id
+                    WHERE e.empresa_id = ?
+                """, (company_id,))
+            
+                reports = []
+                for row in cursor.fetchall():
+                    reports.append({
+                        'id': row[0],
+                        'inspecao_id': row[1],
+                        'data_emissao': row[2],
+                        'link_arquivo': row[3],
+                        'observacoes': row[4],
+                        'equipamento_id': row[5],
+                        'tipo_inspecao': row[6],
+                        'engenheiro_id': row[7],
+                        'equipamento_tag': row[8],
+                        'equipamento_categoria': row[9],
+                        'engenheiro_nome': row[10]
+                    })
                 
-            logger.debug(f"Encontrados {len(reports)} relatórios para a empresa ID: {company_id}")
-            return reports
+                logger.debug(f"Encontrados {len(reports)} relatórios para a empresa ID: {company_id}")
+                return reports
             
         except Exception as e:
             logger.error(f"Erro ao buscar relatórios da empresa {company_id}: {str(e)}")
             logger.error(traceback.format_exc())
             return []
             
-        finally:
-            cursor.close()
-            
+    @retry_on_disconnect
     def get_report_by_id(self, report_id: int) -> dict:
         """Retorna um relatório específico pelo ID"""
         try:
             logger.debug(f"Buscando relatório {report_id}")
-            conn = self.db_models.db.get_connection()
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT 
-                    r.id,
-                    r.inspecao_id,
-                    r.data_emissao,
-                    r.link_arquivo,
-                    r.observacoes,
-                    i.tipo_inspecao,
-                    i.resultado as inspecao_resultado,
-                    e.tag as equipamento_tag,
-                    e.categoria as equipamento_categoria,
-                    u.nome as engenheiro_nome
-                FROM dbo.relatorios r
-                JOIN dbo.inspecoes i ON r.inspecao_id = i.id
-                JOIN dbo.equipamentos e ON i.equipamento_id = e.id
-                JOIN dbo.usuarios u ON i.engenheiro_id = u.id
-                WHERE r.id = ?
-            """
-            
-            cursor.execute(query, (report_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                columns = [column[0] for column in cursor.description]
-                result = dict(zip(columns, row))
-                logger.debug(f"Relatório {report_id}: {result}")
-                return result
-            
-            return None
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                query = """
+                    SELECT 
+                        r.id,
+                        r.inspecao_id,
+                        r.data_emissao,
+                        r.link_arquivo,
+                        r.observacoes,
+                        i.tipo_inspecao,
+                        i.resultado as inspecao_resultado,
+                        e.tag as equipamento_tag,
+                        e.categoria as equipamento_categoria,
+                        u.nome as engenheiro_nome
+                    FROM dbo.relatorios r
+                    JOIN dbo.inspecoes i ON r.inspecao_id = i.id
+                    JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+                    JOIN dbo.usuarios u ON i.engenheiro_id = u.id
+                    WHERE r.id = ?
+                """
+            
+                cursor.execute(query, (report_id,))
+                row = cursor.fetchone()
+            
+                if row:
+                    columns = [column[0] for column in cursor.description]
+                    result = dict(zip(columns, row))
+                    logger.debug(f"Relatório {report_id}: {result}")
+                    return result
+            
+                return None
             
         except Exception as e:
             logger.error(f"Erro ao buscar relatório {report_id}: {str(e)}")
             return None
             
-        finally:
-            cursor.close()
-            
     def update_report(self, report_id: int, **kwargs) -> tuple[bool, str]:
         """Atualiza os dados de um relatório"""
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Atualizando relatório {report_id} com parâmetros: {kwargs}")
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            # Verifica se o relatório existe
-            cursor.execute("SELECT id FROM relatorios WHERE id = ?", (report_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Relatório {report_id} não encontrado")
-                return False, f"Relatório {report_id} não encontrado"
-            
-            update_fields = []
-            values = []
-            
-            for field, value in kwargs.items():
-                if value is not None:
-                    update_fields.append(f"{field} = ?")
-                    values.append(value)
-                    logger.debug(f"Campo a atualizar: {field} = {value}")
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                # Verifica se o relatório existe
+                cursor.execute("SELECT id FROM relatorios WHERE id = ?", (report_id,))
+                if not cursor.fetchone():
+                    logger.warning(f"Relatório {report_id} não encontrado")
+                    return False, f"Relatório {report_id} não encontrado"
+            
+                if kwargs.get('link_arquivo'):
+                    try:
+                        kwargs['link_arquivo'], kwargs['documento_sha256'] = self._arquivar(kwargs['link_arquivo'])
+                    except ValueError as e:
+                        logger.warning(f"Arquivo do relatório recusado: {str(e)}")
+                        return False, str(e)
+                
+                update_fields = []
+                values = []
+            
+                for field, value in kwargs.items():
+                    # documento_sha256 = NULL quando o novo link não é um arquivo local
+                    if value is not None or field == 'documento_sha256':
+                        update_fields.append(f"{field} = ?")
+                        values.append(value)
+                        logger.debug(f"Campo a atualizar: {field} = {value}")
                     
-            if not update_fields:
-                logger.warning("Nenhum campo para atualizar")
-                return False, "Nenhum campo para atualizar"
+                if not update_fields:
+                    logger.warning("Nenhum campo para atualizar")
+                    return False, "Nenhum campo para atualizar"
                 
-            values.append(report_id)
+                values.append(report_id)
             
-            update_query = f"""
-                UPDATE relatorios
-                SET {', '.join(update_fields)}
-                WHERE id = ?
-            """
-            logger.debug(f"Query de atualização: {update_query}")
-            logger.debug(f"Valores: {values}")
+                update_query = f"""
+                    UPDATE relatorios
+                    SET {', '.join(update_fields)}
+                    WHERE id = ?
+                """
+                logger.debug(f"Query de atualização: {update_query}")
+                logger.debug(f"Valores: {values}")
             
-            cursor.execute(update_query, values)
+                cursor.execute(update_query, values)
             
-            # Verifica se alguma linha foi afetada
-            rows_affected = cursor.rowcount
-            logger.debug(f"Linhas afetadas: {rows_affected}")
+                # Verifica se alguma linha foi afetada
+                rows_affected = cursor.rowcount
+                logger.debug(f"Linhas afetadas: {rows_affected}")
             
-            if rows_affected == 0:
-                logger.warning(f"Nenhuma linha afetada na atualização do relatório {report_id}")
-                conn.rollback()
-                return False, "Nenhuma alteração realizada"
+                if rows_affected == 0:
+                    logger.warning(f"Nenhuma linha afetada na atualização do relatório {report_id}")
+                    conn.rollback()
+                    return False, "Nenhuma alteração realizada"
             
-            # Forçar sincronização após a operação
-            self.force_sync()
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
             
-            return True, "Relatório atualizado com sucesso!"
+                return True, "Relatório atualizado com sucesso!"
             
         except Exception as e:
             logger.error(f"Erro ao atualizar relatório {report_id}: {str(e)}")
             logger.error(traceback.format_exc())
-            if 'conn' in locals():
-                conn.rollback()
             return False, f"Erro ao atualizar relatório: {str(e)}"
             
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            
     def atualizar_relatorio(self, report_id: int, inspecao_id: int, data_emissao: str, 
                            link_arquivo: str, observacoes: str = None) -> bool:
         """
@@ -458,27 +521,20 @@ class ReportController:
     def delete_report(self, report_id: int) -> tuple[bool, str]:
         """Deleta um relatório"""
         try:
-            # Garante que a conexão está ativa
-            self._ensure_connection()
-            
             logger.debug(f"Deletando relatório {report_id}")
-            conn = self.connection
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                DELETE FROM relatorios
-                WHERE id = ?
-            """, (report_id,))
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    DELETE FROM relatorios
+                    WHERE id = ?
+                """, (report_id,))
             
-            # Forçar sincronização após a operação
-            self.force_sync()
+                # Confirma a transação
+                conn.commit()
+                self.db_models.db.written()
             
-            return True, "Relatório deletado com sucesso!"
+                return True, "Relatório deletado com sucesso!"
             
         except Exception as e:
             logger.error(f"Erro ao deletar relatório {report_id}: {str(e)}")
             logger.error(traceback.format_exc())
             return False, f"Erro ao deletar relatório: {str(e)}"
-            
-        finally:
-            cursor.close() 
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Detecção de alterações nas tabelas do sistema.
+
+Cada tabela monitorada possui uma coluna `versao` do tipo ROWVERSION, que o
+SQL Server atualiza sozinho a cada INSERT/UPDATE. Uma única consulta devolve,
+por tabela, a maior versão e o número de linhas (para perceber exclusões);
+as telas só recarregam as tabelas cuja assinatura mudou.
+
+Exclusões ficam registradas na tabela `registros_excluidos` (preenchida por
+gatilhos AFTER DELETE), o que permite aos controladores devolver apenas as
+linhas inseridas/alteradas e os IDs excluídos desde uma marca d'água.
+"""
+import logging
+import traceback
+from contextlib import closing
+from database.health import retry_on_disconnect
+
+logger = logging.getLogger(__name__)
+
+TRACKED_TABLES = ('usuarios', 'equipamentos', 'inspecoes', 'relatorios')
+VERSION_COLUMN = 'versao'
+TOMBSTONE_TABLE = 'registros_excluidos'
+
+
+def read_watermark(cursor) -> int:
+    """
+    Retorna a marca d'água para a próxima consulta incremental.
+
+    Usa MIN_ACTIVE_ROWVERSION() em vez de @@DBTS: versões de transações ainda
+    abertas ficam acima da marca e são entregues na consulta seguinte.
+    Deve ser lida antes das linhas.
+    """
+    cursor.execute("SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) - 1")
+    return cursor.fetchone()[0]
+
+
+def version_filter(*aliases) -> str:
+    """
+    Condição SQL para linhas alteradas após a marca d'água em qualquer um
+    dos aliases informados. Requer um parâmetro por alias.
+    """
+    return "(" + " OR ".join(
+        f"{alias}.{VERSION_COLUMN} > CAST(? AS BINARY(8))" for alias in aliases
+    ) + ")"
+
+
+def fetch_deleted_ids(cursor, table: str, since: int) -> list:
+    """Retorna os IDs excluídos da tabela após a marca d'água."""
+    cursor.execute(f"""
+        SELECT DISTINCT registro_id FROM dbo.{TOMBSTONE_TABLE}
+        WHERE tabela = ? AND {VERSION_COLUMN} > CAST(? AS BINARY(8))
+    """, (table, since))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def apply_delta(rows: list, delta: dict, key: str = 'id') -> list:
+    """
+    Aplica um delta ({'rows', 'deleted', 'version'}) a uma lista já carregada.
+
+    Linhas alteradas substituem as existentes na mesma posição, novas linhas
+    vão para o final e as excluídas são removidas.
+    """
+    changed = {row[key]: row for row in delta['rows']}
+    deleted = set(delta['deleted'])
+    merged = []
+    for row in rows:
+        row_id = row[key]
+        if row_id in deleted:
+            continue
+        merged.append(changed.pop(row_id, row))
+    merged.extend(row for row_id, row in changed.items() if row_id not in deleted)
+    return merged
+
+
+class ChangeTracker:
+    """
+    Compara a assinatura (versão máxima, quantidade de linhas) das tabelas
+    entre uma consulta e outra.
+
+    Args:
+        pool: Pool de conexões (`DatabaseConnection().pool`)
+        tables: Tabelas monitoradas
+    """
+
+    def __init__(self, pool, tables=TRACKED_TABLES):
+        self.pool = pool
+        self.tables = tuple(tables)
+        self.versions = {}
+        self.version_queries = 0
+        # Subconsultas separadas: a versão máxima sai do índice da coluna
+        # (IX_<tabela>_versao) sem percorrer a tabela junto com a contagem
+        self._query = " UNION ALL ".join(
+            f"SELECT '{table}', (SELECT COUNT_BIG(*) FROM dbo.{table}), "
+            f"CAST((SELECT MAX({VERSION_COLUMN}) FROM dbo.{table}) AS BIGINT)"
+            for table in self.tables
+        )
+
+    @retry_on_disconnect
+    def fetch_versions(self) -> dict:
+        """
+        Retorna {tabela: (versão máxima, quantidade de linhas)}.
+
+        Retorna None se a consulta falhar (ex.: coluna `versao` ainda não criada).
+        """
+        try:
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(self._query)
+                self.version_queries += 1
+                return {row[0]: (row[2] or 0, row[1]) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Erro ao consultar versões das tabelas: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+
+    def poll(self) -> set:
+        """
+        Retorna o conjunto de tabelas alteradas desde a última chamada.
+
+        Na primeira chamada, ou se não for possível consultar as versões,
+        todas as tabelas são consideradas alteradas.
+        """
+        current = self.fetch_versions()
+        if current is None:
+            self.versions = {}
+            return set(self.tables)
+
+        changed = {table for table in self.tables
+                   if self.versions.get(table) != current.get(table)}
+        self.versions = current
+        if changed:
+            logger.debug(f"Tabelas alteradas: {', '.join(sorted(changed))}")
+        return changed
+
+    def version_of(self, table: str) -> int:
+        """Última versão conhecida da tabela (0 se desconhecida)."""
+        return self.versions.get(table, (0, 0))[0]
@@ -1,36 +1,61 @@
 """
-Módulo responsável pela conexão com o banco de dados SQL Server.
+Módulo responsável pela conexão com o banco de dados (SQL Server ou SQLite).
 """
 import os
-import pyodbc
+import threading
 from dotenv import load_dotenv
 import logging
+from database.pool import ConnectionPool
+from database.dialects import create_dialect
+from config.settings import (
+    DB_BACKEND, DB_SQLITE_PATH, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT,
+    DB_POOL_MAX_IDLE, DB_POOL_MAX_LIFETIME, LOCAL_REPLICA_ENABLED, LOCAL_REPLICA_PATH,
+    LOCAL_REPLICA_SYNC_INTERVAL
+)
 
 logger = logging.getLogger(__name__)
 
 class DatabaseConnection:
     """
-    Classe responsável por gerenciar a conexão com o banco de dados.
+    Classe responsável por gerenciar as conexões com o banco de dados.
+
+    As conexões vêm de um pool compartilhado (`self.pool`). O código novo deve
+    usar `with db.pool.connection() as conn:`; `get_connection()` continua
+    disponível para scripts antigos e entrega uma conexão fixa por thread.
+    `self.dialect` abre as conexões do backend configurado em `DB_BACKEND`
+    e concentra o SQL que muda entre SQL Server e SQLite. Com
+    `LOCAL_REPLICA_ENABLED`, as listagens leem de `self.replica` (ver
+    `read_pool()`).
     """
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance._initialize()
+        with cls._lock:
+            if cls._instance is None:
+                instance = super(DatabaseConnection, cls).__new__(cls)
+                instance._initialize()
+                cls._instance = instance
         return cls._instance
 
     def _initialize(self):
-        """Inicializa a conexão com o banco de dados."""
+        """Monta a string de conexão e cria o pool."""
         try:
             load_dotenv()
-            
+
+            if DB_BACKEND == 'sqlite':
+                logger.info(f"Usando banco de dados SQLite: {DB_SQLITE_PATH}")
+                self.connection_string = None
+                self.dialect = create_dialect('sqlite', path=DB_SQLITE_PATH)
+                self._create_pool()
+                return
+
             server = os.getenv('DB_SERVER')
             database = os.getenv('DB_NAME')
             username = os.getenv('DB_USERNAME')
             password = os.getenv('DB_PASSWORD')
             trusted_connection = os.getenv('DB_TRUSTED_CONNECTION', 'False').lower() == 'true'
-            
+
             if trusted_connection:
                 self.connection_string = (
                     f"DRIVER={{SQL Server}};"
@@ -46,46 +71,83 @@ class DatabaseConnection:
                     f"UID={username};"
                     f"PWD={password}"
                 )
-            
+
             logger.info(f"Tentando conectar ao banco de dados: {server}/{database}")
-            self.conn = pyodbc.connect(self.connection_string)
-            # Configurar para não fechar a conexão automaticamente
-            self.conn.autocommit = False
-            logger.info("Conexão com o banco de dados estabelecida com sucesso")
-            
+            self.dialect = create_dialect('sqlserver', connection_string=self.connection_string)
+            self._create_pool()
+
         except Exception as e:
             logger.error(f"Erro ao conectar ao banco de dados: {str(e)}")
             raise
 
+    def _create_pool(self):
+        self.pool = ConnectionPool(
+            self._connect,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            timeout=DB_POOL_TIMEOUT,
+            max_idle=DB_POOL_MAX_IDLE,
+            max_lifetime=DB_POOL_MAX_LIFETIME,
+        )
+        self._local = threading.local()
+        logger.info("Conexão com o banco de dados estabelecida com sucesso")
+
+        self.replica = None
+        if LOCAL_REPLICA_ENABLED and self.dialect.name != 'sqlite':
+            from database.replica import LocalReplica
+            os.makedirs(os.path.dirname(LOCAL_REPLICA_PATH) or '.', exist_ok=True)
+            self.replica = LocalReplica(self.pool, self.dialect, LOCAL_REPLICA_PATH,
+                                        interval=LOCAL_REPLICA_SYNC_INTERVAL)
+
+    def read_pool(self, consistent: bool = False):
+        """
+        Pool para as leituras das listagens.
+
+        A réplica local, se habilitada e em dia com as gravações desta estação;
+        senão o servidor.
+
+        Args:
+            consistent: Lê sempre do servidor (ex.: logo após uma gravação)
+        """
+        if (not consistent and self.replica is not None
+                and self.replica.ready and self.replica.fresh):
+            return self.replica.pool
+        return self.pool
+
+    def written(self):
+        """
+        Avisa a réplica local de uma gravação confirmada no servidor.
+
+        A réplica sincroniza em seguida; até lá `read_pool()` devolve o servidor,
+        para que quem gravou veja a própria alteração na próxima listagem.
+        """
+        if self.replica is not None:
+            self.replica.request_sync()
+
+    def _connect(self):
+        """Abre uma nova conexão física com o banco configurado."""
+        return self.dialect.connect()
+
     def get_connection(self):
-        """Retorna a conexão com o banco de dados."""
-        try:
-            # Verifica se a conexão está ativa
-            if self.conn is None or not self.is_connection_alive():
-                logger.warning("Conexão com o banco de dados perdida, reconectando...")
-                self._initialize()
-            return self.conn
-        except Exception as e:
-            logger.error(f"Erro ao obter conexão: {str(e)}")
-            # Tenta reconectar
-            self._initialize()
-            return self.conn
+        """
+        Retorna a conexão fixa da thread atual.
 
-    def is_connection_alive(self):
-        """Verifica se a conexão com o banco de dados está ativa."""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            cursor.close()
-            return True
-        except Exception:
-            return False
+        Mantido por compatibilidade: a conexão fica reservada para a thread até
+        `close_connection()`. Prefira `self.pool.connection()`.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.pool.acquire()
+            self._local.conn = conn
+        return conn
 
     def force_commit(self):
-        """Força um commit nas transações pendentes."""
+        """Força um commit nas transações pendentes da conexão da thread atual."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return True
         try:
-            self.conn.commit()
+            conn.commit()
             logger.info("Commit forçado realizado com sucesso")
             return True
         except Exception as e:
@@ -93,7 +155,9 @@ class DatabaseConnection:
             return False
 
     def close_connection(self):
-        """Fecha a conexão com o banco de dados."""
-        if self.conn:
-            self.conn.close()
-            logger.info("Conexão com o banco de dados fechada") 
\ No newline at end of file
+        """Devolve ao pool a conexão fixa da thread atual."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            self.pool.release(conn)
+            logger.info("Conexão com o banco de dados devolvida ao pool")
@@ -0,0 +1,286 @@
+"""
+Dialetos SQL suportados pela camada de banco de dados.
+
+Os controladores escrevem o SQL no formato do SQL Server (produção). Cada
+dialeto sabe abrir conexões do seu backend, traduzir esse SQL quando
+necessário (`compile`), obter o ID gerado por um INSERT, limitar o número de
+linhas de uma consulta ordenada e consultar o esquema. O SQLite é usado em
+caches locais, medições e testes sem um SQL Server disponível.
+
+O dialeto em uso é escolhido por `DB_BACKEND` (ver `config/settings.py`) e
+fica disponível em `DatabaseConnection().dialect`.
+"""
+import re
+import sqlite3
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+class Dialect:
+    """Interface comum dos dialetos."""
+
+    name = ''
+    # Exceções do driver (para `except dialect.errors`)
+    errors: tuple = ()
+
+    def connect(self):
+        """Abre uma nova conexão física (sem autocommit)."""
+        raise NotImplementedError
+
+    def compile(self, sql: str) -> str:
+        """Traduz um comando escrito para o SQL Server para este backend."""
+        return sql
+
+    def last_insert_id(self, cursor) -> int:
+        """ID gerado pelo último INSERT feito no cursor."""
+        raise NotImplementedError
+
+    def limit(self, sql: str) -> str:
+        """
+        Limita uma consulta que termina em ORDER BY.
+
+        A quantidade de linhas é o último parâmetro do comando.
+        """
+        raise NotImplementedError
+
+    def prefix_condition(self, column: str) -> str:
+        """
+        Condição para os valores de `column` que começam com um texto, sem
+        diferenciar maiúsculas, resolvida por busca no índice da coluna.
+
+        Os parâmetros são gerados por `prefix_params`.
+        """
+        return f"{column} LIKE ? ESCAPE '!'"
+
+    def prefix_params(self, prefix: str) -> tuple:
+        """Parâmetros de `prefix_condition` para o texto procurado."""
+        return (_like_prefix(prefix),)
+
+    def prepare_bulk(self, cursor):
+        """Prepara o cursor para `executemany` com muitas linhas."""
+
+    def table_exists(self, cursor, table: str) -> bool:
+        raise NotImplementedError
+
+    def column_names(self, cursor, table: str) -> set:
+        """Nomes das colunas da tabela em minúsculas (vazio se ela não existir)."""
+        raise NotImplementedError
+
+
+class SqlServerDialect(Dialect):
+    """
+    SQL Server via pyodbc.
+
+    Args:
+        connection_string: String de conexão ODBC
+    """
+
+    name = 'sqlserver'
+
+    def __init__(self, connection_string: str):
+        # pyodbc só é necessário com o SQL Server
+        import pyodbc
+        self._pyodbc = pyodbc
+        self.connection_string = connection_string
+        self.errors = (pyodbc.Error,)
+
+    def connect(self):
+        conn = self._pyodbc.connect(self.connection_string)
+        # Configurar para não fechar a conexão automaticamente
+        conn.autocommit = False
+        return conn
+
+    def last_insert_id(self, cursor) -> int:
+        cursor.execute("SELECT @@IDENTITY")
+        return int(cursor.fetchone()[0])
+
+    def limit(self, sql: str) -> str:
+        return f"{sql} OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+
+    def prepare_bulk(self, cursor):
+        # Envia todos os parâmetros de uma vez em vez de uma ida ao servidor por linha
+        cursor.fast_executemany = True
+
+    def table_exists(self, cursor, table: str) -> bool:
+        cursor.execute("SELECT OBJECT_ID(?, 'U')", (table,))
+        return cursor.fetchone()[0] is not None
+
+    def column_names(self, cursor, table: str) -> set:
+        cursor.execute("SELECT name FROM sys.columns WHERE object_id = OBJECT_ID(?)", (table,))
+        return {row[0].lower() for row in cursor.fetchall()}
+
+
+# Traduções do SQL Server para o SQLite, aplicadas em ordem
+_SQLITE_REWRITES = (
+    (re.compile(r'\bdbo\.', re.I), ''),
+    (re.compile(r'\bCOUNT_BIG\s*\(', re.I), 'COUNT('),
+    (re.compile(r'\bISNULL\s*\(', re.I), 'IFNULL('),
+    (re.compile(r'\bLEN\s*\(', re.I), 'LENGTH('),
+    (re.compile(r'\bDATEADD\s*\(\s*(year|month|day|hour|minute)\s*,\s*(-?\d+)\s*,\s*GETDATE\s*\(\s*\)\s*\)', re.I),
+     lambda m: f"datetime('now', 'localtime', '{m.group(2)} {m.group(1).lower()}s')"),
+    # Dias desde 01/01/1900 (a data 0 do SQL Server); antes da regra de GETDATE()
+    (re.compile(r'\bDATEDIFF\s*\(\s*day\s*,\s*0\s*,\s*((?:MAX|MIN)\s*\(\s*[\w.]+\s*\)|GETDATE\s*\(\s*\)|[\w.]+)\s*\)', re.I),
+     r'CAST(julianday(\1) - 2415020.5 AS INTEGER)'),
+    (re.compile(r'\bGETDATE\s*\(\s*\)', re.I), "datetime('now', 'localtime')"),
+    # Forma gerada por SqlServerDialect.limit
+    (re.compile(r'\bOFFSET\s+0\s+ROWS\s+FETCH\s+(?:NEXT|FIRST)\s+(\?|\d+)\s+ROWS?\s+ONLY', re.I),
+     r'LIMIT \1'),
+    # Versões de linha são inteiros no SQLite (ver database/sqlite_schema.py)
+    (re.compile(r'CAST\s*\(\s*\?\s+AS\s+BINARY\s*\(\s*8\s*\)\s*\)', re.I), '?'),
+    (re.compile(r'\bMIN_ACTIVE_ROWVERSION\s*\(\s*\)', re.I),
+     '((SELECT valor FROM controle_versao) + 1)'),
+)
+
+
+def _like_prefix(prefix: str) -> str:
+    """Padrão LIKE (com escape '!') para os textos que começam com `prefix`."""
+    for char in '![%_':
+        prefix = prefix.replace(char, '!' + char)
+    return prefix + '%'
+
+
+@lru_cache(maxsize=512)
+def _compile_sqlite(sql: str) -> str:
+    for pattern, replacement in _SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def _convert_datetime(value: bytes):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+def _convert_date(value: bytes):
+    converted = _convert_datetime(value)
+    return converted.date() if isinstance(converted, datetime) else converted
+
+
+# Tipos que o pyodbc devolve com o ODBC Driver 17/18 para DATETIME, DATE e BIT.
+# O driver legado "SQL Server" devolve DATE como texto ISO: a interface
+# normaliza as datas com utils.helpers.as_date/format_db_date.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('BIT', lambda value: bool(int(value)))
+
+
+class _CompilingCursor:
+    """Cursor do sqlite3 que traduz os comandos e aceita parâmetros como no pyodbc."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        self._cursor.execute(_compile_sqlite(sql), params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(_compile_sqlite(sql), seq_of_params)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _CompilingConnection:
+    """Conexão do sqlite3 cujos cursores usam `_CompilingCursor`."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return _CompilingCursor(self._conn.cursor())
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class SqliteDialect(Dialect):
+    """
+    SQLite embutido (arquivo local ou ':memory:').
+
+    Args:
+        path: Caminho do arquivo do banco
+        timeout: Espera, em segundos, por um banco bloqueado por outra escrita
+        foreign_keys: Verifica as chaves estrangeiras
+    """
+
+    name = 'sqlite'
+    errors = (sqlite3.Error,)
+
+    def __init__(self, path: str, timeout: float = 30, foreign_keys: bool = True):
+        self.path = path
+        self.timeout = timeout
+        self.foreign_keys = foreign_keys
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout,
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False)
+        if self.foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ':memory:':
+            # Leituras não esperam pela escrita em andamento
+            conn.execute("PRAGMA journal_mode = WAL")
+        return _CompilingConnection(conn)
+
+    def compile(self, sql: str) -> str:
+        return _compile_sqlite(sql)
+
+    def last_insert_id(self, cursor) -> int:
+        return cursor.lastrowid
+
+    def limit(self, sql: str) -> str:
+        return f"{sql} LIMIT ?"
+
+    def prefix_condition(self, column: str) -> str:
+        # O LIKE do SQLite não usa índices de colunas BINARY; a faixa entre o
+        # prefixo em maiúsculas e em minúsculas (ASCII) cobre todas as grafias
+        # e o LIKE descarta o que sobrar dentro dela
+        return f"{column} >= ? AND {column} < ? AND {column} LIKE ? ESCAPE '!'"
+
+    def prefix_params(self, prefix: str) -> tuple:
+        upper = ''.join(char.upper() if char.isascii() else char for char in prefix)
+        lower = ''.join(char.lower() if char.isascii() else char for char in prefix)
+        return (upper, lower + '\U0010ffff', _like_prefix(prefix))
+
+    def table_exists(self, cursor, table: str) -> bool:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+
+    def column_names(self, cursor, table: str) -> set:
+        cursor.execute("SELECT name FROM pragma_table_info(?)", (table,))
+        return {row[0].lower() for row in cursor.fetchall()}
+
+
+def create_dialect(backend: str, **options) -> Dialect:
+    """
+    Cria o dialeto do backend configurado.
+
+    Args:
+        backend: 'sqlserver' ou 'sqlite'
+        options: `connection_string` (SQL Server) ou `path` (SQLite)
+    """
+    if backend == 'sqlserver':
+        return SqlServerDialect(options['connection_string'])
+    if backend == 'sqlite':
+        return SqliteDialect(options['path'])
+    raise ValueError(f"Backend de banco de dados desconhecido: {backend}")
@@ -0,0 +1,110 @@
+"""
+Camada de saúde das conexões com o banco de dados.
+
+Em vez de executar `SELECT 1` antes de cada consulta, as conexões só são
+validadas depois de ficarem ociosas (ver `ConnectionPool.max_idle`). Links
+quebrados são detectados pelo próprio erro do driver: a conexão é descartada
+e leituras idempotentes são repetidas uma vez com uma conexão nova.
+"""
+import functools
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATEs ODBC que indicam falha de comunicação com o servidor
+DISCONNECT_SQLSTATES = {
+    '08S01',  # Communication link failure
+    '08001',  # Client unable to establish connection
+    '08003',  # Connection does not exist
+    '08004',  # Server rejected the connection
+    '08007',  # Connection failure during transaction
+    'HYT01',  # Connection timeout expired
+}
+
+
+def is_disconnect_error(exc: BaseException) -> bool:
+    """
+    Indica se a exceção representa perda do link com o banco.
+
+    Os erros do pyodbc trazem o SQLSTATE como primeiro argumento.
+    """
+    args = getattr(exc, 'args', ())
+    if args and isinstance(args[0], str) and args[0] in DISCONNECT_SQLSTATES:
+        return True
+    # Alguns drivers só informam o SQLSTATE dentro da mensagem
+    message = str(exc)
+    return any(f"[{state}]" in message or f"({state})" in message
+               for state in DISCONNECT_SQLSTATES)
+
+
+class ConnectionHealth:
+    """Contadores de validação e de quedas de conexão."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.probes = 0
+        self.probe_failures = 0
+        self.disconnects = 0
+        self.retries = 0
+
+    def record_probe(self, ok: bool):
+        """Registra uma consulta de validação enviada ao servidor."""
+        with self._lock:
+            self.probes += 1
+            if not ok:
+                self.probe_failures += 1
+
+    def record_disconnect(self):
+        """Registra uma queda de conexão detectada durante uma operação."""
+        with self._lock:
+            self.disconnects += 1
+        self._local.disconnects = self.local_disconnects() + 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def local_disconnects(self) -> int:
+        """Quedas de conexão observadas pela thread atual."""
+        return getattr(self._local, 'disconnects', 0)
+
+    def snapshot(self) -> dict:
+        """Retorna uma cópia dos contadores."""
+        with self._lock:
+            return {
+                'probes': self.probes,
+                'probe_failures': self.probe_failures,
+                'disconnects': self.disconnects,
+                'retries': self.retries,
+            }
+
+    def reset(self):
+        """Zera os contadores (útil para medições)."""
+        with self._lock:
+            self.probes = 0
+            self.probe_failures = 0
+            self.disconnects = 0
+            self.retries = 0
+
+
+def retry_on_disconnect(method):
+    """
+    Repete uma vez um método de leitura de controlador se a conexão cair.
+
+    Os métodos dos controladores tratam as próprias exceções e retornam um
+    valor vazio; a queda é percebida pelo pool, que descarta a conexão e
+    incrementa o contador da thread. Use apenas em operações idempotentes.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        health = self.pool.health
+        before = health.local_disconnects()
+        result = method(self, *args, **kwargs)
+        if health.local_disconnects() > before:
+            health.record_retry()
+            logger.warning(f"Conexão perdida em {method.__qualname__}, repetindo com nova conexão")
+            result = method(self, *args, **kwargs)
+        return result
+    return wrapper
@@ -0,0 +1,118 @@
+"""
+Índices das consultas dos controladores.
+
+Cada índice corresponde a um filtro/ordenação usado pelas telas e serviços
+(indicados em `queries`). Colunas incluídas (INCLUDE) tornam o índice de
+cobertura no SQL Server; no SQLite, que não tem INCLUDE, elas entram no fim
+da chave, depois do id (no SQL Server a chave do índice clusterizado segue as
+colunas da chave). Criados pelas migrações `criar_indices_consultas`,
+`adicionar_proxima_manutencao`, `criar_resumo_conformidade` e
+`desempatar_inspecoes_por_equipamento` e verificados por
+`python -m database.query_plans` (e tests/test_query_plans.py).
+"""
+from dataclasses import dataclass
+from database.change_tracking import TRACKED_TABLES, VERSION_COLUMN
+
+
+@dataclass(frozen=True)
+class QueryIndex:
+    """Definição de um índice não clusterizado."""
+    name: str
+    table: str
+    columns: tuple
+    include: tuple = ()
+    queries: str = ''
+
+    @property
+    def column_names(self) -> tuple:
+        """Nomes das colunas (chave e incluídas), sem ASC/DESC."""
+        return tuple(column.split()[0] for column in self.columns + self.include)
+
+    def sqlserver_ddl(self) -> str:
+        ddl = f"CREATE NONCLUSTERED INDEX {self.name} ON {self.table} ({', '.join(self.columns)})"
+        if self.include:
+            ddl += f" INCLUDE ({', '.join(self.include)})"
+        return ddl
+
+    def sqlite_ddl(self) -> str:
+        # Sem colunas incluídas o rowid (id) já fica no fim da chave
+        columns = self.columns + ('id',) + self.include if self.include else self.columns
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table} ({', '.join(columns)})"
+
+
+QUERY_INDEXES = (
+    QueryIndex(
+        'IX_equipamentos_empresa_tag', 'equipamentos', ('empresa_id', 'tag'),
+        include=('categoria', 'fabricante', 'ano_fabricacao', 'pressao_projeto',
+                 'pressao_trabalho', 'volume', 'fluido', 'frequencia_manutencao',
+                 'data_ultima_manutencao', 'ativo', 'status'),
+        queries='EquipmentController.get_equipment_by_company, *_by_company'
+    ),
+    QueryIndex(
+        'IX_equipamentos_tag', 'equipamentos', ('tag',),
+        queries='EquipmentController.get_equipment_page, get_all_equipment'
+    ),
+    QueryIndex(
+        'IX_inspecoes_equipamento_data', 'inspecoes', ('equipamento_id', 'data_inspecao DESC'),
+        queries='InspecaoModel.get_by_equipment, JOIN inspecoes -> equipamentos'
+    ),
+    QueryIndex(
+        'IX_inspecoes_engenheiro_data', 'inspecoes', ('engenheiro_id', 'data_inspecao DESC'),
+        queries='InspecaoModel.get_by_engineer, EngineerController.delete_engineer'
+    ),
+    QueryIndex(
+        'IX_inspecoes_data', 'inspecoes', ('data_inspecao DESC', 'id DESC'),
+        queries='InspectionController.get_inspections_page, get_all_inspections, '
+                'InspecaoModel.get_by_date_range'
+    ),
+    QueryIndex(
+        'IX_inspecoes_proxima_inspecao', 'inspecoes', ('proxima_inspecao',),
+        include=('equipamento_id', 'engenheiro_id'),
+        queries='EmailService.send_inspection_reminder'
+    ),
+    QueryIndex(
+        'IX_relatorios_inspecao', 'relatorios', ('inspecao_id',),
+        queries='ReportController.criar_relatorio, JOIN relatorios -> inspecoes'
+    ),
+    QueryIndex(
+        'IX_relatorios_data_emissao', 'relatorios', ('data_emissao DESC', 'id DESC'),
+        queries='ReportController.get_reports_page, get_all_reports'
+    ),
+    QueryIndex(
+        'IX_usuarios_tipo_nome', 'usuarios', ('tipo_acesso', 'nome'),
+        include=('ativo', 'empresa', 'email', 'crea'),
+        queries='CompanyDirectory, AuthController.get_all_engineers, get_engineers'
+    ),
+)
+
+# Índices criados por migrações posteriores à 6. QUERY_INDEXES entra no checksum
+# da migração `criar_indices_consultas` e não recebe índices novos.
+MAINTENANCE_INDEXES = (
+    QueryIndex(
+        'IX_equipamentos_proxima_manutencao', 'equipamentos', ('data_proxima_manutencao',),
+        include=('empresa_id', 'tag', 'ativo', 'status'),
+        queries='EquipmentController.get_maintenance_due'
+    ),
+)
+
+# Índices trocados pela migração 14: com o id DESC na chave a exportação das
+# inspeções de um equipamento (ORDER BY data DESC, id DESC) sai na ordem do
+# índice, sem ordenar os empates de data
+REPLACED_INDEXES = {'IX_inspecoes_equipamento_data': 'inspecoes'}
+INSPECTION_ORDER_INDEXES = (
+    QueryIndex(
+        'IX_inspecoes_equipamento_data_id', 'inspecoes',
+        ('equipamento_id', 'data_inspecao DESC', 'id DESC'),
+        queries='InspecaoModel.get_by_equipment, ExportService.export inspecoes, '
+                'JOIN inspecoes -> equipamentos'
+    ),
+)
+
+# Versão máxima de cada tabela monitorada sem ler a tabela inteira
+VERSION_INDEXES = tuple(
+    QueryIndex(
+        f'IX_{table}_{VERSION_COLUMN}', table, (VERSION_COLUMN,),
+        queries='ChangeTracker.fetch_versions, DashboardController.resumo'
+    )
+    for table in TRACKED_TABLES
+)
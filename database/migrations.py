@@ -2,78 +2,536 @@
 # -*- coding: utf-8 -*-
 
 """
-Script de migrações para atualizar o banco de dados
+Migrações versionadas do banco de dados.
+
+Cada migração tem um número de versão e um checksum do seu código. As versões
+aplicadas ficam na tabela `schema_version`; na inicialização uma única
+consulta compara essa tabela com a lista `MIGRACOES` e, se não houver nada
+pendente, nenhuma outra verificação de esquema é feita. Migrações pendentes
+são aplicadas em ordem, em uma única transação. Com o backend SQLite o
+esquema já atualizado de `database/sqlite_schema.py` é criado diretamente e
+as migrações que ele contém são registradas em `schema_version`.
+
+Uso:
+    python -m database.migrations             # aplica as pendentes
+    python -m database.migrations --dry-run   # só lista o que seria aplicado
 """
 
+import argparse
+import hashlib
+import inspect
+import sys
+from dataclasses import dataclass
+from typing import Callable, Optional
 from database.connection import DatabaseConnection
+from database.models import criar_tabelas_base
 import logging
 import traceback
+from contextlib import closing
+from database.change_tracking import TRACKED_TABLES, VERSION_COLUMN, TOMBSTONE_TABLE
+from database.indexes import (QUERY_INDEXES, MAINTENANCE_INDEXES, VERSION_INDEXES,
+                              INSPECTION_ORDER_INDEXES, REPLACED_INDEXES)
+from database.sqlite_schema import create_schema
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def adicionar_campo_crea():
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+def adicionar_campo_crea(cursor):
     """Adiciona o campo CREA à tabela de usuários se não existir"""
-    logger.info("Verificando se é necessário adicionar o campo CREA à tabela de usuários")
-    
-    db = DatabaseConnection()
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Verifica se a tabela existe
+    cursor.execute("""
+        IF OBJECT_ID('usuarios', 'U') IS NOT NULL AND COL_LENGTH('usuarios', 'crea') IS NULL
+            ALTER TABLE usuarios ADD crea VARCHAR(50) NULL
+    """)
+
+def adicionar_campos_manutencao(cursor):
+    """Adiciona os campos de controle de manutenção à tabela de equipamentos"""
+    cursor.execute("""
+        IF COL_LENGTH('equipamentos', 'frequencia_manutencao') IS NULL
+            ALTER TABLE equipamentos ADD frequencia_manutencao INT DEFAULT 180;
+        IF COL_LENGTH('equipamentos', 'data_ultima_manutencao') IS NULL
+            ALTER TABLE equipamentos ADD data_ultima_manutencao DATE;
+    """)
+
+def adicionar_controle_versao(cursor):
+    """Adiciona a coluna `versao` (ROWVERSION) às tabelas monitoradas pelo ChangeTracker"""
+    logger.info("Verificando colunas de controle de versão")
+    for tabela in TRACKED_TABLES:
         cursor.execute("""
-            IF EXISTS (SELECT * FROM sys.tables WHERE name = 'usuarios')
+            IF EXISTS (SELECT * FROM sys.tables WHERE name = ?)
+            SELECT 1 ELSE SELECT 0
+        """, (tabela,))
+        if not cursor.fetchone()[0]:
+            logger.info(f"Tabela {tabela} não existe, ignorando")
+            continue
+        
+        cursor.execute(f"""
+            IF COL_LENGTH('{tabela}', '{VERSION_COLUMN}') IS NOT NULL
             SELECT 1 ELSE SELECT 0
         """)
-        tabela_existe = cursor.fetchone()[0]
+        if cursor.fetchone()[0]:
+            continue
         
-        if not tabela_existe:
-            logger.info("Tabela usuários não existe, nada a fazer")
-            return
-            
-        # Verifica se o campo já existe
+        # Uma tabela só pode ter uma coluna ROWVERSION
+        cursor.execute("""
+            SELECT COUNT(*) FROM sys.columns
+            WHERE object_id = OBJECT_ID(?) AND system_type_id = TYPE_ID('timestamp')
+        """, (tabela,))
+        if cursor.fetchone()[0]:
+            logger.warning(f"Tabela {tabela} já possui outra coluna ROWVERSION, ignorando")
+            continue
+        
+        logger.info(f"Adicionando coluna {VERSION_COLUMN} à tabela {tabela}")
+        cursor.execute(f"ALTER TABLE {tabela} ADD {VERSION_COLUMN} ROWVERSION")
+    logger.info("Colunas de controle de versão verificadas")
+
+def criar_registro_exclusoes(cursor):
+    """Cria a tabela de exclusões e os gatilhos que a alimentam"""
+    logger.info("Verificando tabela de registros excluídos")
+    cursor.execute(f"""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = '{TOMBSTONE_TABLE}')
+        BEGIN
+            CREATE TABLE {TOMBSTONE_TABLE} (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                tabela VARCHAR(50) NOT NULL,
+                registro_id INT NOT NULL,
+                data_exclusao DATETIME NOT NULL DEFAULT GETDATE(),
+                {VERSION_COLUMN} ROWVERSION
+            );
+            CREATE INDEX IX_{TOMBSTONE_TABLE}_tabela_versao
+                ON {TOMBSTONE_TABLE} (tabela, {VERSION_COLUMN});
+        END
+    """)
+    
+    for tabela in TRACKED_TABLES:
+        gatilho = f"TR_{tabela}_exclusao"
         cursor.execute("""
-            IF COL_LENGTH('usuarios', 'crea') IS NOT NULL
+            IF EXISTS (SELECT * FROM sys.tables WHERE name = ?)
+            AND NOT EXISTS (SELECT * FROM sys.triggers WHERE name = ?)
             SELECT 1 ELSE SELECT 0
+        """, (tabela, gatilho))
+        if not cursor.fetchone()[0]:
+            continue
+        
+        # CREATE TRIGGER precisa ser o único comando do lote
+        logger.info(f"Criando gatilho {gatilho}")
+        cursor.execute(f"""
+            CREATE TRIGGER {gatilho} ON {tabela} AFTER DELETE AS
+            BEGIN
+                SET NOCOUNT ON;
+                INSERT INTO {TOMBSTONE_TABLE} (tabela, registro_id)
+                SELECT '{tabela}', id FROM deleted;
+            END
         """)
-        campo_existe = cursor.fetchone()[0]
+    logger.info("Registro de exclusões verificado")
+
+def criar_indices_consultas(cursor):
+    """Cria os índices usados pelas consultas dos controladores (ver database/indexes.py)"""
+    logger.info("Verificando índices das consultas")
+    for indice in QUERY_INDEXES:
+        cursor.execute("""
+            IF EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = ? AND object_id = OBJECT_ID(?))
+            SELECT 1 ELSE SELECT 0
+        """, (indice.name, indice.table))
+        if cursor.fetchone()[0]:
+            continue
         
-        if campo_existe:
-            logger.info("Campo CREA já existe na tabela usuários")
-            return
-            
-        # Adiciona o campo
-        logger.info("Adicionando campo CREA à tabela usuários")
+        # Bancos criados por scripts antigos podem não ter todas as colunas
+        cursor.execute(
+            "SELECT name FROM sys.columns WHERE object_id = OBJECT_ID(?)", (indice.table,)
+        )
+        colunas = {row[0].lower() for row in cursor.fetchall()}
+        faltando = [c for c in indice.column_names if c.lower() not in colunas]
+        if not colunas or faltando:
+            logger.warning(f"Índice {indice.name} ignorado: colunas ausentes em "
+                           f"{indice.table}: {', '.join(faltando) or 'tabela inexistente'}")
+            continue
+        
+        logger.info(f"Criando índice {indice.name}")
+        cursor.execute(indice.sqlserver_ddl())
+    logger.info("Índices das consultas verificados")
+
+def criar_repositorio_documentos(cursor):
+    """Cria a tabela `documentos` e a referência `relatorios.documento_sha256` (ver services/document_store.py)"""
+    logger.info("Verificando repositório de documentos")
+    cursor.execute("""
+        IF OBJECT_ID('documentos', 'U') IS NULL
+        CREATE TABLE documentos (
+            sha256 CHAR(64) NOT NULL PRIMARY KEY,
+            tamanho BIGINT NOT NULL,
+            extensao VARCHAR(10) NOT NULL,
+            nome_original VARCHAR(255) NULL,
+            ultimo_uso DATETIME NOT NULL DEFAULT GETDATE()
+        )
+    """)
+    cursor.execute("""
+        IF COL_LENGTH('relatorios', 'documento_sha256') IS NULL
+            ALTER TABLE relatorios ADD documento_sha256 CHAR(64) NULL
+    """)
+    # Contagem de referências e coleta de órfãos
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = 'IX_relatorios_documento' AND object_id = OBJECT_ID('relatorios'))
+            EXEC('CREATE NONCLUSTERED INDEX IX_relatorios_documento ON relatorios (documento_sha256)')
+    """)
+    logger.info("Repositório de documentos verificado")
+
+def criar_fila_emails(cursor):
+    """Cria a fila de saída de e-mails (ver services/email_outbox.py)"""
+    logger.info("Verificando fila de e-mails")
+    cursor.execute("""
+        IF OBJECT_ID('email_saida', 'U') IS NULL
+        BEGIN
+            CREATE TABLE email_saida (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                destinatario VARCHAR(255) NOT NULL,
+                assunto NVARCHAR(255) NOT NULL,
+                corpo NVARCHAR(MAX) NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+                tentativas INT NOT NULL DEFAULT 0,
+                proxima_tentativa DATETIME NOT NULL,
+                lote CHAR(32) NULL,
+                ultimo_erro NVARCHAR(500) NULL,
+                criado_em DATETIME NOT NULL DEFAULT GETDATE(),
+                enviado_em DATETIME NULL
+            );
+            CREATE NONCLUSTERED INDEX IX_email_saida_status_proxima
+                ON email_saida (status, proxima_tentativa);
+            CREATE NONCLUSTERED INDEX IX_email_saida_lote ON email_saida (lote);
+        END
+    """)
+    logger.info("Fila de e-mails verificada")
+
+def criar_registro_lembretes(cursor):
+    """Cria o registro dos lembretes de inspeção já enviados (ver EmailService.send_inspection_reminder)"""
+    logger.info("Verificando registro de lembretes")
+    cursor.execute("""
+        IF OBJECT_ID('lembretes_enviados', 'U') IS NULL
+        CREATE TABLE lembretes_enviados (
+            inspecao_id INT NOT NULL,
+            vencimento DATETIME NOT NULL,
+            antecedencia INT NOT NULL,
+            destinatario VARCHAR(255) NULL,
+            enviado_em DATETIME NOT NULL DEFAULT GETDATE(),
+            CONSTRAINT PK_lembretes_enviados PRIMARY KEY (inspecao_id, vencimento, antecedencia)
+        )
+    """)
+    logger.info("Registro de lembretes verificado")
+
+def criar_tarefas_agendadas(cursor):
+    """Cria a tabela de tarefas do agendador (ver services/scheduler.py)"""
+    logger.info("Verificando tabela de tarefas agendadas")
+    cursor.execute("""
+        IF OBJECT_ID('tarefas_agendadas', 'U') IS NULL
+        CREATE TABLE tarefas_agendadas (
+            id INT IDENTITY(1,1) PRIMARY KEY,
+            nome VARCHAR(100) NOT NULL UNIQUE,
+            acao VARCHAR(50) NOT NULL,
+            argumentos NVARCHAR(1000) NULL,
+            gatilho VARCHAR(10) NOT NULL,
+            parametro VARCHAR(20) NULL,
+            proxima_execucao DATETIME NOT NULL,
+            tolerancia_segundos INT NULL,
+            timeout_segundos INT NULL,
+            ultima_execucao DATETIME NULL,
+            ultimo_atraso_ms INT NULL,
+            ultima_duracao_ms INT NULL,
+            ultimo_erro NVARCHAR(500) NULL,
+            execucoes INT NOT NULL DEFAULT 0,
+            falhas INT NOT NULL DEFAULT 0
+        )
+    """)
+    logger.info("Tabela de tarefas agendadas verificada")
+
+def adicionar_prazos_nr13(cursor):
+    """Adiciona o SPIE das empresas e os prazos NR-13 dos equipamentos (ver services/due_dates.py)"""
+    logger.info("Verificando colunas dos prazos NR-13")
+    cursor.execute("""
+        IF COL_LENGTH('usuarios', 'possui_spie') IS NULL
+            ALTER TABLE usuarios ADD possui_spie BIT NOT NULL DEFAULT 0;
+        IF COL_LENGTH('equipamentos', 'proximo_exame_externo') IS NULL
+            ALTER TABLE equipamentos ADD proximo_exame_externo DATE NULL;
+        IF COL_LENGTH('equipamentos', 'proximo_exame_interno') IS NULL
+            ALTER TABLE equipamentos ADD proximo_exame_interno DATE NULL;
+        IF COL_LENGTH('equipamentos', 'proximo_teste_hidrostatico') IS NULL
+            ALTER TABLE equipamentos ADD proximo_teste_hidrostatico DATE NULL;
+    """)
+    logger.info("Colunas dos prazos NR-13 verificadas")
+
+def adicionar_proxima_manutencao(cursor):
+    """Adiciona a data da próxima manutenção dos equipamentos, preenchida a partir da última"""
+    logger.info("Verificando data da próxima manutenção")
+    cursor.execute("""
+        IF COL_LENGTH('equipamentos', 'data_proxima_manutencao') IS NULL
+            ALTER TABLE equipamentos ADD data_proxima_manutencao DATE NULL
+    """)
+    # Lote separado: a coluna precisa existir quando o UPDATE é compilado
+    cursor.execute("""
+        UPDATE equipamentos
+        SET data_proxima_manutencao = DATEADD(day, frequencia_manutencao, data_ultima_manutencao)
+        WHERE data_proxima_manutencao IS NULL
+          AND data_ultima_manutencao IS NOT NULL AND frequencia_manutencao > 0
+    """)
+    for indice in MAINTENANCE_INDEXES:
+        cursor.execute("""
+            IF EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = ? AND object_id = OBJECT_ID(?))
+            SELECT 1 ELSE SELECT 0
+        """, (indice.name, indice.table))
+        if not cursor.fetchone()[0]:
+            logger.info(f"Criando índice {indice.name}")
+            cursor.execute(indice.sqlserver_ddl())
+    logger.info("Data da próxima manutenção verificada")
+
+def criar_resumo_conformidade(cursor):
+    """
+    Cria a tabela do resumo de conformidade por empresa (ver controllers/dashboard_controller.py)
+    e os índices das colunas de versão, lidas para saber se o resumo está atualizado
+    """
+    logger.info("Verificando tabela do resumo de conformidade")
+    cursor.execute("""
+        IF OBJECT_ID('resumo_conformidade', 'U') IS NULL
+        CREATE TABLE resumo_conformidade (
+            empresa_id INT NOT NULL PRIMARY KEY,
+            equipamentos INT NOT NULL DEFAULT 0,
+            atrasados INT NOT NULL DEFAULT 0,
+            vence_7 INT NOT NULL DEFAULT 0,
+            vence_15 INT NOT NULL DEFAULT 0,
+            vence_30 INT NOT NULL DEFAULT 0,
+            aprovadas INT NOT NULL DEFAULT 0,
+            reprovadas INT NOT NULL DEFAULT 0,
+            pendentes INT NOT NULL DEFAULT 0,
+            assinatura VARCHAR(200) NULL,
+            atualizado_em DATETIME NOT NULL
+        )
+    """)
+    for indice in VERSION_INDEXES:
         cursor.execute("""
-            ALTER TABLE usuarios
-            ADD crea VARCHAR(50) NULL
+            IF EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = ? AND object_id = OBJECT_ID(?))
+            SELECT 1 ELSE SELECT 0
+        """, (indice.name, indice.table))
+        if not cursor.fetchone()[0]:
+            logger.info(f"Criando índice {indice.name}")
+            cursor.execute(indice.sqlserver_ddl())
+    logger.info("Tabela do resumo de conformidade verificada")
+
+def desempatar_inspecoes_por_equipamento(cursor):
+    """Troca o índice das inspeções por equipamento por um com o id na chave (ver database/indexes.py)"""
+    logger.info("Verificando índice das inspeções por equipamento")
+    for nome, tabela in REPLACED_INDEXES.items():
+        cursor.execute(f"""
+            IF EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = '{nome}' AND object_id = OBJECT_ID('{tabela}'))
+            DROP INDEX {nome} ON {tabela}
         """)
+    for indice in INSPECTION_ORDER_INDEXES:
+        cursor.execute("""
+            IF EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = ? AND object_id = OBJECT_ID(?))
+            SELECT 1 ELSE SELECT 0
+        """, (indice.name, indice.table))
+        if not cursor.fetchone()[0]:
+            logger.info(f"Criando índice {indice.name}")
+            cursor.execute(indice.sqlserver_ddl())
+    logger.info("Índice das inspeções por equipamento verificado")
+
+@dataclass(frozen=True)
+class Migracao:
+    """
+    Migração versionada.
+
+    Args:
+        versao: Número da migração (ordem de aplicação)
+        descricao: Texto registrado em `schema_version`
+        aplicar: Função que recebe o cursor da transação; deve ser idempotente
+        dados: Valores usados pela função que também entram no checksum
+    """
+    versao: int
+    descricao: str
+    aplicar: Callable
+    dados: tuple = ()
+
+    @property
+    def checksum(self) -> str:
+        """SHA-256 do código da migração e dos dados que ela usa."""
+        try:
+            codigo = inspect.getsource(self.aplicar).encode('utf-8')
+        except (OSError, TypeError):
+            # Sem fonte disponível (ex.: aplicação empacotada)
+            codigo = self.aplicar.__code__.co_code
+        return hashlib.sha256(codigo + repr(self.dados).encode('utf-8')).hexdigest()
+
+
+# Nunca altere uma migração já aplicada: crie uma nova versão
+MIGRACOES = (
+    Migracao(1, "Tabelas principais", criar_tabelas_base),
+    Migracao(2, "Campo CREA em usuarios", adicionar_campo_crea),
+    Migracao(3, "Campos de manutenção em equipamentos", adicionar_campos_manutencao),
+    Migracao(4, "Colunas de controle de versão", adicionar_controle_versao,
+             (TRACKED_TABLES, VERSION_COLUMN)),
+    Migracao(5, "Registro de exclusões", criar_registro_exclusoes,
+             (TRACKED_TABLES, TOMBSTONE_TABLE)),
+    Migracao(6, "Índices das consultas", criar_indices_consultas, (QUERY_INDEXES,)),
+    Migracao(7, "Repositório de documentos", criar_repositorio_documentos),
+    Migracao(8, "Fila de saída de e-mails", criar_fila_emails),
+    Migracao(9, "Registro de lembretes enviados", criar_registro_lembretes),
+    Migracao(10, "Tarefas do agendador", criar_tarefas_agendadas),
+    Migracao(11, "Prazos NR-13 dos equipamentos", adicionar_prazos_nr13),
+    Migracao(12, "Próxima manutenção dos equipamentos", adicionar_proxima_manutencao,
+             (MAINTENANCE_INDEXES,)),
+    Migracao(13, "Resumo de conformidade", criar_resumo_conformidade, (VERSION_INDEXES,)),
+    Migracao(14, "Desempate por id nas inspeções por equipamento",
+             desempatar_inspecoes_por_equipamento, (REPLACED_INDEXES, INSPECTION_ORDER_INDEXES)),
+)
+
+
+def ler_versoes_aplicadas(cursor) -> dict:
+    """
+    Retorna {versão: checksum} das migrações aplicadas em uma única consulta.
+
+    Retorna um dicionário vazio se a tabela `schema_version` ainda não existir.
+    """
+    cursor.execute(f"""
+        IF OBJECT_ID('dbo.{SCHEMA_VERSION_TABLE}', 'U') IS NOT NULL
+            SELECT versao, checksum FROM dbo.{SCHEMA_VERSION_TABLE}
+        ELSE
+            SELECT CAST(NULL AS INT) AS versao, CAST(NULL AS CHAR(64)) AS checksum WHERE 1 = 0
+    """)
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def migracoes_pendentes(aplicadas: dict) -> list:
+    """Migrações de `MIGRACOES` ainda não registradas, em ordem de versão."""
+    for migracao in MIGRACOES:
+        checksum = aplicadas.get(migracao.versao)
+        if checksum is not None and checksum.strip() != migracao.checksum:
+            logger.warning(f"Migração {migracao.versao} ({migracao.descricao}) foi alterada "
+                           f"depois de aplicada; crie uma nova versão em vez de editá-la")
+    return sorted((m for m in MIGRACOES if m.versao not in aplicadas), key=lambda m: m.versao)
+
+
+def _aplicar(conn, cursor):
+    """Aplica as migrações pendentes em uma única transação."""
+    # Impede que duas estações apliquem as mesmas migrações ao mesmo tempo
+    cursor.execute("""
+        SET NOCOUNT ON;
+        DECLARE @resultado INT;
+        EXEC @resultado = sp_getapplock @Resource = 'schema_migrations',
+             @LockMode = 'Exclusive', @LockOwner = 'Transaction', @LockTimeout = 60000;
+        SELECT @resultado;
+    """)
+    if cursor.fetchone()[0] < 0:
+        raise RuntimeError("Não foi possível obter o bloqueio das migrações")
+    
+    cursor.execute(f"""
+        IF OBJECT_ID('dbo.{SCHEMA_VERSION_TABLE}', 'U') IS NULL
+        CREATE TABLE dbo.{SCHEMA_VERSION_TABLE} (
+            versao INT NOT NULL PRIMARY KEY,
+            descricao VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            aplicada_em DATETIME NOT NULL DEFAULT GETDATE()
+        )
+    """)
+    
+    # Relê com o bloqueio obtido: outra estação pode ter acabado de aplicar
+    pendentes = migracoes_pendentes(ler_versoes_aplicadas(cursor))
+    for migracao in pendentes:
+        logger.info(f"Aplicando migração {migracao.versao}: {migracao.descricao}")
+        migracao.aplicar(cursor)
+        cursor.execute(f"""
+            INSERT INTO dbo.{SCHEMA_VERSION_TABLE} (versao, descricao, checksum)
+            VALUES (?, ?, ?)
+        """, (migracao.versao, migracao.descricao, migracao.checksum))
+    
+    conn.commit()
+    return pendentes
+
+
+def _listar_pendentes(pendentes: list):
+    for migracao in pendentes:
+        logger.info(f"Pendente: {migracao.versao} - {migracao.descricao} "
+                    f"({migracao.checksum[:12]})")
+
+
+def _criar_esquema_sqlite(db, dry_run: bool) -> bool:
+    """
+    No SQLite o esquema atual é criado de uma vez (ver database/sqlite_schema.py).
+
+    `schema_version` registra as migrações que esse esquema já contém: com
+    todas registradas nenhum comando de esquema é executado.
+    """
+    with db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        aplicadas = {}
+        if db.dialect.table_exists(cursor, SCHEMA_VERSION_TABLE):
+            cursor.execute(f"SELECT versao, checksum FROM {SCHEMA_VERSION_TABLE}")
+            aplicadas = {row[0]: row[1] for row in cursor.fetchall()}
+        pendentes = migracoes_pendentes(aplicadas)
+        if not pendentes:
+            logger.info("Esquema SQLite atualizado")
+            return True
+        if dry_run:
+            _listar_pendentes(pendentes)
+            return True
         
+        novo = not db.dialect.table_exists(cursor, 'usuarios')
+        create_schema(conn)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                versao INTEGER NOT NULL PRIMARY KEY,
+                descricao VARCHAR(200) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                aplicada_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.executemany(f"""
+            INSERT INTO {SCHEMA_VERSION_TABLE} (versao, descricao, checksum) VALUES (?, ?, ?)
+        """, [(m.versao, m.descricao, m.checksum) for m in pendentes])
         conn.commit()
-        logger.info("Campo CREA adicionado com sucesso")
-        
-    except Exception as e:
-        logger.error(f"Erro ao adicionar campo CREA: {str(e)}")
-        logger.error(traceback.format_exc())
-        conn.rollback()
-        raise
-    finally:
-        cursor.close()
+    logger.info("Esquema SQLite criado" if novo else "Esquema SQLite verificado")
+    return True
+
+
+def executar_migracoes(dry_run: bool = False, db: Optional[DatabaseConnection] = None) -> bool:
+    """
+    Executa todas as migrações pendentes.
 
-def executar_migracoes():
-    """Executa todas as migrações pendentes"""
+    Args:
+        dry_run: Apenas lista as migrações pendentes, sem aplicá-las
+        db: Conexão a usar; por padrão a `DatabaseConnection` da aplicação
+
+    Returns:
+        bool: True se o esquema está (ou ficaria, no dry-run) atualizado
+    """
     try:
-        logger.info("Iniciando migrações do banco de dados")
-        
-        # Adicionar campo CREA
-        adicionar_campo_crea()
+        db = db or DatabaseConnection()
+        if db.dialect.name == 'sqlite':
+            return _criar_esquema_sqlite(db, dry_run)
         
-        logger.info("Migrações concluídas com sucesso")
+        with db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            pendentes = migracoes_pendentes(ler_versoes_aplicadas(cursor))
+            if not pendentes:
+                logger.info("Esquema do banco de dados atualizado")
+                return True
+            
+            if dry_run:
+                _listar_pendentes(pendentes)
+                return True
+            
+            aplicadas = _aplicar(conn, cursor)
+            logger.info(f"Migrações concluídas com sucesso: {len(aplicadas)} aplicada(s)")
+            return True
     except Exception as e:
         logger.error(f"Erro durante as migrações: {str(e)}")
         logger.error(traceback.format_exc())
+        return False
 
 if __name__ == "__main__":
-    executar_migracoes() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Aplica as migrações pendentes do banco de dados")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="lista as migrações pendentes sem aplicá-las")
+    args = parser.parse_args()
+    sys.exit(0 if executar_migracoes(dry_run=args.dry_run) else 1)
@@ -4,6 +4,7 @@ Módulo contendo os modelos de dados do sistema.
 from datetime import datetime
 from typing import Optional, List
 from dataclasses import dataclass
+from contextlib import closing
 from database.connection import DatabaseConnection
 import logging
 
@@ -57,6 +58,76 @@ class Relatorio:
     link_arquivo: str
     observacoes: Optional[str] = None
 
+def criar_tabelas_base(cursor):
+    """Cria as tabelas principais, se não existirem, usando o cursor informado."""
+    # Tabela de usuários
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'usuarios')
+        CREATE TABLE usuarios (
+            id INT IDENTITY(1,1) PRIMARY KEY,
+            nome VARCHAR(100) NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            senha_hash VARCHAR(255) NOT NULL,
+            tipo_acesso VARCHAR(20) NOT NULL,
+            empresa VARCHAR(100),
+            ativo BIT DEFAULT 1,
+            crea VARCHAR(50),
+            versao ROWVERSION
+        )
+    """)
+
+    # Tabela de equipamentos
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'equipamentos')
+        CREATE TABLE equipamentos (
+            id INT IDENTITY(1,1) PRIMARY KEY,
+            tipo VARCHAR(20) NOT NULL,
+            empresa VARCHAR(100) NOT NULL,
+            localizacao VARCHAR(200) NOT NULL,
+            codigo_projeto VARCHAR(50) NOT NULL,
+            pressao_maxima FLOAT NOT NULL,
+            temperatura_maxima FLOAT NOT NULL,
+            data_ultima_inspecao DATETIME,
+            data_proxima_inspecao DATETIME,
+            status VARCHAR(20) DEFAULT 'ativo',
+            versao ROWVERSION
+        )
+    """)
+
+    # Tabela de inspeções
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'inspecoes')
+        CREATE TABLE inspecoes (
+            id INT IDENTITY(1,1) PRIMARY KEY,
+            equipamento_id INT NOT NULL,
+            data_inspecao DATETIME NOT NULL,
+            tipo_inspecao VARCHAR(20) NOT NULL,
+            engenheiro_responsavel VARCHAR(100) NOT NULL,
+            resultado VARCHAR(20) NOT NULL,
+            recomendacoes TEXT,
+            proxima_inspecao DATETIME,
+            engenheiro_id INT,
+            versao ROWVERSION,
+            FOREIGN KEY (equipamento_id) REFERENCES equipamentos(id),
+            FOREIGN KEY (engenheiro_id) REFERENCES usuarios(id)
+        )
+    """)
+
+    # Tabela de relatórios
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'relatorios')
+        CREATE TABLE relatorios (
+            id INT IDENTITY(1,1) PRIMARY KEY,
+            inspecao_id INT NOT NULL,
+            data_emissao DATE NOT NULL,
+            link_arquivo VARCHAR(255) NOT NULL,
+            observacoes TEXT,
+            versao ROWVERSION,
+            FOREIGN KEY (inspecao_id) REFERENCES inspecoes(id)
+        )
+    """)
+
+
 class DatabaseModels:
     """Classe responsável por operações CRUD no banco de dados."""
     
@@ -69,112 +140,44 @@ class DatabaseModels:
         
     def criar_tabelas(self):
         """Cria as tabelas necessárias no banco de dados."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Tabela de usuários
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'usuarios')
-                CREATE TABLE usuarios (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    nome VARCHAR(100) NOT NULL,
-                    email VARCHAR(100) UNIQUE NOT NULL,
-                    senha_hash VARCHAR(255) NOT NULL,
-                    tipo_acesso VARCHAR(20) NOT NULL,
-                    empresa VARCHAR(100),
-                    ativo BIT DEFAULT 1,
-                    crea VARCHAR(50)
-                )
-            """)
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            try:
+                criar_tabelas_base(cursor)
+                conn.commit()
+                logger.info("Tabelas criadas com sucesso")
             
-            # Tabela de equipamentos
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'equipamentos')
-                CREATE TABLE equipamentos (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    tipo VARCHAR(20) NOT NULL,
-                    empresa VARCHAR(100) NOT NULL,
-                    localizacao VARCHAR(200) NOT NULL,
-                    codigo_projeto VARCHAR(50) NOT NULL,
-                    pressao_maxima FLOAT NOT NULL,
-                    temperatura_maxima FLOAT NOT NULL,
-                    data_ultima_inspecao DATETIME,
-                    data_proxima_inspecao DATETIME,
-                    status VARCHAR(20) DEFAULT 'ativo'
-                )
-            """)
-            
-            # Tabela de inspeções
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'inspecoes')
-                CREATE TABLE inspecoes (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    equipamento_id INT NOT NULL,
-                    data_inspecao DATETIME NOT NULL,
-                    tipo_inspecao VARCHAR(20) NOT NULL,
-                    engenheiro_responsavel VARCHAR(100) NOT NULL,
-                    resultado VARCHAR(20) NOT NULL,
-                    recomendacoes TEXT,
-                    proxima_inspecao DATETIME,
-                    engenheiro_id INT,
-                    FOREIGN KEY (equipamento_id) REFERENCES equipamentos(id),
-                    FOREIGN KEY (engenheiro_id) REFERENCES usuarios(id)
-                )
-            """)
-            
-            # Tabela de relatórios
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'relatorios')
-                CREATE TABLE relatorios (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    inspecao_id INT NOT NULL,
-                    data_emissao DATE NOT NULL,
-                    link_arquivo VARCHAR(255) NOT NULL,
-                    observacoes TEXT,
-                    FOREIGN KEY (inspecao_id) REFERENCES inspecoes(id)
-                )
-            """)
-            
-            conn.commit()
-            logger.info("Tabelas criadas com sucesso")
-            
-        except Exception as e:
-            logger.error(f"Erro ao criar tabelas: {str(e)}")
-            raise
-        finally:
-            cursor.close() 
+            except Exception as e:
+                logger.error(f"Erro ao criar tabelas: {str(e)}")
+                raise
+
 
     def recriar_tabela_relatorios(self):
         """Recria a tabela de relatórios."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Drop da tabela se existir
-            cursor.execute("""
-                IF EXISTS (SELECT * FROM sys.tables WHERE name = 'relatorios')
-                DROP TABLE relatorios
-            """)
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            try:
+                # Drop da tabela se existir
+                cursor.execute("""
+                    IF EXISTS (SELECT * FROM sys.tables WHERE name = 'relatorios')
+                    DROP TABLE relatorios
+                """)
             
-            # Cria a tabela novamente
-            cursor.execute("""
-                CREATE TABLE relatorios (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    inspecao_id INT NOT NULL,
-                    data_emissao DATE NOT NULL,
-                    link_arquivo VARCHAR(255) NOT NULL,
-                    observacoes TEXT,
-                    FOREIGN KEY (inspecao_id) REFERENCES inspecoes(id)
-                )
-            """)
+                # Cria a tabela novamente
+                cursor.execute("""
+                    CREATE TABLE relatorios (
+                        id INT IDENTITY(1,1) PRIMARY KEY,
+                        inspecao_id INT NOT NULL,
+                        data_emissao DATE NOT NULL,
+                        link_arquivo VARCHAR(255) NOT NULL,
+                        observacoes TEXT,
+                        versao ROWVERSION,
+                        FOREIGN KEY (inspecao_id) REFERENCES inspecoes(id)
+                    )
+                """)
             
-            conn.commit()
-            print("Tabela relatorios recriada com sucesso!")
+                conn.commit()
+                print("Tabela relatorios recriada com sucesso!")
             
-        except Exception as e:
-            print(f"Erro ao recriar tabela relatorios: {str(e)}")
-            conn.rollback()
-            raise
-        finally:
-            cursor.close() 
\ No newline at end of file
+            except Exception as e:
+                print(f"Erro ao recriar tabela relatorios: {str(e)}")
+                conn.rollback()
+                raise
@@ -0,0 +1,35 @@
+"""
+Paginação por chave (keyset) das listagens.
+
+Em vez de OFFSET, cada página começa depois da chave de ordenação da última
+linha da página anterior, o que permite ao SQL Server buscar a página pelo
+índice sem ler as linhas já entregues.
+"""
+
+PAGE_SIZE = 200
+
+
+def keyset_condition(columns, descending: bool = False) -> str:
+    """
+    Condição SQL para as linhas posteriores a uma chave na ordem das colunas.
+
+    Para ('a', 'b') em ordem crescente:
+        a >= ? AND (a > ? OR (a = ? AND b > ?))
+    A primeira comparação permite a busca pelo índice da coluna principal.
+    Os parâmetros são gerados por `keyset_params`.
+    """
+    op = '<' if descending else '>'
+    terms = []
+    for i, column in enumerate(columns):
+        equal = [f"{previous} = ?" for previous in columns[:i]]
+        terms.append("(" + " AND ".join(equal + [f"{column} {op} ?"]) + ")")
+    return f"{columns[0]} {op}= ? AND (" + " OR ".join(terms) + ")"
+
+
+def keyset_params(values) -> tuple:
+    """Parâmetros de `keyset_condition` para a chave da última linha recebida."""
+    values = tuple(values)
+    params = [values[0]]
+    for i in range(len(values)):
+        params.extend(values[:i + 1])
+    return tuple(params)
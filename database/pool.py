@@ -0,0 +1,257 @@
+"""
+Pool de conexões thread-safe para o banco de dados.
+
+O pool é independente do driver: recebe uma função que abre uma nova conexão
+(pyodbc em produção, sqlite3 em testes locais) e controla quantas conexões
+podem existir ao mesmo tempo.
+"""
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from database.health import ConnectionHealth, is_disconnect_error
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Nenhuma conexão ficou disponível dentro do tempo de espera."""
+
+
+class _PooledConnection:
+    """Conexão física com os metadados usados pelo pool."""
+
+    __slots__ = ('raw', 'created_at', 'last_used')
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Pool limitado de conexões.
+
+    Args:
+        connect: Função sem argumentos que abre uma nova conexão
+        min_size: Número de conexões abertas na criação do pool
+        max_size: Número máximo de conexões abertas ao mesmo tempo
+        timeout: Tempo máximo (s) de espera por uma conexão livre
+        max_idle: Conexões ociosas há mais tempo que isso (s) são validadas antes
+            do uso; conexões usadas recentemente são entregues sem consulta extra
+        max_lifetime: Conexões mais antigas que isso (s) são descartadas
+        validation_query: Consulta usada para validar conexões ociosas
+        reset_on_return: Executa rollback ao devolver a conexão ao pool
+    """
+
+    def __init__(self, connect, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 30.0, max_idle: float = 300.0,
+                 max_lifetime: float = 3600.0, validation_query: str = "SELECT 1",
+                 reset_on_return: bool = True):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Tamanhos de pool inválidos: min={min_size}, max={max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.validation_query = validation_query
+        self.reset_on_return = reset_on_return
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self.health = ConnectionHealth()
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+            self._size += 1
+
+        logger.info(f"Pool de conexões criado (min={min_size}, max={max_size})")
+
+    @property
+    def size(self) -> int:
+        """Número de conexões físicas abertas (livres + em uso)."""
+        with self._cond:
+            return self._size
+
+    @property
+    def in_use(self) -> int:
+        """Número de conexões emprestadas no momento."""
+        with self._cond:
+            return len(self._in_use)
+
+    def _open(self) -> _PooledConnection:
+        raw = self._connect()
+        logger.debug("Nova conexão física aberta pelo pool")
+        return _PooledConnection(raw)
+
+    def _discard(self, pooled: _PooledConnection):
+        try:
+            pooled.raw.close()
+        except Exception as e:
+            logger.debug(f"Erro ao fechar conexão descartada: {str(e)}")
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        return bool(self.max_lifetime) and now - pooled.created_at > self.max_lifetime
+
+    def _is_valid(self, pooled: _PooledConnection) -> bool:
+        try:
+            cursor = pooled.raw.cursor()
+            try:
+                cursor.execute(self.validation_query)
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            self.health.record_probe(True)
+            return True
+        except Exception as e:
+            self.health.record_probe(False)
+            logger.warning(f"Conexão ociosa inválida, descartando: {str(e)}")
+            return False
+
+    def _invalidate_idle(self):
+        """Força a validação das conexões livres no próximo empréstimo."""
+        with self._cond:
+            for pooled in self._idle:
+                pooled.last_used = float('-inf')
+
+    def acquire(self, timeout: float = None):
+        """
+        Retira uma conexão do pool.
+
+        Conexões expiradas são descartadas e conexões ociosas há mais de
+        `max_idle` segundos são validadas antes de serem entregues.
+
+        Raises:
+            PoolTimeoutError: se nenhuma conexão ficar livre dentro do prazo
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Pool de conexões encerrado")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserva a vaga antes de abrir fora do lock
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Nenhuma conexão livre após {timeout:.1f}s (max={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                try:
+                    pooled = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                now = time.monotonic()
+                stale = self._is_expired(pooled, now) or (
+                    self.max_idle is not None
+                    and now - pooled.last_used > self.max_idle
+                    and not self._is_valid(pooled)
+                )
+                if stale:
+                    self._discard(pooled)
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    continue
+
+            with self._cond:
+                self._in_use[id(pooled.raw)] = pooled
+            return pooled.raw
+
+    def release(self, conn, discard: bool = False):
+        """
+        Devolve uma conexão ao pool.
+
+        Args:
+            conn: Conexão obtida por `acquire`
+            discard: Fecha a conexão em vez de reaproveitá-la (ex.: link quebrado)
+        """
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            logger.warning("Tentativa de devolver conexão que não pertence ao pool")
+            return
+
+        if not discard and self.reset_on_return:
+            try:
+                conn.rollback()
+            except Exception as e:
+                logger.warning(f"Falha ao limpar conexão devolvida, descartando: {str(e)}")
+                discard = True
+
+        now = time.monotonic()
+        if discard or self._closed or self._is_expired(pooled, now):
+            self._discard(pooled)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+
+        pooled.last_used = now
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """
+        Empresta uma conexão durante o bloco `with`.
+
+        Se o bloco lançar exceção a transação é desfeita antes da devolução.
+        Falhas de comunicação descartam a conexão e marcam as demais conexões
+        livres para validação, já que provavelmente caíram juntas.
+        """
+        conn = self.acquire(timeout)
+        discard = False
+        try:
+            yield conn
+        except BaseException as e:
+            if is_disconnect_error(e):
+                logger.warning(f"Falha de comunicação com o banco, descartando conexão: {str(e)}")
+                self.health.record_disconnect()
+                self._invalidate_idle()
+                discard = True
+            else:
+                try:
+                    conn.rollback()
+                except Exception as rollback_error:
+                    logger.warning(f"Erro ao desfazer transação: {str(rollback_error)}")
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def close_all(self):
+        """Fecha as conexões livres e impede novos empréstimos."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+        logger.info("Pool de conexões encerrado")
@@ -0,0 +1,258 @@
+"""
+Verificação dos planos de consulta em um banco SQLite de referência.
+
+Cria o esquema de `database/sqlite_schema.py` com os índices de
+`database/indexes.py`, chama os métodos de leitura dos controladores e
+serviços e roda EXPLAIN QUERY PLAN sobre cada SELECT que eles executam (o
+próprio SQL dos controladores, já traduzido pelo dialeto). Falha se alguma
+tabela for lida por completo ou se o resultado precisar ser ordenado fora de
+um índice.
+
+Uso:
+    python -m database.query_plans
+    python -m database.query_plans --sem-indices   # mostra os planos sem os índices
+
+Os mesmos casos rodam em tests/test_query_plans.py.
+"""
+import os
+import sys
+import tempfile
+from contextlib import closing
+from types import SimpleNamespace
+from database.dialects import SqliteDialect
+from database.pool import ConnectionPool
+from database.sqlite_schema import VERSION_COUNTER_TABLE, create_schema
+
+# Tabelas de uma linha só: lê-las por completo não é problema
+SINGLE_ROW_TABLES = (VERSION_COUNTER_TABLE,)
+
+# Registros mínimos para que os métodos cheguem a todas as consultas
+# (ex.: delete_engineer só conta as inspeções de um engenheiro existente)
+_SEED = """
+    INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso, empresa)
+        VALUES ('ACME', 'contato@acme.com', 'x', 'cliente', 'ACME');
+    INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso) VALUES ('Ana', 'ana@nr13.com', 'x', 'eng');
+    INSERT INTO equipamentos (tag, categoria, empresa_id) VALUES ('VP-001', 'Vaso de Pressão', 1);
+    INSERT INTO inspecoes (equipamento_id, engenheiro_id, data_inspecao, tipo_inspecao, resultado)
+        VALUES (1, 2, '2024-01-10', 'Periódica', 'Aprovado');
+    INSERT INTO relatorios (inspecao_id, data_emissao, link_arquivo) VALUES (1, '2024-01-11', 'laudo.pdf');
+"""
+
+
+def _reminder(ctx):
+    from services.email_service import _REMINDER_QUERY
+    ctx.consultar(_REMINDER_QUERY, ('2024-01-01', '2024-02-01', 30))
+
+
+def _exportacao(register: str, filters: dict):
+    """Consulta de `ExportService.export`: `filtered_query` do controlador e a ordenação do cadastro."""
+    def chamada(ctx):
+        from services.export import REGISTERS
+        query, params = ctx.controladores[register].filtered_query(filters)
+        ctx.consultar(f"{query} ORDER BY {REGISTERS[register].order_by}", params)
+    return chamada
+
+
+# (consulta, chamada) — a chamada recebe o contexto de `_contexto` e roda o
+# método como a aplicação o chama
+PLAN_CASES = (
+    ("EquipmentController.get_equipment_by_company",
+     lambda ctx: ctx.equipamentos.get_equipment_by_company(1)),
+    ("EquipmentController.get_equipment_page (primeira página)",
+     lambda ctx: ctx.equipamentos.get_equipment_page(limit=200)),
+    ("EquipmentController.get_equipment_page (página seguinte)",
+     lambda ctx: ctx.equipamentos.get_equipment_page('VP-001', 1, 200)),
+    ("EquipmentController.get_equipment_page (busca por tag)",
+     lambda ctx: ctx.equipamentos.get_equipment_page('VP-01', 1, 200, tag_prefix='vp-01')),
+    ("EquipmentController.get_equipment_page (empresa e tag)",
+     lambda ctx: ctx.equipamentos.get_equipment_page(limit=200, tag_prefix='vp-01', empresa_id=1)),
+    ("EquipmentController.count_equipment (busca por tag)",
+     lambda ctx: ctx.equipamentos.count_equipment(tag_prefix='vp-01')),
+    ("EquipmentController.get_maintenance_due",
+     lambda ctx: ctx.equipamentos.get_maintenance_due(ate_dias=30)),
+    ("EquipmentController.get_equipment_by_id",
+     lambda ctx: ctx.equipamentos.get_equipment_by_id(1)),
+    ("ExportService.export equipamentos", _exportacao('equipamentos', {})),
+    ("ExportService.export equipamentos (empresa)", _exportacao('equipamentos', {'empresa_id': 1})),
+    ("InspectionController.get_inspections_page",
+     lambda ctx: ctx.inspecoes.get_inspections_page('2024-01-01', 1, 200)),
+    ("InspectionController.get_inspections_by_company",
+     lambda ctx: ctx.inspecoes.get_inspections_by_company(1)),
+    ("InspectionController.get_filtered_inspections (equipamento)",
+     lambda ctx: ctx.inspecoes.get_filtered_inspections({'equipment_id': 1})),
+    ("InspectionController.get_filtered_inspections (período)",
+     lambda ctx: ctx.inspecoes.get_filtered_inspections({'date_from': '2024-01-01',
+                                                         'date_to': '2024-12-31'})),
+    ("InspecaoModel.get_by_equipment",
+     lambda ctx: ctx.inspecoes.get_inspections_by_equipment(1)),
+    ("InspecaoModel.get_by_engineer",
+     lambda ctx: ctx.inspecoes.model.get_by_engineer(2)),
+    ("InspecaoModel.get_by_date_range",
+     lambda ctx: ctx.inspecoes.get_inspections_by_date_range('2024-01-01', '2024-12-31')),
+    ("EmailService.send_inspection_reminder", _reminder),
+    ("DueDateEngine.recalcular (um equipamento)",
+     lambda ctx: ctx.equipamentos.prazos.recalcular([1])),
+    ("EngineerController.delete_engineer",
+     lambda ctx: ctx.engenheiros.delete_engineer(2)),
+    ("ReportController.get_reports_page",
+     lambda ctx: ctx.relatorios.get_reports_page('2024-01-01', 1, 200)),
+    ("ReportController.get_reports_by_company",
+     lambda ctx: ctx.relatorios.get_reports_by_company(1)),
+    ("ExportService.export inspecoes", _exportacao('inspecoes', {})),
+    ("ExportService.export inspecoes (equipamento)", _exportacao('inspecoes', {'equipment_id': 1})),
+    ("ExportService.export relatorios", _exportacao('relatorios', {})),
+    ("ExportService.export relatorios (período)",
+     _exportacao('relatorios', {'date_from': '2024-01-01', 'date_to': '2024-12-31'})),
+    ("ReportController.criar_relatorio",
+     lambda ctx: ctx.relatorios.criar_relatorio(1, '2024-01-11', 'laudo.pdf')),
+    ("CompanyDirectory._fetch",
+     lambda ctx: ctx.auth.companies.active()),
+    ("AuthController.get_all_engineers",
+     lambda ctx: ctx.auth.get_all_engineers()),
+    ("change_tracking.fetch_deleted_ids",
+     lambda ctx: ctx.consultar_delta('equipamentos')),
+)
+
+
+class _PlanCursor:
+    """Cursor que guarda o plano de cada SELECT antes de executá-lo."""
+
+    def __init__(self, conn, planos: list):
+        self._conn = conn
+        self._cursor = conn.cursor()
+        self._planos = planos
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            plano = self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            self._planos.append((sql, [row[-1] for row in plano]))
+        self._cursor.execute(sql, params)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _PlanConnection:
+    def __init__(self, conn, planos: list):
+        self._conn = conn
+        self._planos = planos
+
+    def cursor(self):
+        return _PlanCursor(self._conn, self._planos)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def create_database(path: str, with_indexes: bool = True) -> SqliteDialect:
+    """Banco SQLite em `path` com o esquema, os registros mínimos e, opcionalmente, os índices."""
+    dialect = SqliteDialect(path)
+    with closing(dialect.connect()) as conn:
+        create_schema(conn, with_indexes)
+        conn.executescript(_SEED)
+        conn.commit()
+    return dialect
+
+
+def _contexto(dialect: SqliteDialect, planos: list) -> SimpleNamespace:
+    # Importados aqui: os controladores dependem deste pacote
+    from controllers.auth_controller import AuthController
+    from controllers.engineer_controller import EngineerController
+    from controllers.equipment_controller import EquipmentController
+    from controllers.inspection_controller import InspectionController
+    from controllers.report_controller import ReportController
+    from database.change_tracking import fetch_deleted_ids
+
+    pool = ConnectionPool(lambda: _PlanConnection(dialect.connect(), planos), max_size=1)
+    db = SimpleNamespace(pool=pool, dialect=dialect, read_pool=lambda consistent=False: pool,
+                         written=lambda: None)
+    db_models = SimpleNamespace(db=db)
+
+    def consultar(sql, params=()):
+        with pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(sql, params)
+
+    def consultar_delta(table):
+        with pool.connection() as conn, closing(conn.cursor()) as cursor:
+            fetch_deleted_ids(cursor, table, 0)
+
+    equipamentos = EquipmentController(db_models)
+    inspecoes = InspectionController(db_models)
+    relatorios = ReportController(db_models)
+    return SimpleNamespace(
+        pool=pool, consultar=consultar, consultar_delta=consultar_delta,
+        auth=AuthController(db), equipamentos=equipamentos, inspecoes=inspecoes,
+        relatorios=relatorios, engenheiros=EngineerController(db_models),
+        controladores={'equipamentos': equipamentos, 'inspecoes': inspecoes,
+                       'relatorios': relatorios},
+    )
+
+
+def plan_problems(plan) -> list:
+    """
+    Problemas de um plano do EXPLAIN QUERY PLAN.
+
+    Leitura completa de tabela ('SCAN x' sem índice) e ordenação em árvore
+    temporária (inclusive só dos empates, 'RIGHT PART OF ORDER BY') são
+    problemas; percorrer um índice na ordem pedida com LIMIT não é. Árvores
+    temporárias de GROUP BY e DISTINCT sobre as linhas já filtradas pelo
+    índice são aceitas.
+    """
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN') and ' USING ' not in detail:
+            if detail.split()[1] not in SINGLE_ROW_TABLES:
+                problems.append(detail)
+        elif detail.startswith('USE TEMP B-TREE FOR') and detail.endswith('ORDER BY'):
+            problems.append(detail)
+    return problems
+
+
+def check_plans(with_indexes: bool = True) -> dict:
+    """
+    Retorna {consulta: (planos, problemas)} para todos os casos.
+
+    `planos` tem um (SQL, plano) por SELECT executado. Um caso que não
+    executa nenhum SELECT (ex.: o controlador engoliu um erro) é um problema.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        dialect = create_database(os.path.join(pasta, 'planos.db'), with_indexes)
+        planos = []
+        ctx = _contexto(dialect, planos)
+        try:
+            for name, chamada in PLAN_CASES:
+                planos.clear()
+                chamada(ctx)
+                problems = [problem for _sql, plan in planos for problem in plan_problems(plan)]
+                if not planos:
+                    problems.append("nenhuma consulta executada")
+                results[name] = (list(planos), problems)
+        finally:
+            ctx.pool.close_all()
+    return results
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    results = check_plans(with_indexes='--sem-indices' not in argv)
+    failures = 0
+    for name, (planos, problems) in results.items():
+        status = "FALHA" if problems else "ok"
+        print(f"[{status}] {name}")
+        for _sql, plan in planos:
+            for detail in plan:
+                print(f"        {detail}")
+        for problem in problems:
+            if not any(problem in plan for _sql, plan in planos):
+                print(f"        {problem}")
+        failures += bool(problems)
+    print(f"\n{len(results) - failures}/{len(results)} consultas usam índices")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
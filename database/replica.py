@@ -0,0 +1,209 @@
+"""
+Réplica local (SQLite) das tabelas do servidor, para as listagens.
+
+Cada estação pode manter uma cópia das tabelas monitoradas em um arquivo
+SQLite. Uma thread em segundo plano lê a marca d'água do servidor a cada
+`interval` segundos; se ela não mudou, nada mais é consultado. Caso
+contrário, só as linhas com versão acima da última marca copiada (e os
+registros de exclusão correspondentes) são trazidos e gravados na réplica em
+uma única transação, junto com a nova marca.
+
+A réplica guarda as versões do servidor na coluna `versao` e a marca d'água
+em `controle_versao`, de modo que o mesmo SQL dos controladores (incluindo
+as consultas incrementais e o `ChangeTracker`) roda sobre ela sem mudanças.
+As leituras usam `DatabaseConnection().read_pool()`; quem precisa ver as
+próprias escritas imediatamente pede `consistent=True` e lê do servidor.
+Depois de uma gravação local (`DatabaseConnection().written()`), a réplica é
+sincronizada na hora e, até essa cópia terminar, as listagens também leem do
+servidor.
+"""
+import logging
+import threading
+import time
+import traceback
+from contextlib import closing
+from database.change_tracking import (
+    TRACKED_TABLES, VERSION_COLUMN, TOMBSTONE_TABLE, read_watermark, version_filter,
+    fetch_deleted_ids
+)
+from database.dialects import SqliteDialect
+from database.pool import ConnectionPool
+from database.sqlite_schema import VERSION_COUNTER_TABLE, create_schema
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas do servidor por vez durante a cópia
+SYNC_BATCH_SIZE = 1000
+
+
+class LocalReplica:
+    """
+    Cópia local das tabelas do servidor.
+
+    Args:
+        server_pool: Pool de conexões do servidor
+        server_dialect: Dialeto do servidor (`DatabaseConnection().dialect`)
+        path: Arquivo SQLite da réplica
+        interval: Intervalo (s) entre as sincronizações da thread
+        tables: Tabelas copiadas (as exclusões são copiadas sempre)
+    """
+
+    def __init__(self, server_pool, server_dialect, path: str, interval: float = 5.0,
+                 tables=TRACKED_TABLES):
+        self.server_pool = server_pool
+        self.server_dialect = server_dialect
+        self.path = path
+        self.interval = interval
+        self.tables = tuple(tables)
+        # Sem gatilhos nem chaves estrangeiras: as linhas chegam como estão no servidor
+        self.dialect = SqliteDialect(path, foreign_keys=False)
+        self.pool = ConnectionPool(self.dialect.connect, min_size=1, max_size=4)
+        with self.pool.connection() as conn:
+            create_schema(conn, with_triggers=False)
+            self.watermark = conn.execute(
+                f"SELECT valor FROM {VERSION_COUNTER_TABLE}").fetchone()[0]
+        self._columns = {}
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        # Pedidos de sincronização feitos e atendidos (ver `fresh`)
+        self._requested = 0
+        self._served = 0
+        self.syncs = 0
+        self.failures = 0
+        self.rows_copied = 0
+        self.last_sync = None
+
+    @property
+    def ready(self) -> bool:
+        """Indica se a réplica já recebeu ao menos uma cópia do servidor."""
+        return self.watermark > 0
+
+    @property
+    def fresh(self) -> bool:
+        """Indica se a réplica já copiou as gravações avisadas por `request_sync()`."""
+        return self._served >= self._requested
+
+    # --- Sincronização ---
+
+    def _common_columns(self, server_cursor, replica_cursor, table: str) -> tuple:
+        """Colunas presentes no servidor e na réplica (lidas uma vez por tabela)."""
+        if table not in self._columns:
+            server = self.server_dialect.column_names(server_cursor, table)
+            replica = self.dialect.column_names(replica_cursor, table)
+            self._columns[table] = tuple(sorted((server & replica) - {VERSION_COLUMN}))
+        return self._columns[table]
+
+    def _copy_table(self, server_cursor, replica_cursor, table: str, since: int) -> int:
+        columns = self._common_columns(server_cursor, replica_cursor, table)
+        if not columns:
+            logger.warning(f"Tabela {table} não encontrada no servidor, ignorando na réplica")
+            return 0
+
+        server_cursor.execute(f"""
+            SELECT {', '.join(f't.{column}' for column in columns)},
+                   CAST(t.{VERSION_COLUMN} AS BIGINT)
+            FROM dbo.{table} t
+            WHERE {version_filter('t')}
+        """, (since,))
+        insert = (f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, {VERSION_COLUMN}) "
+                  f"VALUES ({', '.join('?' * (len(columns) + 1))})")
+        copied = 0
+        while True:
+            rows = server_cursor.fetchmany(SYNC_BATCH_SIZE)
+            if not rows:
+                break
+            replica_cursor.executemany(insert, [tuple(row) for row in rows])
+            copied += len(rows)
+
+        if since and table != TOMBSTONE_TABLE:
+            deleted = fetch_deleted_ids(server_cursor, table, since)
+            if deleted:
+                replica_cursor.executemany(f"DELETE FROM {table} WHERE id = ?",
+                                           [(row_id,) for row_id in deleted])
+                copied += len(deleted)
+        return copied
+
+    def sync(self):
+        """
+        Copia as alterações do servidor desde a última sincronização.
+
+        Returns:
+            int: Linhas copiadas/excluídas (0 se nada mudou), ou None em caso de erro
+        """
+        with self._sync_lock:
+            since = self.watermark
+            requested = self._requested
+            try:
+                with self.server_pool.connection() as server_conn, \
+                        closing(server_conn.cursor()) as server_cursor:
+                    watermark = read_watermark(server_cursor)
+                    if watermark == since:
+                        self.last_sync = time.time()
+                        self._served = requested
+                        return 0
+
+                    with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                        copied = 0
+                        for table in self.tables + (TOMBSTONE_TABLE,):
+                            copied += self._copy_table(server_cursor, cursor, table, since)
+                        cursor.execute(f"UPDATE {VERSION_COUNTER_TABLE} SET valor = ?", (watermark,))
+                        conn.commit()
+
+                self.watermark = watermark
+                self._served = requested
+                self.syncs += 1
+                self.rows_copied += copied
+                self.last_sync = time.time()
+                logger.debug(f"Réplica sincronizada até a versão {watermark}: {copied} linha(s)")
+                return copied
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Erro ao sincronizar a réplica local: {str(e)}")
+                logger.error(traceback.format_exc())
+                return None
+
+    # --- Thread de sincronização ---
+
+    def start(self):
+        """
+        Sincroniza uma vez e inicia a thread de sincronização.
+
+        A primeira cópia roda na thread de quem chama, para que as telas já
+        abram a partir da réplica; se o servidor estiver inacessível, a cópia
+        anterior (se houver) continua sendo usada.
+        """
+        if self._thread is not None:
+            return
+        self.sync()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='replica-sync', daemon=True)
+        self._thread.start()
+        logger.info(f"Réplica local iniciada em {self.path} (versão {self.watermark})")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopping:
+                return
+            self.sync()
+
+    def request_sync(self):
+        """
+        Antecipa a próxima sincronização (ex.: depois de uma gravação).
+
+        Até ela terminar, `fresh` é falso e `read_pool()` lê do servidor.
+        """
+        self._requested += 1
+        self._wake.set()
+
+    def stop(self):
+        """Para a thread de sincronização e fecha as conexões da réplica."""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.pool.close_all()
@@ -0,0 +1,258 @@
+"""
+Esquema do banco no SQLite.
+
+Equivalente ao esquema do SQL Server depois de todas as migrações de
+`database/migrations.py`: mesmas tabelas e colunas, os índices de
+`database/indexes.py` e o controle de versão usado pelo `ChangeTracker`.
+Como o SQLite não tem ROWVERSION, a coluna `versao` é preenchida por
+gatilhos a partir de um contador único (`controle_versao`), e as exclusões
+são registradas em `registros_excluidos` com a versão do contador.
+"""
+from database.change_tracking import TRACKED_TABLES, VERSION_COLUMN, TOMBSTONE_TABLE
+from database.indexes import (QUERY_INDEXES, MAINTENANCE_INDEXES, VERSION_INDEXES,
+                              INSPECTION_ORDER_INDEXES, REPLACED_INDEXES)
+
+VERSION_COUNTER_TABLE = 'controle_versao'
+
+TABLES = f"""
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome VARCHAR(100) NOT NULL,
+        email VARCHAR(100) UNIQUE NOT NULL,
+        senha_hash VARCHAR(255) NOT NULL,
+        tipo_acesso VARCHAR(20) NOT NULL,
+        empresa VARCHAR(100),
+        ativo BIT DEFAULT 1,
+        crea VARCHAR(50),
+        possui_spie BIT NOT NULL DEFAULT 0,
+        {VERSION_COLUMN} BIGINT
+    );
+
+    CREATE TABLE IF NOT EXISTS equipamentos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tag VARCHAR(20),
+        categoria VARCHAR(50),
+        empresa_id INTEGER REFERENCES usuarios(id),
+        fabricante VARCHAR(100),
+        ano_fabricacao INTEGER,
+        pressao_projeto FLOAT,
+        pressao_trabalho FLOAT,
+        volume FLOAT,
+        fluido VARCHAR(50),
+        categoria_nr13 VARCHAR(20),
+        pmta VARCHAR(50),
+        placa_identificacao VARCHAR(50),
+        numero_registro VARCHAR(50),
+        frequencia_manutencao INTEGER DEFAULT 180,
+        data_ultima_manutencao DATE,
+        -- Mantida por EquipmentController.atualizar_manutencao_equipamento
+        data_proxima_manutencao DATE,
+        ativo BIT DEFAULT 1,
+        status VARCHAR(20) DEFAULT 'ativo',
+        -- Colunas do cadastro antigo
+        tipo VARCHAR(20),
+        empresa VARCHAR(100),
+        localizacao VARCHAR(200),
+        codigo_projeto VARCHAR(50),
+        pressao_maxima FLOAT,
+        temperatura_maxima FLOAT,
+        data_ultima_inspecao DATETIME,
+        data_proxima_inspecao DATETIME,
+        -- Prazos NR-13 (ver services/due_dates.py)
+        proximo_exame_externo DATE,
+        proximo_exame_interno DATE,
+        proximo_teste_hidrostatico DATE,
+        {VERSION_COLUMN} BIGINT
+    );
+
+    CREATE TABLE IF NOT EXISTS inspecoes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        equipamento_id INTEGER NOT NULL REFERENCES equipamentos(id),
+        engenheiro_id INTEGER REFERENCES usuarios(id),
+        data_inspecao DATETIME NOT NULL,
+        tipo_inspecao VARCHAR(20) NOT NULL,
+        engenheiro_responsavel VARCHAR(100),
+        resultado VARCHAR(20) NOT NULL,
+        recomendacoes TEXT,
+        proxima_inspecao DATETIME,
+        status VARCHAR(20),
+        prazo_proxima_inspecao INTEGER,
+        {VERSION_COLUMN} BIGINT
+    );
+
+    CREATE TABLE IF NOT EXISTS relatorios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        inspecao_id INTEGER NOT NULL REFERENCES inspecoes(id),
+        data_emissao DATE NOT NULL,
+        link_arquivo VARCHAR(255) NOT NULL,
+        observacoes TEXT,
+        engenheiro_responsavel INTEGER,
+        documento_sha256 CHAR(64),
+        {VERSION_COLUMN} BIGINT
+    );
+
+    CREATE TABLE IF NOT EXISTS documentos (
+        sha256 CHAR(64) NOT NULL PRIMARY KEY,
+        tamanho BIGINT NOT NULL,
+        extensao VARCHAR(10) NOT NULL,
+        nome_original VARCHAR(255),
+        ultimo_uso DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+    );
+
+    CREATE TABLE IF NOT EXISTS email_saida (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        destinatario VARCHAR(255) NOT NULL,
+        assunto VARCHAR(255) NOT NULL,
+        corpo TEXT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+        tentativas INTEGER NOT NULL DEFAULT 0,
+        proxima_tentativa DATETIME NOT NULL,
+        lote CHAR(32),
+        ultimo_erro VARCHAR(500),
+        criado_em DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+        enviado_em DATETIME
+    );
+    CREATE INDEX IF NOT EXISTS IX_email_saida_status_proxima
+        ON email_saida (status, proxima_tentativa);
+    CREATE INDEX IF NOT EXISTS IX_email_saida_lote ON email_saida (lote);
+
+    CREATE TABLE IF NOT EXISTS lembretes_enviados (
+        inspecao_id INTEGER NOT NULL,
+        vencimento DATETIME NOT NULL,
+        antecedencia INTEGER NOT NULL,
+        destinatario VARCHAR(255),
+        enviado_em DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+        PRIMARY KEY (inspecao_id, vencimento, antecedencia)
+    );
+
+    CREATE TABLE IF NOT EXISTS resumo_conformidade (
+        empresa_id INTEGER PRIMARY KEY,
+        equipamentos INTEGER NOT NULL DEFAULT 0,
+        atrasados INTEGER NOT NULL DEFAULT 0,
+        vence_7 INTEGER NOT NULL DEFAULT 0,
+        vence_15 INTEGER NOT NULL DEFAULT 0,
+        vence_30 INTEGER NOT NULL DEFAULT 0,
+        aprovadas INTEGER NOT NULL DEFAULT 0,
+        reprovadas INTEGER NOT NULL DEFAULT 0,
+        pendentes INTEGER NOT NULL DEFAULT 0,
+        assinatura VARCHAR(200),
+        atualizado_em DATETIME NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS tarefas_agendadas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome VARCHAR(100) NOT NULL UNIQUE,
+        acao VARCHAR(50) NOT NULL,
+        argumentos TEXT,
+        gatilho VARCHAR(10) NOT NULL,
+        parametro VARCHAR(20),
+        proxima_execucao DATETIME NOT NULL,
+        tolerancia_segundos INTEGER,
+        timeout_segundos INTEGER,
+        ultima_execucao DATETIME,
+        ultimo_atraso_ms INTEGER,
+        ultima_duracao_ms INTEGER,
+        ultimo_erro VARCHAR(500),
+        execucoes INTEGER NOT NULL DEFAULT 0,
+        falhas INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS {TOMBSTONE_TABLE} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela VARCHAR(50) NOT NULL,
+        registro_id INTEGER NOT NULL,
+        data_exclusao DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+        {VERSION_COLUMN} BIGINT
+    );
+    CREATE INDEX IF NOT EXISTS IX_{TOMBSTONE_TABLE}_tabela_versao
+        ON {TOMBSTONE_TABLE} (tabela, {VERSION_COLUMN});
+
+    CREATE TABLE IF NOT EXISTS {VERSION_COUNTER_TABLE} (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        valor BIGINT NOT NULL
+    );
+    INSERT OR IGNORE INTO {VERSION_COUNTER_TABLE} (id, valor) VALUES (1, 0);
+"""
+
+# Colunas acrescentadas depois da criação do esquema: (tabela, coluna, tipo).
+# Bancos SQLite já existentes as recebem em `create_schema`.
+ADDED_COLUMNS = (
+    ('relatorios', 'documento_sha256', 'CHAR(64)'),
+    ('usuarios', 'possui_spie', 'BIT NOT NULL DEFAULT 0'),
+    ('equipamentos', 'proximo_exame_externo', 'DATE'),
+    ('equipamentos', 'proximo_exame_interno', 'DATE'),
+    ('equipamentos', 'proximo_teste_hidrostatico', 'DATE'),
+    ('equipamentos', 'data_proxima_manutencao', 'DATE'),
+)
+
+# Preenchimento das colunas acima nos bancos que acabaram de recebê-las
+ADDED_COLUMN_BACKFILLS = {
+    ('equipamentos', 'data_proxima_manutencao'): """
+        UPDATE equipamentos
+        SET data_proxima_manutencao = date(data_ultima_manutencao, '+' || frequencia_manutencao || ' days')
+        WHERE data_ultima_manutencao IS NOT NULL AND frequencia_manutencao > 0
+    """,
+}
+
+# Índices que dependem das colunas acima
+ADDED_INDEXES = """
+    CREATE INDEX IF NOT EXISTS IX_relatorios_documento ON relatorios (documento_sha256);
+"""
+
+
+def version_triggers(table: str) -> str:
+    """
+    Gatilhos que numeram as alterações da tabela.
+
+    Cada INSERT/UPDATE recebe o próximo valor do contador em `versao` e cada
+    DELETE gera um registro em `registros_excluidos`, como o ROWVERSION e os
+    gatilhos AFTER DELETE do SQL Server.
+    """
+    next_version = f"""
+        UPDATE {VERSION_COUNTER_TABLE} SET valor = valor + 1;
+        UPDATE {table} SET {VERSION_COLUMN} = (SELECT valor FROM {VERSION_COUNTER_TABLE})
+        WHERE id = NEW.id;
+    """
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS TR_{table}_versao_insert AFTER INSERT ON {table}
+        BEGIN {next_version} END;
+
+        CREATE TRIGGER IF NOT EXISTS TR_{table}_versao_update AFTER UPDATE ON {table}
+        WHEN NEW.{VERSION_COLUMN} IS OLD.{VERSION_COLUMN}
+        BEGIN {next_version} END;
+
+        CREATE TRIGGER IF NOT EXISTS TR_{table}_exclusao AFTER DELETE ON {table}
+        BEGIN
+            UPDATE {VERSION_COUNTER_TABLE} SET valor = valor + 1;
+            INSERT INTO {TOMBSTONE_TABLE} (tabela, registro_id, {VERSION_COLUMN})
+            VALUES ('{table}', OLD.id, (SELECT valor FROM {VERSION_COUNTER_TABLE}));
+        END;
+    """
+
+
+def create_schema(conn, with_indexes: bool = True, with_triggers: bool = True):
+    """
+    Cria (se não existirem) as tabelas, gatilhos e índices.
+
+    Args:
+        conn: Conexão do sqlite3 (ou a conexão do pool com backend SQLite)
+        with_indexes: Cria também os índices de `QUERY_INDEXES`, `MAINTENANCE_INDEXES`,
+            `VERSION_INDEXES` e `INSPECTION_ORDER_INDEXES`, sem os de `REPLACED_INDEXES`
+        with_triggers: Cria os gatilhos de controle de versão; uma cópia de
+            outro banco (ver database/replica.py) guarda as versões de origem
+    """
+    conn.executescript(TABLES)
+    for table, column, column_type in ADDED_COLUMNS:
+        existing = {row[1].lower() for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            if (table, column) in ADDED_COLUMN_BACKFILLS:
+                conn.execute(ADDED_COLUMN_BACKFILLS[(table, column)])
+    script = ADDED_INDEXES
+    if with_triggers:
+        script += "".join(version_triggers(table) for table in TRACKED_TABLES)
+    if with_indexes:
+        indexes = QUERY_INDEXES + MAINTENANCE_INDEXES + VERSION_INDEXES + INSPECTION_ORDER_INDEXES
+        script += "".join(f"DROP INDEX IF EXISTS {name};\n" for name in REPLACED_INDEXES)
+        script += "".join(f"{index.sqlite_ddl()};\n" for index in indexes if index.name not in REPLACED_INDEXES)
+    conn.executescript(script)
@@ -3,12 +3,19 @@
 
 """
 Script para executar diretamente o gerador de laudos NR-13
+
+Sem argumentos abre a janela do gerador. Com --batch gera, sem interface,
+os laudos das inspeções informadas (ou filtradas) em paralelo:
+
+    python gerar_laudo.py --batch --de 2024-01-01 --ate 2024-12-31 --saida laudos/2024
+    python gerar_laudo.py --batch --ids 10,11,12
 """
 
 import sys
 import os
 import logging
-from PyQt5.QtWidgets import QApplication
+import argparse
+import multiprocessing
 
 # Configuração do logging
 if not os.path.exists('logs'):
@@ -29,11 +36,68 @@ logging.getLogger('').addHandler(console)
 
 logger = logging.getLogger(__name__)
 
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Gerador de laudos técnicos NR-13")
+    parser.add_argument('--batch', action='store_true',
+                        help="Gera os laudos em lote, sem interface gráfica")
+    parser.add_argument('--ids', help="IDs das inspeções separados por vírgula")
+    parser.add_argument('--de', dest='date_from', help="Inspeções a partir desta data (AAAA-MM-DD)")
+    parser.add_argument('--ate', dest='date_to', help="Inspeções até esta data (AAAA-MM-DD)")
+    parser.add_argument('--equipamento', dest='equipment_id', type=int, help="ID do equipamento")
+    parser.add_argument('--tipo', dest='tipo_inspecao', help="Tipo de inspeção")
+    parser.add_argument('--resultado', help="Resultado da inspeção")
+    parser.add_argument('--saida', help="Pasta dos PDFs (padrão: REPORT_OUTPUT_PATH)")
+    parser.add_argument('--processos', type=int, help="Processos de geração (padrão: um por núcleo)")
+    return parser.parse_args()
+
+
+def gerar_em_lote(args):
+    """Gera os laudos em lote e retorna o código de saída"""
+    from config.settings import LAUDO_BATCH_WORKERS, REPORT_OUTPUT_PATH
+    from database.models import DatabaseModels
+    from services.laudo_batch import LaudoBatch
+    
+    if args.date_from and not args.date_to or args.date_to and not args.date_from:
+        print("Informe --de e --ate juntos.")
+        return 2
+    ids = [int(valor) for valor in args.ids.split(',') if valor.strip()] if args.ids else None
+    filtros = {chave: getattr(args, chave)
+               for chave in ('date_from', 'date_to', 'equipment_id', 'tipo_inspecao', 'resultado')
+               if getattr(args, chave)}
+    if ids is None and not filtros:
+        print("Informe --ids ou ao menos um filtro (--de/--ate, --equipamento, --tipo, --resultado).")
+        return 2
+    
+    # No console, só o progresso e os avisos
+    console.setLevel(logging.WARNING)
+    lote = LaudoBatch(DatabaseModels(), args.saida or REPORT_OUTPUT_PATH,
+                      args.processos or LAUDO_BATCH_WORKERS)
+    
+    def progresso(feitos, total):
+        print(f"\r{feitos}/{total} laudo(s)", end='', flush=True)
+    
+    resultado = lote.gerar(ids=ids, filters=filtros, progress=progresso)
+    print()
+    for inspecao_id, erro in resultado.falhas:
+        print(f"Inspeção {inspecao_id}: {erro}")
+    print(f"{len(resultado.gerados)} laudo(s) gerado(s) em {os.path.abspath(lote.output_dir)}, "
+          f"{len(resultado.falhas)} falha(s), {resultado.registrados} registro(s) novo(s) em relatorios")
+    return 1 if resultado.falhas else 0
+
+
 if __name__ == "__main__":
+    # Necessário para o pool de processos no executável do Windows
+    multiprocessing.freeze_support()
+    args = _argumentos()
     try:
+        if args.batch:
+            logger.info("=== GERAÇÃO DE LAUDOS NR-13 EM LOTE ===")
+            sys.exit(gerar_em_lote(args))
+        
         logger.info("=== INICIANDO GERADOR DE LAUDOS NR-13 ===")
         
         # Inicializa a aplicação
+        from PyQt5.QtWidgets import QApplication
         app = QApplication(sys.argv)
         
         # Importa os módulos necessários
@@ -52,4 +116,4 @@ if __name__ == "__main__":
         logger.error(traceback.format_exc())
         print(f"ERRO FATAL: {str(e)}")
         print(traceback.format_exc())
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
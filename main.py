@@ -9,12 +9,12 @@ Data: [Data]
 
 import sys
 import logging
+from contextlib import closing
 from PyQt5.QtWidgets import QApplication
 from ui.admin_ui import AdminWindow
 from ui.client_ui import ClientWindow
 from ui.login_window import LoginWindow
 from controllers.auth_controller import AuthController
-import pyodbc
 from ui.debug_window import DebugWindow
 from database.models import DatabaseModels
 from database.migrations import executar_migracoes
@@ -90,12 +90,10 @@ class SistemaInspecao:
             else:
                 # Busca a empresa do usuário
                 db_models = DatabaseModels()
-                conn = db_models.db.get_connection()
-                cursor = conn.cursor()
-                cursor.execute("SELECT empresa FROM usuarios WHERE id = ?", (usuario_id,))
-                row = cursor.fetchone()
+                with db_models.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                    cursor.execute("SELECT empresa FROM usuarios WHERE id = ?", (usuario_id,))
+                    row = cursor.fetchone()
                 company = row[0] if row else ""
-                cursor.close()
                 
                 self.window = ClientWindow(self.auth_controller, usuario_id, company)
             
@@ -165,15 +163,17 @@ if __name__ == "__main__":
             
         logger.info("=== INICIANDO APLICAÇÃO ===")
         
-        # Inicializa o banco de dados
-        logger.info("Inicializando banco de dados")
-        db_models = DatabaseModels()
-        db_models.criar_tabelas()
-        
-        # Executa as migrações pendentes
-        logger.info("Executando migrações do banco de dados")
+        # Cria as tabelas e aplica as migrações pendentes (uma consulta se o
+        # esquema já estiver atualizado)
+        logger.info("Verificando esquema do banco de dados")
         executar_migracoes()
         
+        # Réplica local das listagens (LOCAL_REPLICA_ENABLED no .env)
+        replica = DatabaseModels().db.replica
+        if replica is not None:
+            logger.info("Sincronizando réplica local")
+            replica.start()
+        
         # Cria o usuário admin se não existir
         logger.info("Verificando usuário admin")
         auth = AuthController()
@@ -190,6 +190,8 @@ if __name__ == "__main__":
         sistema = SistemaInspecao()
         logger.info("Executando a aplicação")
         codigo_saida = sistema.run()
+        if replica is not None:
+            replica.stop()
         
         logger.info(f"Aplicação encerrada com código {codigo_saida}")
         sys.exit(codigo_saida)
@@ -0,0 +1,252 @@
+"""
+Repositório de documentos dos relatórios (laudos em PDF e anexos).
+
+Os arquivos ficam em `UPLOAD_FOLDER`, endereçados pelo SHA-256 do conteúdo
+(`<pasta>/ab/abcdef….pdf`). O arquivo de origem é copiado em blocos para uma
+pasta temporária, com o hash calculado durante a cópia, e depois movido para
+o destino. Conteúdo já guardado não é gravado de novo: enviar o mesmo laudo
+várias vezes não aumenta o uso do disco.
+
+A tabela `documentos` registra cada arquivo guardado e os relatórios apontam
+para ele por `relatorios.documento_sha256`. As referências são contadas pelo
+índice dessa coluna; `coletar_orfaos`, agendada em services/scheduler.py,
+remove os documentos que nenhum relatório usa mais.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from config.settings import (
+    ALLOWED_EXTENSIONS, DOCUMENT_GC_GRACE_HOURS, MAX_FILE_SIZE, UPLOAD_FOLDER
+)
+
+logger = logging.getLogger(__name__)
+
+# Bytes lidos do arquivo de origem por vez
+CHUNK_SIZE = 1024 * 1024
+
+# Pasta (dentro do repositório) dos arquivos ainda em cópia
+TEMP_DIR = '.tmp'
+
+
+@dataclass(frozen=True)
+class Documento:
+    """
+    Arquivo guardado no repositório.
+
+    Attributes:
+        sha256: Hash do conteúdo (chave do documento)
+        tamanho: Tamanho em bytes
+        caminho: Caminho absoluto do arquivo no repositório
+        novo: False se o conteúdo já estava guardado
+    """
+    sha256: str
+    tamanho: int
+    caminho: str
+    novo: bool = False
+
+
+class DocumentStore:
+    """
+    Guarda, localiza e verifica os documentos dos relatórios.
+
+    Uso:
+        store = DocumentStore(db_models)
+        documento = store.guardar('C:/laudos/Laudo_VP-001.pdf')
+        store.verificar(documento.sha256)
+    """
+
+    def __init__(self, db_models, raiz: str = UPLOAD_FOLDER):
+        self.db = db_models.db
+        self.dialect = self.db.dialect
+        self.raiz = os.path.abspath(raiz)
+
+    def caminho(self, sha256: str, extensao: str) -> str:
+        """Caminho do arquivo no repositório, calculado a partir do hash."""
+        return os.path.join(self.raiz, sha256[:2], f"{sha256}.{extensao}")
+
+    def gerenciado(self, caminho: str) -> bool:
+        """True se o caminho é um arquivo do repositório."""
+        try:
+            return os.path.commonpath([self.raiz, os.path.abspath(caminho)]) == self.raiz
+        except ValueError:
+            return False  # outra unidade (Windows)
+
+    def localizar(self, sha256: str) -> Optional[Documento]:
+        """Documento pelo hash (consulta pela chave primária), ou None."""
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT tamanho, extensao FROM documentos WHERE sha256 = ?", (sha256,))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return Documento(sha256, row[0], self.caminho(sha256, row[1].strip()))
+
+    def referencias(self, sha256: str) -> int:
+        """Quantidade de relatórios que usam o documento."""
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT COUNT(*) FROM relatorios WHERE documento_sha256 = ?", (sha256,))
+            return cursor.fetchone()[0]
+
+    def verificar(self, sha256: str, completo: bool = False) -> bool:
+        """
+        Confere se o arquivo do documento está no disco.
+
+        Args:
+            sha256: Hash do documento
+            completo: Lê o arquivo e recalcula o hash em vez de conferir só o tamanho
+        """
+        documento = self.localizar(sha256)
+        if documento is None or not os.path.isfile(documento.caminho):
+            return False
+        if os.path.getsize(documento.caminho) != documento.tamanho:
+            return False
+        return not completo or self._hash(documento.caminho) == sha256
+
+    @staticmethod
+    def _hash(caminho: str) -> str:
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(CHUNK_SIZE), b''):
+                sha.update(bloco)
+        return sha.hexdigest()
+
+    def guardar(self, origem: str, nome_original: str = None) -> Documento:
+        """
+        Guarda o arquivo no repositório (ou reaproveita o conteúdo já guardado).
+
+        Args:
+            origem: Arquivo a guardar
+            nome_original: Nome registrado em `documentos` (padrão: nome do arquivo)
+
+        Returns:
+            Documento: Hash, tamanho e caminho no repositório
+
+        Raises:
+            ValueError: Tipo de arquivo não permitido ou maior que MAX_FILE_SIZE
+        """
+        if self.gerenciado(origem):
+            sha256 = os.path.splitext(os.path.basename(origem))[0]
+            documento = self.localizar(sha256)
+            if documento is not None:
+                self._registrar(documento.sha256, documento.tamanho, None, None)
+                return documento
+
+        extensao = os.path.splitext(origem)[1][1:].lower()
+        if extensao not in ALLOWED_EXTENSIONS:
+            raise ValueError(f"Tipo de arquivo não permitido. Tipos permitidos: "
+                             f"{', '.join(sorted(ALLOWED_EXTENSIONS))}")
+
+        pasta_temporaria = os.path.join(self.raiz, TEMP_DIR)
+        os.makedirs(pasta_temporaria, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=pasta_temporaria, suffix='.parcial')
+        try:
+            sha = hashlib.sha256()
+            tamanho = 0
+            with open(origem, 'rb') as entrada, os.fdopen(fd, 'wb') as saida:
+                for bloco in iter(lambda: entrada.read(CHUNK_SIZE), b''):
+                    tamanho += len(bloco)
+                    if tamanho > MAX_FILE_SIZE:
+                        raise ValueError(f"Arquivo muito grande. Tamanho máximo: "
+                                         f"{MAX_FILE_SIZE / 1024 / 1024:.0f}MB")
+                    sha.update(bloco)
+                    saida.write(bloco)
+            sha256 = sha.hexdigest()
+            documento = self._registrar(sha256, tamanho, extensao,
+                                        nome_original or os.path.basename(origem), temporario)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+        logger.info(f"Documento {os.path.basename(origem)} "
+                    f"{'guardado' if documento.novo else 'já existia'}: {sha256[:12]}")
+        return documento
+
+    def _registrar(self, sha256: str, tamanho: int, extensao: Optional[str],
+                   nome_original: Optional[str], temporario: str = None) -> Documento:
+        """
+        Atualiza `ultimo_uso` do documento ou o cria a partir do arquivo temporário.
+
+        `ultimo_uso` protege o documento da coleta de órfãos enquanto o
+        relatório que vai usá-lo ainda não foi gravado.
+        """
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT extensao FROM documentos WHERE sha256 = ?", (sha256,))
+            row = cursor.fetchone()
+            if row is not None:
+                destino = self.caminho(sha256, row[0].strip())
+                # Repõe um arquivo apagado fora do sistema
+                if temporario and not os.path.exists(destino):
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    os.replace(temporario, destino)
+                cursor.execute("UPDATE documentos SET ultimo_uso = GETDATE() WHERE sha256 = ?", (sha256,))
+                conn.commit()
+                return Documento(sha256, tamanho, destino)
+
+            destino = self.caminho(sha256, extensao)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(temporario, destino)
+            try:
+                cursor.execute("""
+                    INSERT INTO documentos (sha256, tamanho, extensao, nome_original, ultimo_uso)
+                    VALUES (?, ?, ?, ?, GETDATE())
+                """, (sha256, tamanho, extensao, (nome_original or '')[:255]))
+                conn.commit()
+            except self.dialect.errors:
+                conn.rollback()
+                # Outra estação guardou o mesmo conteúdo ao mesmo tempo
+                cursor.execute("UPDATE documentos SET ultimo_uso = GETDATE() WHERE sha256 = ?", (sha256,))
+                if cursor.rowcount != 1:
+                    os.remove(destino)
+                    raise
+                conn.commit()
+                return Documento(sha256, tamanho, destino)
+        return Documento(sha256, tamanho, destino, novo=True)
+
+    def coletar_orfaos(self, carencia_horas: int = DOCUMENT_GC_GRACE_HOURS) -> tuple[int, int]:
+        """
+        Remove os documentos sem relatório que não são usados há `carencia_horas`.
+
+        Também apaga cópias temporárias abandonadas (ex.: estação desligada
+        durante um envio).
+
+        Returns:
+            tuple[int, int]: (documentos removidos, bytes liberados)
+        """
+        limite = (datetime.now() - timedelta(hours=carencia_horas)).replace(microsecond=0)
+        orfao = """
+            ultimo_uso < ? AND NOT EXISTS (
+                SELECT 1 FROM relatorios r WHERE r.documento_sha256 = documentos.sha256)
+        """
+        removidos = []
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(f"SELECT sha256, extensao, tamanho FROM documentos WHERE {orfao}", (limite,))
+            for sha256, extensao, tamanho in cursor.fetchall():
+                # Confere de novo: um relatório pode ter passado a usá-lo
+                cursor.execute(f"DELETE FROM documentos WHERE sha256 = ? AND {orfao}", (sha256, limite))
+                if cursor.rowcount == 1:
+                    removidos.append((self.caminho(sha256, extensao.strip()), tamanho))
+            conn.commit()
+
+        liberados = 0
+        for caminho, tamanho in removidos:
+            try:
+                os.remove(caminho)
+                liberados += tamanho
+            except FileNotFoundError:
+                pass
+
+        pasta_temporaria = os.path.join(self.raiz, TEMP_DIR)
+        if os.path.isdir(pasta_temporaria):
+            limite_temporarios = time.time() - carencia_horas * 3600
+            for entrada in os.scandir(pasta_temporaria):
+                if entrada.is_file() and entrada.stat().st_mtime < limite_temporarios:
+                    os.remove(entrada.path)
+
+        logger.info(f"Coleta de documentos: {len(removidos)} órfão(s) removido(s), "
+                    f"{liberados / 1024 / 1024:.1f}MB liberado(s)")
+        return len(removidos), liberados
@@ -0,0 +1,346 @@
+"""
+Prazos dos exames NR-13 de todos os equipamentos.
+
+Os intervalos vêm da tabela `REGRAS_NR13`: por categoria do vaso (I a V) e
+pela existência de Serviço Próprio de Inspeção de Equipamentos (SPIE) na
+empresa dona do equipamento (`usuarios.possui_spie`). A partir da última
+inspeção de cada tipo são calculados os próximos exame externo, exame interno
+e teste hidrostático, gravados em `equipamentos`:
+
+    proximo_exame_externo, proximo_exame_interno, proximo_teste_hidrostatico
+    data_proxima_inspecao  (o mais próximo dos três; sem prazo calculado,
+                            a data do cadastro antigo é mantida)
+
+O cálculo é feito para todos os equipamentos de uma vez, com NumPy, a partir
+de duas consultas (equipamentos e MAX(data_inspecao) por tipo). Só as linhas
+cujos prazos mudaram são regravadas, em um único `executemany`. Ao registrar,
+alterar ou excluir uma inspeção só o equipamento dela é recalculado.
+
+Depois de alterar `REGRAS_NR13` (ou ao atualizar um banco existente):
+    python -m services.due_dates
+"""
+import logging
+import re
+import time
+import unicodedata
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CATEGORIAS = ('I', 'II', 'III', 'IV', 'V')
+
+# Colunas de `equipamentos` gravadas, na ordem das colunas de `calcular_prazos`
+EXAMES = ('proximo_exame_externo', 'proximo_exame_interno', 'proximo_teste_hidrostatico')
+
+EXTERNO, INTERNO, HIDROSTATICO = 1, 2, 4
+
+# Exibido no lugar da data quando a regra não fixa prazo
+SEM_PRAZO_FIXO = "A critério do PH"
+
+
+@dataclass(frozen=True)
+class RegraNR13:
+    """
+    Intervalos máximos, em meses, entre exames de uma categoria de vaso.
+
+    None = sem prazo fixo (a critério do Profissional Habilitado).
+    """
+    categoria: str
+    spie: bool
+    exame_externo: Optional[int]
+    exame_interno: Optional[int]
+    teste_hidrostatico: Optional[int]
+
+
+REGRAS_NR13 = (
+    RegraNR13('I', False, 12, 36, 72),
+    RegraNR13('II', False, 24, 48, 96),
+    RegraNR13('III', False, 36, 72, 144),
+    RegraNR13('IV', False, 48, 96, 192),
+    RegraNR13('V', False, 60, 120, 240),
+    RegraNR13('I', True, 36, 72, 144),
+    RegraNR13('II', True, 48, 96, 192),
+    RegraNR13('III', True, 60, 120, None),
+    RegraNR13('IV', True, 72, 144, None),
+    RegraNR13('V', True, 84, None, None),
+)
+
+# Exames cobertos por cada tipo de inspeção (trecho do tipo, sem acentos).
+# A primeira correspondência vale; os demais tipos contam como exame externo.
+EXAMES_POR_TIPO = (
+    ('inicial', EXTERNO | INTERNO | HIDROSTATICO),
+    ('hidrostatico', HIDROSTATICO),
+    ('interno', INTERNO),
+    ('externo', EXTERNO),
+    ('visual', EXTERNO),
+    ('periodica', EXTERNO | INTERNO),
+    ('extraordinaria', EXTERNO | INTERNO),
+)
+
+# Parâmetros por comando na lista IN (o SQL Server aceita até 2100)
+IDS_POR_CONSULTA = 1000
+
+_SEM_DATA = np.iinfo(np.int64).min  # mesmo valor que NaT em datetime64
+_EPOCA = date(1970, 1, 1).toordinal()
+_DIAS_1900_1970 = _EPOCA - date(1900, 1, 1).toordinal()
+
+
+def _normalizar(texto: str) -> str:
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+@lru_cache(maxsize=256)
+def codigo_categoria(categoria_nr13: Optional[str]) -> int:
+    """Índice da categoria NR-13 ('Categoria III' -> 3); 0 se não se aplica."""
+    encontrada = re.search(r'\b(IV|V|I{1,3}|[1-5])\b', (categoria_nr13 or '').upper())
+    if not encontrada:
+        return 0
+    valor = encontrada.group(1)
+    return int(valor) if valor.isdigit() else CATEGORIAS.index(valor) + 1
+
+
+@lru_cache(maxsize=256)
+def exames_do_tipo(tipo_inspecao: Optional[str]) -> int:
+    """Exames (EXTERNO | INTERNO | HIDROSTATICO) cobertos por um tipo de inspeção."""
+    tipo = _normalizar(tipo_inspecao)
+    for trecho, exames in EXAMES_POR_TIPO:
+        if trecho in tipo:
+            return exames
+    return EXTERNO
+
+
+def tabela_regras(regras: Iterable[RegraNR13] = REGRAS_NR13) -> np.ndarray:
+    """Intervalos em meses indexados por [categoria, spie, exame]; -1 = sem prazo."""
+    tabela = np.full((len(CATEGORIAS) + 1, 2, len(EXAMES)), -1, dtype=np.int64)
+    for regra in regras:
+        meses = (regra.exame_externo, regra.exame_interno, regra.teste_hidrostatico)
+        tabela[codigo_categoria(regra.categoria), int(regra.spie)] = [
+            -1 if valor is None else valor for valor in meses]
+    return tabela
+
+
+def _dia(valor) -> int:
+    """Dias desde 01/01/1970 (date, datetime ou texto ISO); _SEM_DATA se vazio."""
+    if valor is None or valor == '':
+        return _SEM_DATA
+    if isinstance(valor, str):
+        valor = date.fromisoformat(valor[:10])
+    return valor.toordinal() - _EPOCA
+
+
+def _dias(desde_1900: np.ndarray) -> np.ndarray:
+    """Converte `DATEDIFF(day, 0, ...)` (-1 = vazia) em dias desde 01/01/1970."""
+    return np.where(desde_1900 < 0, _SEM_DATA, desde_1900 - _DIAS_1900_1970)
+
+
+def somar_meses(datas: np.ndarray, meses: np.ndarray) -> np.ndarray:
+    """
+    Soma meses a datas (datetime64[D]), limitando o dia ao fim do mês
+    (31/01 + 1 mês = 28/02 ou 29/02), como QDate.addMonths.
+    """
+    mes = datas.astype('datetime64[M]')
+    dia = datas - mes.astype('datetime64[D]')
+    destino = mes + meses.astype('timedelta64[M]')
+    inicio = destino.astype('datetime64[D]')
+    ultimo_dia = (destino + 1).astype('datetime64[D]') - inicio - 1
+    return inicio + np.minimum(dia, ultimo_dia)
+
+
+def calcular_prazos(categorias: np.ndarray, spie: np.ndarray, bases: np.ndarray,
+                    tabela: np.ndarray) -> np.ndarray:
+    """
+    Próximos exames de N equipamentos.
+
+    Args:
+        categorias: (N,) índice da categoria (`codigo_categoria`)
+        spie: (N,) bool, a empresa possui SPIE
+        bases: (N, 3) datetime64[D] do último exame externo, interno e
+            hidrostático (NaT se nunca feito)
+        tabela: Resultado de `tabela_regras`
+
+    Returns:
+        np.ndarray: (N, 3) datetime64[D]; NaT sem exame anterior ou sem prazo fixo
+    """
+    meses = tabela[categorias, spie.astype(np.intp)]
+    vazio = np.isnat(bases) | (meses < 0)
+    prazos = somar_meses(np.where(vazio, np.datetime64(0, 'D'), bases), np.where(vazio, 0, meses))
+    prazos[vazio] = np.datetime64('NaT')
+    return prazos
+
+
+def mais_proximo(prazos: np.ndarray) -> np.ndarray:
+    """Menor data de cada linha de `calcular_prazos`, ignorando NaT."""
+    dias = prazos.view(np.int64)
+    maximo = np.iinfo(np.int64).max
+    menor = np.where(dias == _SEM_DATA, maximo, dias).min(axis=1)
+    return np.where(menor == maximo, _SEM_DATA, menor).view('datetime64[D]')
+
+
+def prazos_da_inspecao(categoria_nr13: str, possui_spie: bool, tipo_inspecao: str,
+                       data_inspecao, regras: Iterable[RegraNR13] = REGRAS_NR13) -> dict:
+    """
+    Prazos gerados por uma única inspeção (ex.: para preencher um laudo).
+
+    Returns:
+        dict: {coluna de EXAMES: date ou None}, só com os exames que o tipo cobre
+    """
+    exames = exames_do_tipo(tipo_inspecao)
+    base = np.datetime64(_dia(data_inspecao), 'D')
+    bases = np.array([[base if exames & (1 << k) else np.datetime64('NaT')
+                       for k in range(len(EXAMES))]], dtype='datetime64[D]')
+    prazos = calcular_prazos(np.array([codigo_categoria(categoria_nr13)]),
+                             np.array([bool(possui_spie)]), bases, tabela_regras(regras))
+    return {coluna: prazo for k, (coluna, prazo) in enumerate(zip(EXAMES, prazos[0].tolist()))
+            if exames & (1 << k)}
+
+
+@dataclass
+class ResumoRecalculo:
+    """Resultado de `DueDateEngine.recalcular`."""
+    equipamentos: int = 0
+    alterados: int = 0
+    segundos: float = 0.0
+
+
+class DueDateEngine:
+    """
+    Calcula e grava os prazos NR-13 dos equipamentos.
+
+    Uso:
+        engine = DueDateEngine(db_models)
+        engine.recalcular()                  # frota inteira
+        engine.recalcular([42], cursor)      # na transação de quem chamou
+    """
+
+    # Datas lidas como dias desde 01/01/1900 (-1 = vazia): evita converter
+    # cada valor em objeto date do Python
+    _EQUIPAMENTOS = f"""
+        SELECT e.id, e.categoria_nr13, ISNULL(u.possui_spie, 0),
+               {', '.join(f'ISNULL(DATEDIFF(day, 0, e.{coluna}), -1)'
+                          for coluna in (*EXAMES, 'data_proxima_inspecao'))}
+        FROM equipamentos e
+        LEFT JOIN usuarios u ON u.id = e.empresa_id
+    """
+
+    _ULTIMOS_EXAMES = """
+        SELECT equipamento_id, tipo_inspecao, DATEDIFF(day, 0, MAX(data_inspecao))
+        FROM inspecoes
+        WHERE data_inspecao IS NOT NULL AND (status IS NULL OR status <> 'cancelada')
+    """
+
+    _UPDATE = f"""
+        UPDATE equipamentos
+        SET {', '.join(f'{coluna} = ?' for coluna in EXAMES)}, data_proxima_inspecao = ?
+        WHERE id = ?
+    """
+
+    def __init__(self, db_models, regras: Iterable[RegraNR13] = REGRAS_NR13):
+        self.db = db_models.db
+        self.dialect = self.db.dialect
+        self.tabela = tabela_regras(regras)
+
+    def recalcular(self, equipamentos: Iterable[int] = None, cursor=None) -> ResumoRecalculo:
+        """
+        Recalcula os prazos e grava os que mudaram.
+
+        Args:
+            equipamentos: IDs a recalcular (padrão: todos)
+            cursor: Cursor de uma transação em andamento; os prazos são
+                gravados junto com ela (quem chamou faz o commit)
+
+        Returns:
+            ResumoRecalculo: Equipamentos lidos, linhas regravadas e duração
+        """
+        if cursor is not None:
+            return self._recalcular(cursor, equipamentos)
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            resumo = self._recalcular(cursor, equipamentos)
+            conn.commit()
+            self.db.written()
+        logger.info(f"Prazos NR-13: {resumo.equipamentos} equipamento(s), "
+                    f"{resumo.alterados} alterado(s) em {resumo.segundos * 1000:.0f} ms")
+        return resumo
+
+    def definir_spie(self, empresa_id: int, possui_spie: bool) -> ResumoRecalculo:
+        """Marca se a empresa possui SPIE e recalcula os prazos dos seus equipamentos."""
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("UPDATE usuarios SET possui_spie = ? WHERE id = ?",
+                           (1 if possui_spie else 0, empresa_id))
+            cursor.execute("SELECT id FROM equipamentos WHERE empresa_id = ?", (empresa_id,))
+            resumo = self._recalcular(cursor, [row[0] for row in cursor.fetchall()])
+            conn.commit()
+            self.db.written()
+        logger.info(f"SPIE da empresa {empresa_id} {'ativado' if possui_spie else 'desativado'}: "
+                    f"{resumo.alterados} equipamento(s) com novos prazos")
+        return resumo
+
+    def _consultar(self, cursor, sql: str, coluna_id: str, ids: Optional[list], sufixo: str = '') -> list:
+        if ids is None:
+            cursor.execute(sql + sufixo)
+            return cursor.fetchall()
+        linhas = []
+        for inicio in range(0, len(ids), IDS_POR_CONSULTA):
+            lote = ids[inicio:inicio + IDS_POR_CONSULTA]
+            filtro = f"{coluna_id} IN ({', '.join('?' * len(lote))})"
+            juncao = 'AND' if 'WHERE' in sql else 'WHERE'
+            cursor.execute(f"{sql} {juncao} {filtro} {sufixo}", lote)
+            linhas.extend(cursor.fetchall())
+        return linhas
+
+    def _recalcular(self, cursor, equipamentos: Optional[Iterable[int]]) -> ResumoRecalculo:
+        inicio = time.perf_counter()
+        ids = None if equipamentos is None else sorted({int(i) for i in equipamentos})
+        if ids == []:
+            return ResumoRecalculo()
+
+        linhas = self._consultar(cursor, self._EQUIPAMENTOS, 'e.id', ids, "ORDER BY e.id")
+        ultimos = self._consultar(cursor, self._ULTIMOS_EXAMES, 'equipamento_id', ids,
+                                  "GROUP BY equipamento_id, tipo_inspecao")
+        n = len(linhas)
+        if not n:
+            return ResumoRecalculo()
+
+        equipamentos = np.array(linhas, dtype=object)
+        id_equipamento = equipamentos[:, 0].astype(np.int64)
+        categorias = np.fromiter(map(codigo_categoria, equipamentos[:, 1]), np.intp, n)
+        spie = equipamentos[:, 2].astype(bool)
+        gravados = _dias(equipamentos[:, 3:7].astype(np.int64))
+
+        # Último exame de cada tipo: máximo das datas das inspeções que o cobrem
+        bases = np.full((n, len(EXAMES)), _SEM_DATA, dtype=np.int64)
+        if ultimos:
+            ultimos = np.array(ultimos, dtype=object)
+            equipamento = ultimos[:, 0].astype(np.int64)
+            exames = np.fromiter(map(exames_do_tipo, ultimos[:, 1]), np.int64, len(ultimos))
+            datas = _dias(ultimos[:, 2].astype(np.int64))
+            posicao = np.minimum(np.searchsorted(id_equipamento, equipamento), n - 1)
+            valida = id_equipamento[posicao] == equipamento
+            for k in range(len(EXAMES)):
+                selecao = valida & (exames & (1 << k) != 0)
+                np.maximum.at(bases[:, k], posicao[selecao], datas[selecao])
+
+        prazos = calcular_prazos(categorias, spie, bases.view('datetime64[D]'), self.tabela)
+        proximo = mais_proximo(prazos).view(np.int64)
+        # Sem prazo calculado, mantém a data do cadastro antigo
+        proximo = np.where(proximo == _SEM_DATA, gravados[:, 3], proximo)
+        novos = np.column_stack([prazos.view(np.int64), proximo])
+        alterados = np.flatnonzero((novos != gravados).any(axis=1))
+
+        if len(alterados):
+            valores = novos[alterados].view('datetime64[D]').tolist()
+            self.dialect.prepare_bulk(cursor)
+            cursor.executemany(self._UPDATE, [
+                (*datas, id_) for datas, id_ in zip(valores, id_equipamento[alterados].tolist())])
+        return ResumoRecalculo(n, len(alterados), time.perf_counter() - inicio)
+
+
+if __name__ == "__main__":
+    from database.models import DatabaseModels
+    logging.basicConfig(level=logging.INFO)
+    print(DueDateEngine(DatabaseModels()).recalcular())
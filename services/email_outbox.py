@@ -0,0 +1,373 @@
+"""
+Fila de saída (outbox) de e-mails e entrega em lote.
+
+Os e-mails são gravados na tabela `email_saida` por `enfileirar`, em um
+único comando, e a conexão com o banco é liberada em seguida. A entrega
+(`entregar`) reserva lotes de mensagens e os divide entre algumas sessões
+SMTP em paralelo (`EMAIL_SMTP_SESSIONS`). Cada sessão faz STARTTLS e LOGIN
+uma única vez e envia várias mensagens. O ritmo total fica limitado a
+`EMAIL_RATE_LIMIT` e-mails por segundo.
+
+Falhas temporárias (conexão, respostas 4xx) voltam para a fila com espera
+crescente (`EMAIL_RETRY_SECONDS`, dobrando a cada tentativa) até
+`EMAIL_MAX_ATTEMPTS`. Recusas definitivas (5xx) são marcadas como `falha`.
+Se a sessão cai, as mensagens dela que ainda não foram enviadas voltam para
+a fila sem contar uma tentativa.
+A reserva grava um identificador de lote e um prazo. Assim, duas estações
+não entregam a mesma mensagem, e mensagens de uma entrega interrompida
+voltam para a fila quando o prazo vence.
+
+Para testar com um servidor SMTP local (sem TLS nem login), com o aiosmtpd
+(`pip install aiosmtpd`; o módulo smtpd saiu do Python 3.12):
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_USE_TLS=false python -m services.email_outbox
+"""
+import logging
+import random
+import smtplib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Iterable
+from config.settings import (
+    EMAIL_MAX_ATTEMPTS, EMAIL_RATE_LIMIT, EMAIL_RETRY_SECONDS, EMAIL_SMTP_SESSIONS,
+    FROM_EMAIL, SMTP_PASSWORD, SMTP_PORT, SMTP_SERVER, SMTP_TIMEOUT, SMTP_USE_TLS,
+    SMTP_USERNAME
+)
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDENTE = 'pendente'
+STATUS_ENVIANDO = 'enviando'
+STATUS_ENVIADO = 'enviado'
+STATUS_FALHA = 'falha'
+
+# Mensagens reservadas por vez
+OUTBOX_BATCH_SIZE = 200
+
+# Prazo da reserva; depois dele a mensagem volta para a fila
+LEASE_MINUTES = 15
+
+# Espera máxima entre tentativas
+MAX_RETRY_SECONDS = 6 * 3600
+
+
+@dataclass(frozen=True)
+class Mensagem:
+    """Mensagem reservada para entrega."""
+    id: int
+    destinatario: str
+    assunto: str
+    corpo: str
+    tentativas: int
+
+
+@dataclass
+class ResumoEntrega:
+    """
+    Resultado de uma entrega.
+
+    Attributes:
+        enviados: Mensagens aceitas pelo servidor
+        reagendados: Falhas temporárias que voltaram para a fila
+        falhas: Mensagens desistidas (recusa definitiva ou tentativas esgotadas)
+        nao_tentadas: Mensagens que voltaram para a fila sem envio porque a
+            sessão caiu antes delas
+    """
+    enviados: int = 0
+    reagendados: int = 0
+    falhas: int = 0
+    nao_tentadas: int = 0
+
+
+class _LimiteTaxa:
+    """Espaça os envios de todas as sessões para no máximo `por_segundo`."""
+
+    def __init__(self, por_segundo: float):
+        self._intervalo = 1 / por_segundo if por_segundo > 0 else 0
+        self._proximo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        if not self._intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            vez = max(self._proximo, agora)
+            self._proximo = vez + self._intervalo
+        if vez > agora:
+            time.sleep(vez - agora)
+
+
+class _SessaoSMTP:
+    """Conexão SMTP autenticada, aberta no primeiro envio e reaproveitada."""
+
+    def __init__(self):
+        self._smtp = None
+
+    def _conectar(self):
+        smtp = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            if SMTP_USE_TLS:
+                smtp.starttls()
+            if SMTP_USERNAME:
+                smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def enviar(self, mensagem: EmailMessage):
+        if self._smtp is None:
+            self._conectar()
+        try:
+            self._smtp.send_message(mensagem)
+        except smtplib.SMTPServerDisconnected:
+            # O servidor encerrou a sessão ociosa: reconecta uma vez
+            self._smtp = None
+            self._conectar()
+            self._smtp.send_message(mensagem)
+
+    def descartar(self):
+        """Abandona a conexão após um erro; a próxima mensagem abre outra."""
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+    def fechar(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+
+# Recusas de uma mensagem específica; a sessão continua válida
+_ERROS_DA_MENSAGEM = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+class _NaoTentada(Exception):
+    """Erro registrado para as mensagens que ficaram sem envio após a queda da sessão."""
+
+
+def _definitiva(erro: Exception) -> bool:
+    """True se o servidor recusou a mensagem de forma definitiva (5xx)."""
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return all(codigo >= 500 for codigo, _ in erro.recipients.values())
+    if isinstance(erro, _ERROS_DA_MENSAGEM):
+        return erro.smtp_code >= 500
+    # Erros da sessão (conexão, TLS, login) não dependem da mensagem
+    return False
+
+
+class EmailOutbox:
+    """
+    Fila de saída de e-mails.
+
+    Uso:
+        outbox = EmailOutbox(db_models)
+        outbox.enfileirar([(email, assunto, corpo), ...])
+        resumo = outbox.entregar()
+    """
+
+    def __init__(self, db_models, sessoes: int = EMAIL_SMTP_SESSIONS,
+                 taxa: float = EMAIL_RATE_LIMIT, max_tentativas: int = EMAIL_MAX_ATTEMPTS):
+        self.db = db_models.db
+        self.dialect = self.db.dialect
+        self.sessoes = max(1, sessoes)
+        self.taxa = taxa
+        self.max_tentativas = max_tentativas
+
+    def enfileirar(self, mensagens: Iterable[tuple], cursor=None) -> int:
+        """
+        Grava mensagens na fila.
+
+        Args:
+            mensagens: (destinatário, assunto, corpo)
+            cursor: Cursor de uma transação em andamento; as mensagens entram
+                na fila junto com ela (quem chamou faz o commit)
+
+        Returns:
+            int: Mensagens enfileiradas
+        """
+        agora = datetime.now().replace(microsecond=0)
+        linhas = [(destinatario, assunto, corpo, agora)
+                  for destinatario, assunto, corpo in mensagens if destinatario]
+        if not linhas:
+            return 0
+        insert = """
+            INSERT INTO email_saida (destinatario, assunto, corpo, proxima_tentativa)
+            VALUES (?, ?, ?, ?)
+        """
+        if cursor is not None:
+            self.dialect.prepare_bulk(cursor)
+            cursor.executemany(insert, linhas)
+        else:
+            with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                self.dialect.prepare_bulk(cursor)
+                cursor.executemany(insert, linhas)
+                conn.commit()
+        logger.info(f"{len(linhas)} e-mail(s) na fila de saída")
+        return len(linhas)
+
+    def _reservar(self, quantidade: int) -> list:
+        """Reserva mensagens vencidas para esta entrega (status `enviando` com prazo)."""
+        agora = datetime.now().replace(microsecond=0)
+        lote = uuid.uuid4().hex
+        vencidas = "status IN (?, ?) AND proxima_tentativa <= ?"
+        params_vencidas = (STATUS_PENDENTE, STATUS_ENVIANDO, agora)
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(self.dialect.limit(f"""
+                SELECT id FROM email_saida WHERE {vencidas}
+                ORDER BY proxima_tentativa, id
+            """), params_vencidas + (quantidade,))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return []
+            # Outra estação pode ter reservado alguma delas entre o SELECT e o UPDATE
+            cursor.execute(f"""
+                UPDATE email_saida SET status = ?, lote = ?, proxima_tentativa = ?
+                WHERE id IN ({', '.join('?' * len(ids))}) AND {vencidas}
+            """, (STATUS_ENVIANDO, lote, agora + timedelta(minutes=LEASE_MINUTES), *ids,
+                  *params_vencidas))
+            conn.commit()
+            cursor.execute("""
+                SELECT id, destinatario, assunto, corpo, tentativas
+                FROM email_saida WHERE lote = ? ORDER BY id
+            """, (lote,))
+            return [Mensagem(*row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _montar(mensagem: Mensagem) -> EmailMessage:
+        email = EmailMessage()
+        email['From'] = FROM_EMAIL
+        email['To'] = mensagem.destinatario
+        email['Subject'] = mensagem.assunto
+        email.set_content(mensagem.corpo)
+        return email
+
+    def _entregar_sessao(self, sessao: _SessaoSMTP, mensagens: list, limite: _LimiteTaxa) -> list:
+        """Envia as mensagens por uma sessão; devolve (mensagem, erro ou None)."""
+        resultados = []
+        for indice, mensagem in enumerate(mensagens):
+            limite.aguardar()
+            try:
+                sessao.enviar(self._montar(mensagem))
+                resultados.append((mensagem, None))
+            except _ERROS_DA_MENSAGEM as e:
+                logger.warning(f"E-mail {mensagem.id} para {mensagem.destinatario} recusado: {str(e)}")
+                resultados.append((mensagem, e))
+            except (smtplib.SMTPException, OSError) as e:
+                # Sem sessão com o servidor: a mensagem atual conta a tentativa e as
+                # demais voltam para a fila sem terem sido enviadas
+                logger.warning(f"Erro na sessão SMTP com {SMTP_SERVER}: {str(e)}")
+                sessao.descartar()
+                resultados.append((mensagem, e))
+                resultados.extend((restante, _NaoTentada(str(e))) for restante in mensagens[indice + 1:])
+                break
+        return resultados
+
+    def _espera(self, tentativas: int) -> timedelta:
+        segundos = min(EMAIL_RETRY_SECONDS * 2 ** (tentativas - 1), MAX_RETRY_SECONDS)
+        # Evita que as mensagens de um mesmo lote voltem todas juntas
+        return timedelta(seconds=segundos * random.uniform(1, 1.1))
+
+    def _concluir(self, resultados: list, resumo: ResumoEntrega):
+        """Grava o resultado dos envios em poucos comandos."""
+        agora = datetime.now().replace(microsecond=0)
+        enviados, reagendados, falhas, nao_tentadas = [], [], [], []
+        for mensagem, erro in resultados:
+            if erro is None:
+                enviados.append((STATUS_ENVIADO, agora, mensagem.id))
+                continue
+            if isinstance(erro, _NaoTentada):
+                # Mesma espera da primeira nova tentativa, para não voltar ao servidor
+                # fora do ar ainda nesta entrega; `tentativas` não muda
+                nao_tentadas.append((STATUS_PENDENTE, agora + self._espera(1),
+                                     f"Não enviada: {erro}"[:500], mensagem.id))
+                continue
+            tentativas = mensagem.tentativas + 1
+            texto = str(erro)[:500]
+            if _definitiva(erro) or tentativas >= self.max_tentativas:
+                falhas.append((STATUS_FALHA, tentativas, texto, mensagem.id))
+            else:
+                reagendados.append((STATUS_PENDENTE, tentativas, agora + self._espera(tentativas),
+                                    texto, mensagem.id))
+
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            self.dialect.prepare_bulk(cursor)
+            if enviados:
+                cursor.executemany("""
+                    UPDATE email_saida SET status = ?, enviado_em = ?, lote = NULL, ultimo_erro = NULL
+                    WHERE id = ?
+                """, enviados)
+            if reagendados:
+                cursor.executemany("""
+                    UPDATE email_saida SET status = ?, tentativas = ?, proxima_tentativa = ?,
+                                           ultimo_erro = ?, lote = NULL
+                    WHERE id = ?
+                """, reagendados)
+            if falhas:
+                cursor.executemany("""
+                    UPDATE email_saida SET status = ?, tentativas = ?, ultimo_erro = ?, lote = NULL
+                    WHERE id = ?
+                """, falhas)
+            if nao_tentadas:
+                cursor.executemany("""
+                    UPDATE email_saida SET status = ?, proxima_tentativa = ?, ultimo_erro = ?, lote = NULL
+                    WHERE id = ?
+                """, nao_tentadas)
+            conn.commit()
+
+        resumo.enviados += len(enviados)
+        resumo.reagendados += len(reagendados)
+        resumo.falhas += len(falhas)
+        resumo.nao_tentadas += len(nao_tentadas)
+
+    def entregar(self) -> ResumoEntrega:
+        """
+        Entrega as mensagens vencidas da fila.
+
+        As mensagens reagendadas durante a entrega ficam para a próxima
+        execução (ver services/scheduler.py).
+
+        Returns:
+            ResumoEntrega: Quantidades enviadas, reagendadas e desistidas
+        """
+        resumo = ResumoEntrega()
+        limite = _LimiteTaxa(self.taxa)
+        sessoes = [_SessaoSMTP() for _ in range(self.sessoes)]
+        inicio = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=self.sessoes) as executor:
+                while True:
+                    mensagens = self._reservar(OUTBOX_BATCH_SIZE)
+                    if not mensagens:
+                        break
+                    partes = [mensagens[i::self.sessoes] for i in range(self.sessoes)]
+                    resultados = []
+                    for parte in executor.map(self._entregar_sessao, sessoes, partes,
+                                              [limite] * self.sessoes):
+                        resultados.extend(parte)
+                    self._concluir(resultados, resumo)
+        finally:
+            for sessao in sessoes:
+                sessao.fechar()
+
+        if resumo.enviados or resumo.reagendados or resumo.falhas or resumo.nao_tentadas:
+            logger.info(f"Entrega de e-mails em {time.monotonic() - inicio:.1f}s: "
+                        f"{resumo.enviados} enviado(s), {resumo.reagendados} reagendado(s), "
+                        f"{resumo.falhas} falha(s), {resumo.nao_tentadas} não tentada(s)")
+        return resumo
+
+
+if __name__ == "__main__":
+    from database.models import DatabaseModels
+    logging.basicConfig(level=logging.INFO)
+    print(EmailOutbox(DatabaseModels()).entregar())
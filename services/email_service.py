@@ -1,30 +1,68 @@
 """
 Serviço de envio de e-mails para notificações.
+
+Os e-mails passam pela fila de saída (services/email_outbox.py), que reutiliza
+as sessões SMTP e tenta de novo as falhas temporárias.
 """
-import os
-import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from contextlib import closing
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from database.connection import DatabaseConnection
+from config.settings import DAYS_BEFORE_REMINDER
+from database.models import DatabaseModels
+from services.email_outbox import EmailOutbox
 
 logger = logging.getLogger(__name__)
 
+# Inspeções a vencer de clientes ativos, apenas a mais recente de cada
+# equipamento e ainda sem lembrete para este vencimento e antecedência.
+# Todas as junções são por chave (IX_inspecoes_proxima_inspecao,
+# IX_inspecoes_equipamento_data_id e as chaves primárias).
+_REMINDER_QUERY = """
+    SELECT u.id, u.email, u.nome,
+           i.id, i.proxima_inspecao, i.tipo_inspecao,
+           e.tag, e.categoria
+    FROM dbo.inspecoes i
+    JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+    JOIN dbo.usuarios u ON e.empresa_id = u.id
+    WHERE i.proxima_inspecao BETWEEN ? AND ?
+      AND u.tipo_acesso = 'cliente'
+      AND ISNULL(u.ativo, 1) = 1
+      AND ISNULL(e.ativo, 1) = 1
+      AND NOT EXISTS (
+          SELECT 1 FROM dbo.inspecoes posterior
+          WHERE posterior.equipamento_id = i.equipamento_id
+            AND posterior.data_inspecao > i.data_inspecao)
+      AND NOT EXISTS (
+          SELECT 1 FROM dbo.lembretes_enviados l
+          WHERE l.inspecao_id = i.id
+            AND l.vencimento = i.proxima_inspecao
+            AND l.antecedencia = ?)
+"""
+
 class EmailService:
     """
     Serviço responsável pelo envio de e-mails de notificação.
     """
     
-    def __init__(self):
-        load_dotenv()
-        self.smtp_server = os.getenv('SMTP_SERVER')
-        self.smtp_port = int(os.getenv('SMTP_PORT', 587))
-        self.smtp_username = os.getenv('SMTP_USERNAME')
-        self.smtp_password = os.getenv('SMTP_PASSWORD')
-        self.from_email = os.getenv('FROM_EMAIL')
-        self.db = DatabaseConnection()
+    def __init__(self, db_models: DatabaseModels = None):
+        db_models = db_models or DatabaseModels()
+        self.db = db_models.db
+        self.pool = self.db.pool
+        self.outbox = EmailOutbox(db_models)
+        
+    def _deliver(self, messages: list) -> bool:
+        """
+        Enfileira os e-mails (se houver) e entrega a fila.
+        
+        Args:
+            messages: (destinatário, assunto, corpo)
+            
+        Returns:
+            bool: True se nenhum e-mail falhou ou ficou para nova tentativa
+        """
+        self.outbox.enfileirar(messages)
+        resumo = self.outbox.entregar()
+        return not (resumo.falhas or resumo.reagendados or resumo.nao_tentadas)
         
     def _send_email(self, to_email: str, subject: str, body: str) -> bool:
         """
@@ -39,28 +77,18 @@ class EmailService:
             bool: True se e-mail enviado com sucesso
         """
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-                
-            logger.info(f"E-mail enviado para {to_email}")
-            return True
-            
+            return self._deliver([(to_email, subject, body)])
         except Exception as e:
             logger.error(f"Erro ao enviar e-mail: {str(e)}")
             return False
             
-    def send_inspection_reminder(self, days_before: int = 30) -> bool:
+    def send_inspection_reminder(self, days_before: int = DAYS_BEFORE_REMINDER) -> bool:
         """
-        Envia lembretes de inspeções próximas.
+        Envia lembretes de inspeções próximas, um e-mail por cliente.
+        
+        Cada inspeção entra no lembrete uma única vez para a mesma data de
+        vencimento e antecedência (tabela `lembretes_enviados`); rodar de novo
+        no mesmo dia não reenvia nada.
         
         Args:
             days_before: Número de dias de antecedência para enviar o lembrete
@@ -69,56 +97,60 @@ class EmailService:
             bool: True se todos os e-mails foram enviados com sucesso
         """
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # Busca inspeções próximas
-            cursor.execute("""
-                SELECT i.*, e.codigo_projeto, e.localizacao,
-                       u.email, u.nome
-                FROM inspecoes i
-                JOIN equipamentos e ON i.equipamento_id = e.id
-                JOIN usuarios u ON e.empresa = u.empresa
-                WHERE i.proxima_inspecao BETWEEN ? AND ?
-                AND u.tipo = 'cliente'
-            """, (
-                datetime.now(),
-                datetime.now() + timedelta(days=days_before)
-            ))
-            
-            inspections = cursor.fetchall()
-            success = True
-            
-            for insp in inspections:
-                subject = f"Lembrete: Inspeção NR-13 - {insp.codigo_projeto}"
-                
-                body = f"""
-                Prezado(a) {insp.nome},
+            agora = datetime.now().replace(microsecond=0)
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(_REMINDER_QUERY, (agora, agora + timedelta(days=days_before), days_before))
+                rows = cursor.fetchall()
+                if not rows:
+                    logger.info("Nenhum lembrete de inspeção pendente")
+                    return True
                 
-                Este é um lembrete sobre a próxima inspeção do equipamento:
+                # Ordenadas aqui: são poucas linhas e o ORDER BY no banco exigiria ordenar fora do índice
+                rows.sort(key=lambda row: (row[0], row[4], row[6]))
+                digests = {}
+                for row in rows:
+                    digests.setdefault(row[0], []).append(row)
+                messages = [self._reminder_digest(items, days_before) for items in digests.values()]
                 
-                Código: {insp.codigo_projeto}
-                Localização: {insp.localizacao}
-                Data da Próxima Inspeção: {insp.proxima_inspecao.strftime('%d/%m/%Y')}
-                Tipo: {insp.tipo_inspecao}
-                
-                Por favor, entre em contato com nossa equipe para agendar a inspeção.
-                
-                Atenciosamente,
-                Equipe de Inspeções NR-13
-                """
-                
-                if not self._send_email(insp.email, subject, body):
-                    success = False
-                    
-            return success
+                # Fila e registro na mesma transação: ou o lembrete sai e fica registrado, ou nenhum dos dois
+                self.outbox.enfileirar(messages, cursor)
+                # O vencimento é copiado da própria inspeção para comparar igual na próxima execução
+                cursor.executemany("""
+                    INSERT INTO lembretes_enviados (inspecao_id, vencimento, antecedencia, destinatario)
+                    SELECT id, proxima_inspecao, ?, ? FROM inspecoes WHERE id = ?
+                """, [(days_before, row[1], row[3]) for row in rows])
+                conn.commit()
+            logger.info(f"{len(rows)} inspeção(ões) em {len(messages)} lembrete(s)")
+            
+            return self._deliver([])
             
         except Exception as e:
             logger.error(f"Erro ao enviar lembretes: {str(e)}")
             return False
             
-        finally:
-            cursor.close()
+    @staticmethod
+    def _reminder_digest(items: list, days_before: int) -> tuple:
+        """Monta o lembrete de um cliente com todas as suas inspeções próximas."""
+        _, email, nome = items[0][:3]
+        subject = (f"Lembrete: {len(items)} inspeção(ões) NR-13 "
+                   f"nos próximos {days_before} dias")
+        lines = [
+            f"Prezado(a) {nome},",
+            "",
+            "Os equipamentos abaixo têm inspeção prevista para os próximos dias:",
+            "",
+        ]
+        for _, _, _, _, proxima, tipo, tag, categoria in items:
+            lines.append(f"- {tag} ({categoria or 'Equipamento'}): "
+                         f"{proxima.strftime('%d/%m/%Y')} - {tipo}")
+        lines += [
+            "",
+            "Por favor, entre em contato com nossa equipe para agendar as inspeções.",
+            "",
+            "Atenciosamente,",
+            "Equipe de Inspeções NR-13",
+        ]
+        return email, subject, "\n".join(lines)
             
     def send_inspection_report(self, inspecao_id: int) -> bool:
         """
@@ -131,21 +163,19 @@ class EmailService:
             bool: True se e-mail enviado com sucesso
         """
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # Busca dados da inspeção
-            cursor.execute("""
-                SELECT i.*, e.codigo_projeto, e.localizacao,
-                       u.email, u.nome, r.link_arquivo
-                FROM inspecoes i
-                JOIN equipamentos e ON i.equipamento_id = e.id
-                JOIN usuarios u ON e.empresa = u.empresa
-                LEFT JOIN relatorios r ON i.id = r.inspecao_id
-                WHERE i.id = ?
-            """, (inspecao_id,))
-            
-            insp = cursor.fetchone()
+            with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                # Busca dados da inspeção
+                cursor.execute("""
+                    SELECT i.*, e.codigo_projeto, e.localizacao,
+                           u.email, u.nome, r.link_arquivo
+                    FROM inspecoes i
+                    JOIN equipamentos e ON i.equipamento_id = e.id
+                    JOIN usuarios u ON e.empresa = u.empresa
+                    LEFT JOIN relatorios r ON i.id = r.inspecao_id
+                    WHERE i.id = ?
+                """, (inspecao_id,))
+                
+                insp = cursor.fetchone()
             
             if not insp:
                 logger.error(f"Inspeção {inspecao_id} não encontrada")
@@ -181,6 +211,3 @@ class EmailService:
         except Exception as e:
             logger.error(f"Erro ao enviar relatório: {str(e)}")
             return False
-            
-        finally:
-            cursor.close() 
\ No newline at end of file
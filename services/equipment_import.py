@@ -0,0 +1,466 @@
+"""
+Importação em lote de equipamentos a partir de planilhas (CSV ou XLSX).
+
+A planilha é lida linha a linha, sem carregar o arquivo inteiro. As linhas
+são normalizadas e validadas em lotes de `CHUNK_SIZE`:
+- números com vírgula decimal;
+- categoria NR-13 em qualquer grafia ("3", "III", "Cat. III");
+- tag única por empresa, comparada com as já cadastradas e com as linhas
+  anteriores do arquivo.
+
+Cada lote válido é gravado com um único `executemany` (com
+`fast_executemany` no SQL Server) em uma transação.
+
+As linhas rejeitadas vão para um relatório CSV ao lado da planilha
+(`<arquivo>.erros.csv`). O progresso é salvo após cada lote em
+`<arquivo>.progresso.json`; se a importação for interrompida, a próxima
+chamada continua do primeiro lote não gravado.
+"""
+import csv
+import json
+import logging
+import os
+import re
+import traceback
+import unicodedata
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+from utils.helpers import validate_pressure
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+# Nome do campo -> cabeçalhos aceitos na planilha (já normalizados)
+CAMPOS = {
+    'tag': ('tag', 'tag_equipamento', 'tag_do_equipamento', 'identificacao'),
+    'categoria': ('categoria', 'tipo', 'tipo_equipamento', 'tipo_de_equipamento'),
+    'fabricante': ('fabricante',),
+    'ano_fabricacao': ('ano_fabricacao', 'ano_de_fabricacao', 'ano'),
+    'pressao_projeto': ('pressao_projeto', 'pressao_de_projeto'),
+    'pressao_trabalho': ('pressao_trabalho', 'pressao_de_trabalho', 'pressao_operacao',
+                         'pressao_de_operacao'),
+    'volume': ('volume',),
+    'fluido': ('fluido',),
+    'categoria_nr13': ('categoria_nr13', 'categoria_nr_13', 'cat_nr13', 'cat_nr_13', 'nr13',
+                       'nr_13'),
+    'pmta': ('pmta',),
+    'placa_identificacao': ('placa_identificacao', 'placa_de_identificacao', 'placa'),
+    'numero_registro': ('numero_registro', 'numero_de_registro', 'n_registro', 'registro'),
+}
+_ALIASES = {alias: campo for campo, aliases in CAMPOS.items() for alias in aliases}
+
+COLUNAS_INSERT = ('tag', 'categoria', 'empresa_id', 'fabricante', 'ano_fabricacao',
+                  'pressao_projeto', 'pressao_trabalho', 'volume', 'fluido',
+                  'categoria_nr13', 'pmta', 'placa_identificacao', 'numero_registro')
+
+INSERT_EQUIPAMENTO = (f"INSERT INTO equipamentos ({', '.join(COLUNAS_INSERT)}) "
+                      f"VALUES ({', '.join('?' * len(COLUNAS_INSERT))})")
+
+_ROMANOS = {'1': 'I', '2': 'II', '3': 'III', '4': 'IV', '5': 'V'}
+_TAG_VALIDA = re.compile(r'^[A-Za-z0-9\-]+$')
+TAG_MAX_LENGTH = 20
+
+
+@dataclass
+class ErroImportacao:
+    """Linha rejeitada."""
+    linha: int
+    tag: str
+    mensagem: str
+
+
+@dataclass
+class ResultadoImportacao:
+    """
+    Resumo de uma importação.
+
+    Attributes:
+        importados: Equipamentos gravados nesta execução
+        ja_importados: Linhas puladas por já terem sido gravadas (retomada)
+        erros: Linhas rejeitadas
+        relatorio_erros: Caminho do relatório CSV de erros (se houver arquivo)
+        interrompida: Mensagem do erro que interrompeu a importação, se houver
+    """
+    importados: int = 0
+    ja_importados: int = 0
+    erros: list = field(default_factory=list)
+    relatorio_erros: Optional[str] = None
+    interrompida: Optional[str] = None
+
+    @property
+    def concluida(self) -> bool:
+        return self.interrompida is None
+
+
+def normalizar_cabecalho(texto) -> str:
+    """'Pressão de Projeto (bar)' -> 'pressao_de_projeto'."""
+    texto = unicodedata.normalize('NFKD', str(texto or ''))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = re.sub(r'\(.*?\)|\[.*?\]', '', texto)
+    return re.sub(r'[^a-z0-9]+', '_', texto).strip('_')
+
+
+def _texto(valor) -> Optional[str]:
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor).strip()
+    return texto or None
+
+
+def _numero(valor) -> Optional[float]:
+    """Converte '1.234,5', '10,5', '10.5' ou um número da planilha em float."""
+    if valor is None or isinstance(valor, (int, float)):
+        return None if valor is None else float(valor)
+    texto = re.sub(r'[^\d,.\-]', '', str(valor))
+    if not texto:
+        return None
+    if ',' in texto and '.' in texto:
+        # O último separador é o decimal
+        if texto.rfind(',') > texto.rfind('.'):
+            texto = texto.replace('.', '').replace(',', '.')
+        else:
+            texto = texto.replace(',', '')
+    else:
+        texto = texto.replace(',', '.')
+    return float(texto)
+
+
+def _categoria_nr13(valor) -> Optional[str]:
+    """'3', 'III', 'cat. III' ou 'Categoria III' -> 'Categoria III'."""
+    texto = _texto(valor)
+    if texto is None:
+        return None
+    chave = normalizar_cabecalho(texto)
+    if chave in ('n_a', 'na', 'nao_se_aplica', 'nao_aplicavel'):
+        return "Não se Aplica"
+    chave = re.sub(r'^(categoria|cat)_?', '', chave).upper()
+    chave = _ROMANOS.get(chave, chave)
+    if chave not in _ROMANOS.values():
+        raise ValueError(f"categoria NR-13 inválida: {texto}")
+    return f"Categoria {chave}"
+
+
+def normalizar_equipamento(dados: dict) -> tuple[dict, list]:
+    """
+    Normaliza e valida os campos de uma linha.
+
+    Returns:
+        tuple: (registro normalizado, lista de mensagens de erro)
+    """
+    erros = []
+    registro = {campo: _texto(dados.get(campo))
+                for campo in ('tag', 'categoria', 'fabricante', 'fluido', 'pmta',
+                              'placa_identificacao', 'numero_registro')}
+
+    tag = registro['tag']
+    if not tag:
+        erros.append("tag obrigatória")
+    elif len(tag) > TAG_MAX_LENGTH or not _TAG_VALIDA.match(tag):
+        erros.append(f"tag inválida (letras, números e hífens, até {TAG_MAX_LENGTH} caracteres)")
+    if not registro['fluido']:
+        erros.append("fluido obrigatório")
+
+    for campo, nome in (('pressao_projeto', 'pressão de projeto'),
+                        ('pressao_trabalho', 'pressão de trabalho'),
+                        ('volume', 'volume')):
+        try:
+            registro[campo] = _numero(dados.get(campo))
+        except ValueError:
+            registro[campo] = None
+            erros.append(f"{nome} não numérica: {dados.get(campo)}")
+            continue
+        if registro[campo] is None:
+            erros.append(f"{nome} obrigatória" if campo != 'volume' else "volume obrigatório")
+        elif campo == 'volume' and registro[campo] <= 0:
+            erros.append("volume deve ser maior que zero")
+        elif campo != 'volume' and not validate_pressure(registro[campo]):
+            erros.append(f"{nome} fora do intervalo (0, 1000] bar")
+    if (registro['pressao_projeto'] and registro['pressao_trabalho']
+            and registro['pressao_trabalho'] > registro['pressao_projeto']):
+        erros.append("pressão de trabalho maior que a de projeto")
+
+    ano = dados.get('ano_fabricacao')
+    registro['ano_fabricacao'] = None
+    if _texto(ano) is not None:
+        try:
+            registro['ano_fabricacao'] = int(_numero(ano))
+            if not 1900 <= registro['ano_fabricacao'] <= datetime.now().year:
+                erros.append(f"ano de fabricação inválido: {ano}")
+        except (TypeError, ValueError):
+            erros.append(f"ano de fabricação inválido: {ano}")
+
+    try:
+        registro['categoria_nr13'] = _categoria_nr13(dados.get('categoria_nr13'))
+    except ValueError as e:
+        registro['categoria_nr13'] = None
+        erros.append(str(e))
+
+    return registro, erros
+
+
+# --- Leitura das planilhas ---
+
+def _mapear_cabecalho(cabecalho) -> list:
+    colunas = []
+    ignoradas = []
+    for titulo in cabecalho:
+        campo = _ALIASES.get(normalizar_cabecalho(titulo))
+        colunas.append(campo)
+        if campo is None and _texto(titulo):
+            ignoradas.append(str(titulo))
+    if 'tag' not in colunas:
+        raise ValueError("A planilha não tem uma coluna 'Tag'")
+    if ignoradas:
+        logger.info(f"Colunas ignoradas na importação: {', '.join(ignoradas)}")
+    return colunas
+
+
+def _linhas_mapeadas(linhas) -> Iterator[tuple[int, dict]]:
+    """(número da linha, {campo: valor}) a partir da primeira linha de cabeçalho."""
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return
+    colunas = _mapear_cabecalho(cabecalho)
+    for numero, valores in enumerate(linhas, start=2):
+        if not any(_texto(valor) for valor in valores):
+            continue
+        yield numero, {campo: valor for campo, valor in zip(colunas, valores) if campo}
+
+
+def _codificacao(caminho: str) -> str:
+    with open(caminho, 'rb') as arquivo:
+        inicio = arquivo.read(65536)
+    try:
+        inicio.decode('utf-8')
+        return 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # Arquivo cortado no meio de um caractere UTF-8 ainda é UTF-8
+        return 'utf-8-sig' if e.start >= len(inicio) - 3 else 'cp1252'
+
+
+def _ler_csv(caminho: str) -> Iterator[tuple[int, dict]]:
+    with open(caminho, newline='', encoding=_codificacao(caminho)) as arquivo:
+        amostra = arquivo.read(8192)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=';,\t')
+        except csv.Error:
+            dialeto = csv.excel
+        yield from _linhas_mapeadas(csv.reader(arquivo, dialeto))
+
+
+def _ler_xlsx(caminho: str) -> Iterator[tuple[int, dict]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Para importar arquivos .xlsx instale o pacote openpyxl")
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        yield from _linhas_mapeadas(livro.active.iter_rows(values_only=True))
+    finally:
+        livro.close()
+
+
+def ler_planilha(caminho: str) -> Iterator[tuple[int, dict]]:
+    """
+    Lê uma planilha CSV ou XLSX linha a linha.
+
+    Yields:
+        (número da linha na planilha, {campo: valor})
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in ('.csv', '.txt'):
+        return _ler_csv(caminho)
+    if extensao in ('.xlsx', '.xlsm'):
+        return _ler_xlsx(caminho)
+    raise ValueError(f"Formato de planilha não suportado: {extensao or caminho}")
+
+
+def _lotes(iteravel, tamanho: int):
+    iterador = iter(iteravel)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+# --- Importação ---
+
+class EquipmentImporter:
+    """
+    Importa equipamentos em lote.
+
+    Args:
+        db_models: Instância de `DatabaseModels`
+        chunk_size: Linhas por lote (uma transação por lote)
+    """
+
+    def __init__(self, db_models, chunk_size: int = CHUNK_SIZE):
+        self.db = db_models.db
+        self.pool = self.db.pool
+        self.dialect = self.db.dialect
+        self.chunk_size = chunk_size
+
+    def _tags_cadastradas(self, empresa_id: int) -> dict:
+        """{tag em minúsculas: 0} das tags já cadastradas para a empresa."""
+        with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT tag FROM equipamentos WHERE empresa_id = ? AND tag IS NOT NULL",
+                           (empresa_id,))
+            return {row[0].strip().casefold(): 0 for row in cursor.fetchall()}
+
+    def _validar_lote(self, linhas, empresa_id: int, tags: dict) -> tuple[list, list]:
+        """Separa as linhas do lote em (linhas válidas, erros)."""
+        validas, erros = [], []
+        for numero, dados in linhas:
+            registro, mensagens = normalizar_equipamento(dados)
+            tag = registro['tag']
+            chave = tag.casefold() if tag else None
+            if chave in tags:
+                origem = tags[chave]
+                mensagens.append("tag já cadastrada para a empresa" if origem == 0
+                                 else f"tag repetida na planilha (linha {origem})")
+            if mensagens:
+                erros.append(ErroImportacao(numero, tag or '', "; ".join(mensagens)))
+                continue
+            tags[chave] = numero
+            registro['empresa_id'] = empresa_id
+            validas.append((numero, registro))
+        return validas, erros
+
+    def _gravar_lote(self, validas: list) -> list:
+        """
+        Grava o lote em uma transação.
+
+        Se o `executemany` falhar (ex.: tag cadastrada por outra estação no
+        meio da importação), o lote é regravado linha a linha para identificar
+        as linhas com problema. Retorna os erros dessas linhas.
+        """
+        valores = [tuple(registro[coluna] for coluna in COLUNAS_INSERT) for _, registro in validas]
+        with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            try:
+                self.dialect.prepare_bulk(cursor)
+                cursor.executemany(INSERT_EQUIPAMENTO, valores)
+                conn.commit()
+                return []
+            except self.dialect.errors as e:
+                logger.warning(f"Falha ao gravar lote, gravando linha a linha: {str(e)}")
+                conn.rollback()
+
+        erros = []
+        with self.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            for (numero, registro), linha in zip(validas, valores):
+                try:
+                    cursor.execute(INSERT_EQUIPAMENTO, linha)
+                except self.dialect.errors as e:
+                    erros.append(ErroImportacao(numero, registro['tag'], f"erro ao gravar: {str(e)}"))
+            conn.commit()
+        return erros
+
+    def _processar(self, linhas, empresa_id: int, resultado, ao_gravar_lote=None):
+        tags = self._tags_cadastradas(empresa_id)
+        for lote in _lotes(linhas, self.chunk_size):
+            validas, erros = self._validar_lote(lote, empresa_id, tags)
+            if validas:
+                erros_gravacao = self._gravar_lote(validas)
+                resultado.importados += len(validas) - len(erros_gravacao)
+                erros.extend(erros_gravacao)
+            erros.sort(key=lambda erro: erro.linha)
+            resultado.erros.extend(erros)
+            if ao_gravar_lote:
+                ao_gravar_lote(lote[-1][0], erros)
+            logger.debug(f"Lote gravado até a linha {lote[-1][0]}: "
+                         f"{resultado.importados} importados, {len(resultado.erros)} erros")
+
+    def inserir(self, empresa_id: int, equipamentos: Iterable[dict]) -> ResultadoImportacao:
+        """
+        Insere equipamentos já em memória (ex.: dados de teste) em lotes.
+
+        Args:
+            empresa_id: ID da empresa dona dos equipamentos
+            equipamentos: Dicionários com os campos de `CAMPOS`
+        """
+        resultado = ResultadoImportacao()
+        try:
+            self._processar(enumerate(equipamentos, start=1), empresa_id, resultado)
+        except Exception as e:
+            logger.error(f"Erro ao inserir equipamentos em lote: {str(e)}")
+            logger.error(traceback.format_exc())
+            resultado.interrompida = str(e)
+        # Os lotes gravados antes de uma interrupção também contam
+        self.db.written()
+        return resultado
+
+    def importar(self, caminho: str, empresa_id: int, retomar: bool = True) -> ResultadoImportacao:
+        """
+        Importa uma planilha CSV/XLSX para a empresa.
+
+        Args:
+            caminho: Arquivo da planilha
+            empresa_id: ID da empresa dona dos equipamentos
+            retomar: Continua uma importação interrompida do mesmo arquivo
+
+        Returns:
+            ResultadoImportacao: Contagens, erros por linha e o caminho do
+                relatório de erros. Erros de arquivo (formato, cabeçalho)
+                lançam ValueError.
+        """
+        caminho_progresso = f"{caminho}.progresso.json"
+        resultado = ResultadoImportacao(relatorio_erros=f"{caminho}.erros.csv")
+        estado = os.stat(caminho)
+        assinatura = {'empresa_id': empresa_id, 'tamanho': estado.st_size,
+                      'modificado': estado.st_mtime}
+
+        gravada_ate = 0
+        if retomar and os.path.exists(caminho_progresso):
+            with open(caminho_progresso, encoding='utf-8') as arquivo:
+                progresso = json.load(arquivo)
+            if progresso.get('assinatura') == assinatura:
+                gravada_ate = progresso['linha']
+                logger.info(f"Retomando importação de {caminho} após a linha {gravada_ate}")
+
+        linhas = ler_planilha(caminho)
+        logger.info(f"Importando equipamentos de {caminho} para a empresa {empresa_id}")
+        with open(resultado.relatorio_erros, 'a' if gravada_ate else 'w',
+                  newline='', encoding='utf-8-sig') as relatorio:
+            escritor = csv.writer(relatorio, delimiter=';')
+            if not gravada_ate:
+                escritor.writerow(['linha', 'tag', 'erro'])
+
+            def ao_gravar_lote(ultima_linha, erros):
+                escritor.writerows((erro.linha, erro.tag, erro.mensagem) for erro in erros)
+                relatorio.flush()
+                with open(caminho_progresso, 'w', encoding='utf-8') as arquivo:
+                    json.dump({'assinatura': assinatura, 'linha': ultima_linha}, arquivo)
+
+            def pendentes():
+                for numero, dados in linhas:
+                    if numero <= gravada_ate:
+                        resultado.ja_importados += 1
+                        continue
+                    yield numero, dados
+
+            try:
+                self._processar(pendentes(), empresa_id, resultado, ao_gravar_lote)
+            except ValueError:
+                raise
+            except Exception as e:
+                logger.error(f"Importação de {caminho} interrompida: {str(e)}")
+                logger.error(traceback.format_exc())
+                resultado.interrompida = str(e)
+                if resultado.importados:
+                    self.db.written()
+                return resultado
+
+        if os.path.exists(caminho_progresso):
+            os.remove(caminho_progresso)
+        self.db.written()
+        logger.info(f"Importação concluída: {resultado.importados} importados, "
+                    f"{len(resultado.erros)} linhas com erro")
+        return resultado
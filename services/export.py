@@ -0,0 +1,239 @@
+"""
+Exportação dos cadastros (equipamentos, inspeções e relatórios) para CSV ou XLSX.
+
+As linhas são lidas do cursor em lotes de `EXPORT_BATCH_SIZE` (`fetchmany`)
+e gravadas no arquivo à medida que chegam. No SQL Server o resultado vem do
+servidor conforme é consumido, então a memória usada não depende do número
+de linhas exportadas. O XLSX é gravado por uma pasta de trabalho
+`write_only` do openpyxl, que também escreve as linhas direto no disco.
+
+O arquivo é gerado com o sufixo `.parcial` e renomeado só no final; uma
+exportação cancelada ou com erro não deixa um arquivo incompleto no destino.
+"""
+import csv
+import logging
+import os
+import re
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Optional
+from controllers.equipment_controller import EquipmentController
+from controllers.inspection_controller import InspectionController
+from controllers.report_controller import ReportController
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas do cursor por vez
+EXPORT_BATCH_SIZE = 1000
+
+# Linhas de dados por planilha no XLSX (limite do Excel menos o cabeçalho)
+XLSX_MAX_ROWS = 1048575
+
+# Caracteres de controle que o XML do XLSX não aceita
+_XML_ILLEGAL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class ExportCancelled(Exception):
+    """A exportação foi cancelada pelo usuário."""
+
+
+@dataclass(frozen=True)
+class Register:
+    """
+    Cadastro exportável.
+
+    Attributes:
+        title: Nome da planilha
+        controller: Classe do controlador que monta a consulta (`filtered_query`)
+        order_by: Ordenação das linhas
+        columns: (cabeçalho, coluna da consulta) na ordem do arquivo
+    """
+    title: str
+    controller: type
+    order_by: str
+    columns: tuple
+
+
+REGISTERS = {
+    'equipamentos': Register(
+        "Equipamentos", EquipmentController, "e.tag, e.id",
+        (("ID", 'id'), ("Tag", 'tag'), ("Tipo", 'categoria'), ("Empresa", 'empresa_nome'),
+         ("Fabricante", 'fabricante'), ("Ano de Fabricação", 'ano_fabricacao'),
+         ("Pressão de Projeto", 'pressao_projeto'), ("Pressão de Trabalho", 'pressao_trabalho'),
+         ("Volume", 'volume'), ("Fluido", 'fluido'), ("Categoria NR-13", 'categoria_nr13'),
+         ("PMTA", 'pmta'), ("Placa", 'placa_identificacao'), ("Número de Registro", 'numero_registro'),
+         ("Frequência de Manutenção (dias)", 'frequencia_manutencao'),
+         ("Última Manutenção", 'data_ultima_manutencao'), ("Ativo", 'ativo_calculado'))
+    ),
+    'inspecoes': Register(
+        "Inspeções", InspectionController, "i.data_inspecao DESC, i.id DESC",
+        (("ID", 'id'), ("Equipamento", 'equipamento_tag'), ("Tipo de Equipamento", 'equipamento_categoria'),
+         ("Engenheiro", 'engenheiro_nome'), ("Data", 'data_inspecao'), ("Tipo", 'tipo_inspecao'),
+         ("Resultado", 'resultado'), ("Recomendações", 'recomendacoes'),
+         ("Próxima Inspeção", 'proxima_inspecao'), ("Status", 'status'),
+         ("Prazo (dias)", 'prazo_proxima_inspecao'))
+    ),
+    'relatorios': Register(
+        "Relatórios", ReportController, "r.data_emissao DESC, r.id DESC",
+        (("ID", 'id'), ("Inspeção", 'inspecao_id'), ("Emissão", 'data_emissao'),
+         ("Equipamento", 'equipamento_tag'), ("Tipo de Equipamento", 'equipamento_categoria'),
+         ("Tipo de Inspeção", 'tipo_inspecao'), ("Resultado", 'inspecao_resultado'),
+         ("Engenheiro", 'engenheiro_nome'), ("Arquivo", 'link_arquivo'), ("Observações", 'observacoes'))
+    ),
+}
+
+
+def _csv_value(value):
+    """Formata o valor como o Excel em português espera ler do CSV."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return "Sim" if value else "Não"
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y' if value.time() == datetime.min.time() else '%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, (float, Decimal)):
+        return str(value).replace('.', ',')
+    return value
+
+
+class _CsvSink:
+    """CSV separado por ';' com BOM, para abrir direto no Excel."""
+
+    def __init__(self, path: str, register: Register):
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file, delimiter=';')
+        self._writer.writerow([header for header, _ in register.columns])
+
+    def write_rows(self, rows):
+        self._writer.writerows([_csv_value(value) for value in row] for row in rows)
+
+    def close(self, save: bool = True):
+        self._file.close()
+
+
+class _XlsxSink:
+    """Pasta de trabalho `write_only`; passa para outra planilha ao atingir o limite do Excel."""
+
+    def __init__(self, path: str, register: Register):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValueError("Para exportar arquivos .xlsx instale o pacote openpyxl")
+        self._path = path
+        self._title = register.title
+        self._headers = [header for header, _ in register.columns]
+        self._book = Workbook(write_only=True)
+        self._sheet = None
+        self._sheets = 0
+        self._rows = XLSX_MAX_ROWS
+
+    def _next_sheet(self):
+        self._sheets += 1
+        title = self._title if self._sheets == 1 else f"{self._title} ({self._sheets})"
+        self._sheet = self._book.create_sheet(title)
+        self._sheet.append(self._headers)
+        self._rows = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self._rows >= XLSX_MAX_ROWS:
+                self._next_sheet()
+            self._sheet.append([_XML_ILLEGAL.sub('', value) if isinstance(value, str) else value
+                                for value in row])
+            self._rows += 1
+
+    def close(self, save: bool = True):
+        if not save:
+            self._book.close()
+            return
+        if self._sheet is None:
+            self._next_sheet()
+        self._book.save(self._path)
+
+
+_SINKS = {'.csv': _CsvSink, '.xlsx': _XlsxSink}
+
+
+class RegisterExporter:
+    """
+    Exporta um cadastro com os mesmos filtros das listagens.
+
+    Uso:
+        exporter = RegisterExporter(db_models)
+        exporter.export('inspecoes', 'historico.xlsx', {'equipment_id': 10})
+    """
+
+    def __init__(self, db_models):
+        self.db = db_models.db
+        self._controllers = {name: register.controller(db_models)
+                             for name, register in REGISTERS.items()}
+
+    def count(self, register: str, filters: dict = None) -> Optional[int]:
+        """Quantidade de linhas que a exportação vai gravar (None em caso de erro)."""
+        query, params = self._controllers[register].filtered_query(filters or {})
+        try:
+            with self.db.read_pool().connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(f"SELECT COUNT_BIG(*) FROM ({query}) q", params)
+                return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erro ao contar linhas para exportar {register}: {str(e)}")
+            return None
+
+    def export(self, register: str, path: str, filters: dict = None,
+               progress: Callable[[int, Optional[int]], None] = None,
+               cancelled: Callable[[], bool] = None) -> int:
+        """
+        Grava o cadastro no arquivo (formato pela extensão: .csv ou .xlsx).
+
+        Args:
+            register: Chave de `REGISTERS`
+            path: Arquivo de destino
+            filters: Filtros aceitos por `filtered_query` do controlador
+            progress: Chamado após cada lote com (linhas gravadas, total ou None)
+            cancelled: Consultado entre os lotes; se retornar True a
+                exportação para e lança ExportCancelled
+
+        Returns:
+            int: Linhas exportadas
+        """
+        spec = REGISTERS[register]
+        sink_class = _SINKS.get(os.path.splitext(path)[1].lower())
+        if sink_class is None:
+            raise ValueError(f"Formato de exportação não suportado: {path}")
+
+        total = self.count(register, filters) if progress else None
+        query, params = self._controllers[register].filtered_query(filters or {})
+        partial = f"{path}.parcial"
+        sink = sink_class(partial, spec)
+        written = 0
+        saved = False
+        try:
+            with self.db.read_pool().connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute(f"{query} ORDER BY {spec.order_by}", params)
+                names = [column[0].lower() for column in cursor.description]
+                indexes = [names.index(column) for _, column in spec.columns]
+                while True:
+                    if cancelled and cancelled():
+                        raise ExportCancelled()
+                    rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    sink.write_rows([row[index] for index in indexes] for row in rows)
+                    written += len(rows)
+                    if progress:
+                        progress(written, total)
+            sink.close()
+            saved = True
+            os.replace(partial, path)
+        finally:
+            if not saved:
+                sink.close(save=False)
+                if os.path.exists(partial):
+                    os.remove(partial)
+
+        logger.info(f"{written} linha(s) de {register} exportada(s) para {path}")
+        return written
@@ -0,0 +1,250 @@
+"""
+Geração de laudos técnicos em lote, sem interface gráfica.
+
+Os dados das inspeções selecionadas (por ID ou pelos filtros de
+`InspectionController.filtered_query`) são lidos do banco no processo
+principal. Os PDFs são gerados em um pool de processos, um por núcleo:
+o ReportLab é puro Python e não se beneficia de threads. Cada processo monta
+os estilos do `LaudoTecnicoPDF` uma única vez.
+
+Cada laudo gerado é registrado em `relatorios`, em uma única transação ao
+final do lote. Gerar de novo o mesmo laudo sobrescreve o PDF sem duplicar o
+registro.
+"""
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Iterable, Optional
+from xml.sax.saxutils import escape
+from config.settings import LAUDO_BATCH_WORKERS, REPORT_OUTPUT_PATH
+from controllers.inspection_controller import InspectionController
+from utils.pdf_generator import LaudoTecnicoPDF
+
+logger = logging.getLogger(__name__)
+
+# IDs por consulta (o SQL Server aceita até 2100 parâmetros)
+ID_CHUNK_SIZE = 500
+
+# Laudos enviados a um processo por vez
+RENDER_CHUNK_SIZE = 4
+
+_DADOS_QUERY = """
+    SELECT
+        i.id, i.data_inspecao, i.tipo_inspecao, i.resultado, i.recomendacoes,
+        i.proxima_inspecao, i.engenheiro_id,
+        e.tag, e.categoria, e.categoria_nr13, e.fabricante, e.ano_fabricacao,
+        e.pressao_projeto, e.volume,
+        eng.nome AS engenheiro_nome, eng.crea AS engenheiro_crea,
+        COALESCE(NULLIF(cli.empresa, ''), cli.nome) AS cliente_nome
+    FROM dbo.inspecoes i
+    JOIN dbo.equipamentos e ON i.equipamento_id = e.id
+    LEFT JOIN dbo.usuarios eng ON i.engenheiro_id = eng.id
+    LEFT JOIN dbo.usuarios cli ON e.empresa_id = cli.id
+"""
+
+
+@dataclass
+class ResultadoLote:
+    """
+    Resumo de uma geração em lote.
+
+    Attributes:
+        gerados: (ID da inspeção, caminho do PDF)
+        falhas: (ID da inspeção, mensagem de erro)
+        registrados: Novos registros em `relatorios`
+    """
+    gerados: list = field(default_factory=list)
+    falhas: list = field(default_factory=list)
+    registrados: int = 0
+
+
+def _data(valor) -> str:
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime('%d/%m/%Y')
+    return str(valor or '')
+
+
+def _texto(valor, padrao: str = '') -> str:
+    """Texto do banco pronto para um Paragraph do ReportLab."""
+    texto = str(valor).strip() if valor is not None else ''
+    return escape(texto or padrao).replace('\n', '<br/>')
+
+
+def dados_laudo(linha: dict) -> dict:
+    """Monta os dados do laudo (formato de `LaudoTecnicoPDF`) a partir de uma linha de `_DADOS_QUERY`."""
+    responsavel = linha['engenheiro_nome'] or ''
+    if linha['engenheiro_crea']:
+        responsavel = f"{responsavel} (CREA {linha['engenheiro_crea']})"
+    resultado = linha['resultado'] or ''
+    return {
+        'titulo': _texto(f"Laudo Técnico - {linha['categoria'] or 'Equipamento'} - {linha['tag']}"),
+        'cliente_nome': linha['cliente_nome'] or '',
+        'equipamento_tag': linha['tag'] or '',
+        'equipamento_tipo': linha['categoria'] or '',
+        'equipamento_categoria': linha['categoria_nr13'] or '',
+        'equipamento_fabricante': linha['fabricante'] or '',
+        'equipamento_ano': str(linha['ano_fabricacao'] or ''),
+        'equipamento_pressao': str(linha['pressao_projeto'] or ''),
+        'equipamento_volume': str(linha['volume'] or ''),
+        'inspecao_data': _data(linha['data_inspecao']),
+        'inspecao_tipo': linha['tipo_inspecao'] or '',
+        'inspecao_responsavel': responsavel,
+        'inspecao_resultado': resultado,
+        'inspecao_proxima': _data(linha['proxima_inspecao']),
+        'recomendacoes': _texto(linha['recomendacoes'], "Sem recomendações adicionais."),
+        'conclusao': _texto(f"Equipamento {resultado.lower()}." if resultado else ''),
+    }
+
+
+def nome_arquivo(inspecao_id: int, tag: str) -> str:
+    """Nome fixo por inspeção, para que gerar de novo substitua o arquivo."""
+    tag = re.sub(r'[^A-Za-z0-9_-]+', '_', tag or '').strip('_') or 'equipamento'
+    return f"Laudo_{tag}_{inspecao_id}.pdf"
+
+
+# --- Processos de geração ---
+
+_gerador = None
+
+
+def _iniciar_processo():
+    global _gerador
+    _gerador = LaudoTecnicoPDF()
+
+
+def _renderizar(tarefa):
+    """Gera um laudo no processo do pool; devolve (id, caminho, erro)."""
+    inspecao_id, dados, caminho = tarefa
+    if _gerador is None:
+        _iniciar_processo()
+    try:
+        return inspecao_id, _gerador.renderizar(dados, caminho), None
+    except Exception as e:
+        logger.error(f"Erro ao gerar o laudo da inspeção {inspecao_id}: {str(e)}")
+        return inspecao_id, None, str(e)
+
+
+class LaudoBatch:
+    """
+    Gera laudos de várias inspeções em paralelo.
+
+    Args:
+        db_models: Instância de `DatabaseModels`
+        output_dir: Pasta dos PDFs
+        workers: Processos de geração (0/None = um por núcleo; 1 = no
+            próprio processo, sem pool)
+    """
+
+    def __init__(self, db_models, output_dir: str = REPORT_OUTPUT_PATH,
+                 workers: Optional[int] = LAUDO_BATCH_WORKERS):
+        self.db = db_models.db
+        self.dialect = self.db.dialect
+        self.inspection_controller = InspectionController(db_models)
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+
+    def selecionar(self, filters: dict) -> list:
+        """IDs das inspeções que atendem aos filtros da listagem de inspeções."""
+        query, params = self.inspection_controller.filtered_query(filters)
+        with self.db.read_pool().connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(f"SELECT q.id FROM ({query}) q ORDER BY q.id", params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def _carregar(self, ids: list) -> list:
+        linhas = []
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            for inicio in range(0, len(ids), ID_CHUNK_SIZE):
+                lote = ids[inicio:inicio + ID_CHUNK_SIZE]
+                cursor.execute(f"{_DADOS_QUERY} WHERE i.id IN ({', '.join('?' * len(lote))})", lote)
+                columns = [column[0].lower() for column in cursor.description]
+                linhas.extend(dict(zip(columns, row)) for row in cursor.fetchall())
+        return linhas
+
+    def _tarefas(self, linhas: list) -> Iterable[tuple]:
+        for linha in linhas:
+            caminho = os.path.abspath(os.path.join(self.output_dir, nome_arquivo(linha['id'], linha['tag'])))
+            yield linha['id'], dados_laudo(linha), caminho
+
+    def _registrar(self, gerados: list, engenheiros: dict) -> int:
+        """Cria os registros em `relatorios` que ainda não existem para o mesmo arquivo."""
+        if not gerados:
+            return 0
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            existentes = set()
+            ids = [inspecao_id for inspecao_id, _ in gerados]
+            for inicio in range(0, len(ids), ID_CHUNK_SIZE):
+                lote = ids[inicio:inicio + ID_CHUNK_SIZE]
+                cursor.execute(f"""
+                    SELECT inspecao_id, link_arquivo FROM relatorios
+                    WHERE inspecao_id IN ({', '.join('?' * len(lote))})
+                """, lote)
+                existentes.update((row[0], row[1]) for row in cursor.fetchall())
+
+            hoje = date.today()
+            novos = [(inspecao_id, hoje, caminho, "Laudo gerado em lote", engenheiros.get(inspecao_id))
+                     for inspecao_id, caminho in gerados if (inspecao_id, caminho) not in existentes]
+            if novos:
+                self.dialect.prepare_bulk(cursor)
+                cursor.executemany("""
+                    INSERT INTO relatorios (inspecao_id, data_emissao, link_arquivo, observacoes,
+                                            engenheiro_responsavel)
+                    VALUES (?, ?, ?, ?, ?)
+                """, novos)
+            conn.commit()
+        self.db.written()
+        return len(novos)
+
+    def gerar(self, ids: Iterable[int] = None, filters: dict = None,
+              progress: Callable[[int, int], None] = None) -> ResultadoLote:
+        """
+        Gera os laudos das inspeções.
+
+        Args:
+            ids: IDs das inspeções (tem prioridade sobre `filters`)
+            filters: Filtros de `InspectionController.filtered_query`
+            progress: Chamado a cada laudo com (laudos processados, total)
+
+        Returns:
+            ResultadoLote: Arquivos gerados, falhas e registros criados
+        """
+        ids = list(dict.fromkeys(ids)) if ids is not None else self.selecionar(filters or {})
+        resultado = ResultadoLote()
+        linhas = self._carregar(ids)
+        encontrados = {linha['id'] for linha in linhas}
+        resultado.falhas.extend((inspecao_id, "inspeção não encontrada")
+                                for inspecao_id in ids if inspecao_id not in encontrados)
+        if not linhas:
+            return resultado
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        total = len(linhas)
+        workers = min(self.workers, total)
+        logger.info(f"Gerando {total} laudo(s) em {self.output_dir} com {workers} processo(s)")
+        inicio = datetime.now()
+
+        def coletar(resultados):
+            for feitos, (inspecao_id, caminho, erro) in enumerate(resultados, start=1):
+                if erro:
+                    resultado.falhas.append((inspecao_id, erro))
+                else:
+                    resultado.gerados.append((inspecao_id, caminho))
+                if progress:
+                    progress(feitos, total)
+
+        if workers == 1:
+            coletar(map(_renderizar, self._tarefas(linhas)))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo) as executor:
+                coletar(executor.map(_renderizar, self._tarefas(linhas), chunksize=RENDER_CHUNK_SIZE))
+
+        engenheiros = {linha['id']: linha['engenheiro_id'] for linha in linhas}
+        resultado.registrados = self._registrar(resultado.gerados, engenheiros)
+
+        logger.info(f"Lote concluído em {(datetime.now() - inicio).total_seconds():.1f}s: "
+                    f"{len(resultado.gerados)} gerado(s), {len(resultado.falhas)} falha(s), "
+                    f"{resultado.registrados} registro(s) novo(s)")
+        return resultado
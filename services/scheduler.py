@@ -1,86 +1,487 @@
 """
 Serviço de agendamento de tarefas.
+
+As tarefas ficam na tabela `tarefas_agendadas` e sobrevivem a reinícios.
+O laço principal mantém um heap com o próximo disparo de cada tarefa e dorme
+até o primeiro vencimento. Ele também acorda quando este processo agenda uma
+tarefa nova. Tarefas gravadas por outros processos (ex.: a interface) são
+lidas a cada `SCHEDULER_RELOAD_SECONDS`.
+
+As tarefas rodam em um pool com `SCHEDULER_WORKERS` threads. Cada disparo é
+reservado no banco antes de rodar, então dois agendadores não executam o
+mesmo disparo. Gatilhos:
+- 'unico': uma execução; a tarefa é apagada ao disparar
+- 'intervalo': a cada N segundos (`parametro`)
+- 'diario': todo dia no horário HH:MM (`parametro`)
+
+Disparos atrasados além de `tolerancia_segundos` (ex.: o serviço estava
+parado) não são executados: a tarefa recorrente vai para o próximo horário e
+a única é descartada. Sem tolerância, o disparo roda assim que possível e
+atrasos acumulados viram uma única execução. Uma tarefa que passa de
+`timeout_segundos` é registrada como falha e não dispara de novo enquanto
+não terminar; threads não podem ser interrompidas.
+
+Cada execução registra o atraso (disparo previsto até o início) e a duração,
+no log, em `metricas()` e na própria tabela.
+
+Uso (serviço sem interface):
+    python -m services.scheduler
+    python -m services.scheduler --listar
 """
-import schedule
-import time
+import argparse
+import heapq
+import json
 import logging
-from datetime import datetime
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Optional
+from config.settings import REMINDER_HOUR, SCHEDULER_RELOAD_SECONDS, SCHEDULER_WORKERS
+from controllers.dashboard_controller import DashboardController
+from database.models import DatabaseModels
+from services.document_store import DocumentStore
 from services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
 
+GATILHO_UNICO = 'unico'
+GATILHO_INTERVALO = 'intervalo'
+GATILHO_DIARIO = 'diario'
+
+# (nome, ação, gatilho, parâmetro, tolerância, tempo limite) das tarefas do sistema
+TAREFAS_PADRAO = (
+    ('lembretes_inspecao', 'lembretes', GATILHO_DIARIO, REMINDER_HOUR, 4 * 3600, 1800),
+    # Fora do expediente
+    ('coleta_documentos', 'coleta_documentos', GATILHO_DIARIO, '03:00', 4 * 3600, 3600),
+    # Logo após a virada do dia, quando as faixas de vencimento mudam
+    ('resumo_conformidade', 'resumo_conformidade', GATILHO_DIARIO, '00:05', 4 * 3600, 1800),
+    ('entrega_emails', 'entrega_emails', GATILHO_INTERVALO, '300', None, 600),
+)
+
+
+@dataclass(frozen=True)
+class Tarefa:
+    """Linha de `tarefas_agendadas`."""
+    id: int
+    nome: str
+    acao: str
+    argumentos: dict
+    gatilho: str
+    parametro: Optional[str]
+    proxima_execucao: datetime
+    tolerancia_segundos: Optional[int] = None
+    timeout_segundos: Optional[int] = None
+
+
+@dataclass
+class MetricasTarefa:
+    """Execuções de uma tarefa desde o início do agendador (tempos em ms)."""
+    execucoes: int = 0
+    falhas: int = 0
+    perdidas: int = 0
+    estouros: int = 0
+    ultimo_atraso_ms: float = 0
+    maior_atraso_ms: float = 0
+    ultima_duracao_ms: float = 0
+    maior_duracao_ms: float = 0
+    duracao_total_ms: float = 0
+
+    @property
+    def duracao_media_ms(self) -> float:
+        return self.duracao_total_ms / self.execucoes if self.execucoes else 0
+
+
+def _segundo(valor: datetime) -> datetime:
+    # DATETIME do SQL Server não guarda microssegundos; os disparos são comparados por igualdade
+    return valor.replace(microsecond=0)
+
+
+def proximo_disparo(gatilho: str, parametro: Optional[str], depois: datetime) -> Optional[datetime]:
+    """Primeiro disparo estritamente depois de `depois` (None para a tarefa única)."""
+    if gatilho == GATILHO_INTERVALO:
+        return _segundo(depois) + timedelta(seconds=int(parametro))
+    if gatilho == GATILHO_DIARIO:
+        hora, minuto = (int(parte) for parte in parametro.split(':'))
+        disparo = depois.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        return disparo if disparo > depois else disparo + timedelta(days=1)
+    if gatilho == GATILHO_UNICO:
+        return None
+    raise ValueError(f"Gatilho desconhecido: {gatilho}")
+
+
 class Scheduler:
     """
-    Classe responsável por agendar e executar tarefas periódicas.
+    Agendador persistente de tarefas.
+
+    Uso:
+        scheduler = Scheduler()
+        scheduler.schedule_inspection_report(15, datetime(2024, 5, 2, 9, 0))
+        scheduler.start()   # bloqueia até stop()
     """
-    
-    def __init__(self):
-        self.email_service = EmailService()
-        
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS, db_models: DatabaseModels = None):
+        db_models = db_models or DatabaseModels()
+        self.db = db_models.db
+        self.workers = max(1, workers)
+        self.email_service = EmailService(db_models)
+        self.document_store = DocumentStore(db_models)
+        self.dashboard = DashboardController(db_models)
+        self.acoes = {
+            'lembretes': self._send_reminders,
+            'coleta_documentos': self._collect_documents,
+            'entrega_emails': self._deliver_outbox,
+            'resumo_conformidade': self._refresh_dashboard,
+            'relatorio_inspecao': self._send_inspection_report,
+        }
+        self._cond = threading.Condition()
+        self._parar = threading.Event()
+        self._heap = []
+        self._tarefas = {}
+        self._proxima_leitura = 0
+        # id -> (future, prazo em time.monotonic() ou None, estouro já registrado)
+        self._em_execucao = {}
+        self._metricas = {}
+
+    # --- Persistência ---
+
+    def _gravar(self, nome: str, acao: str, gatilho: str, parametro: Optional[str],
+                proxima: datetime, argumentos: dict = None, tolerancia: int = None,
+                timeout: int = None):
+        """Cria a tarefa ou substitui a de mesmo nome."""
+        valores = (acao, json.dumps(argumentos or {}), gatilho, parametro, _segundo(proxima),
+                   tolerancia, timeout)
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("""
+                UPDATE tarefas_agendadas
+                SET acao = ?, argumentos = ?, gatilho = ?, parametro = ?, proxima_execucao = ?,
+                    tolerancia_segundos = ?, timeout_segundos = ?
+                WHERE nome = ?
+            """, valores + (nome,))
+            if cursor.rowcount == 0:
+                cursor.execute("""
+                    INSERT INTO tarefas_agendadas (acao, argumentos, gatilho, parametro, proxima_execucao,
+                                                   tolerancia_segundos, timeout_segundos, nome)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, valores + (nome,))
+            conn.commit()
+        with self._cond:
+            # Acorda o laço para reler as tarefas
+            self._proxima_leitura = 0
+            self._cond.notify()
+
+    def agendar(self, nome: str, acao: str, gatilho: str, parametro: str = None,
+                quando: datetime = None, argumentos: dict = None, tolerancia: int = None,
+                timeout: int = None):
+        """
+        Agenda (ou reagenda) uma tarefa.
+
+        Args:
+            nome: Identificador único; agendar de novo o mesmo nome substitui a tarefa
+            acao: Chave de `self.acoes`
+            gatilho: GATILHO_UNICO, GATILHO_INTERVALO ou GATILHO_DIARIO
+            parametro: Segundos (intervalo) ou HH:MM (diário)
+            quando: Primeiro disparo (obrigatório para a tarefa única)
+            argumentos: Argumentos nomeados da ação
+            tolerancia: Atraso máximo, em segundos, para ainda executar um disparo
+            timeout: Tempo limite da execução, em segundos
+        """
+        if acao not in self.acoes:
+            raise ValueError(f"Ação desconhecida: {acao}")
+        if quando is None:
+            if gatilho == GATILHO_UNICO:
+                raise ValueError("A tarefa única precisa da data de execução")
+            quando = proximo_disparo(gatilho, parametro, datetime.now())
+        self._gravar(nome, acao, gatilho, parametro, quando, argumentos, tolerancia, timeout)
+        logger.info(f"Tarefa {nome} agendada para {_segundo(quando)}")
+
+    def _garantir_tarefas_padrao(self):
+        """Cria as tarefas do sistema ou atualiza as que mudaram de configuração."""
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT nome, gatilho, parametro FROM tarefas_agendadas")
+            existentes = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        for nome, acao, gatilho, parametro, tolerancia, timeout in TAREFAS_PADRAO:
+            if existentes.get(nome) != (gatilho, parametro):
+                self.agendar(nome, acao, gatilho, parametro, tolerancia=tolerancia, timeout=timeout)
+
+    def _ler_tarefas(self):
+        """Relê a tabela e remonta o heap."""
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("""
+                SELECT id, nome, acao, argumentos, gatilho, parametro, proxima_execucao,
+                       tolerancia_segundos, timeout_segundos
+                FROM tarefas_agendadas
+            """)
+            tarefas = {}
+            for row in cursor.fetchall():
+                tarefas[row[0]] = Tarefa(row[0], row[1], row[2], json.loads(row[3] or '{}'), *row[4:])
+        self._tarefas = tarefas
+        self._heap = [(tarefa.proxima_execucao, tarefa.id) for tarefa in tarefas.values()]
+        heapq.heapify(self._heap)
+        self._proxima_leitura = time.monotonic() + SCHEDULER_RELOAD_SECONDS
+
+    def _reservar(self, tarefa: Tarefa, seguinte: Optional[datetime]) -> bool:
+        """
+        Move a tarefa para o próximo disparo (ou apaga a única) antes de executar.
+
+        Returns:
+            bool: False se outro agendador já reservou o disparo ou a tarefa mudou
+        """
+        with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+            if seguinte is None:
+                cursor.execute("DELETE FROM tarefas_agendadas WHERE id = ? AND proxima_execucao = ?",
+                               (tarefa.id, tarefa.proxima_execucao))
+            else:
+                cursor.execute("""
+                    UPDATE tarefas_agendadas SET proxima_execucao = ?
+                    WHERE id = ? AND proxima_execucao = ?
+                """, (seguinte, tarefa.id, tarefa.proxima_execucao))
+            reservada = cursor.rowcount == 1
+            conn.commit()
+        return reservada
+
+    def _registrar_execucao(self, tarefa: Tarefa, inicio: datetime, atraso_ms: float,
+                            duracao_ms: float, erro: Optional[str]):
+        try:
+            with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("""
+                    UPDATE tarefas_agendadas
+                    SET ultima_execucao = ?, ultimo_atraso_ms = ?, ultima_duracao_ms = ?,
+                        ultimo_erro = ?, execucoes = execucoes + 1,
+                        falhas = falhas + ?
+                    WHERE id = ?
+                """, (_segundo(inicio), int(atraso_ms), int(duracao_ms),
+                      erro[:500] if erro else None, 1 if erro else 0, tarefa.id))
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Erro ao registrar a execução da tarefa {tarefa.nome}: {str(e)}")
+
+    # --- Execução ---
+
+    def _executar(self, tarefa: Tarefa, previsto: datetime):
+        inicio = datetime.now()
+        atraso_ms = max((inicio - previsto).total_seconds() * 1000, 0)
+        relogio = time.perf_counter()
+        erro = None
+        try:
+            self.acoes[tarefa.acao](**tarefa.argumentos)
+        except Exception as e:
+            erro = str(e) or type(e).__name__
+            logger.error(f"Erro na tarefa {tarefa.nome}: {erro}")
+            logger.error(traceback.format_exc())
+        duracao_ms = (time.perf_counter() - relogio) * 1000
+        if erro is None and tarefa.timeout_segundos and duracao_ms > tarefa.timeout_segundos * 1000:
+            erro = f"tempo limite de {tarefa.timeout_segundos}s excedido"
+
+        with self._cond:
+            metricas = self._metricas.setdefault(tarefa.nome, MetricasTarefa())
+            metricas.execucoes += 1
+            metricas.falhas += bool(erro)
+            metricas.ultimo_atraso_ms = atraso_ms
+            metricas.maior_atraso_ms = max(metricas.maior_atraso_ms, atraso_ms)
+            metricas.ultima_duracao_ms = duracao_ms
+            metricas.maior_duracao_ms = max(metricas.maior_duracao_ms, duracao_ms)
+            metricas.duracao_total_ms += duracao_ms
+        logger.info(f"Tarefa {tarefa.nome}: atraso {atraso_ms:.0f} ms, duração {duracao_ms:.0f} ms"
+                    + (" (falhou)" if erro else ""))
+        self._registrar_execucao(tarefa, inicio, atraso_ms, duracao_ms, erro)
+
+    def _terminou(self, tarefa_id: int, future):
+        with self._cond:
+            if self._em_execucao.get(tarefa_id, (None,))[0] is future:
+                del self._em_execucao[tarefa_id]
+
+    def _disparar(self, executor: ThreadPoolExecutor, tarefa: Tarefa, agora: datetime):
+        seguinte = proximo_disparo(tarefa.gatilho, tarefa.parametro, agora)
+        atraso = (agora - tarefa.proxima_execucao).total_seconds()
+        perdida = tarefa.tolerancia_segundos is not None and atraso > tarefa.tolerancia_segundos
+
+        if tarefa.id in self._em_execucao:
+            logger.warning(f"Tarefa {tarefa.nome} ainda em execução; disparo de "
+                           f"{tarefa.proxima_execucao} ignorado")
+            perdida = True
+        elif perdida:
+            logger.warning(f"Tarefa {tarefa.nome}: disparo de {tarefa.proxima_execucao} perdido "
+                           f"({atraso:.0f}s de atraso)")
+
+        if not self._reservar(tarefa, seguinte):
+            return
+        if seguinte is None:
+            self._tarefas.pop(tarefa.id, None)
+        else:
+            self._tarefas[tarefa.id] = replace(tarefa, proxima_execucao=seguinte)
+            heapq.heappush(self._heap, (seguinte, tarefa.id))
+
+        if perdida:
+            self._metricas.setdefault(tarefa.nome, MetricasTarefa()).perdidas += 1
+            return
+        future = executor.submit(self._executar, tarefa, tarefa.proxima_execucao)
+        prazo = time.monotonic() + tarefa.timeout_segundos if tarefa.timeout_segundos else None
+        self._em_execucao[tarefa.id] = (future, prazo, False)
+        future.add_done_callback(lambda f, tarefa_id=tarefa.id: self._terminou(tarefa_id, f))
+
+    def _verificar_tempo_limite(self):
+        agora = time.monotonic()
+        for tarefa_id, (future, prazo, avisado) in list(self._em_execucao.items()):
+            if prazo is None or avisado or agora < prazo or future.done():
+                continue
+            tarefa = self._tarefas.get(tarefa_id)
+            nome = tarefa.nome if tarefa else str(tarefa_id)
+            logger.error(f"Tarefa {nome} excedeu o tempo limite; novos disparos aguardam o término")
+            self._metricas.setdefault(nome, MetricasTarefa()).estouros += 1
+            self._em_execucao[tarefa_id] = (future, prazo, True)
+
+    def _espera(self) -> float:
+        """Segundos até o próximo disparo, prazo de execução ou releitura."""
+        limites = [self._proxima_leitura - time.monotonic()]
+        if self._heap:
+            limites.append((self._heap[0][0] - datetime.now()).total_seconds())
+        limites.extend(prazo - time.monotonic() for _, prazo, avisado in self._em_execucao.values()
+                       if prazo is not None and not avisado)
+        return max(min(limites), 0)
+
     def start(self):
-        """Inicia o agendador de tarefas."""
+        """Inicia o agendador de tarefas (bloqueia até `stop()`)."""
         try:
-            # Agenda envio de lembretes diariamente às 8h
-            schedule.every().day.at("08:00").do(self._send_reminders)
-            
-            logger.info("Agendador iniciado")
-            
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
-                
+            self._parar.clear()
+            self._garantir_tarefas_padrao()
+            self._ler_tarefas()
+            logger.info(f"Agendador iniciado com {len(self._tarefas)} tarefa(s) e "
+                        f"{self.workers} execução(ões) simultânea(s)")
+
+            with ThreadPoolExecutor(max_workers=self.workers,
+                                    thread_name_prefix='tarefa') as executor:
+                while not self._parar.is_set():
+                    with self._cond:
+                        espera = self._espera()
+                        if espera > 0:
+                            self._cond.wait(espera)
+                        if self._parar.is_set():
+                            break
+                        if time.monotonic() >= self._proxima_leitura:
+                            self._ler_tarefas()
+                        self._verificar_tempo_limite()
+
+                        agora = datetime.now()
+                        while self._heap and self._heap[0][0] <= agora:
+                            previsto, tarefa_id = heapq.heappop(self._heap)
+                            tarefa = self._tarefas.get(tarefa_id)
+                            # Entradas antigas (tarefa reagendada ou apagada) ficam no heap até aqui
+                            if tarefa is None or tarefa.proxima_execucao != previsto:
+                                continue
+                            self._disparar(executor, tarefa, agora)
+                logger.info("Agendador parado; aguardando tarefas em execução")
+
         except Exception as e:
             logger.error(f"Erro no agendador: {str(e)}")
-            
+            logger.error(traceback.format_exc())
+
+    def stop(self):
+        """Encerra o laço do agendador; as tarefas em execução terminam antes."""
+        self._parar.set()
+        with self._cond:
+            self._cond.notify()
+
+    def metricas(self) -> dict:
+        """{nome da tarefa: MetricasTarefa} das execuções deste processo."""
+        with self._cond:
+            return {nome: replace(metricas) for nome, metricas in self._metricas.items()}
+
+    # --- Ações ---
+
     def _send_reminders(self):
         """Envia lembretes de inspeções próximas."""
-        try:
-            logger.info("Iniciando envio de lembretes")
-            
-            if self.email_service.send_inspection_reminder():
-                logger.info("Lembretes enviados com sucesso")
-            else:
-                logger.error("Falha ao enviar lembretes")
-                
-        except Exception as e:
-            logger.error(f"Erro ao enviar lembretes: {str(e)}")
-            
+        logger.info("Iniciando envio de lembretes")
+
+        if self.email_service.send_inspection_reminder():
+            logger.info("Lembretes enviados com sucesso")
+        else:
+            raise RuntimeError("Falha ao enviar lembretes")
+
+    def _collect_documents(self):
+        """Remove os documentos órfãos do repositório de documentos."""
+        self.document_store.coletar_orfaos()
+
+    def _deliver_outbox(self):
+        """Entrega os e-mails pendentes da fila de saída."""
+        self.email_service.outbox.entregar()
+
+    def _refresh_dashboard(self):
+        """Recalcula o resumo de conformidade do painel do administrador."""
+        self.dashboard.atualizar_resumo()
+
     def schedule_inspection_report(self, inspecao_id: int, send_date: datetime):
         """
         Agenda o envio de um relatório de inspeção.
-        
+
+        A tarefa é única: roda uma vez na data indicada e é removida.
+        Agendar de novo a mesma inspeção substitui a data anterior.
+
         Args:
             inspecao_id: ID da inspeção
             send_date: Data para envio do relatório
         """
         try:
-            schedule.every().day.at(send_date.strftime("%H:%M")).do(
-                self._send_inspection_report, inspecao_id
-            )
-            
+            self.agendar(f"relatorio_inspecao:{inspecao_id}", 'relatorio_inspecao', GATILHO_UNICO,
+                         quando=send_date, argumentos={'inspecao_id': inspecao_id}, timeout=600)
+
             logger.info(f"Relatório da inspeção {inspecao_id} agendado para {send_date}")
-            
+
         except Exception as e:
             logger.error(f"Erro ao agendar relatório: {str(e)}")
-            
+
     def _send_inspection_report(self, inspecao_id: int):
         """Envia um relatório de inspeção."""
-        try:
-            logger.info(f"Enviando relatório da inspeção {inspecao_id}")
-            
-            if self.email_service.send_inspection_report(inspecao_id):
-                logger.info(f"Relatório da inspeção {inspecao_id} enviado com sucesso")
-            else:
-                logger.error(f"Falha ao enviar relatório da inspeção {inspecao_id}")
-                
-        except Exception as e:
-            logger.error(f"Erro ao enviar relatório: {str(e)}")
-            
+        logger.info(f"Enviando relatório da inspeção {inspecao_id}")
+
+        if self.email_service.send_inspection_report(inspecao_id):
+            logger.info(f"Relatório da inspeção {inspecao_id} enviado com sucesso")
+        else:
+            raise RuntimeError(f"Falha ao enviar relatório da inspeção {inspecao_id}")
+
     def clear_schedule(self):
-        """Limpa todos os agendamentos."""
+        """Limpa todos os agendamentos (as tarefas do sistema são recriadas no próximo início)."""
         try:
-            schedule.clear()
+            with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("DELETE FROM tarefas_agendadas")
+                conn.commit()
+            with self._cond:
+                self._proxima_leitura = 0
+                self._cond.notify()
             logger.info("Agendamentos limpos")
-            
+
         except Exception as e:
-            logger.error(f"Erro ao limpar agendamentos: {str(e)}") 
\ No newline at end of file
+            logger.error(f"Erro ao limpar agendamentos: {str(e)}")
+
+
+def _listar(db):
+    with db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("""
+            SELECT nome, gatilho, parametro, proxima_execucao, ultima_execucao,
+                   ultimo_atraso_ms, ultima_duracao_ms, execucoes, falhas, ultimo_erro
+            FROM tarefas_agendadas ORDER BY proxima_execucao
+        """)
+        for nome, gatilho, parametro, proxima, ultima, atraso, duracao, execucoes, falhas, erro in cursor.fetchall():
+            print(f"{nome:<30} {gatilho:<9} {parametro or '':<6} próxima {proxima}  "
+                  f"última {ultima or '-'}  atraso {atraso if atraso is not None else '-'} ms  "
+                  f"duração {duracao if duracao is not None else '-'} ms  "
+                  f"{execucoes} execução(ões), {falhas} falha(s)" + (f"  erro: {erro}" if erro else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agendador de tarefas do sistema de inspeções")
+    parser.add_argument('--listar', action='store_true',
+                        help="lista as tarefas agendadas e a última execução de cada uma")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if args.listar:
+        _listar(DatabaseModels().db)
+    else:
+        scheduler = Scheduler()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sinal, lambda *_: scheduler.stop())
+        scheduler.start()
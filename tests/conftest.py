@@ -0,0 +1,54 @@
+"""
+Recursos comuns dos testes.
+
+Os testes rodam sobre um arquivo SQLite temporário (`SqliteDialect`) no lugar
+do SQL Server, com o mesmo esquema criado por `database/sqlite_schema.py`.
+
+Uso:
+    python -m pytest tests
+"""
+from types import SimpleNamespace
+import pytest
+from database.dialects import SqliteDialect
+from database.pool import ConnectionPool
+from database.sqlite_schema import create_schema
+
+
+@pytest.fixture
+def sqlite_dialect(tmp_path):
+    """Dialeto SQLite de um banco vazio com o esquema do sistema."""
+    dialect = SqliteDialect(str(tmp_path / 'nr13.db'))
+    conn = dialect.connect()
+    try:
+        create_schema(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return dialect
+
+
+class BancoDeTeste:
+    """
+    Substitui `DatabaseConnection` nos testes: um pool sobre o SQLite, sem réplica.
+
+    `gravacoes` conta as chamadas a `written()` (avisos de gravação à réplica).
+    """
+
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.pool = ConnectionPool(dialect.connect, max_size=4)
+        self.gravacoes = 0
+
+    def read_pool(self, consistent: bool = False):
+        return self.pool
+
+    def written(self):
+        self.gravacoes += 1
+
+
+@pytest.fixture
+def db_models(sqlite_dialect):
+    """Stand-in de `DatabaseModels` (atributo `db`) sobre o banco de `sqlite_dialect`."""
+    db = BancoDeTeste(sqlite_dialect)
+    yield SimpleNamespace(db=db)
+    db.pool.close_all()
@@ -0,0 +1,110 @@
+"""
+Consulta de alterações (`ChangeTracker`) e recarga das telas.
+
+Sem escritas entre duas consultas, a janela não deve recarregar nenhuma
+tabela: cada ciclo custa só a consulta de versões.
+"""
+from contextlib import closing
+from types import SimpleNamespace
+import pytest
+from database.change_tracking import ChangeTracker, TRACKED_TABLES
+from database.pool import ConnectionPool
+from ui.admin_ui import AdminWindow
+
+
+class _CursorRegistrado:
+    def __init__(self, cursor, registro):
+        self._cursor = cursor
+        self._registro = registro
+
+    def execute(self, sql, *params):
+        self._registro['consultas'].append(sql)
+        self._cursor.execute(sql, *params)
+        return self
+
+    def fetchall(self):
+        linhas = self._cursor.fetchall()
+        self._registro['linhas'] += len(linhas)
+        return linhas
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _ConexaoRegistrada:
+    def __init__(self, conn, registro):
+        self._conn = conn
+        self._registro = registro
+
+    def cursor(self):
+        return _CursorRegistrado(self._conn.cursor(), self._registro)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def registro():
+    return {'consultas': [], 'linhas': 0}
+
+
+@pytest.fixture
+def pool(sqlite_dialect, registro):
+    with closing(sqlite_dialect.connect()) as conn:
+        conn.execute("INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso, empresa) "
+                     "VALUES ('ACME', 'c@acme.com', 'x', 'cliente', 'ACME')")
+        conn.executemany("INSERT INTO equipamentos (tag, categoria, empresa_id) VALUES (?, ?, 1)",
+                         [(f"V-{n:03d}", 'Vaso de Pressão') for n in range(100)])
+        conn.commit()
+    pool = ConnectionPool(lambda: _ConexaoRegistrada(sqlite_dialect.connect(), registro))
+    yield pool
+    pool.close_all()
+
+
+def _janela(carregadas):
+    """Substituto da AdminWindow com os carregadores registrando as chamadas."""
+    def carregador(nome):
+        return lambda: carregadas.append(nome)
+    return SimpleNamespace(
+        auth_controller=SimpleNamespace(companies=SimpleNamespace(invalidate=carregador('empresas'))),
+        dashboard_controller=SimpleNamespace(invalidate=carregador('resumo')),
+        tabs=SimpleNamespace(currentIndex=lambda: 0, setCurrentIndex=lambda index: None),
+        load_users=carregador('usuarios'), load_equipment=carregador('equipamentos'),
+        load_inspections=carregador('inspecoes'), load_reports=carregador('relatorios'),
+        load_dashboard=carregador('conformidade'),
+    )
+
+
+def test_consulta_sem_escritas_nao_recarrega_nada(pool, registro):
+    tracker = ChangeTracker(pool)
+    assert tracker.poll() == set(TRACKED_TABLES)
+
+    registro['consultas'].clear()
+    registro['linhas'] = 0
+    alteradas = tracker.poll()
+
+    assert alteradas == set()
+    # Uma única consulta (a de versões), com uma linha por tabela monitorada
+    assert len(registro['consultas']) == 1
+    assert registro['linhas'] == len(TRACKED_TABLES)
+
+    carregadas = []
+    AdminWindow._reload_changed_tables(_janela(carregadas), alteradas)
+    assert carregadas == []
+    # Os carregadores não foram chamados: nenhuma linha além das versões
+    assert registro['linhas'] == len(TRACKED_TABLES)
+
+
+def test_escrita_recarrega_so_as_telas_afetadas(pool):
+    tracker = ChangeTracker(pool)
+    tracker.poll()
+    with pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("UPDATE equipamentos SET fabricante = 'ABC' WHERE tag = 'V-001'")
+        conn.commit()
+
+    alteradas = tracker.poll()
+    assert alteradas == {'equipamentos'}
+
+    carregadas = []
+    AdminWindow._reload_changed_tables(_janela(carregadas), alteradas)
+    assert carregadas == ['resumo', 'equipamentos', 'inspecoes', 'relatorios', 'conformidade']
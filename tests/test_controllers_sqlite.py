@@ -0,0 +1,155 @@
+"""
+Controladores sobre o backend SQLite.
+
+Cada controlador roda suas operações de cadastro, as listagens paginadas e
+as consultas de delta (`since=`) contra o esquema de `create_schema`, sem
+SQL Server.
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+import pytest
+from controllers.auth_controller import AuthController
+from controllers.dashboard_controller import DashboardController
+from controllers.engineer_controller import EngineerController
+from controllers.equipment_controller import EquipmentController
+from controllers.inspection_controller import InspectionController
+from controllers.report_controller import ReportController
+
+
+@pytest.fixture
+def ctl(db_models):
+    auth = AuthController(db_models.db)
+    assert auth.criar_usuario('ACME', 'contato@acme.com', 'senha123', 'cliente', 'ACME')[0]
+    assert auth.criar_usuario('Beta', 'contato@beta.com', 'senha123', 'cliente', 'Beta')[0]
+    assert auth.criar_usuario('Ana', 'ana@nr13.com', 'senha123', 'eng', crea='SP-1')[0]
+    return SimpleNamespace(
+        db=db_models.db, auth=auth,
+        equipamentos=EquipmentController(db_models),
+        inspecoes=InspectionController(db_models),
+        relatorios=ReportController(db_models),
+        engenheiros=EngineerController(db_models),
+        painel=DashboardController(db_models),
+    )
+
+
+def _criar_equipamento(ctl, tag, empresa_id=1, categoria='Vaso de Pressão'):
+    ok, mensagem = ctl.equipamentos.criar_equipamento(tag, categoria, empresa_id, 'Fabricante',
+                                                     2010, 10.0, 8.0, 1.5, 'Ar')
+    assert ok, mensagem
+    return ctl.equipamentos.get_equipment_by_tag(tag)[0]['id']
+
+
+def test_usuarios(ctl):
+    assert ctl.auth.login('contato@acme.com', 'senha123') == (True, 'Login realizado com sucesso', 1)
+    assert not ctl.auth.login('contato@acme.com', 'errada')[0]
+    assert not ctl.auth.criar_usuario('Outra', 'contato@acme.com', 'senha123', 'cliente')[0]
+
+    assert ctl.auth.atualizar_usuario(1, 'ACME SA', 'contato@acme.com', 'cliente', 'ACME SA')[0]
+    assert ctl.auth.alterar_senha('contato@acme.com', 'nova1234')
+    assert ctl.auth.login('contato@acme.com', 'nova1234')[0]
+    assert ctl.auth.desativar_usuario(2)
+    assert {u['id']: u['ativo'] for u in ctl.auth.get_all_users()} == {1: True, 2: False, 3: True}
+    assert ctl.auth.reativar_usuario(2)
+
+    assert ctl.auth.get_user_by_id(1)['empresa'] == 'ACME SA'
+    assert [e['nome'] for e in ctl.auth.get_all_engineers()] == ['Ana']
+    assert ctl.auth.get_company_id_by_name('ACME SA') == 1
+    assert ctl.auth.get_company_by_id(2)['nome'] == 'Beta'
+    assert ctl.db.gravacoes == 7
+
+
+def test_equipamentos(ctl):
+    ids = [_criar_equipamento(ctl, f"VP-{n:03d}", empresa_id=1 + n % 2) for n in range(5)]
+    equipamentos = ctl.equipamentos
+
+    # Páginas por (tag, id)
+    primeira = equipamentos.get_equipment_page(limit=3)
+    segunda = equipamentos.get_equipment_page(primeira[-1]['tag'], primeira[-1]['id'], limit=3)
+    assert [e['tag'] for e in primeira + segunda] == [f"VP-{n:03d}" for n in range(5)]
+    assert equipamentos.count_equipment() == 5
+    assert [e['id'] for e in equipamentos.get_equipment_by_company(2)] == ids[1::2]
+
+    # Delta: só o que mudou depois da versão lida
+    versao = equipamentos.get_all_equipment(since=0)['version']
+    assert equipamentos.update_equipment(ids[0], fabricante='Caldeiras XYZ')[0]
+    assert equipamentos.delete_equipment(ids[4])[0]
+    delta = equipamentos.get_all_equipment(since=versao)
+    assert [e['id'] for e in delta['rows']] == [ids[0]]
+    assert delta['rows'][0]['fabricante'] == 'Caldeiras XYZ'
+    assert delta['deleted'] == [ids[4]]
+    assert equipamentos.get_all_equipment(since=delta['version']) == {
+        'rows': [], 'deleted': [], 'version': delta['version']}
+
+    assert equipamentos.deactivate_equipment(ids[1])[0]
+    assert equipamentos.get_equipment_by_id(ids[1])['ativo'] is False
+    assert equipamentos.activate_equipment(ids[1])[0]
+
+    # Manutenção: próxima data gravada e dias calculados no SQL
+    ultima = date.today() - timedelta(days=20)
+    assert equipamentos.atualizar_manutencao_equipamento(ids[2], ultima.isoformat(), 30)[0]
+    equipamento = equipamentos.get_equipment_by_id(ids[2])
+    assert (equipamento['frequencia_manutencao'], equipamento['data_ultima_manutencao']) == (30, ultima)
+    vencendo = equipamentos.get_maintenance_due(ate_dias=15)
+    assert [(e['id'], e['dias_ate_manutencao']) for e in vencendo] == [(ids[2], 10)]
+    assert equipamentos.get_maintenance_due() == []
+
+
+def test_inspecoes_e_relatorios(ctl):
+    equipamento_id = _criar_equipamento(ctl, 'VP-001')
+    inspecoes = ctl.inspecoes
+    for dia in (1, 2, 3):
+        assert inspecoes.criar_inspecao(equipamento_id, 3, f"2024-05-0{dia}", 'Periódica', 'Aprovado')[0]
+
+    # Páginas das mais recentes para as mais antigas
+    primeira = inspecoes.get_inspections_page(limit=2)
+    segunda = inspecoes.get_inspections_page(primeira[-1]['data_inspecao'], primeira[-1]['id'], limit=2)
+    assert [i['id'] for i in primeira + segunda] == [3, 2, 1]
+    assert inspecoes.count_inspections() == 3
+    assert [i['id'] for i in inspecoes.get_filtered_inspections({'equipment_id': equipamento_id})] == [3, 2, 1]
+    assert [i['id'] for i in inspecoes.get_inspections_by_company(1)] == [3, 2, 1]
+
+    versao = inspecoes.get_all_inspections(since=0)['version']
+    assert inspecoes.update_inspection(2, resultado='Reprovado')[0]
+    assert inspecoes.get_inspection_by_id(2)['resultado'] == 'Reprovado'
+    assert inspecoes.delete_inspection(1)[0]
+    delta = inspecoes.get_all_inspections(since=versao)
+    assert ([i['id'] for i in delta['rows']], delta['deleted']) == ([2], [1])
+    assert inspecoes.cancel_inspection(3)[0]
+
+    relatorios = ctl.relatorios
+    for inspecao_id in (2, 3):
+        assert relatorios.criar_relatorio(inspecao_id, '2024-05-10', f"laudo_{inspecao_id}.pdf", 'obs')[0]
+    assert not relatorios.criar_relatorio(99, '2024-05-10', 'laudo.pdf')[0]
+    primeira = relatorios.get_reports_page(limit=1)
+    segunda = relatorios.get_reports_page(primeira[-1]['data_emissao'], primeira[-1]['id'], limit=1)
+    assert [r['inspecao_id'] for r in primeira + segunda] == [3, 2]
+    assert relatorios.count_reports() == 2
+
+    versao = relatorios.get_all_reports(since=0)['version']
+    assert relatorios.update_report(1, observacoes='revisado')[0]
+    assert relatorios.get_report_by_id(1)['observacoes'] == 'revisado'
+    assert relatorios.delete_report(2)[0]
+    delta = relatorios.get_all_reports(since=versao)
+    assert ([r['id'] for r in delta['rows']], delta['deleted']) == ([1], [2])
+    assert [r['id'] for r in relatorios.get_reports_by_company(1)] == [1]
+
+
+def test_engenheiros_e_painel(ctl):
+    engenheiros = ctl.engenheiros
+    assert engenheiros.create_engineer({'nome': 'Bruno', 'email': 'bruno@nr13.com',
+                                        'senha_hash': 'x', 'crea': 'SP-2'})[0]
+    assert not engenheiros.create_engineer({'nome': 'Outro', 'email': 'bruno@nr13.com',
+                                            'senha_hash': 'x'})[0]
+    assert [e['nome'] for e in engenheiros.get_all_engineers()] == ['Bruno']
+    assert engenheiros.update_engineer(3, {'nome': 'Ana Lima', 'crea': 'SP-9'})[0]
+    assert engenheiros.get_engineer_by_id(3)['crea'] == 'SP-9'
+    assert engenheiros.delete_engineer(4)[0]
+    assert engenheiros.get_engineer_by_id(4) is None
+
+    equipamento_id = _criar_equipamento(ctl, 'VP-001')
+    _criar_equipamento(ctl, 'VP-002', empresa_id=2)
+    assert ctl.inspecoes.criar_inspecao(equipamento_id, 3, '2024-05-01', 'Periódica', 'Reprovado')[0]
+    resumo = {linha['empresa_id']: linha for linha in ctl.painel.atualizar_resumo()}
+    assert (resumo[1]['equipamentos'], resumo[1]['reprovadas']) == (1, 1)
+    assert (resumo[2]['equipamentos'], resumo[2]['reprovadas']) == (1, 0)
+    assert ctl.painel.resumo() == list(resumo.values())
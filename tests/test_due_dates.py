@@ -0,0 +1,105 @@
+"""
+Prazos NR-13 (`services/due_dates.py`): soma de meses, prazos de uma inspeção
+por categoria e SPIE, e o recálculo da frota no SQLite.
+"""
+from contextlib import closing
+from datetime import date
+import numpy as np
+import pytest
+from services.due_dates import (DueDateEngine, EXAMES, REGRAS_NR13, prazos_da_inspecao,
+                                somar_meses)
+
+
+def _somar(data: str, meses: int) -> str:
+    return str(somar_meses(np.array([data], dtype='datetime64[D]'), np.array([meses]))[0])
+
+
+@pytest.mark.parametrize('data, meses, esperada', [
+    ('2024-01-31', 1, '2024-02-29'),
+    ('2023-01-31', 1, '2023-02-28'),
+    ('2024-03-31', 1, '2024-04-30'),
+    ('2024-02-29', 12, '2025-02-28'),
+    ('2020-08-31', 18, '2022-02-28'),
+    ('2024-05-15', 0, '2024-05-15'),
+    ('2024-12-31', 2, '2025-02-28'),
+    ('2024-01-30', 1, '2024-02-29'),
+])
+def test_somar_meses_limita_ao_fim_do_mes(data, meses, esperada):
+    assert _somar(data, meses) == esperada
+
+
+@pytest.mark.parametrize('regra', REGRAS_NR13, ids=lambda r: f"{r.categoria}-{'spie' if r.spie else 'sem-spie'}")
+def test_prazos_da_inspecao_inicial(regra):
+    base = date(2024, 1, 31)
+    prazos = prazos_da_inspecao(f"Categoria {regra.categoria}", regra.spie, 'Inicial', base)
+    meses = (regra.exame_externo, regra.exame_interno, regra.teste_hidrostatico)
+    assert prazos == {
+        coluna: None if n is None else date.fromisoformat(_somar(base.isoformat(), n))
+        for coluna, n in zip(EXAMES, meses)}
+
+
+def test_prazos_da_inspecao_por_tipo():
+    # Só os exames cobertos pelo tipo; sem prazo fixo vira None
+    assert prazos_da_inspecao('Categoria III', False, 'Periódica', '2024-01-31') == {
+        'proximo_exame_externo': date(2027, 1, 31), 'proximo_exame_interno': date(2030, 1, 31)}
+    assert prazos_da_inspecao('III', True, 'Teste Hidrostático', date(2024, 1, 31)) == {
+        'proximo_teste_hidrostatico': None}
+    assert prazos_da_inspecao('Categoria V', True, 'Exame Interno', date(2024, 1, 31)) == {
+        'proximo_exame_interno': None}
+    assert prazos_da_inspecao('Categoria 2', False, 'Visual', date(2024, 1, 31)) == {
+        'proximo_exame_externo': date(2026, 1, 31)}
+    # Sem categoria NR-13 não há prazo
+    assert prazos_da_inspecao(None, False, 'Inicial', date(2024, 1, 31)) == dict.fromkeys(EXAMES)
+
+
+@pytest.fixture
+def frota(db_models):
+    with db_models.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso, empresa) "
+                       "VALUES ('ACME', 'c@acme.com', 'x', 'cliente', 'ACME')")
+        cursor.execute("INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso) "
+                       "VALUES ('Ana', 'ana@nr13.com', 'x', 'eng')")
+        cursor.executemany("INSERT INTO equipamentos (tag, categoria_nr13, empresa_id, data_proxima_inspecao) "
+                           "VALUES (?, ?, 1, ?)",
+                           [('VP-001', 'Categoria II', None), ('VP-002', None, '2026-06-01')])
+        cursor.executemany("INSERT INTO inspecoes (equipamento_id, engenheiro_id, data_inspecao, "
+                           "tipo_inspecao, resultado, status) VALUES (?, 2, ?, ?, 'Aprovado', ?)", [
+                               (1, '2020-03-31', 'Inicial', 'Ativo'),
+                               (1, '2023-01-15', 'Exame Externo', 'Ativo'),
+                               (1, '2025-06-01', 'Periódica', 'cancelada'),
+                               (2, '2024-01-10', 'Inicial', 'Ativo'),
+                           ])
+        conn.commit()
+    return db_models
+
+
+def _prazos(db_models) -> dict:
+    with db_models.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute(f"SELECT tag, {', '.join(EXAMES)}, data_proxima_inspecao FROM equipamentos ORDER BY id")
+        return {row[0]: tuple(str(valor)[:10] if valor else None for valor in row[1:])
+                for row in cursor.fetchall()}
+
+
+def test_recalcular_a_frota(frota):
+    engine = DueDateEngine(frota)
+
+    resumo = engine.recalcular()
+
+    assert (resumo.equipamentos, resumo.alterados) == (2, 1)
+    assert _prazos(frota) == {
+        # Externo pelo último exame externo; interno e hidrostático pela inicial.
+        # A inspeção cancelada não conta.
+        'VP-001': ('2025-01-15', '2024-03-31', '2028-03-31', '2024-03-31'),
+        # Sem categoria: sem prazos, mantém a data do cadastro antigo
+        'VP-002': (None, None, None, '2026-06-01'),
+    }
+    assert frota.db.gravacoes == 1
+    assert engine.recalcular().alterados == 0
+
+    # Com SPIE os intervalos da categoria II passam a 48/96/192 meses
+    resumo = engine.definir_spie(1, True)
+    assert resumo.alterados == 1
+    assert _prazos(frota)['VP-001'] == ('2027-01-15', '2028-03-31', '2036-03-31', '2027-01-15')
+
+    # Só os equipamentos pedidos são lidos
+    assert engine.recalcular([2]).equipamentos == 1
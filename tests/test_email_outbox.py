@@ -0,0 +1,148 @@
+"""
+Entrega da fila de e-mails (`EmailOutbox`) a um servidor SMTP local.
+
+O servidor de teste fala o suficiente do protocolo para o smtplib (EHLO,
+MAIL, RCPT, DATA, RSET, QUIT), recusa destinatários escolhidos e pode cair
+depois de um número de mensagens, recusando as conexões seguintes com 421.
+"""
+import email
+import socketserver
+import threading
+from contextlib import closing
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+import services.email_outbox as email_outbox
+from database.pool import ConnectionPool
+from services.email_outbox import EmailOutbox
+
+
+class _ServidorSMTP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SessaoSMTP)
+        self.recusas = {}
+        self.cair_apos = None
+        self.fora_do_ar = False
+        self.conexoes = 0
+        self.recebidas = []
+        self.lock = threading.Lock()
+
+
+class _SessaoSMTP(socketserver.StreamRequestHandler):
+    def responder(self, linha: str):
+        self.wfile.write(f"{linha}\r\n".encode())
+
+    def handle(self):
+        servidor = self.server
+        if servidor.fora_do_ar:
+            self.responder("421 Servico indisponivel")
+            return
+        with servidor.lock:
+            servidor.conexoes += 1
+        self.responder("220 localhost ESMTP teste")
+        destinatarios = []
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode().strip()
+            verbo = comando[:4].upper()
+            if verbo in ('EHLO', 'HELO'):
+                self.responder("250 localhost")
+            elif verbo in ('MAIL', 'RSET'):
+                destinatarios = []
+                self.responder("250 OK")
+            elif verbo == 'RCPT':
+                endereco = comando.split(':', 1)[1].strip().strip('<>')
+                if endereco in servidor.recusas:
+                    self.responder(servidor.recusas[endereco])
+                else:
+                    destinatarios.append(endereco)
+                    self.responder("250 OK")
+            elif verbo == 'DATA':
+                self.responder("354 Fim com <CRLF>.<CRLF>")
+                dados = b''.join(iter(lambda: self.rfile.readline(), b'.\r\n'))
+                with servidor.lock:
+                    servidor.recebidas.append((destinatarios, email.message_from_bytes(dados)))
+                    cair = servidor.cair_apos is not None and len(servidor.recebidas) >= servidor.cair_apos
+                    servidor.fora_do_ar = servidor.fora_do_ar or cair
+                self.responder("250 Aceita")
+                if cair:
+                    return
+            elif verbo == 'QUIT':
+                self.responder("221 Tchau")
+                return
+            else:
+                self.responder("502 Comando nao implementado")
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    servidor = _ServidorSMTP()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    monkeypatch.setattr(email_outbox, 'SMTP_SERVER', '127.0.0.1')
+    monkeypatch.setattr(email_outbox, 'SMTP_PORT', servidor.server_address[1])
+    monkeypatch.setattr(email_outbox, 'SMTP_USE_TLS', False)
+    monkeypatch.setattr(email_outbox, 'SMTP_USERNAME', '')
+    monkeypatch.setattr(email_outbox, 'SMTP_TIMEOUT', 5)
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def db(sqlite_dialect):
+    pool = ConnectionPool(sqlite_dialect.connect, max_size=2)
+    yield SimpleNamespace(pool=pool, dialect=sqlite_dialect)
+    pool.close_all()
+
+
+def _fila(db) -> dict:
+    with db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("SELECT destinatario, status, tentativas, proxima_tentativa FROM email_saida")
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+def test_entrega_com_sessoes_reaproveitadas(servidor, db):
+    servidor.recusas = {'inexistente@cliente.com': "550 Caixa inexistente",
+                        'cheia@cliente.com': "452 Caixa cheia"}
+    outbox = EmailOutbox(SimpleNamespace(db=db), sessoes=2, taxa=0)
+    destinatarios = ['a@cliente.com', 'b@cliente.com', 'inexistente@cliente.com',
+                     'c@cliente.com', 'cheia@cliente.com', 'd@cliente.com']
+    outbox.enfileirar((destinatario, f"Lembrete {destinatario}", "Corpo") for destinatario in destinatarios)
+
+    resumo = outbox.entregar()
+
+    assert (resumo.enviados, resumo.reagendados, resumo.falhas, resumo.nao_tentadas) == (4, 1, 1, 0)
+    # Uma conexão por sessão, com várias mensagens em cada
+    assert servidor.conexoes == 2
+    assert sorted(mensagem['Subject'] for _, mensagem in servidor.recebidas) == [
+        f"Lembrete {destinatario}" for destinatario in ('a@cliente.com', 'b@cliente.com',
+                                                        'c@cliente.com', 'd@cliente.com')]
+    fila = _fila(db)
+    assert fila['a@cliente.com'][:2] == ('enviado', 0)
+    assert fila['inexistente@cliente.com'][:2] == ('falha', 1)
+    assert fila['cheia@cliente.com'][:2] == ('pendente', 1)
+    assert fila['cheia@cliente.com'][2] > datetime.now()
+
+
+def test_queda_da_sessao_nao_conta_tentativa_das_restantes(servidor, db):
+    servidor.cair_apos = 1
+    outbox = EmailOutbox(SimpleNamespace(db=db), sessoes=1, taxa=0)
+    outbox.enfileirar((f"{nome}@cliente.com", "Relatório", "Corpo") for nome in ('a', 'b', 'c', 'd'))
+
+    resumo = outbox.entregar()
+
+    assert (resumo.enviados, resumo.reagendados, resumo.falhas, resumo.nao_tentadas) == (1, 1, 0, 2)
+    fila = _fila(db)
+    assert fila['a@cliente.com'][:2] == ('enviado', 0)
+    # A mensagem em envio quando a sessão caiu conta a tentativa; as seguintes não
+    assert fila['b@cliente.com'][:2] == ('pendente', 1)
+    assert fila['c@cliente.com'][:2] == ('pendente', 0)
+    assert fila['d@cliente.com'][:2] == ('pendente', 0)
+    # Nenhuma volta ao servidor fora do ar ainda nesta entrega
+    for nome in 'bcd':
+        assert fila[f"{nome}@cliente.com"][2] > datetime.now()
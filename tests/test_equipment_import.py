@@ -0,0 +1,137 @@
+"""
+Importação de equipamentos (`services/equipment_import.py`) no SQLite:
+retomada pelo `.progresso.json`, tags repetidas e a gravação linha a linha
+quando o `executemany` do lote falha.
+"""
+import csv
+import json
+import os
+from contextlib import closing
+import pytest
+from services.equipment_import import EquipmentImporter
+
+CABECALHO = "Tag;Categoria;Fabricante;Pressão de Projeto (bar);Pressão de Trabalho;Volume;Fluido;Categoria NR-13"
+
+
+def _linha(tag: str) -> str:
+    return f"{tag};Vaso de Pressão;ACME;10,5;8;1,5;Ar;3"
+
+
+def _planilha(tmp_path, linhas) -> str:
+    caminho = tmp_path / 'equipamentos.csv'
+    caminho.write_text("\n".join([CABECALHO, *linhas]) + "\n", encoding='utf-8')
+    return str(caminho)
+
+
+def _tags(db_models) -> list:
+    with db_models.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("SELECT tag FROM equipamentos ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _relatorio(caminho: str) -> list:
+    with open(f"{caminho}.erros.csv", newline='', encoding='utf-8-sig') as arquivo:
+        return list(csv.reader(arquivo, delimiter=';'))
+
+
+@pytest.fixture
+def empresa(db_models):
+    with db_models.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+        cursor.execute("INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso, empresa) "
+                       "VALUES ('ACME', 'c@acme.com', 'x', 'cliente', 'ACME')")
+        conn.commit()
+    return 1
+
+
+def test_retoma_do_primeiro_lote_nao_gravado(db_models, empresa, tmp_path, monkeypatch):
+    caminho = _planilha(tmp_path, [_linha('VP-001'), 'VP 002;Vaso;ACME;10;8;1;Ar;3',
+                                   _linha('VP-003'), _linha('VP-004'), _linha('VP-005')])
+    importador = EquipmentImporter(db_models, chunk_size=2)
+    gravar_lote = importador._gravar_lote
+    chamadas = []
+
+    def cai_no_segundo_lote(validas):
+        chamadas.append(len(validas))
+        if len(chamadas) == 2:
+            raise RuntimeError("conexão perdida")
+        return gravar_lote(validas)
+
+    monkeypatch.setattr(importador, '_gravar_lote', cai_no_segundo_lote)
+    resultado = importador.importar(caminho, empresa)
+
+    assert (resultado.importados, resultado.interrompida) == (1, "conexão perdida")
+    with open(f"{caminho}.progresso.json", encoding='utf-8') as arquivo:
+        assert json.load(arquivo)['linha'] == 3
+    assert _tags(db_models) == ['VP-001']
+    assert db_models.db.gravacoes == 1
+
+    monkeypatch.undo()
+    resultado = importador.importar(caminho, empresa)
+
+    assert resultado.concluida
+    assert (resultado.ja_importados, resultado.importados, resultado.erros) == (2, 3, [])
+    assert _tags(db_models) == ['VP-001', 'VP-003', 'VP-004', 'VP-005']
+    assert not os.path.exists(f"{caminho}.progresso.json")
+    # O erro do primeiro lote continua no relatório, sem cabeçalho repetido
+    assert [linha[:2] for linha in _relatorio(caminho)] == [['linha', 'tag'], ['3', 'VP 002']]
+
+
+def test_progresso_de_outro_arquivo_nao_e_retomado(db_models, empresa, tmp_path):
+    caminho = _planilha(tmp_path, [_linha('VP-001')])
+    with open(f"{caminho}.progresso.json", 'w', encoding='utf-8') as arquivo:
+        json.dump({'assinatura': {'empresa_id': empresa, 'tamanho': 1, 'modificado': 0}, 'linha': 2}, arquivo)
+
+    resultado = EquipmentImporter(db_models).importar(caminho, empresa)
+
+    assert (resultado.ja_importados, resultado.importados) == (0, 1)
+
+
+def test_tags_repetidas(db_models, empresa, tmp_path):
+    importador = EquipmentImporter(db_models, chunk_size=2)
+    assert importador.inserir(empresa, [{'tag': 'VP-001', 'pressao_projeto': 10, 'pressao_trabalho': 8,
+                                         'volume': 1, 'fluido': 'Ar'}]).importados == 1
+    caminho = _planilha(tmp_path, [_linha('vp-001'), _linha('VP-002'), _linha('VP-003'),
+                                   _linha('vp-002'), _linha('VP-003')])
+
+    resultado = importador.importar(caminho, empresa)
+
+    assert resultado.importados == 2
+    assert [(erro.linha, erro.tag, erro.mensagem) for erro in resultado.erros] == [
+        (2, 'vp-001', "tag já cadastrada para a empresa"),
+        (5, 'vp-002', "tag repetida na planilha (linha 3)"),
+        (6, 'VP-003', "tag repetida na planilha (linha 4)"),
+    ]
+    assert _tags(db_models) == ['VP-001', 'VP-002', 'VP-003']
+    assert len(_relatorio(caminho)) == 4
+
+
+def test_lote_recusado_e_gravado_linha_a_linha(db_models, empresa, tmp_path):
+    # Uma linha válida na planilha que o banco recusa derruba o executemany do lote
+    with db_models.db.pool.connection() as conn:
+        conn.execute("""
+            CREATE TRIGGER TR_teste_recusa BEFORE INSERT ON equipamentos
+            WHEN NEW.tag = 'VP-002'
+            BEGIN SELECT RAISE(ABORT, 'tag recusada'); END
+        """)
+        conn.commit()
+    caminho = _planilha(tmp_path, [_linha(f"VP-00{n}") for n in range(1, 5)])
+    importador = EquipmentImporter(db_models, chunk_size=3)
+
+    resultado = importador.importar(caminho, empresa)
+
+    assert resultado.concluida
+    assert resultado.importados == 3
+    assert [(erro.linha, erro.tag, erro.mensagem) for erro in resultado.erros] == [
+        (3, 'VP-002', "erro ao gravar: tag recusada")]
+    assert _tags(db_models) == ['VP-001', 'VP-003', 'VP-004']
+    assert db_models.db.gravacoes == 1
+
+
+def test_inserir_avisa_a_gravacao(db_models, empresa):
+    equipamentos = [{'tag': f"VP-00{n}", 'pressao_projeto': '10,5', 'pressao_trabalho': 8,
+                     'volume': 1, 'fluido': 'Ar', 'categoria_nr13': 'III'} for n in range(1, 4)]
+
+    resultado = EquipmentImporter(db_models, chunk_size=2).inserir(empresa, equipamentos)
+
+    assert (resultado.importados, resultado.erros) == (3, [])
+    assert db_models.db.gravacoes == 1
@@ -0,0 +1,100 @@
+"""
+Listagem paginada de equipamentos com busca por tag e filtro de empresa.
+
+A busca vai para a própria consulta: as páginas percorrem só o resultado
+filtrado, na ordem de tag e ID, e o modelo paginado mantém essa ordem nas
+recargas.
+"""
+from contextlib import closing
+from types import SimpleNamespace
+import pytest
+from controllers.equipment_controller import EquipmentController
+from database.pool import ConnectionPool
+from ui.table_model import Column, PagedTableModel
+
+
+@pytest.fixture
+def controller(sqlite_dialect):
+    with closing(sqlite_dialect.connect()) as conn:
+        conn.executemany("INSERT INTO usuarios (nome, email, senha_hash, tipo_acesso, empresa) "
+                         "VALUES (?, ?, 'x', 'cliente', ?)",
+                         [('ACME', 'c@acme.com', 'ACME'), ('Beta', 'c@beta.com', 'Beta')])
+        tags = ([(f"VP-{n:03d}", 1 + n % 2) for n in range(120)]
+                + [('vp-x1', 1), ('VP_%1', 2), ('TQ-001', 1), ('VPA-1', 2)])
+        conn.executemany("INSERT INTO equipamentos (tag, categoria, empresa_id) "
+                         "VALUES (?, 'Vaso de Pressão', ?)", tags)
+        conn.commit()
+    pool = ConnectionPool(sqlite_dialect.connect, max_size=2)
+    db = SimpleNamespace(pool=pool, dialect=sqlite_dialect, read_pool=lambda consistent=False: pool)
+    yield EquipmentController(SimpleNamespace(db=db))
+    pool.close_all()
+
+
+def _todas_as_paginas(controller, limit, **filtros):
+    tags, after = [], (None, None)
+    while True:
+        pagina = controller.get_equipment_page(*after, limit, **filtros)
+        tags += [equipamento['tag'] for equipamento in pagina]
+        if len(pagina) < limit:
+            return tags
+        after = (pagina[-1]['tag'], pagina[-1]['id'])
+
+
+def test_busca_por_inicio_da_tag(controller):
+    tags = _todas_as_paginas(controller, 25, tag_prefix='vp-0')
+    assert tags == [f"VP-{n:03d}" for n in range(100)]
+    assert controller.count_equipment(tag_prefix='vp-0') == 100
+
+    # Maiúsculas não importam; '_' e '%' são literais
+    assert _todas_as_paginas(controller, 25, tag_prefix='VP-X') == ['vp-x1']
+    assert _todas_as_paginas(controller, 25, tag_prefix='VP_') == ['VP_%1']
+    assert _todas_as_paginas(controller, 25, tag_prefix='vp_%') == ['VP_%1']
+    assert controller.count_equipment(tag_prefix='ZZ') == 0
+
+
+def test_busca_com_empresa(controller):
+    tags = _todas_as_paginas(controller, 7, tag_prefix='VP-1', empresa_id=2)
+    assert tags == [f"VP-{n:03d}" for n in range(100, 120) if n % 2]
+    assert controller.count_equipment(tag_prefix='VP-1', empresa_id=2) == 10
+
+    assert len(_todas_as_paginas(controller, 50, empresa_id=1)) == 62
+    assert controller.count_equipment() == 124
+
+
+class _CargaImediata:
+    """`TableLoader` que roda a busca e aplica o resultado na hora."""
+
+    def load(self, key, fetch, apply, on_error=None):
+        apply(fetch())
+
+    def is_loading(self, key):
+        return False
+
+
+def test_recarga_mantem_a_ordem_da_consulta(controller, sqlite_dialect):
+    model = PagedTableModel(
+        [Column("Tag", lambda e: e['tag'])], _CargaImediata(), 'equipamentos',
+        lambda after, limit, filtro: controller.get_equipment_page(*(after or (None, None)), limit,
+                                                                   tag_prefix='VP-00'),
+        lambda e: (e['tag'], e['id']), page_size=5)
+    model.reload()
+    assert [model.value(row, 0) for row in range(model.rowCount())] == [
+        'VP-000', 'VP-001', 'VP-002', 'VP-003', 'VP-004']
+
+    # Um registro novo antes dos carregados entra no topo, como na consulta
+    with closing(sqlite_dialect.connect()) as conn:
+        conn.execute("INSERT INTO equipamentos (tag, categoria, empresa_id) "
+                     "VALUES ('VP-00!', 'Vaso de Pressão', 1)")
+        conn.commit()
+    model.reload()
+    assert [model.value(row, 0) for row in range(model.rowCount())] == [
+        'VP-00!', 'VP-000', 'VP-001', 'VP-002', 'VP-003']
+    assert all(model.row_of(model.key_at(row)) == row for row in range(model.rowCount()))
+
+    # Recarga sem mudança de ordem continua incremental (sem reiniciar o modelo)
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+    model.reload()
+    assert resets == []
+    model.fetchMore()
+    assert model.rowCount() == 10
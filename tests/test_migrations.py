@@ -0,0 +1,115 @@
+"""
+Migrações versionadas (`database/migrations.py`) no backend SQLite.
+
+Cada comando enviado ao banco é registrado para conferir o caminho rápido
+(esquema atualizado: só leituras) e o --dry-run (nada gravado).
+"""
+import logging
+import pytest
+from database.dialects import SqliteDialect
+from database.indexes import QUERY_INDEXES
+from database.migrations import (MIGRACOES, SCHEMA_VERSION_TABLE, Migracao, criar_indices_consultas,
+                                 executar_migracoes, migracoes_pendentes)
+from database.pool import ConnectionPool
+
+
+class BancoRastreado:
+    """Banco SQLite vazio cujas conexões guardam os comandos executados em `comandos`."""
+
+    def __init__(self, path: str):
+        self.dialect = SqliteDialect(path)
+        self.comandos = []
+        self.pool = ConnectionPool(self._connect, max_size=1)
+
+    def _connect(self):
+        conn = self.dialect.connect()
+        conn.set_trace_callback(self.comandos.append)
+        return conn
+
+    def consultar(self, sql: str) -> list:
+        with self.pool.connection() as conn:
+            return conn.execute(sql).fetchall()
+
+    def gravacoes(self) -> list:
+        return [sql for sql in self.comandos if not sql.lstrip().upper().startswith('SELECT')]
+
+
+@pytest.fixture
+def banco(tmp_path):
+    banco = BancoRastreado(str(tmp_path / 'nr13.db'))
+    yield banco
+    banco.pool.close_all()
+
+
+def test_cria_o_esquema_e_registra_as_migracoes(banco):
+    assert executar_migracoes(db=banco)
+
+    assert banco.consultar(f"SELECT versao, checksum FROM {SCHEMA_VERSION_TABLE} ORDER BY versao") == [
+        (m.versao, m.checksum) for m in MIGRACOES]
+    assert banco.consultar("SELECT COUNT(*) FROM usuarios") == [(0,)]
+
+
+def test_esquema_atualizado_nao_executa_ddl(banco):
+    assert executar_migracoes(db=banco)
+    banco.comandos.clear()
+
+    assert executar_migracoes(db=banco)
+
+    assert banco.comandos
+    assert banco.gravacoes() == []
+
+
+def test_dry_run_nao_grava(banco, caplog):
+    with caplog.at_level(logging.INFO, logger='database.migrations'):
+        assert executar_migracoes(dry_run=True, db=banco)
+
+    assert banco.gravacoes() == []
+    assert banco.consultar("SELECT name FROM sqlite_master") == []
+    assert [r.getMessage().split(' - ')[0] for r in caplog.records if r.getMessage().startswith('Pendente')] == [
+        f"Pendente: {m.versao}" for m in MIGRACOES]
+
+
+def test_dry_run_lista_so_a_pendente(banco, caplog):
+    assert executar_migracoes(db=banco)
+    ultima = MIGRACOES[-1]
+    with banco.pool.connection() as conn:
+        conn.execute(f"DELETE FROM {SCHEMA_VERSION_TABLE} WHERE versao = ?", (ultima.versao,))
+        conn.commit()
+    banco.comandos.clear()
+
+    with caplog.at_level(logging.INFO, logger='database.migrations'):
+        assert executar_migracoes(dry_run=True, db=banco)
+
+    assert banco.gravacoes() == []
+    assert [r.getMessage() for r in caplog.records if r.getMessage().startswith('Pendente')] == [
+        f"Pendente: {ultima.versao} - {ultima.descricao} ({ultima.checksum[:12]})"]
+    assert executar_migracoes(db=banco)
+    assert banco.consultar(f"SELECT COUNT(*) FROM {SCHEMA_VERSION_TABLE}") == [(len(MIGRACOES),)]
+
+
+def test_migracao_alterada_depois_de_aplicada(banco, caplog):
+    assert executar_migracoes(db=banco)
+    with banco.pool.connection() as conn:
+        conn.execute(f"UPDATE {SCHEMA_VERSION_TABLE} SET checksum = ? WHERE versao = 6", ('0' * 64,))
+        conn.commit()
+    banco.comandos.clear()
+
+    with caplog.at_level(logging.WARNING, logger='database.migrations'):
+        assert executar_migracoes(db=banco)
+
+    avisos = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert avisos == [f"Migração 6 ({MIGRACOES[5].descricao}) foi alterada depois de aplicada; "
+                      f"crie uma nova versão em vez de editá-la"]
+    # A alterada não é reaplicada
+    assert banco.gravacoes() == []
+
+
+def test_checksum_cobre_o_codigo_e_os_dados():
+    indices = next(m for m in MIGRACOES if m.aplicar is criar_indices_consultas)
+    assert indices.checksum == Migracao(6, "Outra descrição", criar_indices_consultas, (QUERY_INDEXES,)).checksum
+    assert indices.checksum != Migracao(6, indices.descricao, criar_indices_consultas, (QUERY_INDEXES[:-1],)).checksum
+
+    aplicadas = {m.versao: m.checksum for m in MIGRACOES}
+    assert migracoes_pendentes(aplicadas) == []
+    del aplicadas[MIGRACOES[-1].versao]
+    assert migracoes_pendentes(aplicadas) == [MIGRACOES[-1]]
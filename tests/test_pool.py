@@ -0,0 +1,110 @@
+"""
+Leituras concorrentes pelo `ConnectionPool`.
+
+Antes do pool, todas as telas e tarefas usavam uma única conexão
+compartilhada, e as consultas esperavam umas pelas outras. Aqui essa conexão
+é representada por um pool de tamanho 1. A latência de rede do SQL Server é
+simulada com uma espera fixa por consulta, durante a qual o driver (pyodbc ou
+sqlite3) libera o GIL; assim o resultado não depende do número de núcleos da
+máquina.
+"""
+import threading
+import time
+from contextlib import closing
+import pytest
+from database.pool import ConnectionPool, PoolTimeoutError
+
+# Espera simulada (s) de cada consulta ao servidor
+LATENCIA = 0.02
+LEITORES = 8
+CONSULTAS_POR_LEITOR = 5
+
+
+class _CursorComLatencia:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, *params):
+        time.sleep(LATENCIA)
+        self._cursor.execute(sql, *params)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _ConexaoComLatencia:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return _CursorComLatencia(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def conectar(sqlite_dialect):
+    with closing(sqlite_dialect.connect()) as conn:
+        conn.executemany("INSERT INTO equipamentos (tag, categoria) VALUES (?, ?)",
+                         [(f"V-{n:04d}", 'Vaso de Pressão') for n in range(500)])
+        conn.commit()
+    return lambda: _ConexaoComLatencia(sqlite_dialect.connect())
+
+
+def _leituras_concorrentes(pool: ConnectionPool) -> tuple[float, list]:
+    """Dispara LEITORES threads lendo ao mesmo tempo; devolve o tempo total e as contagens."""
+    contagens = []
+    lock = threading.Lock()
+    largada = threading.Barrier(LEITORES)
+
+    def ler():
+        largada.wait()
+        for _ in range(CONSULTAS_POR_LEITOR):
+            with pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("SELECT COUNT(*) FROM equipamentos WHERE tag LIKE 'V-%'")
+                with lock:
+                    contagens.append(cursor.fetchone()[0])
+
+    threads = [threading.Thread(target=ler) for _ in range(LEITORES)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio, contagens
+
+
+def test_leitores_concorrentes_superam_conexao_unica(conectar):
+    unica = ConnectionPool(conectar, min_size=1, max_size=1, timeout=60)
+    pool = ConnectionPool(conectar, min_size=1, max_size=LEITORES, timeout=60)
+    try:
+        tempo_unica, contagens_unica = _leituras_concorrentes(unica)
+        tempo_pool, contagens_pool = _leituras_concorrentes(pool)
+    finally:
+        unica.close_all()
+        pool.close_all()
+
+    total = LEITORES * CONSULTAS_POR_LEITOR
+    assert contagens_unica == [500] * total
+    assert contagens_pool == [500] * total
+    # Conexão única: as consultas enfileiram (~total × LATENCIA)
+    assert tempo_unica >= total * LATENCIA
+    # Pool: os leitores esperam a rede ao mesmo tempo
+    assert tempo_pool < tempo_unica / 3, (
+        f"pool {tempo_pool * 1000:.0f} ms x conexão única {tempo_unica * 1000:.0f} ms")
+    assert pool.size <= LEITORES
+
+
+def test_pool_cheio_respeita_timeout(conectar):
+    pool = ConnectionPool(conectar, min_size=1, max_size=1, timeout=0.1)
+    try:
+        with pool.connection():
+            with pytest.raises(PoolTimeoutError):
+                pool.acquire()
+        with pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT COUNT(*) FROM equipamentos")
+            assert cursor.fetchone()[0] == 500
+    finally:
+        pool.close_all()
@@ -0,0 +1,36 @@
+"""
+Planos das consultas dos controladores (`database/query_plans.py`).
+
+Os casos chamam os métodos reais dos controladores e serviços; qualquer
+leitura completa de tabela ou ordenação em árvore temporária falha o teste.
+"""
+import pytest
+from database.query_plans import PLAN_CASES, check_plans, plan_problems
+
+
+@pytest.fixture(scope='module')
+def planos():
+    return check_plans()
+
+
+@pytest.mark.parametrize('consulta', [name for name, _chamada in PLAN_CASES])
+def test_consulta_usa_indice(planos, consulta):
+    executadas, problemas = planos[consulta]
+    assert not problemas, "\n".join(f"{sql}\n  -> {plan}" for sql, plan in executadas)
+
+
+def test_plan_problems():
+    assert plan_problems(['SEARCH e USING INDEX IX_equipamentos_tag (tag>?)']) == []
+    assert plan_problems(['SCAN controle_versao']) == []
+    assert plan_problems(['SCAN i USING INDEX IX_inspecoes_data', 'USE TEMP B-TREE FOR GROUP BY']) == []
+    assert plan_problems(['SCAN e', 'USE TEMP B-TREE FOR ORDER BY']) == [
+        'SCAN e', 'USE TEMP B-TREE FOR ORDER BY']
+    assert plan_problems(['SEARCH e USING INDEX IX_equipamentos_empresa_tag (empresa_id=?)',
+                          'USE TEMP B-TREE FOR RIGHT PART OF ORDER BY']) == [
+        'USE TEMP B-TREE FOR RIGHT PART OF ORDER BY']
+
+
+def test_sem_indices_as_consultas_leem_as_tabelas():
+    # Garante que a verificação enxerga os planos: sem os índices quase tudo falha
+    resultados = check_plans(with_indexes=False)
+    assert sum(bool(problemas) for _executadas, problemas in resultados.values()) > len(PLAN_CASES) // 2
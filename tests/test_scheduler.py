@@ -0,0 +1,128 @@
+"""
+Agendador de tarefas (`services/scheduler.py`): cálculo do próximo disparo e
+reserva de cada disparo no banco quando dois agendadores disputam a mesma
+tarefa.
+"""
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from conftest import BancoDeTeste
+from services.scheduler import (GATILHO_DIARIO, GATILHO_INTERVALO, GATILHO_UNICO, Scheduler,
+                                proximo_disparo)
+
+
+@pytest.mark.parametrize('depois, esperado', [
+    (datetime(2024, 5, 1, 8, 0), datetime(2024, 5, 1, 9, 30)),
+    # No próprio horário o disparo já passou
+    (datetime(2024, 5, 1, 9, 30), datetime(2024, 5, 2, 9, 30)),
+    (datetime(2024, 5, 1, 9, 30, 0, 1), datetime(2024, 5, 2, 9, 30)),
+    (datetime(2024, 2, 28, 23, 0), datetime(2024, 2, 29, 9, 30)),
+    (datetime(2024, 12, 31, 10, 0), datetime(2025, 1, 1, 9, 30)),
+])
+def test_diario_vira_o_dia(depois, esperado):
+    assert proximo_disparo(GATILHO_DIARIO, '09:30', depois) == esperado
+
+
+@pytest.mark.parametrize('depois', [
+    datetime(2024, 5, 1, 10, 0),
+    datetime(2024, 5, 1, 10, 0, 0, 999999),
+    datetime(2024, 12, 31, 23, 59, 59, 500000),
+])
+@pytest.mark.parametrize('segundos', ['1', '300'])
+def test_intervalo_estritamente_depois(depois, segundos):
+    disparo = proximo_disparo(GATILHO_INTERVALO, segundos, depois)
+    assert disparo > depois
+    assert disparo.microsecond == 0
+    assert (disparo - depois.replace(microsecond=0)).total_seconds() == int(segundos)
+
+
+def test_unico_e_gatilho_desconhecido():
+    assert proximo_disparo(GATILHO_UNICO, None, datetime(2024, 5, 1)) is None
+    with pytest.raises(ValueError):
+        proximo_disparo('semanal', None, datetime(2024, 5, 1))
+
+
+@pytest.fixture
+def agendadores(db_models):
+    """Dois agendadores sobre o mesmo banco, cada um com o seu pool (dois processos)."""
+    outro = BancoDeTeste(db_models.db.dialect)
+    yield Scheduler(workers=1, db_models=db_models), Scheduler(workers=1, db_models=SimpleNamespace(db=outro))
+    outro.pool.close_all()
+
+
+def _disputar(agendadores, tarefa_id, seguinte) -> list:
+    """Os dois agendadores leem as tarefas e tentam reservar o mesmo disparo ao mesmo tempo."""
+    for agendador in agendadores:
+        agendador._ler_tarefas()
+    largada = threading.Barrier(len(agendadores))
+    resultados = [None] * len(agendadores)
+
+    def reservar(indice, agendador):
+        tarefa = agendador._tarefas[tarefa_id]
+        largada.wait()
+        resultados[indice] = agendador._reservar(tarefa, seguinte(tarefa))
+
+    threads = [threading.Thread(target=reservar, args=item) for item in enumerate(agendadores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultados
+
+
+def test_disparo_recorrente_reservado_uma_vez(agendadores):
+    primeiro, _outro = agendadores
+    primeiro.agendar('entrega', 'entrega_emails', GATILHO_INTERVALO, '300',
+                     quando=datetime(2024, 5, 1, 10, 0))
+    primeiro._ler_tarefas()
+    tarefa_id = next(iter(primeiro._tarefas))
+
+    for rodada in range(20):
+        resultados = _disputar(agendadores, tarefa_id, lambda tarefa: proximo_disparo(
+            tarefa.gatilho, tarefa.parametro, tarefa.proxima_execucao))
+        assert sorted(resultados) == [False, True], f"rodada {rodada}"
+
+    primeiro._ler_tarefas()
+    assert primeiro._tarefas[tarefa_id].proxima_execucao == datetime(2024, 5, 1, 11, 40)
+
+
+def test_disparo_unico_reservado_uma_vez(agendadores):
+    primeiro, _outro = agendadores
+    primeiro.schedule_inspection_report(7, datetime(2024, 5, 1, 10, 0))
+    primeiro._ler_tarefas()
+    tarefa_id = next(iter(primeiro._tarefas))
+
+    assert sorted(_disputar(agendadores, tarefa_id, lambda tarefa: None)) == [False, True]
+    primeiro._ler_tarefas()
+    assert primeiro._tarefas == {}
+
+
+class _Executor:
+    """Executor que só registra as tarefas enviadas."""
+
+    def __init__(self):
+        self.enviadas = []
+
+    def submit(self, funcao, tarefa, previsto):
+        self.enviadas.append((tarefa.nome, previsto))
+        return SimpleNamespace(add_done_callback=lambda callback: None)
+
+
+def test_so_um_agendador_executa_o_disparo(agendadores):
+    primeiro, segundo = agendadores
+    previsto = datetime(2024, 5, 1, 3, 0)
+    primeiro.agendar('coleta', 'coleta_documentos', GATILHO_DIARIO, '03:00', quando=previsto)
+    executor = _Executor()
+    agora = datetime(2024, 5, 1, 3, 0, 2)
+
+    for agendador in agendadores:
+        agendador._ler_tarefas()
+    for agendador in agendadores:
+        tarefa = next(iter(agendador._tarefas.values()))
+        agendador._disparar(executor, tarefa, agora)
+
+    assert executor.enviadas == [('coleta', previsto)]
+    # O perdedor também passa para o próximo disparo ao reler a tabela
+    segundo._ler_tarefas()
+    assert [t.proxima_execucao for t in segundo._tarefas.values()] == [datetime(2024, 5, 2, 3, 0)]
@@ -0,0 +1,73 @@
+"""
+Filtro de busca (`SearchProxyModel`) sobre um `ColumnTableModel`.
+
+Depois de cada alteração do modelo, as linhas exibidas pelo proxy devem ser
+exatamente as que uma varredura completa aceitaria.
+"""
+import pytest
+from ui.table_filter import SearchProxyModel, fold_text
+from ui.table_model import ColumnTableModel, Column
+
+
+def _equipamento(n, tag=None):
+    return {'id': n, 'tag': tag or f"VP-{n:03d}", 'empresa_id': n % 3,
+            'fabricante': ('Metalúrgica ABC', 'Caldeiras XYZ')[n % 2]}
+
+
+@pytest.fixture
+def modelos():
+    model = ColumnTableModel([
+        Column("Tag", lambda e: e['tag'], user_role=lambda e: e['id']),
+        Column("Empresa", lambda e: f"Empresa {e['empresa_id']}", user_role=lambda e: e['empresa_id']),
+        Column("Fabricante", lambda e: e['fabricante']),
+    ])
+    model.set_rows([_equipamento(n) for n in range(1, 101)])
+    return model, SearchProxyModel(model)
+
+
+def _exibidas(proxy):
+    return [proxy.data(proxy.index(row, 0)) for row in range(proxy.rowCount())]
+
+
+def _esperadas(model, texto='', empresa=None):
+    needle = fold_text(texto)
+    return [model.value(row, 0) for row in range(model.rowCount())
+            if needle in model.search_text(row)
+            and (empresa is None or model.role_value(row, 1) == empresa)]
+
+
+def test_busca_e_filtro_de_coluna(modelos):
+    model, proxy = modelos
+    assert proxy.rowCount() == 100
+
+    proxy.set_search_text('metalurgica')
+    assert _exibidas(proxy) == _esperadas(model, 'metalurgica')
+    proxy.set_search_text('metalurgica abc')
+    assert _exibidas(proxy) == _esperadas(model, 'metalurgica abc')
+
+    proxy.set_column_filter(1, 2)
+    assert _exibidas(proxy) == _esperadas(model, 'metalurgica abc', 2)
+    assert all(model.role_value(proxy.source_row(row), 1) == 2 for row in range(proxy.rowCount()))
+
+    proxy.set_search_text('')
+    proxy.set_column_filter(1, None)
+    assert proxy.rowCount() == 100
+
+
+def test_alteracoes_do_modelo_com_filtro(modelos):
+    model, proxy = modelos
+    proxy.set_search_text('vp-0')
+
+    model.upsert([_equipamento(5, tag='TQ-005'), _equipamento(150, tag='VP-0150')])
+    assert _exibidas(proxy) == _esperadas(model, 'vp-0')
+    assert 'TQ-005' not in _exibidas(proxy)
+
+    model.upsert([_equipamento(5, tag='VP-0005')])
+    model.remove_keys([1, 2, 50, 150])
+    assert _exibidas(proxy) == _esperadas(model, 'vp-0')
+
+    index = proxy.index(3, 0)
+    assert proxy.mapFromSource(proxy.mapToSource(index)) == index
+
+    model.set_rows([_equipamento(n) for n in range(1, 11)])
+    assert _exibidas(proxy) == _esperadas(model, 'vp-0')
@@ -0,0 +1,45 @@
+"""
+Tarefas em segundo plano (`ui.workers`) junto com o desenho da interface.
+
+Criar um QPixmap na thread da interface enquanto há consultas no pool das
+tarefas não pode travar a janela. A verificação roda em um processo
+separado, com tempo limite, porque o travamento não tem volta.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCRIPT = textwrap.dedent("""
+    import sys
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QPixmap
+    from PyQt5.QtCore import QRunnable, QThreadPool
+    from ui.workers import task_pool
+
+    class Consulta(QRunnable):
+        def run(self):
+            sum(range(200000))
+
+    app = QApplication(sys.argv)
+    # Com uma só thread, como em uma máquina de um núcleo
+    pool = task_pool()
+    pool.setMaxThreadCount(1)
+    QThreadPool.globalInstance().setMaxThreadCount(1)
+    tarefas = [Consulta() for _ in range(5)]
+    for tarefa in tarefas:
+        pool.start(tarefa)
+    print(QPixmap('ui/user.png').isNull())
+    pool.waitForDone()
+""")
+
+
+def test_pixmap_com_consultas_no_pool_das_tarefas():
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPATH=RAIZ)
+    resultado = subprocess.run([sys.executable, '-c', _SCRIPT], cwd=RAIZ, env=env,
+                               capture_output=True, text=True, timeout=30)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.split() == ['False']
+
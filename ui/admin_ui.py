@@ -3,23 +3,30 @@ Interface gráfica do administrador do sistema.
 """
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QTableWidget, QTableWidgetItem, QTableView,
     QMessageBox, QTabWidget, QLineEdit, QComboBox,
     QDateEdit, QTextEdit, QFileDialog, QToolButton, QMenu,
     QHeaderView, QDialog, QGridLayout, QFormLayout, QInputDialog,
     QAction, QApplication
 )
 from PyQt5.QtCore import Qt, QDate, QSize, QTimer, pyqtSignal
-from datetime import datetime, timedelta
 import logging
 from controllers.auth_controller import AuthController
 from database.models import DatabaseModels
+from database.change_tracking import ChangeTracker
+from ui.workers import TableLoader
+from ui.export_dialog import ExportRunner
+from ui.table_model import ColumnTableModel, PagedTableModel, Column, display_text
+from ui.table_filter import TableWidgetSearch, debounce
 from ui.styles import Styles
+from utils.helpers import as_date, format_db_date
 from PyQt5.QtGui import QIcon, QPixmap, QFont, QColor
 from ui.modals import UserModal, EquipmentModal, InspectionModal, ReportModal, MaintenanceModal
 from controllers.equipment_controller import EquipmentController
 from controllers.inspection_controller import InspectionController
 from controllers.report_controller import ReportController
+from controllers.dashboard_controller import DashboardController, CONTADOR_DA_URGENCIA
+from services.equipment_import import EquipmentImporter
 import traceback
 import os
 import threading
@@ -46,6 +53,10 @@ class AdminWindow(QMainWindow):
             self.inspection_controller = InspectionController(self.db_models)
             logger.debug("Criando instância do ReportController")
             self.report_controller = ReportController(self.db_models)
+            self.dashboard_controller = DashboardController(self.db_models)
+            # Consultas das tabelas rodam fora da thread da interface
+            self.table_loader = TableLoader(self)
+            self.export_runner = ExportRunner(self, self.db_models)
             self.is_dark = True
             
             # Definir ícones SVG
@@ -100,6 +111,11 @@ class AdminWindow(QMainWindow):
                     <line x1="16" y1="17" x2="8" y2="17"></line>
                     <polyline points="10 9 9 9 8 9"></polyline>
                 </svg>''',
+                'export': '''<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
+                    <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path>
+                    <polyline points="7 10 12 15 17 10"></polyline>
+                    <line x1="12" y1="15" x2="12" y2="3"></line>
+                </svg>''',
                 'theme': '''<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
                     <circle cx="12" cy="12" r="5"></circle>
                     <line x1="12" y1="1" x2="12" y2="3"></line>
@@ -129,13 +145,21 @@ class AdminWindow(QMainWindow):
             self.apply_theme()
             
             logger.debug("Carregando dados iniciais")
+            # Registra as versões atuais antes da carga para não perder alterações
+            # feitas enquanto as tabelas são preenchidas. Com a réplica local, as
+            # versões são as da réplica, de onde as listagens são lidas
+            self.change_tracker = ChangeTracker(self.db_models.db.read_pool())
+            self.change_tracker.poll()
+            
             # Carrega os dados iniciais antes de iniciar o timer
             self.load_users()
             self.load_equipment()
             self.load_inspections()
             self.load_reports()
+            self.load_dashboard()
             
-            # Configurar o timer para atualização das tabelas a cada 5 segundos
+            # Configurar o timer que verifica alterações a cada 5 segundos;
+            # só as tabelas alteradas são recarregadas
             self.refresh_timer = QTimer(self)
             self.refresh_timer.timeout.connect(self.refresh_all_tables)
             self.refresh_timer.start(5000)  # 5000ms = 5 segundos
@@ -484,7 +508,7 @@ class AdminWindow(QMainWindow):
             self.search_input.setMinimumWidth(200)
             self.search_input.setMaximumWidth(300)
             self.search_input.setMinimumHeight(32)
-            self.search_input.textChanged.connect(self.filter_users)
+            debounce(self.search_input, self.filter_users)
             
             # Estilo da barra de pesquisa
             self.search_input.setStyleSheet("""
@@ -508,6 +532,7 @@ class AdminWindow(QMainWindow):
             
             # Tabela de usuários
             self.user_table = QTableWidget()
+            self.user_search = TableWidgetSearch(self.user_table)
             self.user_table.setColumnCount(5)  # Aumentado para 5 colunas (adicionado Empresa)
             self.user_table.setHorizontalHeaderLabels([
                 "Nome", "Email", "Tipo Acesso", "Status", "Empresa"
@@ -560,6 +585,15 @@ class AdminWindow(QMainWindow):
             self.maintenance_button = self.create_crud_button('maintenance', "Registrar Manutenção", self.register_maintenance, show_text=True, text="Registrar Manutenção")
             equipment_buttons_container.addWidget(self.maintenance_button)
             
+            # Botão Importar Planilha
+            logger.debug("Criando botão de importação de equipamentos")
+            self.import_equipment_button = self.create_crud_button('add', "Importar equipamentos de uma planilha CSV/XLSX", self.import_equipment, show_text=True, text="Importar Planilha")
+            equipment_buttons_container.addWidget(self.import_equipment_button)
+            
+            # Botão Exportar
+            self.export_equipment_button = self.create_crud_button('export', "Exportar equipamentos para XLSX/CSV", lambda: self.export_runner.start('equipamentos'), show_text=True, text="Exportar")
+            equipment_buttons_container.addWidget(self.export_equipment_button)
+            
             # Definir visibilidade inicial dos botões que requerem seleção
             self.edit_equipment_button.setEnabled(False)
             self.toggle_equipment_button.setEnabled(False)
@@ -578,8 +612,8 @@ class AdminWindow(QMainWindow):
             
             # Campo de pesquisa
             self.equipment_search_box = QLineEdit()
-            self.equipment_search_box.setPlaceholderText("Digite para filtrar...")
-            self.equipment_search_box.textChanged.connect(self.filter_equipment)
+            self.equipment_search_box.setPlaceholderText("Início da tag...")
+            debounce(self.equipment_search_box, self.filter_equipment)
             equipment_search_container.addWidget(self.equipment_search_box)
             
             # Filtro por empresa
@@ -599,20 +633,43 @@ class AdminWindow(QMainWindow):
             
             # Tabela de Equipamentos
             logger.debug("Criando tabela de equipamentos")
-            self.equipment_table = QTableWidget()
-            self.equipment_table.setColumnCount(16)  # Ajustado para os campos de manutenção
-            self.equipment_table.setHorizontalHeaderLabels([
-                "Tag", "Categoria", "Empresa", "Fabricante", "Ano", "P. Projeto",
-                "P. Trabalho", "Volume", "Fluido", "Status", "Cat. NR13", "PMTA", "Placa ID", 
-                "Nº Registro", "Última Manutenção", "Próxima Manutenção"
-            ])
+            self.equipment_table = QTableView()
+            # Páginas ordenadas por tag, carregadas conforme a rolagem; a busca
+            # e a empresa selecionada filtram a própria consulta (ver filter_equipment)
+            self.equipment_model = PagedTableModel(
+                [
+                    Column("Tag", lambda e: display_text(e.get('tag')), user_role=lambda e: e.get('id')),
+                    Column("Categoria", lambda e: display_text(e.get('categoria'))),
+                    Column("Empresa", lambda e: e['empresa_nome'], user_role=lambda e: e.get('empresa_id')),
+                    Column("Fabricante", lambda e: display_text(e.get('fabricante'))),
+                    Column("Ano", lambda e: display_text(e.get('ano_fabricacao'))),
+                    Column("P. Projeto", lambda e: display_text(e.get('pressao_projeto'))),
+                    Column("P. Trabalho", lambda e: display_text(e.get('pressao_trabalho'))),
+                    Column("Volume", lambda e: display_text(e.get('volume'))),
+                    Column("Fluido", lambda e: display_text(e.get('fluido'))),
+                    Column("Status", lambda e: "Ativo" if e.get('ativo', 1) else "Inativo"),
+                    Column("Cat. NR13", lambda e: display_text(e.get('categoria_nr13'))),
+                    Column("PMTA", lambda e: display_text(e.get('pmta'))),
+                    Column("Placa ID", lambda e: display_text(e.get('placa_identificacao'))),
+                    Column("Nº Registro", lambda e: display_text(e.get('numero_registro'))),
+                    Column("Última Manutenção", lambda e: e['ultima_manutencao_str']),
+                    Column("Próxima Manutenção", lambda e: e['proxima_manutencao_str']),
+                ],
+                self.table_loader, 'equipamentos', self._fetch_equipment_page,
+                page_key=lambda e: (e.get('tag'), e.get('id')),
+                count=self._count_equipment,
+                row_state=lambda e: e['urgencia'],
+                colors=self._equipment_urgency_colors,
+                parent=self
+            )
+            self.equipment_table.setModel(self.equipment_model)
             
             # Configurar tabela para não mostrar números de linha
             self.equipment_table.verticalHeader().setVisible(False)
             
             # Configurar comportamento de seleção
-            self.equipment_table.setSelectionBehavior(QTableWidget.SelectRows)
-            self.equipment_table.setSelectionMode(QTableWidget.SingleSelection)
+            self.equipment_table.setSelectionBehavior(QTableView.SelectRows)
+            self.equipment_table.setSelectionMode(QTableView.SingleSelection)
             
             # Configurar cabeçalhos para preencher a tabela
             self.equipment_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -624,10 +681,18 @@ class AdminWindow(QMainWindow):
             equipment_header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Empresa
             
             # Conectar sinal de seleção alterada para atualizar botões
-            self.equipment_table.itemSelectionChanged.connect(self.update_toggle_equipment_button)
+            self.equipment_table.selectionModel().selectionChanged.connect(self.update_toggle_equipment_button)
             
             equipment_layout.addWidget(self.equipment_table)
             
+            # Quantidade carregada / total (contagem consultada à parte)
+            self.equipment_count_label = QLabel()
+            equipment_layout.addWidget(self.equipment_count_label)
+            for sinal in (self.equipment_model.modelReset, self.equipment_model.rowsInserted,
+                          self.equipment_model.rowsRemoved):
+                sinal.connect(self.update_equipment_count_label)
+            self.equipment_model.totalChanged.connect(self.update_equipment_count_label)
+            
             # Aba de Inspeções - Removida chamada redundante, será configurada abaixo
             logger.debug("Configurando aba de inspeções")
             
@@ -661,6 +726,11 @@ class AdminWindow(QMainWindow):
             # Botão Visualizar
             self.view_report_btn = self.create_crud_button("view", "Visualizar", self.view_selected_report, show_text=True, text="Visualizar Relatório")
             buttons_container.addWidget(self.view_report_btn)
+            buttons_container.addSpacing(5)  # Espaçamento entre botões
+            
+            # Botão Exportar
+            self.export_report_btn = self.create_crud_button("export", "Exportar relatórios para XLSX/CSV", lambda: self.export_runner.start('relatorios'), show_text=True, text="Exportar")
+            buttons_container.addWidget(self.export_report_btn)
             
             top_container.addLayout(buttons_container)
             top_container.addStretch()
@@ -674,7 +744,7 @@ class AdminWindow(QMainWindow):
             self.report_search_input.setPlaceholderText("Pesquisar relatórios...")
             self.report_search_input.setFixedWidth(250)
             self.report_search_input.setMinimumHeight(36)
-            self.report_search_input.textChanged.connect(self.filter_reports)
+            debounce(self.report_search_input, lambda _texto: self.filter_reports())
             self.report_search_input.setStyleSheet("""
                 QLineEdit {
                     border: 1px solid #666;
@@ -695,6 +765,7 @@ class AdminWindow(QMainWindow):
             
             # Tabela de relatórios
             self.report_table = QTableWidget()
+            self.report_search = TableWidgetSearch(self.report_table)
             self.report_table.setColumnCount(5)  # Reduzido para 5 colunas (removido ID)
             self.report_table.setHorizontalHeaderLabels([
                 "Inspeção", "Data", "Arquivo", "Observações", "Status"
@@ -720,6 +791,7 @@ class AdminWindow(QMainWindow):
             self.tabs.addTab(inspection_tab, self.get_tab_icon("inspecoes.png"), "Inspeções")
             
             self.tabs.addTab(report_tab, self.get_tab_icon("relatorios.png"), "Relatórios")
+            self.tabs.addTab(self.setup_dashboard_tab(), self.get_tab_icon("relatorios.png"), "Conformidade")
             
             # Comentado: Não exibir mais a aba de Equipamentos por Empresa
             # company_equipment_tab = self.create_company_equipment_tab()
@@ -768,7 +840,7 @@ class AdminWindow(QMainWindow):
                 
                 # Estilos específicos para tabelas no modo escuro
                 table_style = """
-                    QTableWidget {
+                    QTableView {
                         background-color: #232629;
                         color: #ffffff;
                         gridline-color: #3a3d40;
@@ -781,7 +853,7 @@ class AdminWindow(QMainWindow):
                         border: 1px solid #3a3d40;
                         font-weight: bold;
                     }
-                    QTableWidget::item:selected {
+                    QTableView::item:selected {
                         background-color: #3a3d40;
                         color: #ffffff;
                     }
@@ -808,7 +880,7 @@ class AdminWindow(QMainWindow):
                 
                 # Estilos específicos para tabelas no modo claro
                 table_style = """
-                    QTableWidget {
+                    QTableView {
                         background-color: #ffffff;
                         color: #000000;
                         gridline-color: #d0d0d0;
@@ -821,7 +893,7 @@ class AdminWindow(QMainWindow):
                         border: 1px solid #d0d0d0;
                         font-weight: bold;
                     }
-                    QTableWidget::item:selected {
+                    QTableView::item:selected {
                         background-color: #e0e0e0;
                         color: #000000;
                     }
@@ -916,6 +988,12 @@ class AdminWindow(QMainWindow):
             # Forçar uma atualização visual das tabelas
             for table in [self.user_table, self.equipment_table, self.report_table]:
                 table.update()
+            
+            # Cores de urgência dependem do tema e são calculadas sob demanda
+            self.equipment_model.refresh_colors()
+            if hasattr(self, 'company_equipment_model'):
+                self.company_equipment_model.refresh_colors()
+            self.dashboard_model.refresh_colors()
                 
             # Força a atualização da tabela de inspeções
             if hasattr(self, 'inspection_tab') and hasattr(self.inspection_tab, 'inspection_table'):
@@ -940,10 +1018,16 @@ class AdminWindow(QMainWindow):
         QTimer.singleShot(10, self.apply_theme)  # Executar após 10ms para dar tempo à interface atualizar
         
     def load_users(self):
-        """Carrega os usuários na tabela"""
+        """Carrega os usuários na tabela em segundo plano"""
+        logger.debug("Carregando usuários")
+        self.table_loader.load(
+            'usuarios', self.auth_controller.get_all_users, self._populate_users,
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar usuários: {erro}")
+        )
+    
+    def _populate_users(self, users):
+        """Preenche a tabela de usuários"""
         try:
-            logger.debug("Carregando usuários")
-            users = self.auth_controller.get_all_users()
             self.user_table.setRowCount(len(users))
             
             for i, user in enumerate(users):
@@ -981,248 +1065,6 @@ class AdminWindow(QMainWindow):
             logger.error(traceback.format_exc())
             QMessageBox.critical(self, "Erro", f"Erro ao carregar usuários: {str(e)}")
             
-    def load_equipment(self):
-        """Carrega todos os equipamentos na tabela, incluindo o ID da empresa como UserRole na coluna Empresa"""
-        try:
-            logger.debug("Carregando equipamentos")
-            equipment = self.equipment_controller.get_all_equipment()
-            self.equipment_table.setRowCount(len(equipment))
-            
-            # Obter todas as empresas para usar como mapeamento ID -> Nome
-            empresas = self.auth_controller.get_companies()
-            empresa_map = {empresa['id']: empresa['nome'] for empresa in empresas}
-            
-            # Data atual para cálculos de manutenção
-            data_atual = datetime.now().date()
-            
-            for i, item in enumerate(equipment):
-                # Armazena o ID como dados do item (invisível para o usuário)
-                equip_id = item.get('id', '')
-                logger.debug(f"Carregando equipamento ID={equip_id}, Tag={item.get('tag', '')}")
-                
-                # Tag
-                tag_item = QTableWidgetItem(item.get('tag', ''))
-                tag_item.setData(Qt.UserRole, equip_id)  # Armazena o ID como dado do item
-                tag_item.setFlags(tag_item.flags() & ~Qt.ItemIsEditable)  # Remove a flag de editável
-                self.equipment_table.setItem(i, 0, tag_item)
-                
-                # Para debug - verifica se o ID foi armazenado corretamente
-                id_stored = tag_item.data(Qt.UserRole)
-                logger.debug(f"ID armazenado no item da tabela: {id_stored}")
-                
-                # Resto dos campos - todos configurados como não editáveis
-                categoria_item = QTableWidgetItem(item.get('categoria', ''))
-                categoria_item.setFlags(categoria_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 1, categoria_item)
-                
-                # Empresa - usando o nome em vez do ID
-                empresa_id = item.get('empresa_id', '')
-                empresa_nome = empresa_map.get(empresa_id, f"ID: {empresa_id}")
-                empresa_item = QTableWidgetItem(empresa_nome)
-                empresa_item.setData(Qt.UserRole, empresa_id)  # Armazena o ID como dado do item
-                empresa_item.setFlags(empresa_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 2, empresa_item)
-                
-                fabricante_item = QTableWidgetItem(item.get('fabricante', ''))
-                fabricante_item.setFlags(fabricante_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 3, fabricante_item)
-                
-                ano_item = QTableWidgetItem(str(item.get('ano_fabricacao', '')))
-                ano_item.setFlags(ano_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 4, ano_item)
-                
-                pressao_projeto_item = QTableWidgetItem(str(item.get('pressao_projeto', '')))
-                pressao_projeto_item.setFlags(pressao_projeto_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 5, pressao_projeto_item)
-                
-                pressao_trabalho_item = QTableWidgetItem(str(item.get('pressao_trabalho', '')))
-                pressao_trabalho_item.setFlags(pressao_trabalho_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 6, pressao_trabalho_item)
-                
-                volume_item = QTableWidgetItem(str(item.get('volume', '')))
-                volume_item.setFlags(volume_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 7, volume_item)
-                
-                fluido_item = QTableWidgetItem(item.get('fluido', ''))
-                fluido_item.setFlags(fluido_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 8, fluido_item)
-                
-                # Status
-                status = "Ativo" if item.get('ativo', 1) else "Inativo"
-                status_item = QTableWidgetItem(status)
-                status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 9, status_item)
-                
-                # Novos campos NR-13
-                categoria_nr13_item = QTableWidgetItem(item.get('categoria_nr13', ''))
-                categoria_nr13_item.setFlags(categoria_nr13_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 10, categoria_nr13_item)
-                
-                pmta_item = QTableWidgetItem(str(item.get('pmta', '')))
-                pmta_item.setFlags(pmta_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 11, pmta_item)
-                
-                placa_identificacao_item = QTableWidgetItem(item.get('placa_identificacao', ''))
-                placa_identificacao_item.setFlags(placa_identificacao_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 12, placa_identificacao_item)
-                
-                numero_registro_item = QTableWidgetItem(item.get('numero_registro', ''))
-                numero_registro_item.setFlags(numero_registro_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 13, numero_registro_item)
-                
-                # Campos de manutenção
-                # Última manutenção
-                data_ultima_manutencao = item.get('data_ultima_manutencao', '')
-                data_ultima_str = ''
-                data_ultima_obj = None
-                
-                if data_ultima_manutencao:
-                    try:
-                        if isinstance(data_ultima_manutencao, str):
-                            # Tratamento robusto para strings de data
-                            if len(data_ultima_manutencao) >= 10:
-                                data_ultima_obj = datetime.strptime(data_ultima_manutencao[:10], '%Y-%m-%d').date()
-                                data_ultima_str = data_ultima_obj.strftime('%d/%m/%Y')
-                            else:
-                                data_ultima_str = data_ultima_manutencao
-                                logger.warning(f"Formato de data inválido: {data_ultima_manutencao}")
-                        elif isinstance(data_ultima_manutencao, datetime):
-                            data_ultima_obj = data_ultima_manutencao.date()
-                            data_ultima_str = data_ultima_obj.strftime('%d/%m/%Y')
-                        else:
-                            data_ultima_str = str(data_ultima_manutencao)
-                            logger.warning(f"Tipo de data não reconhecido: {type(data_ultima_manutencao)}")
-                    except Exception as e:
-                        data_ultima_str = str(data_ultima_manutencao)
-                        logger.warning(f"Erro ao processar data de manutenção: {str(e)}")
-                
-                ultima_manutencao_item = QTableWidgetItem(data_ultima_str)
-                ultima_manutencao_item.setFlags(ultima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 14, ultima_manutencao_item)
-                
-                # Próxima manutenção
-                data_proxima_str = ''
-                frequencia = item.get('frequencia_manutencao', 0)
-                dias_restantes = None
-                
-                if data_ultima_manutencao and frequencia:
-                    try:
-                        # Se ainda não temos o objeto data_ultima_obj, tentar convertê-lo novamente
-                        if data_ultima_obj is None and isinstance(data_ultima_manutencao, str):
-                            try:
-                                if len(data_ultima_manutencao) >= 10:
-                                    data_ultima_obj = datetime.strptime(data_ultima_manutencao[:10], '%Y-%m-%d').date()
-                            except Exception:
-                                logger.warning(f"Não foi possível converter a data: {data_ultima_manutencao}")
-                        
-                        if data_ultima_obj:
-                            data_proxima = data_ultima_obj + timedelta(days=frequencia)
-                            data_proxima_str = data_proxima.strftime('%d/%m/%Y')
-                            
-                            # Calcular dias restantes
-                            dias_restantes = (data_proxima - data_atual).days
-                            
-                            # Aplicar indicadores visuais baseados na urgência da manutenção
-                            proxima_manutencao_item = QTableWidgetItem(data_proxima_str)
-                            proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                            self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-                            
-                            # Verifica se está atrasado ou próximo
-                            if dias_restantes < 0 and item.get('ativo', 1):  # Atrasado e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 10, 10)  # Vermelho muito escuro para tema escuro
-                                    cor_texto = QColor(255, 130, 130)  # Texto vermelho claro
-                                else:
-                                    cor_linha = QColor(255, 200, 200)  # Vermelho pastel
-                                    cor_texto = QColor(139, 0, 0)  # Vermelho escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção atrasada
-                                proxima_manutencao_item.setText("❗ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção ATRASADA")
-                            elif dias_restantes <= 7 and item.get('ativo', 1):  # Próximo (1 semana) e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 20, 20)  # Vermelho escuro para tema escuro
-                                    cor_texto = QColor(255, 150, 150)  # Texto vermelho claro
-                                else:
-                                    cor_linha = QColor(255, 200, 200)  # Vermelho claro
-                                    cor_texto = QColor(139, 0, 0)  # Texto escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção próxima
-                                proxima_manutencao_item.setText("❗ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção URGENTE (≤ 7 dias)")
-                            elif dias_restantes <= 15 and item.get('ativo', 1):  # Próximo (15 dias) e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 60, 10)  # Laranja escuro para tema escuro
-                                    cor_texto = QColor(255, 200, 120)  # Texto laranja claro
-                                else:
-                                    cor_linha = QColor(255, 230, 180)  # Laranja claro
-                                    cor_texto = QColor(102, 51, 0)  # Marrom escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção próxima
-                                proxima_manutencao_item.setText("⚠️ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção ALTA (≤ 15 dias)")
-                            elif dias_restantes <= 30 and item.get('ativo', 1):  # Próximo (30 dias) e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 90, 10)  # Amarelo escuro para tema escuro
-                                    cor_texto = QColor(255, 255, 150)  # Texto amarelo claro
-                                else:
-                                    cor_linha = QColor(255, 255, 180)  # Amarelo claro
-                                    cor_texto = QColor(102, 102, 0)  # Amarelo escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção próxima
-                                proxima_manutencao_item.setText("⚠️ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção MÉDIA (≤ 30 dias)")
-                        else:
-                            proxima_manutencao_item = QTableWidgetItem("Não programada")
-                            proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                            self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-                    except Exception as e:
-                        logger.error(f"Erro ao calcular próxima manutenção: {str(e)}")
-                        data_proxima_str = "Erro no cálculo"
-                        proxima_manutencao_item = QTableWidgetItem(data_proxima_str)
-                        proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                        self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-                else:
-                    proxima_manutencao_item = QTableWidgetItem("Não programada")
-                    proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                    self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-            
-            # Forçar atualização imediata da tabela
-            self.equipment_table.viewport().update()
-            logger.debug(f"Carregados {len(equipment)} equipamentos na tabela")
-        except Exception as e:
-            logger.error(f"Erro ao carregar equipamentos: {str(e)}")
-            logger.error(traceback.format_exc())
-            QMessageBox.critical(self, "Erro", f"Erro ao carregar equipamentos: {str(e)}")
-            
     def load_inspections(self):
         """Carrega as inspeções do banco de dados para a tabela"""
         try:
@@ -1234,16 +1076,18 @@ class AdminWindow(QMainWindow):
                 return
             
             # Código legado - só será executado se inspection_tab não existir
-            # Força a sincronização antes de carregar
-            self.inspection_controller.force_sync()
-            
-            # Carrega os equipamentos para referência
-            equipamentos = self.equipment_controller.get_all_equipment()
-            equipamentos_map = {equip['id']: equip for equip in equipamentos}
-            logger.debug(f"Carregados {len(equipamentos)} equipamentos")
-            
-            # Busca todas as inspeções
-            inspecoes = self.inspection_controller.get_all_inspections()
+            self.table_loader.load(
+                'inspecoes', self.inspection_controller.get_all_inspections, self._populate_inspections,
+                lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar inspeções: {erro}")
+            )
+        except Exception as e:
+            logger.error(f"Erro ao carregar inspeções: {str(e)}")
+            logger.error(traceback.format_exc())
+            QMessageBox.critical(self, "Erro", f"Erro ao carregar inspeções: {str(e)}")
+    
+    def _populate_inspections(self, inspecoes):
+        """Preenche a tabela de inspeções (código legado, sem InspectionTab)"""
+        try:
             self.inspection_table.setRowCount(len(inspecoes))
             
             for i, inspecao in enumerate(inspecoes):
@@ -1254,17 +1098,8 @@ class AdminWindow(QMainWindow):
                 self.inspection_table.setItem(i, 0, equip_item)
                 
                 # Data
-                data_str = inspecao.get('data_inspecao', '')
-                # Garante que data_str seja uma string
-                if isinstance(data_str, datetime):
-                    data_str = data_str.strftime('%d/%m/%Y')
-                elif isinstance(data_str, str) and len(data_str) >= 10:
-                    try:
-                        data_obj = datetime.strptime(data_str[:10], '%Y-%m-%d')
-                        data_str = data_obj.strftime('%d/%m/%Y')
-                    except ValueError:
-                        pass
-                data_item = QTableWidgetItem(str(data_str))
+                data_str = format_db_date(inspecao.get('data_inspecao'))
+                data_item = QTableWidgetItem(data_str)
                 self.inspection_table.setItem(i, 1, data_item)
                 
                 # Tipo
@@ -1287,14 +1122,16 @@ class AdminWindow(QMainWindow):
             QMessageBox.critical(self, "Erro", f"Erro ao carregar inspeções: {str(e)}")
             
     def load_reports(self):
-        """Carrega os relatórios na tabela"""
+        """Carrega os relatórios na tabela em segundo plano"""
+        logger.debug("Carregando relatórios")
+        self.table_loader.load(
+            'relatorios', self.report_controller.get_all_reports, self._populate_reports,
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar relatórios: {erro}")
+        )
+    
+    def _populate_reports(self, reports):
+        """Preenche a tabela de relatórios"""
         try:
-            logger.debug("Carregando relatórios")
-            
-            # Força a sincronização antes de carregar
-            self.report_controller.force_sync()
-            
-            reports = self.report_controller.get_all_reports()
             self.report_table.setRowCount(len(reports))
             
             for i, report in enumerate(reports):
@@ -1309,13 +1146,7 @@ class AdminWindow(QMainWindow):
                     self.report_table.setItem(i, 0, insp_item)
                     
                     # Data
-                    data_str = report.get('data_emissao', '')
-                    if isinstance(data_str, str) and len(data_str) >= 10:
-                        try:
-                            data_obj = datetime.strptime(data_str[:10], '%Y-%m-%d')
-                            data_str = data_obj.strftime('%d/%m/%Y')
-                        except ValueError:
-                            pass
+                    data_str = format_db_date(report.get('data_emissao'))
                     data_item = QTableWidgetItem(data_str)
                     self.report_table.setItem(i, 1, data_item)
                     
@@ -1430,20 +1261,90 @@ class AdminWindow(QMainWindow):
             QMessageBox.critical(self, "Erro", f"Erro ao adicionar equipamento: {str(e)}")
             logger.error(f"Erro no add_equipment: {traceback.format_exc()}")
             
+    def import_equipment(self):
+        """Importa equipamentos de uma planilha CSV/XLSX em segundo plano"""
+        try:
+            if self.table_loader.is_loading('importacao'):
+                QMessageBox.information(self, "Importação", "Já existe uma importação em andamento.")
+                return
+            
+            filename, _ = QFileDialog.getOpenFileName(
+                self,
+                "Importar Equipamentos",
+                "",
+                "Planilhas (*.csv *.xlsx);;Arquivos CSV (*.csv);;Arquivos Excel (*.xlsx)"
+            )
+            if not filename:
+                return
+            
+            companies = self.auth_controller.get_companies()
+            if not companies:
+                QMessageBox.warning(self, "Atenção", "Nenhuma empresa cadastrada para receber os equipamentos.")
+                return
+            nomes = [company['nome'] for company in companies]
+            nome, ok = QInputDialog.getItem(self, "Importar Equipamentos", "Empresa:", nomes, 0, False)
+            if not ok:
+                return
+            empresa_id = companies[nomes.index(nome)]['id']
+            
+            self.import_equipment_button.setEnabled(False)
+            logger.info(f"Importando equipamentos de {filename} para a empresa {nome}")
+            self.table_loader.load(
+                'importacao',
+                lambda: EquipmentImporter(self.db_models).importar(filename, empresa_id),
+                self._import_finished,
+                self._import_failed
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao importar equipamentos: {str(e)}")
+            logger.error(f"Erro no import_equipment: {traceback.format_exc()}")
+    
+    def _import_finished(self, resultado):
+        """Mostra o resumo da importação e recarrega a lista de equipamentos"""
+        self.import_equipment_button.setEnabled(True)
+        mensagem = f"{resultado.importados} equipamento(s) importado(s)."
+        if resultado.ja_importados:
+            mensagem += f"\n{resultado.ja_importados} linha(s) já importada(s) anteriormente."
+        if resultado.erros:
+            mensagem += (f"\n{len(resultado.erros)} linha(s) com erro. "
+                         f"Detalhes em:\n{resultado.relatorio_erros}")
+        if resultado.concluida:
+            QMessageBox.information(self, "Importação", mensagem)
+        else:
+            QMessageBox.warning(self, "Importação interrompida",
+                                f"{mensagem}\n\nErro: {resultado.interrompida}\n"
+                                "Importe o mesmo arquivo novamente para continuar de onde parou.")
+        if resultado.importados:
+            self.load_equipment()
+    
+    def _import_failed(self, erro):
+        self.import_equipment_button.setEnabled(True)
+        QMessageBox.critical(self, "Erro", f"Erro ao importar equipamentos: {erro}")
+            
     def add_inspection(self):
-        """Abre o modal para adicionar uma nova inspeção"""
+        """Busca em segundo plano as opções do formulário e abre o modal de nova inspeção"""
+        logging.info("Abrindo modal para adicionar nova inspeção")
+        self.table_loader.load(
+            'opcoes_inspecao', self._fetch_inspection_options, self._open_inspection_modal,
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao adicionar inspeção: {erro}")
+        )
+    
+    def _fetch_inspection_options(self):
+        """Equipamentos e engenheiros do formulário de inspeção (roda fora da thread da interface)"""
+        return self.equipment_controller.get_all_equipment(), self.auth_controller.get_engineers()
+    
+    def _open_inspection_modal(self, opcoes):
+        """Abre o modal de nova inspeção com as opções já carregadas"""
         try:
-            logging.info("Abrindo modal para adicionar nova inspeção")
+            equipamentos, engenheiros = opcoes
             
             # Verificar se há equipamentos cadastrados
-            equipamentos = self.equipment_controller.get_all_equipment()
             if not equipamentos:
                 QMessageBox.warning(self, "Atenção", "Não há equipamentos cadastrados. "
                                   "Cadastre pelo menos um equipamento antes de adicionar inspeções.")
                 return
                 
             # Verificar se há engenheiros cadastrados
-            engenheiros = self.auth_controller.get_engineers()
             if not engenheiros:
                 QMessageBox.warning(self, "Atenção", "Não há engenheiros cadastrados. "
                                   "Cadastre pelo menos um engenheiro antes de adicionar inspeções.")
@@ -1556,18 +1457,21 @@ class AdminWindow(QMainWindow):
             return False
     
     def load_equipment_to_combo(self, combo_box):
-        """Carrega equipamentos para o combo box especificado"""
-        try:
-            combo_box.clear()
-            equipamentos = self.equipment_controller.get_all_equipment()
-            
-            for equip in equipamentos:
-                # Adiciona a tag e armazena o ID como dados do item
-                combo_box.addItem(equip['tag'], equip['id'])
-                
-            logger.debug(f"Carregados {len(equipamentos)} equipamentos")
-        except Exception as e:
-            logger.error(f"Erro ao carregar equipamentos: {str(e)}")
+        """Carrega em segundo plano os equipamentos no combo box especificado"""
+        self.table_loader.load(
+            'combo_equipamentos', self.equipment_controller.get_all_equipment,
+            lambda equipamentos: self._populate_equipment_combo(combo_box, equipamentos),
+            lambda erro: logger.error(f"Erro ao carregar equipamentos: {erro}")
+        )
+    
+    def _populate_equipment_combo(self, combo_box, equipamentos):
+        """Preenche o combo box com as tags dos equipamentos"""
+        combo_box.clear()
+        for equip in equipamentos:
+            # Adiciona a tag e armazena o ID como dados do item
+            combo_box.addItem(equip['tag'], equip['id'])
+            
+        logger.debug(f"Carregados {len(equipamentos)} equipamentos")
     
     def filter_inspections(self):
         """Filtra a lista de inspeções com base no texto de pesquisa"""
@@ -1864,8 +1768,10 @@ class AdminWindow(QMainWindow):
                 logger.warning("Data da inspeção não encontrada, usando data atual")
                 insp_date = QDate.currentDate()
             
-            # Calcula a data da próxima inspeção (1 ano após)
-            proxima_date = insp_date.addYears(1)
+            # Próximo exame calculado pelos prazos NR-13 ao registrar a inspeção;
+            # sem data, a janela do laudo sugere pelos prazos da categoria
+            proxima = as_date(inspection.get('proxima_inspecao'))
+            proxima_date = QDate(proxima.year, proxima.month, proxima.day) if proxima else None
             
             # Busca dados do equipamento
             equipamento = self.equipment_controller.get_equipment_by_id(inspection['equipamento_id'])
@@ -2194,35 +2100,13 @@ class AdminWindow(QMainWindow):
     def filter_users(self, text):
         """Filtra os usuários na tabela baseado no texto de pesquisa"""
         try:
-            search_text = text.lower()
-            
             # Certifique-se de que o botão de remover esteja visível
             if not self.remove_user_button.isVisible():
                 logger.debug("Restaurando visibilidade do botão de remover")
                 self.remove_user_button.setVisible(True)
             
-            # Resetar visibilidade de todas as linhas se a pesquisa estiver vazia
-            if not search_text:
-                for row in range(self.user_table.rowCount()):
-                    self.user_table.setRowHidden(row, False)
-                logger.debug("Filtro de usuários limpo - mostrando todas as linhas")
-                return
-                
-            # Aplicar filtro apenas se houver texto de pesquisa
-            hidden_count = 0
-            for row in range(self.user_table.rowCount()):
-                should_show = False
-                for col in range(self.user_table.columnCount()):
-                    item = self.user_table.item(row, col)
-                    if item and search_text in item.text().lower():
-                        should_show = True
-                        break
-                
-                self.user_table.setRowHidden(row, not should_show)
-                if not should_show:
-                    hidden_count += 1
-                
-            logger.debug(f"Filtro aplicado: '{search_text}' - {hidden_count} linhas ocultas")
+            hidden_count = self.user_search.apply(text)
+            logger.debug(f"Filtro aplicado: '{text}' - {hidden_count} linhas ocultas")
                 
         except Exception as e:
             logger.error(f"Erro ao filtrar usuários: {str(e)}")
@@ -2369,24 +2253,14 @@ class AdminWindow(QMainWindow):
                 self.report_inspecao_combo.setCurrentIndex(index)
         
         # Data de emissão
-        if 'data_emissao' in report:
-            data_str = report['data_emissao']
-            if isinstance(data_str, str):
-                try:
-                    data_obj = QDate.fromString(data_str, "yyyy-MM-dd")
-                    self.report_data_input.setDate(data_obj)
-                except:
-                    pass
+        data = as_date(report.get('data_emissao'))
+        if data:
+            self.report_data_input.setDate(QDate(data.year, data.month, data.day))
                         
         # Data de validade
-        if 'data_validade' in report:
-            data_str = report['data_validade']
-            if isinstance(data_str, str):
-                try:
-                    data_obj = QDate.fromString(data_str, "yyyy-MM-dd")
-                    self.report_validade_input.setDate(data_obj)
-                except:
-                    pass
+        data = as_date(report.get('data_validade'))
+        if data:
+            self.report_validade_input.setDate(QDate(data.year, data.month, data.day))
         
         # Tipo de relatório
         tipo = report.get('tipo_relatorio', '')
@@ -2460,13 +2334,7 @@ class AdminWindow(QMainWindow):
             modal.inspecao_combo.clear()
             
             for insp in inspecoes:
-                data_str = insp.get('data_inspecao', '')
-                if isinstance(data_str, str) and len(data_str) >= 10:
-                    try:
-                        data_obj = datetime.strptime(data_str[:10], '%Y-%m-%d')
-                        data_str = data_obj.strftime('%d/%m/%Y')
-                    except ValueError:
-                        data_str = 'Data inválida'
+                data_str = format_db_date(insp.get('data_inspecao'), 'Data inválida')
                 
                 display_text = f"#{insp['id']} - {insp.get('tipo_inspecao', '')} ({data_str})"
                 modal.inspecao_combo.addItem(display_text, insp['id'])
@@ -2613,20 +2481,7 @@ class AdminWindow(QMainWindow):
     def filter_reports(self):
         """Filtra os relatórios na tabela com base nos critérios de filtro"""
         try:
-            search_text = self.report_search_input.text().lower()
-            
-            for row in range(self.report_table.rowCount()):
-                should_show = False
-                
-                # Verifica cada coluna da linha
-                for col in range(self.report_table.columnCount()):
-                    item = self.report_table.item(row, col)
-                    if item and search_text in item.text().lower():
-                        should_show = True
-                        break
-                
-                # Mostra ou esconde a linha
-                self.report_table.setRowHidden(row, not should_show)
+            self.report_search.apply(self.report_search_input.text())
                 
         except Exception as e:
             logger.error(f"Erro ao filtrar relatórios: {str(e)}")
@@ -2679,15 +2534,9 @@ class AdminWindow(QMainWindow):
     def filter_engineers(self, text):
         """Filtra a lista de engenheiros com base no texto digitado"""
         try:
-            search_text = text.lower().strip()
-            for row in range(self.engineers_table.rowCount()):
-                visible = False
-                for col in range(self.engineers_table.columnCount()):
-                    item = self.engineers_table.item(row, col)
-                    if item and search_text in item.text().lower():
-                        visible = True
-                        break
-                self.engineers_table.setRowHidden(row, not visible)
+            if not hasattr(self, 'engineers_search'):
+                self.engineers_search = TableWidgetSearch(self.engineers_table)
+            self.engineers_search.apply(text)
         except Exception as e:
             logger.error(f"Erro ao filtrar engenheiros: {str(e)}")
             logger.error(traceback.format_exc())
@@ -2712,13 +2561,7 @@ class AdminWindow(QMainWindow):
                 
             # Adiciona as inspeções ao combo
             for insp in inspecoes:
-                data_str = insp.get('data_inspecao', '')
-                if isinstance(data_str, str) and len(data_str) >= 10:
-                    try:
-                        data_obj = datetime.strptime(data_str[:10], '%Y-%m-%d')
-                        data_str = data_obj.strftime('%d/%m/%Y')
-                    except ValueError:
-                        data_str = 'Data inválida'
+                data_str = format_db_date(insp.get('data_inspecao'), 'Data inválida')
                 
                 display_text = f"#{insp['id']} - {insp.get('tipo_inspecao', '')} ({data_str})"
                 modal.inspecao_combo.addItem(display_text, insp['id'])
@@ -2746,41 +2589,6 @@ class AdminWindow(QMainWindow):
             logger.error(traceback.format_exc())
             QMessageBox.critical(self, "Erro", f"Erro ao abrir modal: {str(e)}")
 
-    def filter_equipment(self, text):
-        """Filtra os equipamentos na tabela com base no texto inserido e empresa selecionada"""
-        try:
-            search_text = text.lower()
-            logger.debug(f"Filtrando equipamentos com texto: '{search_text}'")
-            
-            company_id = self.equipment_company_selector.currentData()
-            logger.debug(f"Empresa selecionada ID={company_id}")
-            
-            for row in range(self.equipment_table.rowCount()):
-                should_show = True
-                
-                # Filtro por empresa
-                if company_id is not None:
-                    item_empresa = self.equipment_table.item(row, 2)  # Coluna Empresa
-                    if not item_empresa or int(item_empresa.data(Qt.UserRole)) != company_id:
-                        should_show = False
-                        
-                # Filtro por texto
-                if should_show and search_text:
-                    found = False
-                    for col in range(self.equipment_table.columnCount()):
-                        item = self.equipment_table.item(row, col)
-                        if item and search_text in item.text().lower():
-                            found = True
-                            break
-                    should_show = found
-                    
-                self.equipment_table.setRowHidden(row, not should_show)
-                
-            logger.debug("Filtro de equipamentos aplicado com sucesso")
-        except Exception as e:
-            logger.error(f"Erro ao filtrar equipamentos: {str(e)}")
-            logger.error(traceback.format_exc())
-    
     def get_equipment_id(self, row):
         """
         Obtém o ID do equipamento a partir de uma linha selecionada na tabela.
@@ -2793,17 +2601,16 @@ class AdminWindow(QMainWindow):
             tuple: (equipment_id, tag_text) ou (None, tag_text) se não encontrado
         """
         try:
-            # Garantir que estamos obtendo o item da primeira coluna
-            tag_item = self.equipment_table.item(row, 0)  # A coluna Tag contém o ID nos dados do item
-            if tag_item is None:
-                logger.error(f"Item da coluna Tag é None para a linha {row}")
+            # Garantir que a linha existe na tabela
+            if row < 0 or row >= self.equipment_model.rowCount():
+                logger.error(f"Linha {row} inexistente na tabela de equipamentos")
                 return None, ""
                 
-            tag_text = tag_item.text()
+            tag_text = self.equipment_model.value(row, 0)
             logger.debug(f"Tag do equipamento: {tag_text}")
             
-            # Tentativa 1: buscar ID pelo UserRole
-            equipment_id = tag_item.data(Qt.UserRole)
+            # Tentativa 1: buscar ID pelo UserRole da coluna Tag
+            equipment_id = self.equipment_model.role_value(row, 0)
             logger.debug(f"Tentativa 1 - ID do equipamento obtido via UserRole: {equipment_id}")
             
             # Tentativa 2: buscar pelo tag se UserRole falhar
@@ -3016,17 +2823,15 @@ class AdminWindow(QMainWindow):
         """Retorna o ID do equipamento selecionado na tabela"""
         try:
             # Verifica se há uma linha selecionada
-            selected_items = self.equipment_table.selectedItems()
-            if not selected_items:
+            selected_rows = self.equipment_table.selectionModel().selectedRows()
+            if not selected_rows:
                 logger.warning("Nenhuma linha selecionada na tabela de equipamentos")
                 return None
                 
-            # Obtém a linha selecionada
-            row = selected_items[0].row()
+            row = selected_rows[0].row()
             
-            # Tentativa 1: Obter via UserRole do próprio item
-            id_item = self.equipment_table.item(row, 0)  # Primeira coluna deve ter o ID como dado adicional
-            equipment_id = id_item.data(Qt.UserRole)
+            # Tentativa 1: Obter via UserRole da coluna Tag
+            equipment_id = self.equipment_model.role_value(row, 0)
             
             if equipment_id:
                 logger.debug(f"Tentativa 1 - ID do equipamento obtido via UserRole: {equipment_id}")
@@ -3041,7 +2846,7 @@ class AdminWindow(QMainWindow):
             #        return self.equipment_ids[row]
                     
             # Tentativa 3: Buscar pelo tag
-            tag_text = id_item.text()
+            tag_text = self.equipment_model.value(row, 0)
             if tag_text:
                 equipment = self.equipment_controller.get_equipment_by_tag(tag_text)
                 if equipment:
@@ -3102,24 +2907,40 @@ class AdminWindow(QMainWindow):
             logger.error(f"Erro ao mostrar aba de usuários: {str(e)}")
 
     def refresh_all_tables(self):
-        """Atualiza todas as tabelas do sistema com dados mais recentes"""
+        """Verifica em segundo plano quais tabelas mudaram no banco"""
+        # Uma verificação por vez: descartar um resultado perderia as alterações
+        if self.table_loader.is_loading('versoes'):
+            return
+        self.table_loader.load('versoes', self.change_tracker.poll, self._reload_changed_tables)
+    
+    def _reload_changed_tables(self, alteradas):
+        """Recarrega apenas as tabelas cujos dados mudaram no banco"""
         try:
-            logger.debug("Atualizando todas as tabelas")
+            if not alteradas:
+                return
+            
+            logger.debug(f"Atualizando tabelas afetadas por: {', '.join(sorted(alteradas))}")
+            
+            # O cadastro de empresas vem da tabela de usuários
+            if 'usuarios' in alteradas:
+                self.auth_controller.companies.invalidate()
+            # O resumo de conformidade é recalculado quando equipamentos ou inspeções mudam
+            if alteradas & {'equipamentos', 'inspecoes'}:
+                self.dashboard_controller.invalidate()
             
             # Obtém o índice da aba atual para manter o foco após atualização
             current_tab = self.tabs.currentIndex()
             
-            # Força a sincronização com o banco de dados em todos os controladores
-            self.auth_controller.force_sync()
-            self.equipment_controller.force_sync()
-            self.inspection_controller.force_sync()
-            self.report_controller.force_sync()
-            
-            # Atualiza cada tabela
-            self.load_users()
-            self.load_equipment()
-            self.load_inspections()
-            self.load_reports()
+            # Atualiza cada tabela cujas tabelas de origem foram alteradas
+            for carregar, origens in (
+                (self.load_users, {'usuarios'}),
+                (self.load_equipment, {'equipamentos', 'usuarios'}),
+                (self.load_inspections, {'inspecoes', 'equipamentos', 'usuarios'}),
+                (self.load_reports, {'relatorios', 'inspecoes', 'equipamentos', 'usuarios'}),
+                (self.load_dashboard, {'inspecoes', 'equipamentos', 'usuarios'}),
+            ):
+                if alteradas & origens:
+                    carregar()
             
             # Retorna para a aba que estava selecionada
             self.tabs.setCurrentIndex(current_tab)
@@ -3135,163 +2956,46 @@ class AdminWindow(QMainWindow):
         self.logout_requested.emit()
     
     def load_equipment_by_company(self, company_id=None):
-        """Carrega os equipamentos de uma empresa específica na tabela"""
-        # Verificar se a tabela existe
-
-        if not hasattr(self, 'company_equipment_table') or self.company_equipment_table is None:
-
-            logger.warning("Tabela de equipamentos por empresa não foi inicializada. Inicializando...")
-
-            self.company_equipment_table = QTableWidget()
-
-            self.company_equipment_table.setColumnCount(9)
-
-            self.company_equipment_table.setHorizontalHeaderLabels([
-
-                "Tag", "Categoria", "Fabricante", "Ano Fabricação", 
-
-                "Pressão Projeto", "Pressão Trabalho", "Volume", "Fluido", "Status"
-
-            ])
-
-
-        try:
-            logger.debug(f"Carregando equipamentos para empresa ID={company_id}")
-            if company_id is None:
-                # Se nenhuma empresa for selecionada, limpa a tabela
-                self.company_equipment_table.setRowCount(0)
-                return
-                
-            # Obter todos os equipamentos
-            all_equipment = self.equipment_controller.get_all_equipment()
-            
-            # Filtrar apenas os da empresa selecionada
-            company_equipment = [e for e in all_equipment if e.get('empresa_id') == company_id]
-            
-            # Configurar a tabela
-            self.company_equipment_table.setRowCount(len(company_equipment))
-            
-            for i, item in enumerate(company_equipment):
-                # Armazena o ID como dados do item (invisível para o usuário)
-                equip_id = item.get('id', '')
-                
-                # Tag
-                tag_item = QTableWidgetItem(item.get('tag', ''))
-                tag_item.setData(Qt.UserRole, equip_id)  # Armazena o ID como dado do item
-                tag_item.setFlags(tag_item.flags() & ~Qt.ItemIsEditable)  # Remove a flag de editável
-                self.company_equipment_table.setItem(i, 0, tag_item)
-                
-                # Resto dos campos - todos configurados como não editáveis
-                categoria_item = QTableWidgetItem(item.get('categoria', ''))
-                categoria_item.setFlags(categoria_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 1, categoria_item)
-                
-                fabricante_item = QTableWidgetItem(item.get('fabricante', ''))
-                fabricante_item.setFlags(fabricante_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 2, fabricante_item)
-                
-                ano_item = QTableWidgetItem(str(item.get('ano_fabricacao', '')))
-                ano_item.setFlags(ano_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 3, ano_item)
-                
-                pressao_projeto_item = QTableWidgetItem(str(item.get('pressao_projeto', '')))
-                pressao_projeto_item.setFlags(pressao_projeto_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 4, pressao_projeto_item)
-                
-                pressao_trabalho_item = QTableWidgetItem(str(item.get('pressao_trabalho', '')))
-                pressao_trabalho_item.setFlags(pressao_trabalho_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 5, pressao_trabalho_item)
-                
-                volume_item = QTableWidgetItem(str(item.get('volume', '')))
-                volume_item.setFlags(volume_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 6, volume_item)
-                
-                fluido_item = QTableWidgetItem(item.get('fluido', ''))
-                fluido_item.setFlags(fluido_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 7, fluido_item)
-                
-                # Status
-                status = "Ativo" if item.get('ativo', 1) else "Inativo"
-                status_item = QTableWidgetItem(status)
-                status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-                self.company_equipment_table.setItem(i, 8, status_item)
-                
-                # Verificar se há dados de manutenção para colorir a linha
-                frequencia = item.get('frequencia_manutencao')
-                data_ultima = item.get('data_ultima_manutencao')
-                
-                if frequencia and data_ultima and item.get('ativo', 1):
-                    try:
-                        # Calcular próxima manutenção
-                        data_atual = datetime.now().date()
-                        data_ultima_obj = datetime.strptime(data_ultima, "%Y-%m-%d").date()
-                        data_proxima = data_ultima_obj + timedelta(days=int(frequencia))
-                        data_proxima_str = data_proxima.strftime("%Y-%m-%d")
-                        
-                        # Calcular dias restantes
-                        dias_restantes = (data_proxima - data_atual).days
-                        
-                        # Adicionar coluna para data de próxima manutenção
-                        proxima_item = QTableWidgetItem(data_proxima_str)
-                        proxima_item.setFlags(proxima_item.flags() & ~Qt.ItemIsEditable)
-                        
-                        # Definir cores para manutenções próximas
-                        if dias_restantes < 0:  # Atrasado
-                            if self.is_dark:
-                                cor_linha = QColor(90, 10, 10)  # Vermelho muito escuro para tema escuro
-                                cor_texto = QColor(255, 130, 130)  # Texto vermelho claro
-                            else:
-                                cor_linha = QColor(255, 200, 200)  # Vermelho pastel
-                                cor_texto = QColor(139, 0, 0)  # Vermelho escuro para contraste
-                            
-                            # Adiciona indicador visual de manutenção atrasada
-                            tag_item.setText("❗ " + tag_item.text())
-                        elif dias_restantes <= 7:  # Próximo (1 semana)
-                            if self.is_dark:
-                                cor_linha = QColor(90, 20, 20)  # Vermelho escuro para tema escuro
-                                cor_texto = QColor(255, 150, 150)  # Texto vermelho claro
-                            else:
-                                cor_linha = QColor(255, 200, 200)  # Vermelho claro
-                                cor_texto = QColor(139, 0, 0)  # Texto escuro para contraste
-                            
-                            # Adiciona indicador visual de manutenção próxima
-                            tag_item.setText("❗ " + tag_item.text())
-                        elif dias_restantes <= 15:  # Próximo (15 dias)
-                            if self.is_dark:
-                                cor_linha = QColor(90, 60, 10)  # Laranja escuro para tema escuro
-                                cor_texto = QColor(255, 200, 120)  # Texto laranja claro
-                            else:
-                                cor_linha = QColor(255, 230, 180)  # Laranja claro
-                                cor_texto = QColor(102, 51, 0)  # Marrom escuro para contraste
-                            
-                            # Adiciona indicador visual de manutenção próxima
-                            tag_item.setText("⚠️ " + tag_item.text())
-                        elif dias_restantes <= 30:  # Próximo (30 dias)
-                            if self.is_dark:
-                                cor_linha = QColor(90, 90, 10)  # Amarelo escuro para tema escuro
-                                cor_texto = QColor(255, 255, 150)  # Texto amarelo claro
-                            else:
-                                cor_linha = QColor(255, 255, 180)  # Amarelo claro
-                                cor_texto = QColor(102, 102, 0)  # Amarelo escuro para contraste
-                            
-                            # Adiciona indicador visual de manutenção próxima
-                            tag_item.setText("⚠️ " + tag_item.text())
-                        
-                        # Se definimos uma cor, aplicar à linha
-                        if 'cor_linha' in locals() and 'cor_texto' in locals():
-                            for col in range(self.company_equipment_table.columnCount()):
-                                cell = self.company_equipment_table.item(row_index, col)
-                                if cell:
-                                    cell.setBackground(cor_linha)
-                                    cell.setForeground(cor_texto)
-                    except Exception as e:
-                        logger.error(f"Erro ao calcular manutenção para equipamento: {str(e)}")
-            
-            logger.debug(f"Carregados {len(company_equipment)} equipamentos da empresa na tabela")
-        except Exception as e:
-            logger.error(f"Erro ao carregar equipamentos por empresa: {str(e)}")
-            logger.error(traceback.format_exc())
-            QMessageBox.critical(self, "Erro", f"Erro ao carregar equipamentos por empresa: {str(e)}")
+        """Carrega em segundo plano os equipamentos de uma empresa específica na tabela"""
+        if not hasattr(self, 'company_equipment_model'):
+            logger.warning("Tabela de equipamentos por empresa não foi inicializada")
+            return
+        
+        logger.debug(f"Carregando equipamentos para empresa ID={company_id}")
+        if company_id is None:
+            # Se nenhuma empresa for selecionada, limpa a tabela
+            self.company_equipment_model.set_rows([])
+            return
+        
+        # Apenas os equipamentos da empresa selecionada (filtro no banco)
+        self.table_loader.load(
+            'equipamentos_empresa',
+            lambda: self.equipment_controller.get_equipment_by_company(company_id),
+            lambda equipamentos: self._populate_company_equipment(company_id, equipamentos),
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar equipamentos por empresa: {erro}")
+        )
+    
+    def _populate_company_equipment(self, company_id, equipamentos):
+        """Preenche a tabela, se a empresa ainda for a selecionada"""
+        if company_id != self.company_selector.currentData():
+            return
+        self.company_equipment_model.set_rows(equipamentos)
+        logger.debug(f"Carregados {len(equipamentos)} equipamentos da empresa na tabela")
+    
+    @staticmethod
+    def _company_equipment_tag(equipamento):
+        """Tag com o ícone da urgência da manutenção"""
+        urgencia = equipamento.get('urgencia') if equipamento.get('ativo', 1) else None
+        icone = Styles.URGENCY_ICONS[urgencia] if urgencia else ''
+        return icone + display_text(equipamento.get('tag'))
+    
+    def _selected_company_equipment_id(self):
+        """ID do equipamento selecionado na aba de empresa (None se nenhum)"""
+        selected_rows = self.company_equipment_table.selectionModel().selectedRows()
+        if not selected_rows:
+            return None
+        return self.company_equipment_model.role_value(selected_rows[0].row(), 0)
+    
     def company_changed(self, index):
         # Chamado quando a empresa selecionada é alterada
         try:
@@ -3362,19 +3066,11 @@ class AdminWindow(QMainWindow):
     def edit_company_equipment(self):
         # Edita o equipamento selecionado na aba de empresa
         try:
-            # Obter o ID do equipamento selecionado
-            selected_row = self.company_equipment_table.currentRow()
-            if selected_row < 0:
+            # Obter o ID do equipamento selecionado (UserRole da coluna Tag)
+            equipment_id = self._selected_company_equipment_id()
+            if equipment_id is None:
                 QMessageBox.warning(self, "Atenção", "Selecione um equipamento para editar.")
                 return
-                
-            # Obter o ID do equipamento (armazenado no UserRole da coluna Tag)
-            item = self.company_equipment_table.item(selected_row, 0)
-            if not item:
-                QMessageBox.warning(self, "Erro", "Falha ao obter o equipamento selecionado.")
-                return
-                
-            equipment_id = item.data(Qt.UserRole)
             
             # Reusar o método existente
             self.edit_equipment(equipment_id)
@@ -3391,19 +3087,11 @@ class AdminWindow(QMainWindow):
     def delete_company_equipment(self):
         # Remove o equipamento selecionado na aba de empresa
         try:
-            # Obter o ID do equipamento selecionado
-            selected_row = self.company_equipment_table.currentRow()
-            if selected_row < 0:
+            # Obter o ID do equipamento selecionado (UserRole da coluna Tag)
+            equipment_id = self._selected_company_equipment_id()
+            if equipment_id is None:
                 QMessageBox.warning(self, "Atenção", "Selecione um equipamento para remover.")
                 return
-                
-            # Obter o ID do equipamento (armazenado no UserRole da coluna Tag)
-            item = self.company_equipment_table.item(selected_row, 0)
-            if not item:
-                QMessageBox.warning(self, "Erro", "Falha ao obter o equipamento selecionado.")
-                return
-                
-            equipment_id = item.data(Qt.UserRole)
             
             # Reutilizar o método existente
             self.delete_equipment(equipment_id)
@@ -3484,18 +3172,30 @@ class AdminWindow(QMainWindow):
             
             buttons_container.addStretch()
             
-            # Tabela de equipamentos da empresa
-            self.company_equipment_table = QTableWidget()
-            self.company_equipment_table.setColumnCount(9)  # Sem a coluna de Empresa
-            self.company_equipment_table.setHorizontalHeaderLabels([
-                "Tag", "Categoria", "Fabricante", "Ano Fabricação", 
-                "Pressão Projeto", "Pressão Trabalho", "Volume", "Fluido", "Status"
-            ])
+            # Tabela de equipamentos da empresa (sem a coluna de Empresa)
+            self.company_equipment_table = QTableView()
+            self.company_equipment_model = ColumnTableModel(
+                [
+                    Column("Tag", self._company_equipment_tag, user_role=lambda e: e.get('id')),
+                    Column("Categoria", lambda e: display_text(e.get('categoria'))),
+                    Column("Fabricante", lambda e: display_text(e.get('fabricante'))),
+                    Column("Ano Fabricação", lambda e: display_text(e.get('ano_fabricacao'))),
+                    Column("Pressão Projeto", lambda e: display_text(e.get('pressao_projeto'))),
+                    Column("Pressão Trabalho", lambda e: display_text(e.get('pressao_trabalho'))),
+                    Column("Volume", lambda e: display_text(e.get('volume'))),
+                    Column("Fluido", lambda e: display_text(e.get('fluido'))),
+                    Column("Status", lambda e: "Ativo" if e.get('ativo', 1) else "Inativo"),
+                ],
+                # Urgência da manutenção calculada no banco (só equipamentos ativos)
+                row_state=lambda e: e.get('urgencia') if e.get('ativo', 1) else None,
+                colors=self._equipment_urgency_colors,
+                parent=self
+            )
+            self.company_equipment_table.setModel(self.company_equipment_model)
             self.company_equipment_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            self.company_equipment_table.setSelectionBehavior(QTableWidget.SelectRows)
-            self.company_equipment_table.setSelectionMode(QTableWidget.SingleSelection)
+            self.company_equipment_table.setSelectionBehavior(QTableView.SelectRows)
+            self.company_equipment_table.setSelectionMode(QTableView.SingleSelection)
             self.company_equipment_table.setAlternatingRowColors(True)
-            self.company_equipment_table.setEditTriggers(QTableWidget.NoEditTriggers)
             self.company_equipment_table.verticalHeader().setVisible(False)
             
             # Adicionar elementos ao layout da aba
@@ -3537,301 +3237,99 @@ class AdminWindow(QMainWindow):
     
     def filter_equipment_by_company(self):
         """Filtra a tabela de equipamentos pela empresa selecionada no ComboBox"""
-        try:
-            company_id = self.equipment_company_selector.currentData()
-            logger.debug(f"Filtrando equipamentos por empresa ID={company_id}")
-            
-            for row in range(self.equipment_table.rowCount()):
-                item = self.equipment_table.item(row, 2)  # Coluna Empresa
-                if company_id is None or (item and int(item.data(Qt.UserRole)) == company_id):
-                    self.equipment_table.setRowHidden(row, False)
-                else:
-                    self.equipment_table.setRowHidden(row, True)
-                    
-            # Também aplicar o filtro de texto, se houver
-            self.filter_equipment(self.equipment_search_box.text())
-            logger.debug("Filtro por empresa aplicado com sucesso")
-        except Exception as e:
-            logger.error(f"Erro ao filtrar equipamentos por empresa: {str(e)}")
-            logger.error(traceback.format_exc())
+        # O filtro de empresa é aplicado junto com o filtro de texto
+        self.filter_equipment(self.equipment_search_box.text())
     
     def filter_equipment(self, text):
-        """Filtra os equipamentos na tabela com base no texto inserido e empresa selecionada"""
+        """
+        Filtra os equipamentos pelo início da tag e pela empresa selecionada.
+
+        O filtro vai para a consulta paginada (índices de tag e de empresa):
+        a tabela recomeça da primeira página do resultado filtrado em vez de
+        buscar todas as páginas para filtrar na interface.
+        """
         try:
-            search_text = text.lower()
-            logger.debug(f"Filtrando equipamentos com texto: '{search_text}'")
-            
             company_id = self.equipment_company_selector.currentData()
-            logger.debug(f"Empresa selecionada ID={company_id}")
+            logger.debug(f"Filtrando equipamentos com texto: '{text}', empresa ID={company_id}")
             
-            for row in range(self.equipment_table.rowCount()):
-                should_show = True
-                
-                # Filtro por empresa
-                if company_id is not None:
-                    item_empresa = self.equipment_table.item(row, 2)  # Coluna Empresa
-                    if not item_empresa or int(item_empresa.data(Qt.UserRole)) != company_id:
-                        should_show = False
-                        
-                # Filtro por texto
-                if should_show and search_text:
-                    found = False
-                    for col in range(self.equipment_table.columnCount()):
-                        item = self.equipment_table.item(row, col)
-                        if item and search_text in item.text().lower():
-                            found = True
-                            break
-                    should_show = found
-                    
-                self.equipment_table.setRowHidden(row, not should_show)
-                
-            logger.debug("Filtro de equipamentos aplicado com sucesso")
+            text = text.strip()
+            self.equipment_model.set_filter(
+                (text, company_id) if text or company_id is not None else None,
+                lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao filtrar equipamentos: {erro}")
+            )
         except Exception as e:
             logger.error(f"Erro ao filtrar equipamentos: {str(e)}")
             logger.error(traceback.format_exc())
     
     def load_equipment(self):
-        """Carrega todos os equipamentos na tabela, incluindo o ID da empresa como UserRole na coluna Empresa"""
-        try:
-            logger.debug("Carregando equipamentos")
-            equipment = self.equipment_controller.get_all_equipment()
-            self.equipment_table.setRowCount(len(equipment))
-            
-            # Obter todas as empresas para usar como mapeamento ID -> Nome
-            empresas = self.auth_controller.get_companies()
-            empresa_map = {empresa['id']: empresa['nome'] for empresa in empresas}
-            
-            # Data atual para cálculos de manutenção
-            data_atual = datetime.now().date()
-            
-            for i, item in enumerate(equipment):
-                # Armazena o ID como dados do item (invisível para o usuário)
-                equip_id = item.get('id', '')
-                logger.debug(f"Carregando equipamento ID={equip_id}, Tag={item.get('tag', '')}")
-                
-                # Tag
-                tag_item = QTableWidgetItem(item.get('tag', ''))
-                tag_item.setData(Qt.UserRole, equip_id)  # Armazena o ID como dado do item
-                tag_item.setFlags(tag_item.flags() & ~Qt.ItemIsEditable)  # Remove a flag de editável
-                self.equipment_table.setItem(i, 0, tag_item)
-                
-                # Para debug - verifica se o ID foi armazenado corretamente
-                id_stored = tag_item.data(Qt.UserRole)
-                logger.debug(f"ID armazenado no item da tabela: {id_stored}")
-                
-                # Resto dos campos - todos configurados como não editáveis
-                categoria_item = QTableWidgetItem(item.get('categoria', ''))
-                categoria_item.setFlags(categoria_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 1, categoria_item)
-                
-                # Empresa - usando o nome em vez do ID
-                empresa_id = item.get('empresa_id', '')
-                empresa_nome = empresa_map.get(empresa_id, f"ID: {empresa_id}")
-                empresa_item = QTableWidgetItem(empresa_nome)
-                empresa_item.setData(Qt.UserRole, empresa_id)  # Armazena o ID como dado do item
-                empresa_item.setFlags(empresa_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 2, empresa_item)
-                
-                fabricante_item = QTableWidgetItem(item.get('fabricante', ''))
-                fabricante_item.setFlags(fabricante_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 3, fabricante_item)
-                
-                ano_item = QTableWidgetItem(str(item.get('ano_fabricacao', '')))
-                ano_item.setFlags(ano_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 4, ano_item)
-                
-                pressao_projeto_item = QTableWidgetItem(str(item.get('pressao_projeto', '')))
-                pressao_projeto_item.setFlags(pressao_projeto_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 5, pressao_projeto_item)
-                
-                
-                pressao_trabalho_item = QTableWidgetItem(str(item.get('pressao_trabalho', '')))
-                pressao_trabalho_item.setFlags(pressao_trabalho_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 6, pressao_trabalho_item)
-                
-                volume_item = QTableWidgetItem(str(item.get('volume', '')))
-                volume_item.setFlags(volume_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 7, volume_item)
-                
-                fluido_item = QTableWidgetItem(item.get('fluido', ''))
-                fluido_item.setFlags(fluido_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 8, fluido_item)
-                
-                # Status
-                status = "Ativo" if item.get('ativo', 1) else "Inativo"
-                status_item = QTableWidgetItem(status)
-                status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 9, status_item)
-                
-                # Novos campos NR-13
-                categoria_nr13_item = QTableWidgetItem(item.get('categoria_nr13', ''))
-                categoria_nr13_item.setFlags(categoria_nr13_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 10, categoria_nr13_item)
-                
-                pmta_item = QTableWidgetItem(str(item.get('pmta', '')))
-                pmta_item.setFlags(pmta_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 11, pmta_item)
-                
-                placa_identificacao_item = QTableWidgetItem(item.get('placa_identificacao', ''))
-                placa_identificacao_item.setFlags(placa_identificacao_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 12, placa_identificacao_item)
-                
-                numero_registro_item = QTableWidgetItem(item.get('numero_registro', ''))
-                numero_registro_item.setFlags(numero_registro_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 13, numero_registro_item)
-                
-                # Campos de manutenção
-                # Última manutenção
-                data_ultima_manutencao = item.get('data_ultima_manutencao', '')
-                data_ultima_str = ''
-                data_ultima_obj = None
-                
-                if data_ultima_manutencao:
-                    try:
-                        if isinstance(data_ultima_manutencao, str):
-                            # Tratamento robusto para strings de data
-                            if len(data_ultima_manutencao) >= 10:
-                                data_ultima_obj = datetime.strptime(data_ultima_manutencao[:10], '%Y-%m-%d').date()
-                                data_ultima_str = data_ultima_obj.strftime('%d/%m/%Y')
-                            else:
-                                data_ultima_str = data_ultima_manutencao
-                                logger.warning(f"Formato de data inválido: {data_ultima_manutencao}")
-                        elif isinstance(data_ultima_manutencao, datetime):
-                            data_ultima_obj = data_ultima_manutencao.date()
-                            data_ultima_str = data_ultima_obj.strftime('%d/%m/%Y')
-                        else:
-                            data_ultima_str = str(data_ultima_manutencao)
-                            logger.warning(f"Tipo de data não reconhecido: {type(data_ultima_manutencao)}")
-                    except Exception as e:
-                        data_ultima_str = str(data_ultima_manutencao)
-                        logger.warning(f"Erro ao processar data de manutenção: {str(e)}")
-                
-                ultima_manutencao_item = QTableWidgetItem(data_ultima_str)
-                ultima_manutencao_item.setFlags(ultima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                self.equipment_table.setItem(i, 14, ultima_manutencao_item)
-                
-                # Próxima manutenção
-                data_proxima_str = ''
-                frequencia = item.get('frequencia_manutencao', 0)
-                dias_restantes = None
-                
-                if data_ultima_manutencao and frequencia:
-                    try:
-                        # Se ainda não temos o objeto data_ultima_obj, tentar convertê-lo novamente
-                        if data_ultima_obj is None and isinstance(data_ultima_manutencao, str):
-                            try:
-                                if len(data_ultima_manutencao) >= 10:
-                                    data_ultima_obj = datetime.strptime(data_ultima_manutencao[:10], '%Y-%m-%d').date()
-                            except Exception:
-                                logger.warning(f"Não foi possível converter a data: {data_ultima_manutencao}")
-                        
-                        if data_ultima_obj:
-                            data_proxima = data_ultima_obj + timedelta(days=frequencia)
-                            data_proxima_str = data_proxima.strftime('%d/%m/%Y')
-                            
-                            # Calcular dias restantes
-                            dias_restantes = (data_proxima - data_atual).days
-                            
-                            # Aplicar indicadores visuais baseados na urgência da manutenção
-                            proxima_manutencao_item = QTableWidgetItem(data_proxima_str)
-                            proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                            self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-                            
-                            # Verifica se está atrasado ou próximo
-                            if dias_restantes < 0 and item.get('ativo', 1):  # Atrasado e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 10, 10)  # Vermelho muito escuro para tema escuro
-                                    cor_texto = QColor(255, 130, 130)  # Texto vermelho claro
-                                else:
-                                    cor_linha = QColor(255, 200, 200)  # Vermelho pastel
-                                    cor_texto = QColor(139, 0, 0)  # Vermelho escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção atrasada
-                                proxima_manutencao_item.setText("❗ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção ATRASADA")
-                            elif dias_restantes <= 7 and item.get('ativo', 1):  # Próximo (1 semana) e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 20, 20)  # Vermelho escuro para tema escuro
-                                    cor_texto = QColor(255, 150, 150)  # Texto vermelho claro
-                                else:
-                                    cor_linha = QColor(255, 200, 200)  # Vermelho claro
-                                    cor_texto = QColor(139, 0, 0)  # Texto escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção próxima
-                                proxima_manutencao_item.setText("❗ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção URGENTE (≤ 7 dias)")
-                            elif dias_restantes <= 15 and item.get('ativo', 1):  # Próximo (15 dias) e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 60, 10)  # Laranja escuro para tema escuro
-                                    cor_texto = QColor(255, 200, 120)  # Texto laranja claro
-                                else:
-                                    cor_linha = QColor(255, 230, 180)  # Laranja claro
-                                    cor_texto = QColor(102, 51, 0)  # Marrom escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção próxima
-                                proxima_manutencao_item.setText("⚠️ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção ALTA (≤ 15 dias)")
-                            elif dias_restantes <= 30 and item.get('ativo', 1):  # Próximo (30 dias) e ativo
-                                # Cores baseadas no tema atual
-                                if self.is_dark:
-                                    cor_linha = QColor(90, 90, 10)  # Amarelo escuro para tema escuro
-                                    cor_texto = QColor(255, 255, 150)  # Texto amarelo claro
-                                else:
-                                    cor_linha = QColor(255, 255, 180)  # Amarelo claro
-                                    cor_texto = QColor(102, 102, 0)  # Amarelo escuro para contraste
-                                
-                                # Adiciona indicador visual de manutenção próxima
-                                proxima_manutencao_item.setText("⚠️ " + data_proxima_str)
-                                
-                                for col in range(self.equipment_table.columnCount()):
-                                    cell = self.equipment_table.item(i, col)
-                                    if cell:
-                                        cell.setBackground(cor_linha)
-                                        cell.setForeground(cor_texto)
-                                logger.debug(f"Equipamento {item.get('tag')} com manutenção MÉDIA (≤ 30 dias)")
-                        else:
-                            proxima_manutencao_item = QTableWidgetItem("Não programada")
-                            proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                            self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-                    except Exception as e:
-                        logger.error(f"Erro ao calcular próxima manutenção: {str(e)}")
-                        data_proxima_str = "Erro no cálculo"
-                        proxima_manutencao_item = QTableWidgetItem(data_proxima_str)
-                        proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                        self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-                else:
-                    proxima_manutencao_item = QTableWidgetItem("Não programada")
-                    proxima_manutencao_item.setFlags(proxima_manutencao_item.flags() & ~Qt.ItemIsEditable)
-                    self.equipment_table.setItem(i, 15, proxima_manutencao_item)
-            
-            # Forçar atualização imediata da tabela
-            self.equipment_table.viewport().update()
-            logger.debug(f"Carregados {len(equipment)} equipamentos na tabela")
-        except Exception as e:
-            logger.error(f"Erro ao carregar equipamentos: {str(e)}")
-            logger.error(traceback.format_exc())
-            QMessageBox.critical(self, "Erro", f"Erro ao carregar equipamentos: {str(e)}")
+        """Recarrega em segundo plano as páginas de equipamentos já exibidas"""
+        logger.debug("Carregando equipamentos")
+        self.equipment_model.reload(
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar equipamentos: {erro}")
+        )
+    
+    def _fetch_equipment_page(self, after, limit, filtro):
+        """Busca uma página de equipamentos e calcula os campos exibidos (roda fora da thread da interface)"""
+        after_tag, after_id = after or (None, None)
+        tag_prefix, empresa_id = filtro or (None, None)
+        equipment = self.equipment_controller.get_equipment_page(
+            after_tag, after_id, limit, tag_prefix=tag_prefix, empresa_id=empresa_id
+        )
+        
+        # Nomes das empresas resolvidos de uma vez pelo cadastro em cache
+        empresa_map = self.auth_controller.companies.resolve_many(
+            item.get('empresa_id') for item in equipment
+        )
+        
+        for item in equipment:
+            # Campos derivados são calculados uma vez por carga
+            empresa_id = item.get('empresa_id', '')
+            item['empresa_nome'] = empresa_map.get(empresa_id, f"ID: {empresa_id}")
+            item['ultima_manutencao_str'], item['proxima_manutencao_str'], item['urgencia'] = \
+                self._equipment_maintenance_status(item)
+        
+        logger.debug(f"Página com {len(equipment)} equipamentos")
+        return equipment
+    
+    def _count_equipment(self, filtro):
+        """Total de equipamentos com o filtro da tabela (roda fora da thread da interface)"""
+        tag_prefix, empresa_id = filtro or (None, None)
+        return self.equipment_controller.count_equipment(tag_prefix=tag_prefix, empresa_id=empresa_id)
+    
+    def update_equipment_count_label(self, *args):
+        """Mostra quantos equipamentos foram carregados e o total no banco"""
+        carregados = self.equipment_model.rowCount()
+        total = self.equipment_model.total
+        if total is None:
+            self.equipment_count_label.setText(f"{carregados} equipamentos carregados")
+        else:
+            self.equipment_count_label.setText(f"{carregados} de {total} equipamentos carregados")
+    
+    def _equipment_maintenance_status(self, item):
+        """
+        Monta os textos de última/próxima manutenção e a urgência do equipamento.
+        
+        A próxima manutenção e a urgência vêm calculadas do banco
+        (ver EquipmentController._LIST_QUERY).
+        
+        Returns:
+            tuple: (última manutenção, próxima manutenção, urgência ou None)
+        """
+        data_ultima_str = format_db_date(item.get('data_ultima_manutencao'))
+        data_proxima = item.get('data_proxima_manutencao')
+        if not data_proxima:
+            return data_ultima_str, "Não programada", None
+        data_proxima_str = format_db_date(data_proxima)
+        
+        # Indicadores visuais só para equipamentos ativos
+        urgencia = item.get('urgencia') if item.get('ativo', 1) else None
+        if urgencia is None:
+            return data_ultima_str, data_proxima_str, None
+        return data_ultima_str, Styles.URGENCY_ICONS[urgencia] + data_proxima_str, urgencia
+    
+    def _equipment_urgency_colors(self, urgencia, col):
+        """Cores (fundo, texto) da linha conforme a urgência e o tema atual"""
+        return Styles.get_urgency_colors(urgencia, self.is_dark)
 
     def register_maintenance(self):
         """Abre a janela modal para registrar manutenção de equipamento"""
@@ -3843,14 +3341,7 @@ class AdminWindow(QMainWindow):
                 return
                 
             # Buscar dados do equipamento
-            equipment_data = None
-            all_equipment = self.equipment_controller.get_all_equipment()
-            
-            for equip in all_equipment:
-                if equip.get('id') == equipment_id:
-                    equipment_data = equip
-                    break
-                    
+            equipment_data = self.equipment_controller.get_equipment_by_id(equipment_id)
             if not equipment_data:
                 QMessageBox.warning(self, "Erro", f"Não foi possível encontrar o equipamento com ID {equipment_id}")
                 return
@@ -3883,6 +3374,80 @@ class AdminWindow(QMainWindow):
             logger.error(traceback.format_exc())
             QMessageBox.warning(self, "Erro", f"Erro ao registrar manutenção: {str(e)}")
 
+    def setup_dashboard_tab(self):
+        """Aba com o resumo de conformidade por empresa (ver DashboardController)"""
+        dashboard_tab = QWidget()
+        dashboard_layout = QVBoxLayout(dashboard_tab)
+        
+        def contador(nome):
+            return lambda linha: display_text(linha[nome])
+        
+        self.dashboard_model = ColumnTableModel(
+            [
+                Column("Empresa", lambda linha: linha['empresa_nome'], user_role=lambda linha: linha['empresa_id']),
+                Column("Equipamentos", contador('equipamentos')),
+                Column("Manutenção Atrasada", contador('atrasados')),
+                Column("Vence em 7 dias", contador('vence_7')),
+                Column("Vence em 15 dias", contador('vence_15')),
+                Column("Vence em 30 dias", contador('vence_30')),
+                Column("Inspeções Aprovadas", contador('aprovadas')),
+                Column("Inspeções Reprovadas", contador('reprovadas')),
+                Column("Inspeções Pendentes", contador('pendentes')),
+            ],
+            key=lambda linha: linha['empresa_id'],
+            row_state=self._dashboard_urgency,
+            colors=self._equipment_urgency_colors,
+            parent=self
+        )
+        self.dashboard_table = QTableView()
+        self.dashboard_table.setModel(self.dashboard_model)
+        self.dashboard_table.verticalHeader().setVisible(False)
+        self.dashboard_table.setSelectionBehavior(QTableView.SelectRows)
+        self.dashboard_table.setSelectionMode(QTableView.SingleSelection)
+        self.dashboard_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.dashboard_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        dashboard_layout.addWidget(self.dashboard_table)
+        
+        self.dashboard_totals_label = QLabel()
+        dashboard_layout.addWidget(self.dashboard_totals_label)
+        return dashboard_tab
+    
+    def load_dashboard(self):
+        """Carrega o resumo de conformidade em segundo plano"""
+        self.table_loader.load(
+            'conformidade', self._fetch_dashboard, self._populate_dashboard,
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar resumo de conformidade: {erro}")
+        )
+    
+    def _fetch_dashboard(self):
+        """Resumo com os nomes das empresas (roda fora da thread da interface)"""
+        resumo = self.dashboard_controller.resumo()
+        empresa_map = self.auth_controller.companies.resolve_many(linha['empresa_id'] for linha in resumo)
+        # Cópias: as linhas do cache do controlador não são alteradas
+        linhas = [dict(linha, empresa_nome=empresa_map.get(linha['empresa_id'], f"ID: {linha['empresa_id']}"))
+                  for linha in resumo]
+        return sorted(linhas, key=lambda linha: linha['empresa_nome'].lower()), DashboardController.totais(resumo)
+    
+    def _populate_dashboard(self, resultado):
+        """Preenche a tabela de conformidade e a linha de totais"""
+        linhas, totais = resultado
+        self.dashboard_model.set_rows(linhas)
+        self.dashboard_totals_label.setText(
+            f"Total: {totais['equipamentos']} equipamentos ativos | "
+            f"manutenção atrasada: {totais['atrasados']} | vence em 7 dias: {totais['vence_7']} | "
+            f"15 dias: {totais['vence_15']} | 30 dias: {totais['vence_30']} | "
+            f"inspeções aprovadas: {totais['aprovadas']}, reprovadas: {totais['reprovadas']}, "
+            f"pendentes: {totais['pendentes']}"
+        )
+    
+    @staticmethod
+    def _dashboard_urgency(linha):
+        """Faixa mais urgente com equipamentos na empresa (colore a linha)"""
+        for urgencia, contador in CONTADOR_DA_URGENCIA.items():
+            if linha[contador]:
+                return urgencia
+        return None
+    
     def setup_inspection_tab(self):
         """Configura a aba de inspeções"""
         logger.debug("Configurando aba de inspeções")
@@ -10,11 +10,10 @@ import traceback
 import os
 import sys
 import subprocess
-from datetime import datetime, timedelta
 
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QTableView,
     QMessageBox, QTabWidget, QLineEdit, QComboBox,
     QDateEdit, QTextEdit, QFileDialog, QToolButton,
     QHeaderView, QDialog
@@ -24,6 +23,10 @@ from PyQt5.QtGui import QIcon, QPixmap, QColor
 
 from controllers.auth_controller import AuthController
 from database.models import DatabaseModels
+from database.change_tracking import ChangeTracker
+from ui.workers import TableLoader
+from ui.table_model import ColumnTableModel, Column, display_text
+from ui.table_filter import SearchProxyModel, debounce
 from controllers.equipment_controller import EquipmentController
 from controllers.inspection_controller import InspectionController
 from controllers.report_controller import ReportController
@@ -50,6 +53,8 @@ class ClientWindow(QMainWindow):
             self.equipment_controller = EquipmentController(self.db_models)
             self.inspection_controller = InspectionController(self.db_models)
             self.report_controller = ReportController(self.db_models)
+            # Consultas das tabelas rodam fora da thread da interface
+            self.table_loader = TableLoader(self)
             self.is_dark = True
             
             # Definir ícones SVG
@@ -157,10 +162,15 @@ class ClientWindow(QMainWindow):
             self.initUI()
             self.apply_theme()
             
+            # Registra as versões atuais antes da primeira carga
+            self.change_tracker = ChangeTracker(self.db_models.db.read_pool(),
+                                                tables=('usuarios', 'equipamentos'))
+            self.change_tracker.poll()
+            
             # Carregar equipamentos na inicialização
             self.load_equipment()
             
-            # Configurar timer para atualização
+            # Configurar timer que verifica alterações no banco
             self.refresh_timer = QTimer(self)
             self.refresh_timer.timeout.connect(self.refresh_all_tables)
             self.refresh_timer.start(10000)  # Atualiza a cada 10 segundos
@@ -197,7 +207,7 @@ class ClientWindow(QMainWindow):
                 
                 # Estilos específicos para tabelas no modo escuro
                 table_style = """
-                    QTableWidget {
+                    QTableView {
                         background-color: #232629;
                         color: #ffffff;
                         gridline-color: #3a3d40;
@@ -210,7 +220,7 @@ class ClientWindow(QMainWindow):
                         border: 1px solid #3a3d40;
                         font-weight: bold;
                     }
-                    QTableWidget::item:selected {
+                    QTableView::item:selected {
                         background-color: #3a3d40;
                         color: #ffffff;
                     }
@@ -251,7 +261,7 @@ class ClientWindow(QMainWindow):
                 
                 # Estilos específicos para tabelas no modo claro
                 table_style = """
-                    QTableWidget {
+                    QTableView {
                         background-color: #ffffff;
                         color: #000000;
                         gridline-color: #d0d0d0;
@@ -264,7 +274,7 @@ class ClientWindow(QMainWindow):
                         border: 1px solid #d0d0d0;
                         font-weight: bold;
                     }
-                    QTableWidget::item:selected {
+                    QTableView::item:selected {
                         background-color: #e0e0e0;
                         color: #000000;
                     }
@@ -308,6 +318,8 @@ class ClientWindow(QMainWindow):
         """Alterna entre tema escuro e claro"""
         self.is_dark = not self.is_dark
         self.apply_theme()
+        # Cores de urgência dependem do tema e são calculadas sob demanda
+        self.equipment_model.refresh_colors()
 
     def initUI(self):
         """Inicializa a interface do usuário."""
@@ -408,7 +420,7 @@ class ClientWindow(QMainWindow):
             
             self.equipment_search_box = QLineEdit()
             self.equipment_search_box.setPlaceholderText("Digite para filtrar...")
-            self.equipment_search_box.textChanged.connect(self.filter_equipment)
+            debounce(self.equipment_search_box, lambda _texto: self.filter_equipment())
             search_container.addWidget(self.equipment_search_box)
             
             top_container.addLayout(search_container)
@@ -416,18 +428,38 @@ class ClientWindow(QMainWindow):
             equipment_layout.addLayout(top_container)
             
             # Tabela de equipamentos
-            self.equipment_table = QTableWidget()
-            self.equipment_table.setColumnCount(16)  # Mesmo número de colunas que o admin_ui
-            self.equipment_table.setHorizontalHeaderLabels([
-                "Tag", "Categoria", "Empresa", "Fabricante", "Ano", "P. Projeto",
-                "P. Trabalho", "Volume", "Fluido", "Status", "Cat. NR13", "PMTA", "Placa ID", 
-                "Nº Registro", "Última Manutenção", "Próxima Manutenção"
-            ])
+            self.equipment_table = QTableView()
+            self.equipment_model = ColumnTableModel(
+                [
+                    Column("Tag", lambda e: display_text(e.get('tag')), user_role=lambda e: e.get('id')),
+                    Column("Categoria", lambda e: display_text(e.get('categoria')), user_role=lambda e: e.get('categoria_id')),
+                    Column("Empresa", lambda e: e['empresa_nome'], user_role=lambda e: e.get('empresa_id')),
+                    Column("Fabricante", lambda e: display_text(e.get('fabricante'))),
+                    Column("Ano", lambda e: display_text(e.get('ano_fabricacao'))),
+                    Column("P. Projeto", lambda e: display_text(e.get('pressao_projeto'))),
+                    Column("P. Trabalho", lambda e: display_text(e.get('pressao_trabalho'))),
+                    Column("Volume", lambda e: display_text(e.get('volume'))),
+                    Column("Fluido", lambda e: display_text(e.get('fluido_trabalho'))),
+                    Column("Status", lambda e: "Ativo" if e.get('ativo', 1) == 1 else "Inativo"),
+                    Column("Cat. NR13", lambda e: display_text(e.get('categoria_nr13'))),
+                    Column("PMTA", lambda e: display_text(e.get('pmta'))),
+                    Column("Placa ID", lambda e: display_text(e.get('placa_identificacao'))),
+                    Column("Nº Registro", lambda e: display_text(e.get('numero_registro'))),
+                    Column("Última Manutenção", lambda e: display_text(e['ultima_manutencao_str'])),
+                    Column("Próxima Manutenção", lambda e: e['proxima_manutencao_str']),
+                ],
+                row_state=lambda e: (e['urgencia'], e.get('ativo', 1) == 1),
+                colors=self._equipment_colors,
+                parent=self
+            )
+            self.equipment_proxy = SearchProxyModel(self.equipment_model, self)
+            self.equipment_table.setModel(self.equipment_proxy)
             
             # Configurações da tabela
             self.equipment_table.verticalHeader().setVisible(False)
-            self.equipment_table.setSelectionBehavior(QTableWidget.SelectRows)
-            self.equipment_table.setSelectionMode(QTableWidget.SingleSelection)
+            self.equipment_table.verticalHeader().setDefaultSectionSize(36)  # Altura das linhas
+            self.equipment_table.setSelectionBehavior(QTableView.SelectRows)
+            self.equipment_table.setSelectionMode(QTableView.SingleSelection)
             self.equipment_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
             
             # Ajustar tamanho de algumas colunas
@@ -453,228 +485,95 @@ class ClientWindow(QMainWindow):
         self.logout_requested.emit()
         
     def refresh_all_tables(self):
-        """Atualiza todas as tabelas com dados recentes"""
+        """Verifica em segundo plano se houve alteração no banco"""
+        # Uma verificação por vez: descartar um resultado perderia as alterações
+        if self.table_loader.is_loading('versoes'):
+            return
+        self.table_loader.load('versoes', self.change_tracker.poll, self._reload_changed_tables)
+    
+    def _reload_changed_tables(self, alteradas):
+        """Recarrega os equipamentos somente se houve alteração no banco"""
         try:
-            # Forçar sincronização com o banco
-            self.equipment_controller.force_sync()
-            
-            # Recarregar os dados
-            self.load_equipment()
+            # Os nomes das empresas vêm da tabela de usuários
+            if 'usuarios' in alteradas:
+                self.auth_controller.companies.invalidate()
+            if alteradas & {'equipamentos', 'usuarios'}:
+                self.load_equipment()
             
         except Exception as e:
             logger.error(f"Erro ao atualizar tabelas: {str(e)}")
             logger.error(traceback.format_exc()) 
 
     def load_equipment(self):
-        """Carrega equipamentos da empresa do usuário logado."""
+        """Carrega em segundo plano os equipamentos da empresa do usuário logado."""
+        logger.debug(f"Carregando equipamentos da empresa {self.company}")
+        self.table_loader.load('equipamentos', self._fetch_equipment, self._populate_equipment)
+    
+    def _fetch_equipment(self):
+        """Busca os equipamentos da empresa do usuário (roda fora da thread da interface)."""
+        # ID da empresa do usuário logado (cadastro de empresas em cache)
+        company_id = self.auth_controller.get_company_id_by_name(self.company)
+        if not company_id:
+            logger.error(f"Não foi possível encontrar o ID da empresa {self.company}")
+            return None
+        
+        # Equipamentos da empresa com o nome da empresa na mesma consulta
+        equipments = self.equipment_controller.get_equipment_by_company(company_id, with_company_name=True)
+        logger.debug(f"Obtidos {len(equipments)} equipamentos")
+        return equipments
+    
+    def _populate_equipment(self, equipments):
+        """Atualiza o modelo da tabela de equipamentos."""
         try:
-            logger.debug(f"Carregando equipamentos da empresa {self.company}")
-            self.equipment_table.setRowCount(0)
-            
-            # Obter o ID da empresa do usuário logado
-            company_id = self.auth_controller.get_company_id_by_name(self.company)
-            if not company_id:
-                logger.error(f"Não foi possível encontrar o ID da empresa {self.company}")
+            if equipments is None:
+                self.equipment_model.set_rows([])
                 return
-                
-            # Obter equipamentos apenas da empresa do usuário
-            equipments = self.equipment_controller.get_equipment_by_company(company_id)
-            logger.debug(f"Obtidos {len(equipments)} equipamentos")
-            
-            # Preencher a tabela
-            self.equipment_table.setRowCount(len(equipments))
-            
-            for row, equipment in enumerate(equipments):
-                # Tag
-                tag_item = QTableWidgetItem(equipment.get('tag', ''))
-                tag_item.setData(Qt.UserRole, equipment.get('id'))
-                self.equipment_table.setItem(row, 0, tag_item)
-                
-                # Categoria
-                category_item = QTableWidgetItem(equipment.get('categoria', ''))
-                category_item.setData(Qt.UserRole, equipment.get('categoria_id'))
-                self.equipment_table.setItem(row, 1, category_item)
-                
-                # Empresa
-                company_data = self.auth_controller.get_company_by_id(equipment.get('empresa_id'))
-                company_name = company_data.get('nome', '') if company_data else ''
-                company_item = QTableWidgetItem(company_name)
-                company_item.setData(Qt.UserRole, equipment.get('empresa_id'))
-                self.equipment_table.setItem(row, 2, company_item)
-                
-                # Fabricante
-                manufacturer_item = QTableWidgetItem(equipment.get('fabricante', ''))
-                self.equipment_table.setItem(row, 3, manufacturer_item)
-                
-                # Ano
-                year_item = QTableWidgetItem(str(equipment.get('ano_fabricacao', '')))
-                self.equipment_table.setItem(row, 4, year_item)
-                
-                # Pressão de Projeto
-                p_projeto_item = QTableWidgetItem(str(equipment.get('pressao_projeto', '')))
-                self.equipment_table.setItem(row, 5, p_projeto_item)
-                
-                # Pressão de Trabalho
-                p_trabalho_item = QTableWidgetItem(str(equipment.get('pressao_trabalho', '')))
-                self.equipment_table.setItem(row, 6, p_trabalho_item)
-                
-                # Volume
-                volume_item = QTableWidgetItem(str(equipment.get('volume', '')))
-                self.equipment_table.setItem(row, 7, volume_item)
-                
-                # Fluido
-                fluid_item = QTableWidgetItem(equipment.get('fluido_trabalho', ''))
-                self.equipment_table.setItem(row, 8, fluid_item)
-                
-                # Status
-                status = equipment.get('ativo', 1)
-                status_text = "Ativo" if status == 1 else "Inativo"
-                status_item = QTableWidgetItem(status_text)
-                status_item.setForeground(QColor('#28a745' if status == 1 else '#dc3545'))
-                self.equipment_table.setItem(row, 9, status_item)
-                
-                # Categoria NR13
-                nr13_category = equipment.get('categoria_nr13', '')
-                nr13_item = QTableWidgetItem(nr13_category)
-                self.equipment_table.setItem(row, 10, nr13_item)
-                
-                # PMTA
-                pmta_item = QTableWidgetItem(str(equipment.get('pmta', '')))
-                self.equipment_table.setItem(row, 11, pmta_item)
-                
-                # Placa de Identificação
-                placa_item = QTableWidgetItem(equipment.get('placa_identificacao', ''))
-                self.equipment_table.setItem(row, 12, placa_item)
-                
-                # Número de Registro
-                registro_item = QTableWidgetItem(equipment.get('numero_registro', ''))
-                self.equipment_table.setItem(row, 13, registro_item)
-                
-                # Última Manutenção
-                ultima_man = equipment.get('data_ultima_manutencao')
-                ultima_man_text = ultima_man if ultima_man else "Não realizada"
-                ultima_man_item = QTableWidgetItem(ultima_man_text)
-                self.equipment_table.setItem(row, 14, ultima_man_item)
-                
-                # Próxima Manutenção e Coloração da Linha
-                dias_ate_manutencao = equipment.get('dias_ate_manutencao')
-                row_color = None
-                text_color = None
-                
-                if ultima_man and equipment.get('frequencia_manutencao'):
-                    proxima_data = None
-                    if isinstance(dias_ate_manutencao, int):
-                        # Calcular a próxima manutenção a partir dos dias restantes
-                        proxima_data = datetime.now() + timedelta(days=dias_ate_manutencao)
-                        proxima_man = proxima_data.strftime("%Y-%m-%d")
-                        
-                        # Definir cores de acordo com a urgência e o tema
-                        if dias_ate_manutencao <= 7:  # Vermelho: 1 semana ou menos
-                            if self.is_dark:
-                                row_color = QColor(90, 20, 20)  # Vermelho escuro para tema escuro
-                                text_color = QColor(255, 150, 150)  # Texto vermelho claro
-                            else:
-                                row_color = QColor(255, 200, 200)  # Vermelho claro para tema claro
-                                text_color = QColor(139, 0, 0)  # Texto vermelho escuro
-                            logger.debug(f"Equipamento {equipment.get('tag')} com manutenção URGENTE (≤ 7 dias)")
-                        elif dias_ate_manutencao <= 15:  # Laranja: 15 dias ou menos
-                            if self.is_dark:
-                                row_color = QColor(90, 60, 10)  # Laranja escuro para tema escuro
-                                text_color = QColor(255, 200, 120)  # Texto laranja claro
-                            else:
-                                row_color = QColor(255, 230, 180)  # Laranja claro para tema claro
-                                text_color = QColor(102, 51, 0)  # Texto marrom escuro
-                            logger.debug(f"Equipamento {equipment.get('tag')} com manutenção ALTA (≤ 15 dias)")
-                        elif dias_ate_manutencao <= 30:  # Amarelo: 30 dias ou menos
-                            if self.is_dark:
-                                row_color = QColor(90, 90, 10)  # Amarelo escuro para tema escuro
-                                text_color = QColor(255, 255, 150)  # Texto amarelo claro
-                            else:
-                                row_color = QColor(255, 255, 180)  # Amarelo claro para tema claro
-                                text_color = QColor(102, 102, 0)  # Texto amarelo escuro
-                            logger.debug(f"Equipamento {equipment.get('tag')} com manutenção MÉDIA (≤ 30 dias)")
-                    else:
-                        # Tentar calcular a partir da data_ultima_manutencao e frequencia_manutencao
-                        try:
-                            data_ultima = datetime.strptime(ultima_man, "%Y-%m-%d")
-                            frequencia = int(equipment.get('frequencia_manutencao'))
-                            proxima_data = data_ultima + timedelta(days=frequencia)
-                            proxima_man = proxima_data.strftime("%Y-%m-%d")
-                            
-                            # Calcular dias até a próxima manutenção
-                            dias_restantes = (proxima_data - datetime.now()).days
-                            
-                            # Definir cores de acordo com a urgência e o tema
-                            if dias_restantes <= 7:  # Vermelho: 1 semana ou menos
-                                if self.is_dark:
-                                    row_color = QColor(90, 20, 20)  # Vermelho escuro para tema escuro
-                                    text_color = QColor(255, 150, 150)  # Texto vermelho claro
-                                else:
-                                    row_color = QColor(255, 200, 200)  # Vermelho claro para tema claro
-                                    text_color = QColor(139, 0, 0)  # Texto vermelho escuro
-                                logger.debug(f"Equipamento {equipment.get('tag')} com manutenção URGENTE (≤ 7 dias)")
-                            elif dias_restantes <= 15:  # Laranja: 15 dias ou menos
-                                if self.is_dark:
-                                    row_color = QColor(90, 60, 10)  # Laranja escuro para tema escuro
-                                    text_color = QColor(255, 200, 120)  # Texto laranja claro
-                                else:
-                                    row_color = QColor(255, 230, 180)  # Laranja claro para tema claro
-                                    text_color = QColor(102, 51, 0)  # Texto marrom escuro
-                                logger.debug(f"Equipamento {equipment.get('tag')} com manutenção ALTA (≤ 15 dias)")
-                            elif dias_restantes <= 30:  # Amarelo: 30 dias ou menos
-                                if self.is_dark:
-                                    row_color = QColor(90, 90, 10)  # Amarelo escuro para tema escuro
-                                    text_color = QColor(255, 255, 150)  # Texto amarelo claro
-                                else:
-                                    row_color = QColor(255, 255, 180)  # Amarelo claro para tema claro
-                                    text_color = QColor(102, 102, 0)  # Texto amarelo escuro
-                                logger.debug(f"Equipamento {equipment.get('tag')} com manutenção MÉDIA (≤ 30 dias)")
-                        except Exception as e:
-                            logger.error(f"Erro ao calcular próxima manutenção: {str(e)}")
-                            proxima_man = "Erro no cálculo"
-                else:
-                    proxima_man = "Não agendada"
-                
-                proxima_man_item = QTableWidgetItem(proxima_man)
-                self.equipment_table.setItem(row, 15, proxima_man_item)
-                
-                # Aplicar cor à linha de acordo com a urgência
-                if row_color and text_color:
-                    for col in range(self.equipment_table.columnCount()):
-                        item = self.equipment_table.item(row, col)
-                        if item:
-                            item.setBackground(row_color)
-                            item.setForeground(text_color)
-            
-            logger.debug(f"Tabela de equipamentos carregada com {self.equipment_table.rowCount()} linhas")
-            
-            # Ajustar altura das linhas
-            for row in range(self.equipment_table.rowCount()):
-                self.equipment_table.setRowHeight(row, 36)
+            
+            for equipment in equipments:
+                # Campos derivados são calculados uma vez por carga
+                equipment['ultima_manutencao_str'], equipment['proxima_manutencao_str'], equipment['urgencia'] = \
+                    self._equipment_maintenance_status(equipment)
+            
+            self.equipment_model.set_rows(equipments)
+            logger.debug(f"Tabela de equipamentos carregada com {self.equipment_model.rowCount()} linhas")
                 
         except Exception as e:
             logger.error(f"Erro ao carregar equipamentos: {str(e)}")
             logger.error(traceback.format_exc())
             QMessageBox.critical(self, "Erro", f"Erro ao carregar equipamentos: {str(e)}")
     
+    def _equipment_maintenance_status(self, equipment):
+        """
+        Monta os textos de última/próxima manutenção e a urgência do equipamento.
+        
+        Returns:
+            tuple: (última manutenção, próxima manutenção, urgência ou None)
+        """
+        ultima_man = equipment.get('data_ultima_manutencao')
+        ultima_man_text = str(ultima_man)[:10] if ultima_man else "Não realizada"
+        
+        # Próxima manutenção e urgência vêm calculadas do banco
+        proxima_man = equipment.get('data_proxima_manutencao')
+        if not proxima_man:
+            return ultima_man_text, "Não agendada", None
+        return ultima_man_text, str(proxima_man)[:10], equipment.get('urgencia')
+    
+    def _equipment_colors(self, estado, col):
+        """Cores da célula: a urgência colore a linha inteira; sem ela, só o Status é colorido."""
+        urgencia, ativo = estado
+        if urgencia:
+            return Styles.get_urgency_colors(urgencia, self.is_dark)
+        if col == 9:
+            return None, QColor('#28a745' if ativo else '#dc3545')
+        return None
+    
     def filter_equipment(self):
         """Filtra a tabela de equipamentos com base no texto de pesquisa."""
         try:
-            search_text = self.equipment_search_box.text().lower()
+            search_text = self.equipment_search_box.text()
             logger.debug(f"Filtrando equipamentos com texto: '{search_text}'")
             
-            for row in range(self.equipment_table.rowCount()):
-                should_show = False
-                
-                # Verificar em todas as colunas visíveis
-                for col in range(self.equipment_table.columnCount()):
-                    item = self.equipment_table.item(row, col)
-                    if item and search_text in item.text().lower():
-                        should_show = True
-                        break
-                
-                # Mostrar ou esconder a linha
-                self.equipment_table.setRowHidden(row, not should_show)
+            self.equipment_proxy.set_search_text(search_text)
         
         except Exception as e:
             logger.error(f"Erro ao filtrar equipamentos: {str(e)}")
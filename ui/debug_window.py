@@ -1,3 +1,4 @@
+from contextlib import closing
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
     QTableWidgetItem, QMessageBox, QLineEdit, QLabel, QFormLayout, QComboBox,
@@ -94,15 +95,13 @@ class DebugWindow(QMainWindow):
 
     def load_users(self):
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, nome, email, tipo_acesso, empresa, ativo, senha_hash FROM usuarios")
-            rows = cursor.fetchall()
+            with self.db.pool.connection() as conn, closing(conn.cursor()) as cursor:
+                cursor.execute("SELECT id, nome, email, tipo_acesso, empresa, ativo, senha_hash FROM usuarios")
+                rows = cursor.fetchall()
             self.table.setRowCount(len(rows))
             for row_idx, row in enumerate(rows):
                 for col_idx, value in enumerate(row):
                     self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
-            cursor.close()
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar usuários: {str(e)}")
 
@@ -0,0 +1,85 @@
+"""
+Exportação de cadastros a partir das janelas, com barra de progresso.
+
+O usuário escolhe o arquivo (.xlsx ou .csv); a exportação roda em uma
+`ProgressTask` e pode ser cancelada pela própria barra de progresso.
+"""
+import logging
+import os
+from PyQt5.QtCore import QObject, Qt
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from services.export import REGISTERS, RegisterExporter
+from ui.workers import ProgressTask
+
+logger = logging.getLogger(__name__)
+
+_FILTERS = {
+    "Planilha Excel (*.xlsx)": '.xlsx',
+    "CSV separado por ponto e vírgula (*.csv)": '.csv',
+}
+
+
+class ExportRunner(QObject):
+    """
+    Executa uma exportação por vez para a janela.
+
+    Uso:
+        self.export_runner = ExportRunner(self, self.db_models)
+        self.export_runner.start('inspecoes', filters)
+    """
+
+    def __init__(self, parent, db_models):
+        super().__init__(parent)
+        self.window = parent
+        self.db_models = db_models
+        self._task = None
+        self._dialog = None
+
+    def start(self, register: str, filters: dict = None):
+        if self._task is not None:
+            QMessageBox.information(self.window, "Exportação", "Já existe uma exportação em andamento.")
+            return
+        title = REGISTERS[register].title
+        path, selected = QFileDialog.getSaveFileName(
+            self.window, f"Exportar {title}", f"{register}.xlsx", ";;".join(_FILTERS)
+        )
+        if not path:
+            return
+        if os.path.splitext(path)[1].lower() not in _FILTERS.values():
+            path += _FILTERS.get(selected, '.xlsx')
+
+        exporter = RegisterExporter(self.db_models)
+        self._task = ProgressTask(
+            lambda progress, cancelled: exporter.export(register, path, filters, progress, cancelled)
+        )
+        self._dialog = QProgressDialog(f"Exportando {title.lower()}...", "Cancelar", 0, 0, self.window)
+        self._dialog.setWindowTitle("Exportação")
+        self._dialog.setWindowModality(Qt.WindowModal)
+        self._dialog.setMinimumDuration(500)
+        self._dialog.setAutoClose(False)
+        self._dialog.setAutoReset(False)
+        self._dialog.canceled.connect(self._task.cancel)
+
+        signals = self._task.signals
+        signals.progress.connect(self._on_progress)
+        signals.finished.connect(lambda rows: self._done(
+            QMessageBox.information, "Exportação", f"{rows} linha(s) exportada(s) para:\n{path}"))
+        signals.failed.connect(lambda erro: self._done(
+            QMessageBox.critical, "Erro", f"Erro ao exportar {title.lower()}: {erro}"))
+        signals.cancelled.connect(lambda: self._done(None, None, None))
+        logger.info(f"Exportando {register} para {path}")
+        self._task.start()
+
+    def _on_progress(self, done: int, total):
+        if total:
+            self._dialog.setMaximum(total)
+            self._dialog.setValue(min(done, total))
+        self._dialog.setLabelText(f"{done} de {total} linha(s) exportada(s)..." if total
+                                  else f"{done} linha(s) exportada(s)...")
+
+    def _done(self, show, title, message):
+        self._dialog.close()
+        self._dialog = None
+        self._task = None
+        if show:
+            show(self.window, title, message)
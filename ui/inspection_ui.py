@@ -1,7 +1,7 @@
 import logging
 import datetime
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QLabel, QMessageBox,
+                            QTableView, QLabel, QMessageBox,
                             QDateEdit, QComboBox, QLineEdit, QFormLayout, QDialog,
                             QTextEdit, QHeaderView, QGroupBox, QDialogButtonBox,
                             QCheckBox, QSpacerItem, QSizePolicy)
@@ -12,6 +12,11 @@ from controllers.inspection_controller import InspectionController
 from controllers.equipment_controller import EquipmentController
 from controllers.engineer_controller import EngineerController
 from ui.inspection_details import InspectionDetailsDialog
+from ui.workers import TableLoader
+from ui.export_dialog import ExportRunner
+from ui.table_model import ColumnTableModel, Column, display_text
+from ui.table_filter import SearchProxyModel, debounce
+from utils.helpers import as_date, format_db_date
 
 logger = logging.getLogger(__name__)
 
@@ -510,6 +515,11 @@ class InspectionTab(QWidget):
         self.equipment_controller = equipment_controller
         self.inspection_controller = inspection_controller
         self.is_dark = is_dark  # Aceita o parâmetro is_dark do AdminWindow
+        # Consultas rodam fora da thread da interface
+        self.table_loader = TableLoader(self)
+        # Filtros da última filtragem (usados pela exportação)
+        self.current_filters = {}
+        self.export_runner = None
         
         # Adicionar controller de engenheiros
         from controllers.auth_controller import AuthController
@@ -531,6 +541,7 @@ class InspectionTab(QWidget):
             'delete': '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="24" height="24"><path fill="none" d="M0 0h24v24H0z"/><path d="M7 4V2h10v2h5v2h-2v15a1 1 0 0 1-1 1H5a1 1 0 0 1-1-1V6H2V4h5zM6 6v14h12V6H6zm3 3h2v8H9V9zm4 0h2v8h-2V9z" fill="white"/></svg>',
             'filter': '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="24" height="24"><path fill="none" d="M0 0h24v24H0z"/><path d="M14 14v6l-4 2v-8L4 5V3h16v2l-6 9zM6.404 5L12 13.394 17.596 5H6.404z" fill="white"/></svg>',
             'report': '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="24" height="24"><path fill="none" d="M0 0h24v24H0z"/><path d="M20 22H4a1 1 0 0 1-1-1V3a1 1 0 0 1 1-1h16a1 1 0 0 1 1 1v18a1 1 0 0 1-1 1zm-1-2V4H5v16h14zM8 7h8v2H8V7zm0 4h8v2H8v-2zm0 4h8v2H8v-2z" fill="white"/></svg>',
+            'export': '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="24" height="24"><path fill="none" d="M0 0h24v24H0z"/><path d="M3 19h18v2H3v-2zm10-5.828L19.071 7.1l1.414 1.414L12 17 3.515 8.515 4.929 7.1 11 13.17V2h2v11.172z" fill="white"/></svg>',
         }
         
         self.init_ui()
@@ -602,11 +613,26 @@ class InspectionTab(QWidget):
         """)
         self.filter_button.clicked.connect(self.show_filter_dialog)
         
+        # Botão Exportar (com os filtros aplicados)
+        self.export_button = QPushButton("Exportar")
+        self.export_button.setIcon(self.create_icon_from_svg(self.icons['export']))
+        self.export_button.setToolTip("Exporta as inspeções listadas (com os filtros aplicados) para XLSX ou CSV")
+        self.export_button.setStyleSheet("""
+            background-color: #17a2b8;
+            color: white;
+            padding: 8px;
+            font-weight: bold;
+            border-radius: 4px;
+            min-height: 36px;
+        """)
+        self.export_button.clicked.connect(self.export_inspections)
+        
         # Adiciona os botões ao layout na ordem desejada
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.edit_button)
         button_layout.addWidget(self.delete_button)
         button_layout.addWidget(self.filter_button)
+        button_layout.addWidget(self.export_button)
         
         # Adiciona os botões ao container principal
         top_container.addLayout(button_layout)
@@ -621,7 +647,7 @@ class InspectionTab(QWidget):
         self.search_input.setMinimumWidth(200)
         self.search_input.setMaximumWidth(300)
         self.search_input.setMinimumHeight(32)
-        self.search_input.textChanged.connect(self.filter_inspections_by_text)
+        debounce(self.search_input, lambda _texto: self.filter_inspections_by_text())
         
         # Estilo da barra de pesquisa de acordo com o tema
         if self.is_dark:
@@ -657,21 +683,33 @@ class InspectionTab(QWidget):
         layout.addLayout(top_container)
         
         # Tabela de inspeções
-        self.inspection_table = QTableWidget()
-        self.inspection_table.setColumnCount(7)
-        self.inspection_table.setHorizontalHeaderLabels(
-            ["ID", "Equipamento", "Engenheiro", "Data", "Tipo", "Resultado", "Recomendações"]
+        self.inspection_table = QTableView()
+        self.inspection_model = ColumnTableModel(
+            [
+                Column("ID", lambda i: display_text(i['id']), user_role=lambda i: i['id']),
+                Column("Equipamento", self._inspection_equipment_text),
+                Column("Engenheiro", lambda i: display_text(i.get('engenheiro_nome', 'Engenheiro'))),
+                Column("Data", lambda i: format_db_date(i.get('data_inspecao'))),
+                Column("Tipo", lambda i: display_text(i.get('tipo_inspecao'))),
+                Column("Resultado", lambda i: display_text(i.get('resultado'))),
+                Column("Recomendações", self._inspection_recommendations_text),
+            ],
+            row_state=lambda i: i.get('resultado') or '',
+            colors=self._result_colors,
+            parent=self
         )
+        self.inspection_proxy = SearchProxyModel(self.inspection_model, self)
+        self.inspection_table.setModel(self.inspection_proxy)
         self.inspection_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.inspection_table.verticalHeader().setVisible(False)
         self.inspection_table.setAlternatingRowColors(True)
-        self.inspection_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.inspection_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.inspection_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.inspection_table.setSelectionBehavior(QTableView.SelectRows)
+        self.inspection_table.setSelectionMode(QTableView.SingleSelection)
         
         # Estilo da tabela melhorado para temas
         if self.is_dark:
             self.inspection_table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     background-color: #232629;
                     color: #ffffff;
                     gridline-color: #3a3d40;
@@ -684,14 +722,14 @@ class InspectionTab(QWidget):
                     border: 1px solid #3a3d40;
                     font-weight: bold;
                 }
-                QTableWidget::item:selected {
+                QTableView::item:selected {
                     background-color: #3a3d40;
                     color: #ffffff;
                 }
             """)
         else:
             self.inspection_table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     background-color: #ffffff;
                     color: #000000;
                     gridline-color: #d0d0d0;
@@ -704,7 +742,7 @@ class InspectionTab(QWidget):
                     border: 1px solid #d0d0d0;
                     font-weight: bold;
                 }
-                QTableWidget::item:selected {
+                QTableView::item:selected {
                     background-color: #e0e0e0;
                     color: #000000;
                 }
@@ -757,67 +795,41 @@ class InspectionTab(QWidget):
         return QIcon(pixmap)
     
     def load_inspections(self):
-        """Carrega as inspeções na tabela"""
-        try:
-            # Limpar tabela
-            self.inspection_table.setRowCount(0)
-            
-            # Definir cabeçalhos das colunas
-            # Alterado para ajustar à nova estrutura de dados
-            self.inspection_table.setColumnCount(7)
-            self.inspection_table.setHorizontalHeaderLabels([
-                "ID", "Equipamento", "Engenheiro", "Data", "Tipo", "Resultado", "Recomendações"
-            ])
-            
-            # Buscar todas as inspeções
-            inspections = self.inspection_controller.get_all_inspections()
-            
-            for inspection in inspections:
-                row_position = self.inspection_table.rowCount()
-                self.inspection_table.insertRow(row_position)
-                
-                # ID
-                id_item = QTableWidgetItem(str(inspection['id']))
-                id_item.setData(Qt.UserRole, inspection['id'])  # Armazenar ID como dado do objeto
-                self.inspection_table.setItem(row_position, 0, id_item)
-                
-                # Equipamento
-                equip_name = f"{inspection['equipamento_tag']} - {inspection['equipamento_nome']}" if 'equipamento_nome' in inspection else inspection['equipamento_tag']
-                self.inspection_table.setItem(row_position, 1, QTableWidgetItem(equip_name))
-                
-                # Engenheiro
-                eng_name = f"{inspection['engenheiro_nome']}" if 'engenheiro_nome' in inspection else "Engenheiro"
-                self.inspection_table.setItem(row_position, 2, QTableWidgetItem(eng_name))
-                
-                # Data
-                date_str = inspection['data_inspecao']
-                if isinstance(date_str, datetime.date):
-                    date_str = date_str.strftime('%d/%m/%Y')
-                self.inspection_table.setItem(row_position, 3, QTableWidgetItem(date_str))
-                
-                # Tipo
-                self.inspection_table.setItem(row_position, 4, QTableWidgetItem(inspection['tipo_inspecao']))
-                
-                # Resultado com cor
-                result_item = QTableWidgetItem(inspection['resultado'])
-                if inspection['resultado'] == 'Aprovado':
-                    result_item.setForeground(QColor('#28a745'))  # Verde
-                elif inspection['resultado'] == 'Reprovado':
-                    result_item.setForeground(QColor('#dc3545'))  # Vermelho
-                else:
-                    result_item.setForeground(QColor('#ffc107'))  # Amarelo
-                self.inspection_table.setItem(row_position, 5, result_item)
-                
-                # Recomendações
-                recomendacoes = inspection.get('recomendacoes', '')
-                # Limitar o texto visível para não sobrecarregar a tabela
-                recomendacoes_short = recomendacoes[:50] + '...' if len(recomendacoes) > 50 else recomendacoes
-                self.inspection_table.setItem(row_position, 6, QTableWidgetItem(recomendacoes_short))
-            
-            logger.debug(f"Carregadas {len(inspections)} inspeções")
-        except Exception as e:
-            logger.error(f"Erro ao carregar inspeções: {str(e)}")
-            QMessageBox.warning(self, "Erro", f"Erro ao carregar inspeções: {str(e)}")
+        """Carrega as inspeções na tabela em segundo plano"""
+        self.current_filters = {}
+        self.table_loader.load(
+            'inspecoes', self.inspection_controller.get_all_inspections, self._populate_inspections,
+            lambda erro: QMessageBox.warning(self, "Erro", f"Erro ao carregar inspeções: {erro}")
+        )
+    
+    def _populate_inspections(self, inspections):
+        """Preenche a tabela de inspeções"""
+        self.inspection_model.set_rows(inspections)
+        logger.debug(f"Carregadas {len(inspections)} inspeções")
+    
+    @staticmethod
+    def _inspection_equipment_text(inspection):
+        """Tag do equipamento, com o nome se disponível"""
+        if 'equipamento_nome' in inspection:
+            return f"{inspection['equipamento_tag']} - {inspection['equipamento_nome']}"
+        return display_text(inspection.get('equipamento_tag'))
+    
+    @staticmethod
+    def _inspection_recommendations_text(inspection):
+        """Recomendações limitadas a 50 caracteres para não sobrecarregar a tabela"""
+        recomendacoes = inspection.get('recomendacoes') or ''
+        return recomendacoes[:50] + '...' if len(recomendacoes) > 50 else recomendacoes
+    
+    @staticmethod
+    def _result_colors(resultado, col):
+        """Cor do texto da coluna Resultado (fundo inalterado)"""
+        if col != 5:
+            return None
+        if resultado == 'Aprovado':
+            return None, QColor('#28a745')  # Verde
+        if resultado == 'Reprovado':
+            return None, QColor('#dc3545')  # Vermelho
+        return None, QColor('#ffc107')  # Amarelo
     
     def get_selected_inspection(self):
         """Retorna a inspeção selecionada ou None se nenhuma estiver selecionada"""
@@ -827,22 +839,14 @@ class InspectionTab(QWidget):
             QMessageBox.warning(self, "Seleção", "Por favor, selecione uma inspeção.")
             return None
             
-        row = selected_rows[0].row()
+        # Linha no modelo de origem (a tabela pode estar filtrada)
+        row = self.inspection_proxy.mapToSource(selected_rows[0]).row()
         
-        # Obter o ID da inspeção a partir de UserRole no primeiro item da linha
-        item = self.inspection_table.item(row, 0)
-        if not item:
-            QMessageBox.warning(self, "Erro", "Não foi possível identificar a inspeção selecionada.")
-            return None
-            
-        inspection_id = item.data(Qt.UserRole)
+        # ID da inspeção no UserRole da coluna ID
+        inspection_id = self.inspection_model.role_value(row, 0)
         if not inspection_id:
-            # Tentar obter o ID a partir do texto como fallback
-            try:
-                inspection_id = int(item.text())
-            except (ValueError, TypeError):
-                QMessageBox.warning(self, "Erro", "ID da inspeção não encontrado.")
-                return None
+            QMessageBox.warning(self, "Erro", "ID da inspeção não encontrado.")
+            return None
         
         try:
             return self.inspection_controller.get_inspection_by_id(inspection_id)
@@ -1010,60 +1014,25 @@ class InspectionTab(QWidget):
         
         if dialog.exec_():
             filters = dialog.get_filters()
-            try:
-                # Carregar inspeções com filtros
-                inspections = self.inspection_controller.get_filtered_inspections(filters)
-                
-                # Limpar tabela
-                self.inspection_table.setRowCount(0)
-                
-                for inspection in inspections:
-                    row_position = self.inspection_table.rowCount()
-                    self.inspection_table.insertRow(row_position)
-                    
-                    # ID
-                    id_item = QTableWidgetItem(str(inspection['id']))
-                    id_item.setData(Qt.UserRole, inspection['id'])  # Armazena o ID como dado do objeto
-                    self.inspection_table.setItem(row_position, 0, id_item)
-                    
-                    # Equipamento
-                    equip_name = f"{inspection['equipamento_tag']} - {inspection['equipamento_nome']}"
-                    self.inspection_table.setItem(row_position, 1, QTableWidgetItem(equip_name))
-                    
-                    # Engenheiro
-                    eng_name = f"{inspection['engenheiro_nome']}"
-                    self.inspection_table.setItem(row_position, 2, QTableWidgetItem(eng_name))
-                    
-                    # Data
-                    date_str = inspection['data_inspecao']
-                    if isinstance(date_str, datetime.date):
-                        date_str = date_str.strftime('%d/%m/%Y')
-                    self.inspection_table.setItem(row_position, 3, QTableWidgetItem(date_str))
-                    
-                    # Tipo
-                    self.inspection_table.setItem(row_position, 4, QTableWidgetItem(inspection['tipo_inspecao']))
-                    
-                    # Resultado com cor
-                    result_item = QTableWidgetItem(inspection['resultado'])
-                    if inspection['resultado'] == 'Aprovado':
-                        result_item.setForeground(QColor('#28a745'))  # Verde
-                    elif inspection['resultado'] == 'Reprovado':
-                        result_item.setForeground(QColor('#dc3545'))  # Vermelho
-                    else:
-                        result_item.setForeground(QColor('#ffc107'))  # Amarelo
-                    self.inspection_table.setItem(row_position, 5, result_item)
-                    
-                    # Recomendações
-                    recomendacoes = inspection.get('recomendacoes', '')
-                    # Limitar o texto visível para não sobrecarregar a tabela
-                    recomendacoes_short = recomendacoes[:50] + '...' if len(recomendacoes) > 50 else recomendacoes
-                    self.inspection_table.setItem(row_position, 6, QTableWidgetItem(recomendacoes_short))
-                
-                QMessageBox.information(self, "Filtro Aplicado", f"Exibindo {len(inspections)} inspeções conforme filtros selecionados.")
-                logger.debug(f"Filtro aplicado: {filters}")
-            except Exception as e:
-                logger.error(f"Erro ao aplicar filtros: {str(e)}")
-                QMessageBox.warning(self, "Erro", f"Erro ao filtrar inspeções: {str(e)}")
+            self.current_filters = filters
+            # Carregar inspeções com filtros em segundo plano
+            self.table_loader.load(
+                'inspecoes', lambda: self.inspection_controller.get_filtered_inspections(filters),
+                lambda inspections: self._apply_filtered_inspections(filters, inspections),
+                lambda erro: QMessageBox.warning(self, "Erro", f"Erro ao filtrar inspeções: {erro}")
+            )
+    
+    def _apply_filtered_inspections(self, filters, inspections):
+        """Exibe o resultado da filtragem"""
+        self._populate_inspections(inspections)
+        QMessageBox.information(self, "Filtro Aplicado", f"Exibindo {len(inspections)} inspeções conforme filtros selecionados.")
+        logger.debug(f"Filtro aplicado: {filters}")
+    
+    def export_inspections(self):
+        """Exporta as inspeções com os filtros aplicados, em segundo plano"""
+        if self.export_runner is None:
+            self.export_runner = ExportRunner(self, self.inspection_controller.db_models)
+        self.export_runner.start('inspecoes', self.current_filters)
     
     def generate_report(self):
         """Gera laudo técnico a partir da inspeção selecionada"""
@@ -1101,8 +1070,10 @@ class InspectionTab(QWidget):
             else:
                 insp_date = QDate.currentDate()
             
-            # Calcula a data da próxima inspeção (1 ano após)
-            proxima_date = insp_date.addYears(1)
+            # Próximo exame calculado pelos prazos NR-13 ao registrar a inspeção;
+            # sem data, a janela do laudo sugere pelos prazos da categoria
+            proxima = as_date(inspection.get('proxima_inspecao'))
+            proxima_date = QDate(proxima.year, proxima.month, proxima.day) if proxima else None
             
             # Busca dados do equipamento
             equipamento = self.equipment_controller.get_equipment_by_id(inspection['equipamento_id'])
@@ -1216,27 +1187,7 @@ class InspectionTab(QWidget):
 
     def filter_inspections_by_text(self):
         """Filtra a lista de inspeções com base no texto de pesquisa"""
-        search_text = self.search_input.text().lower()
-        
-        # Mostra todas as linhas se o texto estiver vazio
-        if not search_text:
-            for row in range(self.inspection_table.rowCount()):
-                self.inspection_table.setRowHidden(row, False)
-            return
-        
-        # Procura em cada linha
-        for row in range(self.inspection_table.rowCount()):
-            match_found = False
-            
-            # Procura em cada coluna da linha
-            for col in range(self.inspection_table.columnCount()):
-                item = self.inspection_table.item(row, col)
-                if item and search_text in item.text().lower():
-                    match_found = True
-                    break
-            
-            # Mostra ou esconde a linha com base no resultado da pesquisa
-            self.inspection_table.setRowHidden(row, not match_found)
+        self.inspection_proxy.set_search_text(self.search_input.text())
 
     def update_theme(self, table_style=None):
         """Atualiza o tema da aba de inspeções"""
@@ -1246,7 +1197,7 @@ class InspectionTab(QWidget):
             # Atualiza o estilo da tabela
             if self.is_dark:
                 table_style = table_style or """
-                    QTableWidget {
+                    QTableView {
                         background-color: #232629;
                         color: #ffffff;
                         gridline-color: #3a3d40;
@@ -1259,7 +1210,7 @@ class InspectionTab(QWidget):
                         border: 1px solid #3a3d40;
                         font-weight: bold;
                     }
-                    QTableWidget::item:selected {
+                    QTableView::item:selected {
                         background-color: #3a3d40;
                         color: #ffffff;
                     }
@@ -1280,7 +1231,7 @@ class InspectionTab(QWidget):
                 """
             else:
                 table_style = table_style or """
-                    QTableWidget {
+                    QTableView {
                         background-color: #ffffff;
                         color: #000000;
                         gridline-color: #d0d0d0;
@@ -1293,7 +1244,7 @@ class InspectionTab(QWidget):
                         border: 1px solid #d0d0d0;
                         font-weight: bold;
                     }
-                    QTableWidget::item:selected {
+                    QTableView::item:selected {
                         background-color: #e0e0e0;
                         color: #000000;
                     }
@@ -14,12 +14,15 @@ from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QLineEdit, QTextEdit, QComboBox, QDateEdit, QPushButton,
     QMessageBox, QGroupBox, QScrollArea, QSpinBox, QDoubleSpinBox,
-    QFileDialog, QCheckBox
+    QFileDialog, QCheckBox, QProgressBar
 )
-from PyQt5.QtCore import Qt, QDate
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtCore import Qt, QDate, QThreadPool, QUrl
+from PyQt5.QtGui import QIcon, QPixmap, QDesktopServices
 
 from utils.pdf_generator import LaudoTecnicoPDF
+from utils.helpers import calculate_next_inspection
+from services.due_dates import SEM_PRAZO_FIXO
+from ui.workers import ProgressTask
 
 # Configuração do logging
 logger = logging.getLogger(__name__)
@@ -34,11 +37,20 @@ class LaudoWindow(QMainWindow):
         self.setGeometry(100, 100, 800, 700)
         self.setup_ui()
         self.pdf_generator = LaudoTecnicoPDF()
+        # Laudos são gerados fora da thread da interface, um por vez, na ordem pedida
+        self.render_pool = QThreadPool(self)
+        self.render_pool.setMaxThreadCount(1)
+        self._renderizacoes = []
         
         # Se recebeu dados de inspeção, preenche o formulário
         if self.inspection_data:
             self.preencher_com_dados_inspecao()
         
+        # Conectado depois do preenchimento para manter a data recebida
+        self.insp_data.dateChanged.connect(self.sugerir_proxima_inspecao)
+        self.insp_tipo.currentTextChanged.connect(self.sugerir_proxima_inspecao)
+        self.equip_categoria.currentTextChanged.connect(self.sugerir_proxima_inspecao)
+        
     def setup_ui(self):
         """Configuração da interface de usuário"""
         # Widget central
@@ -166,10 +178,10 @@ class LaudoWindow(QMainWindow):
         ])
         
         self.insp_proxima = QDateEdit()
-        # Define a próxima inspeção para 1 ano após a data atual
-        prox_data = QDate.currentDate().addYears(1)
-        self.insp_proxima.setDate(prox_data)
         self.insp_proxima.setCalendarPopup(True)
+        # Data mínima = sem prazo fixo, exibida como texto
+        self.insp_proxima.setSpecialValueText(SEM_PRAZO_FIXO)
+        self.sugerir_proxima_inspecao()
         
         # Adiciona campos ao layout
         inspection_layout.addRow("Data da Inspeção:", self.insp_data)
@@ -254,6 +266,31 @@ class LaudoWindow(QMainWindow):
         self.btn_gerar_pdf.clicked.connect(self.gerar_laudo_pdf)
         button_layout.addWidget(self.btn_gerar_pdf)
         
+        # === Progresso da geração (barra de status) ===
+        self.render_label = QLabel()
+        self.render_progress = QProgressBar()
+        self.render_progress.setMaximumWidth(200)
+        self.btn_cancelar_render = QPushButton("Cancelar")
+        self.btn_cancelar_render.setToolTip("Cancela o laudo em geração e os que estão na fila")
+        self.btn_cancelar_render.clicked.connect(self.cancelar_renderizacoes)
+        for widget in (self.render_label, self.render_progress, self.btn_cancelar_render):
+            self.statusBar().addPermanentWidget(widget)
+            widget.hide()
+        
+    def sugerir_proxima_inspecao(self, *_):
+        """Preenche a próxima inspeção pelos prazos NR-13 da categoria e do tipo de inspeção."""
+        proxima = calculate_next_inspection(self.insp_data.date().toPyDate(),
+                                            self.insp_tipo.currentText(),
+                                            self.equip_categoria.currentText())
+        self.insp_proxima.setDate(QDate(proxima.year, proxima.month, proxima.day) if proxima
+                                  else self.insp_proxima.minimumDate())
+
+    def texto_proxima_inspecao(self) -> str:
+        """Próxima inspeção como aparece no laudo (dd/MM/yyyy ou sem prazo fixo)."""
+        if self.insp_proxima.date() == self.insp_proxima.minimumDate():
+            return SEM_PRAZO_FIXO
+        return self.insp_proxima.date().toString("dd/MM/yyyy")
+        
     def limpar_formulario(self):
         """Limpa todos os campos do formulário"""
         try:
@@ -265,7 +302,6 @@ class LaudoWindow(QMainWindow):
                 
             # Reseta campos de data
             self.insp_data.setDate(QDate.currentDate())
-            self.insp_proxima.setDate(QDate.currentDate().addYears(1))
             
             # Reseta spinners
             self.equip_ano.setValue(datetime.now().year)
@@ -292,6 +328,7 @@ class LaudoWindow(QMainWindow):
             self.equip_categoria.setCurrentIndex(0)
             self.insp_tipo.setCurrentIndex(0)
             self.insp_resultado.setCurrentIndex(0)
+            self.sugerir_proxima_inspecao()
             
             QMessageBox.information(self, "Formulário Limpo", "O formulário foi limpo com sucesso!")
             
@@ -301,7 +338,7 @@ class LaudoWindow(QMainWindow):
             QMessageBox.critical(self, "Erro", f"Erro ao limpar formulário: {str(e)}")
             
     def gerar_laudo_pdf(self):
-        """Gera um laudo técnico em PDF com os dados do formulário"""
+        """Gera um laudo técnico em PDF com os dados do formulário, em segundo plano"""
         try:
             # Verifica campos obrigatórios
             if not self.cliente_nome.text().strip():
@@ -316,45 +353,102 @@ class LaudoWindow(QMainWindow):
                 QMessageBox.warning(self, "Atenção", "O nome do engenheiro responsável é obrigatório.")
                 return
             
-            # Prepara os dados para o PDF
-            dados = self._preparar_dados_laudo()
-            
-            # Gera o PDF
-            caminho_saida = self.pdf_generator.gerar_laudo(dados)
+            caminho_saida, _ = QFileDialog.getSaveFileName(
+                self,
+                "Salvar Laudo Técnico",
+                f"Laudo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                "Arquivos PDF (*.pdf)"
+            )
+            if not caminho_saida:
+                return  # Usuário cancelou
+            if not caminho_saida.lower().endswith('.pdf'):
+                caminho_saida += '.pdf'
             
-            if caminho_saida:
-                QMessageBox.information(
-                    self, 
-                    "Laudo Gerado", 
-                    f"O laudo técnico foi gerado com sucesso!\nSalvo em: {caminho_saida}"
-                )
-                
-                # Pergunta se deseja abrir o PDF
-                resposta = QMessageBox.question(
-                    self,
-                    "Abrir PDF",
-                    "Deseja abrir o arquivo PDF gerado?",
-                    QMessageBox.Yes | QMessageBox.No,
-                    QMessageBox.Yes
-                )
-                
-                if resposta == QMessageBox.Yes:
-                    # Abre o arquivo usando o visualizador padrão do sistema
-                    import platform
-                    import subprocess
-                    
-                    if platform.system() == 'Darwin':  # macOS
-                        subprocess.call(('open', caminho_saida))
-                    elif platform.system() == 'Windows':  # Windows
-                        os.startfile(caminho_saida)
-                    else:  # Linux e outros
-                        subprocess.call(('xdg-open', caminho_saida))
+            # Os dados são lidos agora; o formulário pode ser alterado durante a geração
+            dados = self._preparar_dados_laudo()
+            self._enfileirar_renderizacao(dados, caminho_saida)
         
         except Exception as e:
             logger.error(f"Erro ao gerar laudo PDF: {str(e)}")
             logger.error(traceback.format_exc())
             QMessageBox.critical(self, "Erro", f"Erro ao gerar laudo PDF: {str(e)}")
     
+    def _enfileirar_renderizacao(self, dados, caminho_saida):
+        """Coloca o laudo na fila de geração (um por vez, na ordem pedida)"""
+        tarefa = ProgressTask(
+            lambda progresso, cancelado: self.pdf_generator.renderizar(
+                dados, caminho_saida, progresso, cancelado)
+        )
+        nome = os.path.basename(caminho_saida)
+        sinais = tarefa.signals
+        sinais.progress.connect(lambda feitos, total: self._renderizacao_progresso(tarefa, nome, feitos, total))
+        sinais.message.connect(lambda mensagem: self._renderizacao_mensagem(tarefa, nome, mensagem))
+        sinais.finished.connect(lambda caminho: self._renderizacao_concluida(tarefa, caminho))
+        sinais.failed.connect(lambda erro: self._renderizacao_falhou(tarefa, erro))
+        sinais.cancelled.connect(lambda: self._renderizacao_encerrada(tarefa))
+        
+        self._renderizacoes.append(tarefa)
+        logger.info(f"Laudo {nome} na fila de geração ({len(self._renderizacoes)} na fila)")
+        self._atualizar_status(f"Aguardando: {nome}")
+        tarefa.start(self.render_pool)
+    
+    def _atualizar_status(self, texto):
+        fila = len(self._renderizacoes) - 1
+        if fila > 0:
+            texto += f" (+{fila} na fila)"
+        self.render_label.setText(texto)
+        for widget in (self.render_label, self.render_progress, self.btn_cancelar_render):
+            widget.setVisible(bool(self._renderizacoes))
+    
+    def _renderizacao_progresso(self, tarefa, nome, feitos, total):
+        if self._renderizacoes and self._renderizacoes[0] is tarefa:
+            self.render_progress.setMaximum(total or 0)
+            self.render_progress.setValue(feitos)
+    
+    def _renderizacao_mensagem(self, tarefa, nome, mensagem):
+        if self._renderizacoes and self._renderizacoes[0] is tarefa:
+            self._atualizar_status(f"Gerando {nome} - {mensagem}")
+    
+    def _renderizacao_encerrada(self, tarefa):
+        if tarefa in self._renderizacoes:
+            self._renderizacoes.remove(tarefa)
+        self.render_progress.reset()
+        self._atualizar_status("")
+    
+    def _renderizacao_concluida(self, tarefa, caminho_saida):
+        self._renderizacao_encerrada(tarefa)
+        logger.info(f"Laudo técnico gerado com sucesso: {caminho_saida}")
+        self.statusBar().showMessage(f"Laudo gerado: {caminho_saida}", 10000)
+        
+        # Pergunta se deseja abrir o PDF
+        resposta = QMessageBox.question(
+            self,
+            "Laudo Gerado",
+            f"O laudo técnico foi gerado com sucesso!\nSalvo em: {caminho_saida}\n\n"
+            "Deseja abrir o arquivo PDF gerado?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        if resposta == QMessageBox.Yes:
+            # Abre no visualizador padrão do sistema sem esperar por ele
+            QDesktopServices.openUrl(QUrl.fromLocalFile(caminho_saida))
+    
+    def _renderizacao_falhou(self, tarefa, erro):
+        self._renderizacao_encerrada(tarefa)
+        QMessageBox.critical(self, "Erro", f"Erro ao gerar laudo PDF: {erro}")
+    
+    def cancelar_renderizacoes(self):
+        """Cancela o laudo em geração e os que aguardam na fila"""
+        for tarefa in list(self._renderizacoes):
+            tarefa.cancel()
+        self.render_label.setText("Cancelando...")
+    
+    def closeEvent(self, event):
+        """Cancela as gerações pendentes ao fechar a janela"""
+        self.cancelar_renderizacoes()
+        self.render_pool.waitForDone(2000)
+        super().closeEvent(event)
+    
     def _preparar_dados_laudo(self):
         """Prepara os dados do formulário para o PDF"""
         # Coleta os ensaios selecionados
@@ -411,7 +505,7 @@ class LaudoWindow(QMainWindow):
             'inspecao_tipo': self.insp_tipo.currentText(),
             'inspecao_responsavel': self.insp_responsavel.text(),
             'inspecao_resultado': self.insp_resultado.currentText(),
-            'inspecao_proxima': self.insp_proxima.date().toString("dd/MM/yyyy"),
+            'inspecao_proxima': self.texto_proxima_inspecao(),
             
             # Informações detalhadas
             'ensaios_realizados': ensaios_texto,
@@ -5,7 +5,29 @@
 Estilos compartilhados do sistema
 """
 
+from PyQt5.QtGui import QColor
+
 class Styles:
+    # Cores das linhas por urgência de manutenção:
+    # (fundo tema escuro, texto tema escuro, fundo tema claro, texto tema claro)
+    URGENCY_COLORS = {
+        'atrasada': ((90, 10, 10), (255, 130, 130), (255, 200, 200), (139, 0, 0)),
+        'urgente': ((90, 20, 20), (255, 150, 150), (255, 200, 200), (139, 0, 0)),
+        'alta': ((90, 60, 10), (255, 200, 120), (255, 230, 180), (102, 51, 0)),
+        'media': ((90, 90, 10), (255, 255, 150), (255, 255, 180), (102, 102, 0)),
+    }
+
+    # Indicador exibido antes da tag/data conforme a urgência
+    URGENCY_ICONS = {'atrasada': "❗ ", 'urgente': "❗ ", 'alta': "⚠️ ", 'media': "⚠️ "}
+
+    @staticmethod
+    def get_urgency_colors(urgencia, is_dark):
+        """Retorna (cor de fundo, cor do texto) para a urgência no tema informado."""
+        fundo_escuro, texto_escuro, fundo_claro, texto_claro = Styles.URGENCY_COLORS[urgencia]
+        if is_dark:
+            return QColor(*fundo_escuro), QColor(*texto_escuro)
+        return QColor(*fundo_claro), QColor(*texto_claro)
+
     @staticmethod
     def get_dark_theme():
         return """
@@ -42,16 +64,16 @@ class Styles:
             QPushButton:pressed {
                 background-color: #2a2d30;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #232629;
                 color: #f1f1f1;
                 border: 1px solid #444;
                 border-radius: 6px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #007bff;
                 color: #f1f1f1;
             }
@@ -190,16 +212,16 @@ class Styles:
             QPushButton:pressed {
                 background-color: #d1d5d8;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #fff;
                 color: #212529;
                 border: 1px solid #ced4da;
                 border-radius: 6px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #007bff;
                 color: #fff;
             }
@@ -0,0 +1,306 @@
+"""
+Filtro de texto das tabelas da interface.
+
+Cada linha tem um texto de busca pré-calculado (todas as colunas em minúsculas
+e sem acentos), então cada tecla digitada faz uma busca por substring por
+linha em vez de ler o texto de todas as células. A digitação é agrupada por um
+temporizador antes de aplicar o filtro.
+"""
+import logging
+import unicodedata
+from bisect import bisect_left, bisect_right
+from PyQt5.QtCore import Qt, QAbstractProxyModel, QTimer, QModelIndex
+
+logger = logging.getLogger(__name__)
+
+# Separador entre colunas no texto de busca (não aparece em texto digitado)
+FIELD_SEPARATOR = '\x1f'
+SEARCH_DEBOUNCE_MS = 200
+
+
+def fold_text(text) -> str:
+    """Minúsculas e sem acentos: 'Inspeção' -> 'inspecao'."""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text).lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def row_search_text(values) -> str:
+    """Texto de busca de uma linha a partir dos valores exibidos."""
+    return fold_text(FIELD_SEPARATOR.join(values))
+
+
+def debounce(line_edit, callback, delay_ms: int = SEARCH_DEBOUNCE_MS):
+    """
+    Chama `callback(texto)` só depois que o usuário parar de digitar.
+
+    Returns:
+        QTimer: temporizador usado (filho do campo de texto)
+    """
+    timer = QTimer(line_edit)
+    timer.setSingleShot(True)
+    timer.setInterval(delay_ms)
+    line_edit.textChanged.connect(lambda _text: timer.start())
+    timer.timeout.connect(lambda: callback(line_edit.text()))
+    return timer
+
+
+class SearchProxyModel(QAbstractProxyModel):
+    """
+    Proxy de filtro para um `ColumnTableModel`.
+
+    Aplica o texto de busca (sem acentos) sobre o índice de busca do modelo e,
+    opcionalmente, predicados por coluna comparando o valor de UserRole
+    (ex.: ID da empresa). As linhas aceitas são calculadas de uma vez a cada
+    mudança do filtro, percorrendo as listas do modelo (`search_texts`,
+    `role_values`), e guardadas em ordem; a view só consulta essa lista para as
+    linhas visíveis. Quando o texto digitado estende o anterior, só as linhas
+    já aceitas são verificadas. Alterações do modelo de origem atualizam a
+    lista só nas linhas afetadas.
+
+    Com um modelo paginado, enquanto houver filtro as páginas restantes
+    continuam sendo buscadas, já que a view só pede mais linhas quando a
+    última linha visível aparece.
+    """
+
+    def __init__(self, source_model, parent=None):
+        super().__init__(parent)
+        self._needle = ''
+        self._column_filters = {}
+        # Linhas aceitas do modelo de origem, em ordem (None: sem filtro, todas)
+        self._rows = None
+        self.setSourceModel(source_model)
+        source_model.modelAboutToBeReset.connect(self.beginResetModel)
+        source_model.modelReset.connect(self._source_reset)
+        source_model.rowsAboutToBeInserted.connect(self._source_rows_about_to_be_inserted)
+        source_model.rowsInserted.connect(self._source_rows_inserted)
+        source_model.rowsAboutToBeRemoved.connect(self._source_rows_about_to_be_removed)
+        source_model.rowsRemoved.connect(self._source_rows_removed)
+        source_model.dataChanged.connect(self._source_data_changed)
+        source_model.headerDataChanged.connect(self.headerDataChanged)
+        source_model.rowsInserted.connect(self._fetch_while_filtering)
+
+    # --- Estrutura (interface do Qt) ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        source = self.sourceModel()
+        rows = source.rowCount() if self._rows is None else len(self._rows)
+        if parent.isValid() or not (0 <= row < rows and 0 <= column < source.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Direto no armazenamento do modelo, sem mapear o índice (chamado a cada célula pintada)
+        if not index.isValid():
+            return None
+        row = index.row()
+        return self.sourceModel().cell_data(row if self._rows is None else self._rows[row],
+                                            index.column(), role)
+
+    def flags(self, index):
+        # As flags do ColumnTableModel não dependem da linha
+        return self.sourceModel().flags(index)
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row()
+        return self.sourceModel().index(row if self._rows is None else self._rows[row],
+                                        proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            position = bisect_left(self._rows, row)
+            if position == len(self._rows) or self._rows[position] != row:
+                return QModelIndex()
+            row = position
+        return self.index(row, source_index.column())
+
+    def source_row(self, proxy_row: int) -> int:
+        """Linha do modelo de origem correspondente à linha exibida."""
+        return proxy_row if self._rows is None else self._rows[proxy_row]
+
+    # --- Filtro ---
+
+    def set_search_text(self, text: str):
+        needle = fold_text(text.strip())
+        if needle != self._needle:
+            # Texto estendido: as linhas aceitas só podem diminuir
+            narrowing = self._rows is not None and self._needle and self._needle in needle
+            self._needle = needle
+            self._refilter(self._rows if narrowing else None)
+
+    def set_column_filter(self, column: int, value):
+        """Mantém só as linhas cujo UserRole da coluna é `value` (None remove o filtro)."""
+        if value is None:
+            if self._column_filters.pop(column, None) is not None:
+                self._refilter()
+            return
+        if self._column_filters.get(column) != value:
+            self._column_filters[column] = value
+            self._refilter()
+
+    def _filtering(self) -> bool:
+        return bool(self._needle or self._column_filters)
+
+    def _accepted(self, candidates=None):
+        """Linhas de origem aceitas pelo filtro, em ordem (None se não há filtro)."""
+        if not self._filtering():
+            return None
+        source = self.sourceModel()
+        rows = range(source.rowCount()) if candidates is None else candidates
+        for column, value in self._column_filters.items():
+            roles = source.role_values(column)
+            rows = [row for row in rows if roles[row] == value]
+        if self._needle:
+            needle, texts = self._needle, source.search_texts()
+            rows = [row for row in rows if needle in texts[row]]
+        return list(rows)
+
+    def _accepts(self, row: int) -> bool:
+        source = self.sourceModel()
+        for column, value in self._column_filters.items():
+            if source.role_value(row, column) != value:
+                return False
+        return not self._needle or self._needle in source.search_text(row)
+
+    def _refilter(self, candidates=None):
+        self.beginResetModel()
+        self._rows = self._accepted(candidates)
+        self.endResetModel()
+        self._fetch_while_filtering()
+
+    def _fetch_while_filtering(self, *args):
+        source = self.sourceModel()
+        if self._filtering() and source.canFetchMore(QModelIndex()):
+            source.fetchMore(QModelIndex())
+
+    # --- Alterações do modelo de origem ---
+
+    def _source_reset(self):
+        self._rows = self._accepted()
+        self.endResetModel()
+
+    def _source_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _source_rows_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        count = last - first + 1
+        position = bisect_left(self._rows, first)
+        for i in range(position, len(self._rows)):
+            self._rows[i] += count
+        new = [row for row in range(first, last + 1) if self._accepts(row)]
+        if new:
+            self.beginInsertRows(QModelIndex(), position, position + len(new) - 1)
+            self._rows[position:position] = new
+            self.endInsertRows()
+
+    def _source_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        start, end = bisect_left(self._rows, first), bisect_right(self._rows, last)
+        if end > start:
+            self.beginRemoveRows(QModelIndex(), start, end - 1)
+            del self._rows[start:end]
+            self.endRemoveRows()
+
+    def _source_rows_removed(self, parent, first, last):
+        if self._rows is None:
+            self.endRemoveRows()
+            return
+        count = last - first + 1
+        for i in range(bisect_right(self._rows, last), len(self._rows)):
+            self._rows[i] -= count
+
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        first, last = top_left.row(), bottom_right.row()
+        left, right = top_left.column(), bottom_right.column()
+        if self._rows is None:
+            self.dataChanged.emit(self.index(first, left), self.index(last, right), roles)
+            return
+        if not roles or Qt.DisplayRole in roles or Qt.UserRole in roles:
+            # O texto mudou: a linha pode entrar ou sair do filtro
+            for row in range(first, last + 1):
+                self._recheck(row)
+        start, end = bisect_left(self._rows, first), bisect_right(self._rows, last)
+        if end > start:
+            self.dataChanged.emit(self.index(start, left), self.index(end - 1, right), roles)
+
+    def _recheck(self, row: int):
+        position = bisect_left(self._rows, row)
+        present = position < len(self._rows) and self._rows[position] == row
+        accepted = self._accepts(row)
+        if accepted and not present:
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, row)
+            self.endInsertRows()
+        elif present and not accepted:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self._rows[position]
+            self.endRemoveRows()
+
+
+class TableWidgetSearch:
+    """
+    Índice de busca para um QTableWidget.
+
+    O índice é refeito só quando o conteúdo da tabela muda (sinais do modelo
+    interno), e não a cada tecla.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._rows = None
+        model = table.model()
+        for signal in (model.dataChanged, model.rowsInserted, model.rowsRemoved,
+                       model.modelReset, model.layoutChanged):
+            signal.connect(self._invalidate)
+
+    def _invalidate(self, *args):
+        self._rows = None
+
+    def _build(self):
+        table = self.table
+        columns = range(table.columnCount())
+        rows = []
+        for row in range(table.rowCount()):
+            values = []
+            for col in columns:
+                item = table.item(row, col)
+                if item is not None:
+                    values.append(item.text())
+            rows.append(row_search_text(values))
+        self._rows = rows
+
+    def apply(self, text: str) -> int:
+        """Oculta as linhas que não contêm o texto. Retorna quantas ficaram ocultas."""
+        if self._rows is None:
+            self._build()
+        needle = fold_text(text.strip())
+        hidden = 0
+        for row, row_text in enumerate(self._rows):
+            hide = bool(needle) and needle not in row_text
+            if self.table.isRowHidden(row) != hide:
+                self.table.setRowHidden(row, hide)
+            hidden += hide
+        return hidden
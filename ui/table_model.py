@@ -0,0 +1,353 @@
+"""
+Modelo de tabela somente leitura para as listagens da interface.
+
+Os valores exibidos são formatados uma vez na carga e guardados por coluna
+(uma lista por coluna), sem um QTableWidgetItem por célula. Cores são
+calculadas sob demanda em `data()` a partir de um estado por linha, e as
+recargas atualizam só as linhas alteradas (dataChanged / insert / remove).
+Cada linha guarda também seu texto de busca, usado pelo `SearchProxyModel`.
+`PagedTableModel` carrega as linhas por páginas conforme a rolagem.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from database.paging import PAGE_SIZE
+from ui.table_filter import row_search_text
+
+logger = logging.getLogger(__name__)
+
+
+def display_text(value) -> str:
+    """Texto exibido para um valor do banco (None vira célula vazia)."""
+    return '' if value is None else str(value)
+
+
+@dataclass
+class Column:
+    """Definição de uma coluna do modelo."""
+    header: str
+    value: Callable[[dict], str]
+    user_role: Optional[Callable[[dict], object]] = None
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """
+    Modelo de tabela com armazenamento por coluna.
+
+    Args:
+        columns: Lista de `Column`
+        key: Função que retorna a chave única de um registro (padrão: 'id')
+        row_state: Função que retorna o estado da linha usado nas cores
+        colors: Função (estado, coluna) -> (cor de fundo, cor do texto) ou None;
+            só é chamada para estados diferentes de None
+    """
+
+    def __init__(self, columns, key=None, row_state=None, colors=None, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.key = key or (lambda record: record.get('id'))
+        self.row_state = row_state
+        self.colors = colors
+        self._keys = []
+        self._values = [[] for _ in self.columns]
+        self._roles = {c: [] for c, column in enumerate(self.columns) if column.user_role}
+        self._states = []
+        self._search = []
+        self._row_of = {}
+        self._color_cache = {}
+
+    # --- Interface do Qt ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.cell_data(index.row(), index.column(), role)
+
+    def cell_data(self, row: int, col: int, role=Qt.DisplayRole):
+        """`data()` por linha e coluna, sem criar um QModelIndex (usado pelo proxy de busca)."""
+        if role == Qt.DisplayRole:
+            return self._values[col][row]
+        if role == Qt.UserRole:
+            values = self._roles.get(col)
+            return values[row] if values is not None else None
+        if role in (Qt.BackgroundRole, Qt.ForegroundRole):
+            colors = self._colors_for(self._states[row], col)
+            if colors is None:
+                return None
+            return colors[0] if role == Qt.BackgroundRole else colors[1]
+        return None
+
+    # --- Acesso aos dados ---
+
+    def key_at(self, row: int):
+        """Chave (ID) do registro exibido na linha."""
+        return self._keys[row]
+
+    def row_of(self, key) -> int:
+        """Linha do registro com a chave informada (-1 se não existir)."""
+        return self._row_of.get(key, -1)
+
+    def value(self, row: int, col: int):
+        return self._values[col][row]
+
+    def role_value(self, row: int, col: int):
+        values = self._roles.get(col)
+        return values[row] if values is not None else None
+
+    def search_text(self, row: int) -> str:
+        """Texto da linha em minúsculas e sem acentos, para o filtro."""
+        return self._search[row]
+
+    def search_texts(self) -> list:
+        """Textos de busca de todas as linhas (somente leitura), para o filtro."""
+        return self._search
+
+    def role_values(self, col: int) -> list:
+        """Valores de UserRole da coluna em todas as linhas (somente leitura)."""
+        return self._roles[col]
+
+    # --- Carga ---
+
+    def _extract(self, record):
+        values = tuple(column.value(record) for column in self.columns)
+        roles = tuple(self.columns[c].user_role(record) for c in self._roles)
+        state = self.row_state(record) if self.row_state else None
+        return values, roles, state
+
+    def _store(self, row, extracted):
+        values, roles, state = extracted
+        for c, value in enumerate(values):
+            self._values[c][row] = value
+        for values_list, value in zip(self._roles.values(), roles):
+            values_list[row] = value
+        self._states[row] = state
+        self._search[row] = row_search_text(values)
+
+    def _append(self, key, extracted):
+        values, roles, state = extracted
+        self._row_of[key] = len(self._keys)
+        self._keys.append(key)
+        for c, value in enumerate(values):
+            self._values[c].append(value)
+        for values_list, value in zip(self._roles.values(), roles):
+            values_list.append(value)
+        self._states.append(state)
+        self._search.append(row_search_text(values))
+
+    def _current(self, row):
+        return (
+            tuple(values[row] for values in self._values),
+            tuple(values[row] for values in self._roles.values()),
+            self._states[row],
+        )
+
+    def _remove(self, row):
+        del self._keys[row]
+        for values in self._values:
+            del values[row]
+        for values in self._roles.values():
+            del values[row]
+        del self._states[row]
+        del self._search[row]
+
+    def set_rows(self, records):
+        """
+        Substitui o conteúdo do modelo, na ordem dos registros recebidos.
+
+        Na primeira carga o modelo é reiniciado; nas seguintes só as linhas
+        alteradas, removidas ou novas emitem sinais, desde que as novas venham
+        depois das que continuam. Se a ordem mudou (ex.: um registro novo no
+        meio da listagem), o modelo é reiniciado.
+        """
+        records = list(records)
+        incoming = [self.key(record) for record in records]
+        if self._keys:
+            received = set(incoming)
+            kept = [key for key in self._keys if key in received]
+            if incoming[:len(kept)] == kept:
+                self.remove_keys([key for key in self._keys if key not in received])
+                self.upsert(records)
+                return
+
+        self.beginResetModel()
+        self._keys = []
+        self._values = [[] for _ in self.columns]
+        self._roles = {c: [] for c in self._roles}
+        self._states = []
+        self._search = []
+        self._row_of = {}
+        for key, record in zip(incoming, records):
+            self._append(key, self._extract(record))
+        self.endResetModel()
+
+    def upsert(self, records):
+        """Atualiza linhas existentes e acrescenta as novas ao final."""
+        new = []
+        last_col = len(self.columns) - 1
+        for record in records:
+            key = self.key(record)
+            row = self._row_of.get(key)
+            if row is None:
+                new.append((key, record))
+                continue
+            extracted = self._extract(record)
+            if extracted != self._current(row):
+                self._store(row, extracted)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_col))
+
+        if new:
+            first = len(self._keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            for key, record in new:
+                self._append(key, self._extract(record))
+            self.endInsertRows()
+
+    def remove_keys(self, keys):
+        """Remove as linhas dos registros informados."""
+        rows = sorted((self._row_of[key] for key in keys if key in self._row_of), reverse=True)
+        if not rows:
+            return
+        # Agrupa linhas consecutivas em um único sinal
+        end = start = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            for r in range(end, start - 1, -1):
+                self._remove(r)
+            self.endRemoveRows()
+            if row is not None:
+                end = start = row
+        self._row_of = {key: row for row, key in enumerate(self._keys)}
+
+    def apply_delta(self, delta: dict):
+        """Aplica um delta {'rows', 'deleted', 'version'} dos controladores."""
+        self.remove_keys(delta['deleted'])
+        self.upsert(delta['rows'])
+
+    # --- Cores ---
+
+    def _colors_for(self, state, col):
+        if state is None or self.colors is None:
+            return None
+        cache_key = (state, col)
+        if cache_key not in self._color_cache:
+            self._color_cache[cache_key] = self.colors(state, col)
+        return self._color_cache[cache_key]
+
+    def refresh_colors(self):
+        """Recalcula as cores (ex.: após troca de tema)."""
+        self._color_cache.clear()
+        if self._keys:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(len(self._keys) - 1, len(self.columns) - 1),
+                [Qt.BackgroundRole, Qt.ForegroundRole]
+            )
+
+
+class PagedTableModel(ColumnTableModel):
+    """
+    `ColumnTableModel` preenchido por páginas conforme a rolagem.
+
+    A view chama `fetchMore` ao chegar no fim das linhas carregadas; a página
+    seguinte é buscada em segundo plano a partir da chave da última linha
+    recebida (paginação por chave, sem OFFSET). `reload()` busca de novo as
+    linhas já carregadas e a contagem total, que fica guardada em `total`
+    até a próxima recarga. `set_filter()` troca o filtro repassado às
+    consultas e volta para a primeira página do resultado filtrado.
+
+    Args (além dos de `ColumnTableModel`):
+        loader: `TableLoader` da janela
+        load_key: Nome da carga no loader
+        fetch_page: Função (after, limit, filter) -> registros; `after` é a
+            chave de posição da última linha recebida (None na primeira
+            página) e `filter` o valor de `set_filter` (None sem filtro).
+            Roda fora da thread da interface.
+        page_key: Função registro -> chave de posição (ex.: (tag, id))
+        count: Função (filter) -> total de registros (opcional, fora da
+            thread da interface)
+        page_size: Linhas por página
+    """
+
+    totalChanged = pyqtSignal(int)
+
+    def __init__(self, columns, loader, load_key, fetch_page, page_key, count=None,
+                 page_size=PAGE_SIZE, **kwargs):
+        super().__init__(columns, **kwargs)
+        self.loader = loader
+        self.load_key = load_key
+        self.fetch_page = fetch_page
+        self.page_key = page_key
+        self.count = count
+        self.page_size = page_size
+        self.total = None
+        self.filter = None
+        self._after = None
+        self._exhausted = True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return False
+        return not self.loader.is_loading(self.load_key)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after, limit, filter = self._after, self.page_size, self.filter
+        logger.debug(f"Buscando próxima página de '{self.load_key}' após {after}")
+        self.loader.load(self.load_key, lambda: self.fetch_page(after, limit, filter),
+                         lambda records: self._apply_page(records, limit))
+
+    def reload(self, on_error=None):
+        """Busca de novo as linhas já carregadas (no mínimo uma página) e o total."""
+        self._load_first(max(self.page_size, len(self._keys)), on_error)
+
+    def set_filter(self, filter, on_error=None):
+        """Aplica um novo filtro às consultas e busca a primeira página filtrada."""
+        if filter == self.filter:
+            return
+        self.filter = filter
+        self._load_first(self.page_size, on_error)
+
+    def _load_first(self, limit, on_error):
+        # Uma carga nova descarta o resultado de páginas ainda em andamento
+        filter = self.filter
+        self.loader.load(self.load_key, lambda: self.fetch_page(None, limit, filter),
+                         lambda records: self._apply_page(records, limit, replace=True),
+                         on_error)
+        if self.count:
+            self.loader.load(f"{self.load_key}_total", lambda: self.count(filter), self._set_total)
+
+    def _apply_page(self, records, limit, replace=False):
+        self._exhausted = len(records) < limit
+        if records:
+            self._after = self.page_key(records[-1])
+        elif replace:
+            self._after = None
+        if replace:
+            self.set_rows(records)
+        else:
+            self.upsert(records)
+
+    def _set_total(self, total):
+        if total is not None and total != self.total:
+            self.total = total
+            self.totalChanged.emit(total)
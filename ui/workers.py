@@ -0,0 +1,193 @@
+"""
+Carregamento de dados em segundo plano para as janelas PyQt.
+
+As consultas rodam no pool de `task_pool()` e o resultado volta para a
+thread da interface por sinal. Cada tabela tem no máximo uma consulta em
+andamento; pedidos feitos enquanto ela roda são agrupados em uma nova
+consulta ao final, e resultados de consultas já superadas são descartados. Tarefas longas com
+barra de progresso e cancelamento usam `ProgressTask`.
+"""
+import atexit
+import logging
+import threading
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+_task_pool = None
+
+
+def task_pool() -> QThreadPool:
+    """
+    Pool das tarefas em segundo plano das janelas.
+
+    Não é o QThreadPool global: o Qt divide conversões de imagem (ex.: ao
+    criar um QPixmap) em tarefas no pool global e as espera na thread da
+    interface, que não solta o GIL durante a chamada. Uma tarefa em Python
+    na frente dessas precisa do GIL para terminar, e a janela trava.
+    """
+    global _task_pool
+    if _task_pool is None:
+        _task_pool = QThreadPool()
+        # As consultas passam a maior parte do tempo esperando o banco
+        _task_pool.setMaxThreadCount(max(2, QThread.idealThreadCount()))
+        # Tarefas ainda em andamento terminam antes de o Python ser finalizado
+        atexit.register(_task_pool.waitForDone)
+    return _task_pool
+
+
+class _TaskSignals(QObject):
+    """Sinais emitidos por uma tarefa (QRunnable não herda de QObject)."""
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+
+
+class _LoadTask(QRunnable):
+    """Executa a função de busca fora da thread da interface."""
+
+    def __init__(self, key: str, generation: int, fetch):
+        super().__init__()
+        self.key = key
+        self.generation = generation
+        self.fetch = fetch
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fetch()
+        except Exception as e:
+            logger.error(f"Erro ao carregar '{self.key}' em segundo plano: {str(e)}")
+            logger.error(traceback.format_exc())
+            self.signals.failed.emit(self.key, self.generation, str(e))
+            return
+        self.signals.finished.emit(self.key, self.generation, result)
+
+
+class TableLoader(QObject):
+    """
+    Agenda as cargas das tabelas de uma janela.
+
+    Uso:
+        self.table_loader = TableLoader(self)
+        self.table_loader.load('usuarios', self.auth_controller.get_all_users,
+                               self._populate_users)
+
+    `fetch` roda no pool de threads e não deve tocar em widgets; `apply` e
+    `on_error` rodam na thread da interface.
+    """
+
+    def __init__(self, parent=None, thread_pool: QThreadPool = None):
+        super().__init__(parent)
+        self.thread_pool = thread_pool or task_pool()
+        self._generation = {}
+        self._running = {}
+        self._pending = {}
+        self._callbacks = {}
+        self._tasks = {}
+
+    def load(self, key: str, fetch, apply, on_error=None):
+        """Agenda a carga da tabela `key`, substituindo pedidos anteriores."""
+        generation = self._generation.get(key, 0) + 1
+        self._generation[key] = generation
+        if self._running.get(key):
+            # Só a última requisição interessa; roda quando a atual terminar
+            self._pending[key] = (fetch, apply, on_error)
+            return
+        self._start(key, generation, fetch, apply, on_error)
+
+    def is_loading(self, key: str) -> bool:
+        return bool(self._running.get(key))
+
+    def _start(self, key, generation, fetch, apply, on_error):
+        task = _LoadTask(key, generation, fetch)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._running[key] = True
+        self._callbacks[key] = (apply, on_error)
+        # Mantém referência aos sinais até a entrega do resultado
+        self._tasks[key] = task
+        self.thread_pool.start(task)
+
+    def _next(self, key):
+        self._running[key] = False
+        self._tasks.pop(key, None)
+        pending = self._pending.pop(key, None)
+        if pending:
+            self._start(key, self._generation[key], *pending)
+
+    def _is_stale(self, key, generation) -> bool:
+        return generation != self._generation.get(key)
+
+    def _on_finished(self, key, generation, result):
+        apply, _ = self._callbacks.get(key, (None, None))
+        stale = self._is_stale(key, generation)
+        self._next(key)
+        if stale:
+            logger.debug(f"Resultado descartado para '{key}' (carga mais recente agendada)")
+            return
+        try:
+            apply(result)
+        except Exception as e:
+            logger.error(f"Erro ao preencher '{key}': {str(e)}")
+            logger.error(traceback.format_exc())
+
+    def _on_failed(self, key, generation, message):
+        _, on_error = self._callbacks.get(key, (None, None))
+        stale = self._is_stale(key, generation)
+        self._next(key)
+        if not stale and on_error:
+            on_error(message)
+
+
+class _ProgressSignals(QObject):
+    progress = pyqtSignal(int, object)
+    message = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class ProgressTask(QRunnable):
+    """
+    Tarefa longa com progresso e cancelamento (ex.: exportações).
+
+    `work(progress, cancelled)` roda no pool de threads: chama
+    `progress(feito, total)` (ou `progress(feito, total, mensagem)`) para
+    atualizar a interface e consulta `cancelled()` para parar quando o
+    usuário cancelar. Os sinais chegam na thread da interface; quem inicia a
+    tarefa deve manter uma referência a ela até o sinal final.
+    """
+
+    def __init__(self, work):
+        super().__init__()
+        self.work = work
+        self.signals = _ProgressSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _progress(self, done: int, total=None, message: str = None):
+        self.signals.progress.emit(done, total)
+        if message:
+            self.signals.message.emit(message)
+
+    def start(self, thread_pool: QThreadPool = None):
+        (thread_pool or task_pool()).start(self)
+
+    def run(self):
+        try:
+            result = self.work(self._progress, self._cancel.is_set)
+        except Exception as e:
+            if self._cancel.is_set():
+                self.signals.cancelled.emit()
+                return
+            logger.error(f"Erro na tarefa em segundo plano: {str(e)}")
+            logger.error(traceback.format_exc())
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
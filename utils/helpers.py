@@ -4,12 +4,13 @@ Funções utilitárias para o sistema.
 import os
 import re
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional, List
 from config.settings import (
     UPLOAD_FOLDER, MAX_FILE_SIZE,
     ALLOWED_EXTENSIONS, BACKUP_PATH
 )
+from services.due_dates import prazos_da_inspecao
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +108,49 @@ def parse_datetime(dt_str: str) -> Optional[datetime]:
     except ValueError:
         return None
 
+def as_date(valor) -> Optional[date]:
+    """
+    Converte uma data lida do banco para `date`.
+
+    O tipo devolvido depende do driver: o ODBC Driver 17/18 e o SQLite devolvem
+    date/datetime, o driver legado "SQL Server" devolve colunas DATE como texto
+    ISO (aaaa-mm-dd).
+
+    Args:
+        valor: date, datetime, texto ISO ou None
+
+    Returns:
+        date: Data ou None se vazia/inválida
+    """
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if isinstance(valor, str) and len(valor) >= 10:
+        try:
+            return datetime.strptime(valor[:10], '%Y-%m-%d').date()
+        except ValueError:
+            return None
+    return None
+
+def format_db_date(valor, invalida: Optional[str] = None) -> str:
+    """
+    Formata para exibição (dd/mm/aaaa) uma data lida do banco.
+
+    Args:
+        valor: date, datetime, texto ISO ou None
+        invalida: Texto para valores que não são datas (padrão: o próprio valor)
+
+    Returns:
+        str: Data formatada
+    """
+    data = as_date(valor)
+    if data is not None:
+        return format_date(data)
+    if not valor:
+        return ''
+    return str(valor) if invalida is None else invalida
+
 def validate_file(file_path: str) -> tuple[bool, str]:
     """
     Valida um arquivo antes do upload.
@@ -233,22 +277,30 @@ def format_percentage(value: float) -> str:
 
 def calculate_next_inspection(
     last_inspection: datetime,
-    inspection_type: str
-) -> datetime:
+    inspection_type: str,
+    categoria_nr13: str,
+    possui_spie: bool = False
+) -> Optional[datetime]:
     """
-    Calcula a data da próxima inspeção baseado no tipo.
+    Calcula a data do próximo exame NR-13 gerado por uma inspeção.
+    
+    Usa a tabela de intervalos de services/due_dates.py (categoria do vaso e
+    SPIE da empresa).
     
     Args:
         last_inspection: Data da última inspeção
-        inspection_type: Tipo da inspeção ('periodica' ou 'extraordinaria')
+        inspection_type: Tipo da inspeção ('Inicial', 'Periódica', ...)
+        categoria_nr13: Categoria NR-13 do equipamento ('Categoria III', ...)
+        possui_spie: A empresa possui Serviço Próprio de Inspeção
         
     Returns:
-        datetime: Data da próxima inspeção
+        Optional[datetime]: Data do exame mais próximo, ou None se não há prazo fixo
     """
-    if inspection_type == 'periodica':
-        return last_inspection + timedelta(days=365)  # 1 ano
-    else:
-        return last_inspection + timedelta(days=180)  # 6 meses
+    prazos = [prazo for prazo in prazos_da_inspecao(
+        categoria_nr13, possui_spie, inspection_type, last_inspection).values() if prazo]
+    if not prazos:
+        return None
+    return datetime.combine(min(prazos), datetime.min.time())
 
 def validate_pressure(pressure: float) -> bool:
     """
@@ -8,45 +8,165 @@ Módulo para geração de laudos técnicos em PDF conforme NR-13
 import os
 import logging
 from datetime import datetime
-from PyQt5.QtWidgets import QMessageBox, QFileDialog
 from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table
+from utils.pdf_templates import TEMPLATE_PADRAO, obter_template
 
 # Configuração do logging
 logger = logging.getLogger(__name__)
 
+class RenderizacaoCancelada(Exception):
+    """A geração do laudo foi cancelada."""
+
+
 class LaudoTecnicoPDF:
     """Classe para geração de laudos técnicos NR-13 em PDF"""
     
-    def __init__(self):
-        """Inicializa o gerador de PDF"""
-        self.styles = getSampleStyleSheet()
-        # Adiciona estilo personalizado para títulos
-        self.styles.add(ParagraphStyle(
-            name='TituloPrincipal',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            alignment=1,  # Centralizado
-            spaceAfter=0.5*cm
-        ))
-        # Estilo para subtítulos
-        self.styles.add(ParagraphStyle(
-            name='Subtitulo',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=0.3*cm
-        ))
-        # Estilo para campos do formulário
-        self.styles.add(ParagraphStyle(
-            name='Campo',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            leftIndent=0.5*cm
-        ))
+    def __init__(self, template: str = TEMPLATE_PADRAO):
+        """
+        Inicializa o gerador de PDF
+
+        Args:
+            template: Nome do modelo em `utils.pdf_templates`; estilos e
+                fontes são montados uma vez por processo e compartilhados
+        """
+        self.template = obter_template(template)
+        self.styles = self.template.styles
+        
+    def renderizar(self, dados, caminho_saida, progresso=None, cancelado=None):
+        """
+        Gera o PDF do laudo sem interface gráfica.
+
+        Usado pela geração em lote (services/laudo_batch.py), que roda em
+        outros processos, e pela janela de laudos, que gera em segundo plano.
+        Erros são propagados para quem chamou.
+
+        Args:
+            dados (dict): Dicionário com os dados do laudo
+            caminho_saida (str): Caminho do PDF
+            progresso: Chamado a cada elemento diagramado com
+                (elementos feitos, total de elementos, mensagem com a página)
+            cancelado: Consultado a cada elemento; se retornar True a geração
+                para com RenderizacaoCancelada e nenhum arquivo é gravado
+
+        Returns:
+            str: Caminho do arquivo gerado
+        """
+        # Se não termina com .pdf, adiciona a extensão
+        if not caminho_saida.lower().endswith('.pdf'):
+            caminho_saida += '.pdf'
+        
+        # Cria o documento
+        doc = SimpleDocTemplate(
+            caminho_saida,
+            pagesize=A4,
+            rightMargin=1.5*cm,
+            leftMargin=1.5*cm,
+            topMargin=2*cm,
+            bottomMargin=2*cm
+        )
+        
+        if progresso or cancelado:
+            doc.setProgressCallBack(self._acompanhamento(progresso, cancelado))
+        
+        # Conteúdo do documento
+        conteudo = []
+        
+        # Adiciona o título do documento
+        titulo = dados.get('titulo', 'Laudo Técnico de Inspeção - NR-13')
+        conteudo.append(Paragraph(titulo, self.styles['TituloPrincipal']))
+        conteudo.append(self.template.espaco)
+        
+        # Adiciona as informações do equipamento
+        conteudo.append(Paragraph("Dados do Equipamento", self.styles['Subtitulo']))
+        
+        # Tabela com dados do equipamento
+        dados_equip = [
+            ["Tag:", dados.get('equipamento_tag', '')],
+            ["Tipo:", dados.get('equipamento_tipo', '')],
+            ["Categoria:", dados.get('equipamento_categoria', '')],
+            ["Fabricante:", dados.get('equipamento_fabricante', '')],
+            ["Ano de Fabricação:", dados.get('equipamento_ano', '')],
+            ["Pressão Máxima:", f"{dados.get('equipamento_pressao', '')} kgf/cm²"],
+            ["Volume:", f"{dados.get('equipamento_volume', '')} L"]
+        ]
+        
+        t = Table(dados_equip, colWidths=[4*cm, 12*cm])
+        t.setStyle(self.template.tabela)
+        conteudo.append(t)
+        conteudo.append(self.template.espaco)
+        
+        # Dados da inspeção
+        conteudo.append(Paragraph("Dados da Inspeção", self.styles['Subtitulo']))
+        
+        dados_inspecao = [
+            ["Data da Inspeção:", dados.get('inspecao_data', '')],
+            ["Tipo de Inspeção:", dados.get('inspecao_tipo', '')],
+            ["Engenheiro Responsável:", dados.get('inspecao_responsavel', '')],
+            ["Resultado:", dados.get('inspecao_resultado', '')],
+            ["Próxima Inspeção:", dados.get('inspecao_proxima', '')]
+        ]
+        
+        t = Table(dados_inspecao, colWidths=[4*cm, 12*cm])
+        t.setStyle(self.template.tabela)
+        conteudo.append(t)
+        conteudo.append(self.template.espaco)
         
+        # Descrição dos ensaios realizados
+        conteudo.append(Paragraph("Ensaios Realizados", self.styles['Subtitulo']))
+        ensaios = dados.get('ensaios_realizados', 'Nenhum ensaio registrado.')
+        conteudo.append(Paragraph(ensaios, self.styles['Normal']))
+        conteudo.append(self.template.espaco)
+        
+        # Descrição das não conformidades
+        conteudo.append(Paragraph("Não Conformidades", self.styles['Subtitulo']))
+        nao_conformidades = dados.get('nao_conformidades', 'Nenhuma não conformidade encontrada.')
+        conteudo.append(Paragraph(nao_conformidades, self.styles['Normal']))
+        conteudo.append(self.template.espaco)
+        
+        # Recomendações
+        conteudo.append(Paragraph("Recomendações", self.styles['Subtitulo']))
+        recomendacoes = dados.get('recomendacoes', 'Nenhuma recomendação.')
+        conteudo.append(Paragraph(recomendacoes, self.styles['Normal']))
+        conteudo.append(self.template.espaco)
+        
+        # Conclusão
+        conteudo.append(Paragraph("Conclusão", self.styles['Subtitulo']))
+        conclusao = dados.get('conclusao', 'Sem conclusão registrada.')
+        conteudo.append(Paragraph(conclusao, self.styles['Normal']))
+        conteudo.append(self.template.espaco_final)
+        
+        # Data e assinatura
+        data_atual = datetime.now().strftime("%d/%m/%Y")
+        data_texto = f"Documento gerado em {data_atual}"
+        conteudo.append(Paragraph(data_texto, self.styles['Normal']))
+        
+        # Constrói o documento
+        doc.build(conteudo, onFirstPage=self.template.rodape, onLaterPages=self.template.rodape)
+        
+        return caminho_saida
+
+    @staticmethod
+    def _acompanhamento(progresso, cancelado):
+        """Callback de progresso do ReportLab (elementos diagramados e páginas escritas)."""
+        estado = {'total': 0, 'feitos': 0, 'pagina': 1}
+        
+        def callback(tipo, valor):
+            if cancelado and cancelado():
+                raise RenderizacaoCancelada()
+            if tipo == 'SIZE_EST':
+                estado['total'] = valor
+            elif tipo == 'PROGRESS':
+                estado['feitos'] = valor
+            elif tipo == 'PAGE':
+                estado['pagina'] = valor
+            elif tipo != 'FINISHED':
+                return
+            if progresso:
+                progresso(estado['feitos'], estado['total'], f"Página {estado['pagina']}")
+        return callback
+    
     def gerar_laudo(self, dados, caminho_saida=None):
         """
         Gera um laudo técnico em PDF.
@@ -59,6 +179,8 @@ class LaudoTecnicoPDF:
         Returns:
             str: Caminho do arquivo gerado ou None se falhou
         """
+        # Importado aqui para que a geração em lote não dependa do Qt
+        from PyQt5.QtWidgets import QMessageBox, QFileDialog
         try:
             # Se não foi informado caminho de saída, solicita ao usuário
             if not caminho_saida:
@@ -71,102 +193,7 @@ class LaudoTecnicoPDF:
                 if not caminho_saida:
                     return None  # Usuário cancelou
             
-            # Se não termina com .pdf, adiciona a extensão
-            if not caminho_saida.lower().endswith('.pdf'):
-                caminho_saida += '.pdf'
-            
-            # Cria o documento
-            doc = SimpleDocTemplate(
-                caminho_saida,
-                pagesize=A4,
-                rightMargin=1.5*cm,
-                leftMargin=1.5*cm,
-                topMargin=2*cm,
-                bottomMargin=2*cm
-            )
-            
-            # Conteúdo do documento
-            conteudo = []
-            
-            # Adiciona o título do documento
-            titulo = dados.get('titulo', 'Laudo Técnico de Inspeção - NR-13')
-            conteudo.append(Paragraph(titulo, self.styles['TituloPrincipal']))
-            conteudo.append(Spacer(1, 0.5*cm))
-            
-            # Adiciona as informações do equipamento
-            conteudo.append(Paragraph("Dados do Equipamento", self.styles['Subtitulo']))
-            
-            # Tabela com dados do equipamento
-            dados_equip = [
-                ["Tag:", dados.get('equipamento_tag', '')],
-                ["Tipo:", dados.get('equipamento_tipo', '')],
-                ["Categoria:", dados.get('equipamento_categoria', '')],
-                ["Fabricante:", dados.get('equipamento_fabricante', '')],
-                ["Ano de Fabricação:", dados.get('equipamento_ano', '')],
-                ["Pressão Máxima:", f"{dados.get('equipamento_pressao', '')} kgf/cm²"],
-                ["Volume:", f"{dados.get('equipamento_volume', '')} L"]
-            ]
-            
-            t = Table(dados_equip, colWidths=[4*cm, 12*cm])
-            t.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
-            conteudo.append(t)
-            conteudo.append(Spacer(1, 0.5*cm))
-            
-            # Dados da inspeção
-            conteudo.append(Paragraph("Dados da Inspeção", self.styles['Subtitulo']))
-            
-            dados_inspecao = [
-                ["Data da Inspeção:", dados.get('inspecao_data', '')],
-                ["Tipo de Inspeção:", dados.get('inspecao_tipo', '')],
-                ["Engenheiro Responsável:", dados.get('inspecao_responsavel', '')],
-                ["Resultado:", dados.get('inspecao_resultado', '')],
-                ["Próxima Inspeção:", dados.get('inspecao_proxima', '')]
-            ]
-            
-            t = Table(dados_inspecao, colWidths=[4*cm, 12*cm])
-            t.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
-            conteudo.append(t)
-            conteudo.append(Spacer(1, 0.5*cm))
-            
-            # Descrição dos ensaios realizados
-            conteudo.append(Paragraph("Ensaios Realizados", self.styles['Subtitulo']))
-            ensaios = dados.get('ensaios_realizados', 'Nenhum ensaio registrado.')
-            conteudo.append(Paragraph(ensaios, self.styles['Normal']))
-            conteudo.append(Spacer(1, 0.5*cm))
-            
-            # Descrição das não conformidades
-            conteudo.append(Paragraph("Não Conformidades", self.styles['Subtitulo']))
-            nao_conformidades = dados.get('nao_conformidades', 'Nenhuma não conformidade encontrada.')
-            conteudo.append(Paragraph(nao_conformidades, self.styles['Normal']))
-            conteudo.append(Spacer(1, 0.5*cm))
-            
-            # Recomendações
-            conteudo.append(Paragraph("Recomendações", self.styles['Subtitulo']))
-            recomendacoes = dados.get('recomendacoes', 'Nenhuma recomendação.')
-            conteudo.append(Paragraph(recomendacoes, self.styles['Normal']))
-            conteudo.append(Spacer(1, 0.5*cm))
-            
-            # Conclusão
-            conteudo.append(Paragraph("Conclusão", self.styles['Subtitulo']))
-            conclusao = dados.get('conclusao', 'Sem conclusão registrada.')
-            conteudo.append(Paragraph(conclusao, self.styles['Normal']))
-            conteudo.append(Spacer(1, 1*cm))
-            
-            # Data e assinatura
-            data_atual = datetime.now().strftime("%d/%m/%Y")
-            data_texto = f"Documento gerado em {data_atual}"
-            conteudo.append(Paragraph(data_texto, self.styles['Normal']))
-            
-            # Constrói o documento
-            doc.build(conteudo)
+            caminho_saida = self.renderizar(dados, caminho_saida)
             
             logger.info(f"Laudo técnico gerado com sucesso: {caminho_saida}")
             return caminho_saida
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Registro de modelos (templates) dos laudos em PDF.
+
+Cada modelo reúne o que não muda de um laudo para outro:
+- a folha de estilos;
+- os estilos de tabela;
+- as fontes registradas no ReportLab;
+- os espaçamentos;
+- o rodapé desenhado em todas as páginas.
+
+O modelo é montado na primeira vez que é pedido e reaproveitado pelos
+laudos seguintes do mesmo processo. Os objetos do modelo não são alterados
+durante a geração, então podem ser usados por várias threads.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable
+from reportlab.lib import colors
+from reportlab.lib.styles import StyleSheet1, getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Spacer, TableStyle
+from config.settings import PDF_FONT_PATH, PDF_FONT_BOLD_PATH
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PADRAO = 'laudo_nr13'
+
+
+@dataclass(frozen=True)
+class TemplateLaudo:
+    """
+    Recursos compartilhados pelos laudos de um modelo.
+
+    Attributes:
+        styles: Folha de estilos (inclui TituloPrincipal, Subtitulo e Campo)
+        tabela: Estilo das tabelas de dados (rótulo | valor)
+        espaco: Espaço entre seções
+        espaco_final: Espaço antes da data de emissão
+        rodape: Desenha o rodapé de cada página (`onPage` do ReportLab)
+    """
+    styles: StyleSheet1
+    tabela: TableStyle
+    espaco: Spacer
+    espaco_final: Spacer
+    rodape: Callable
+
+
+def _registrar_fonte() -> tuple:
+    """
+    Registra a fonte TrueType configurada (PDF_FONT_PATH), que é embutida nos PDFs.
+
+    Returns:
+        tuple: (fonte normal, fonte negrito); Helvetica se nenhuma estiver configurada
+    """
+    if not PDF_FONT_PATH:
+        return 'Helvetica', 'Helvetica-Bold'
+    try:
+        pdfmetrics.registerFont(TTFont('LaudoSans', PDF_FONT_PATH))
+        negrito = 'LaudoSans'
+        if PDF_FONT_BOLD_PATH:
+            pdfmetrics.registerFont(TTFont('LaudoSans-Bold', PDF_FONT_BOLD_PATH))
+            negrito = 'LaudoSans-Bold'
+        pdfmetrics.registerFontFamily('LaudoSans', normal='LaudoSans', bold=negrito,
+                                      italic='LaudoSans', boldItalic=negrito)
+        logger.info(f"Fonte dos laudos registrada: {os.path.basename(PDF_FONT_PATH)}")
+        return 'LaudoSans', negrito
+    except Exception as e:
+        logger.error(f"Erro ao registrar a fonte {PDF_FONT_PATH}, usando Helvetica: {str(e)}")
+        return 'Helvetica', 'Helvetica-Bold'
+
+
+def _template_laudo_nr13() -> TemplateLaudo:
+    fonte, fonte_negrito = _registrar_fonte()
+    styles = getSampleStyleSheet()
+    for nome in ('Normal', 'BodyText'):
+        styles[nome].fontName = fonte
+    for nome in ('Title', 'Heading1', 'Heading2', 'Heading3'):
+        styles[nome].fontName = fonte_negrito
+    # Adiciona estilo personalizado para títulos
+    styles.add(ParagraphStyle(
+        name='TituloPrincipal',
+        parent=styles['Heading1'],
+        fontSize=16,
+        alignment=1,  # Centralizado
+        spaceAfter=0.5*cm
+    ))
+    # Estilo para subtítulos
+    styles.add(ParagraphStyle(
+        name='Subtitulo',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=0.3*cm
+    ))
+    # Estilo para campos do formulário
+    styles.add(ParagraphStyle(
+        name='Campo',
+        parent=styles['Normal'],
+        fontSize=11,
+        leftIndent=0.5*cm
+    ))
+
+    tabela = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), fonte),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+
+    def rodape(canvas, doc):
+        canvas.saveState()
+        canvas.setFont(fonte, 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawString(doc.leftMargin, 1*cm, "Laudo Técnico de Inspeção - NR-13")
+        canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 1*cm, f"Página {doc.page}")
+        canvas.restoreState()
+
+    return TemplateLaudo(styles, tabela, Spacer(1, 0.5*cm), Spacer(1, 1*cm), rodape)
+
+
+_FABRICAS = {TEMPLATE_PADRAO: _template_laudo_nr13}
+_templates = {}
+_lock = threading.Lock()
+
+
+def registrar_template(nome: str, fabrica: Callable[[], TemplateLaudo]):
+    """Registra (ou substitui) um modelo; a fábrica só é chamada no primeiro uso."""
+    with _lock:
+        _FABRICAS[nome] = fabrica
+        _templates.pop(nome, None)
+
+
+def obter_template(nome: str = TEMPLATE_PADRAO) -> TemplateLaudo:
+    """Retorna o modelo, montando-o na primeira chamada do processo."""
+    template = _templates.get(nome)
+    if template is None:
+        with _lock:
+            template = _templates.get(nome)
+            if template is None:
+                if nome not in _FABRICAS:
+                    raise ValueError(f"Modelo de laudo desconhecido: {nome}")
+                template = _templates[nome] = _FABRICAS[nome]()
+                logger.debug(f"Modelo de laudo '{nome}' montado")
+    return template
+
+
+def descartar_templates():
+    """Descarta os modelos montados; o próximo laudo monta o modelo de novo."""
+    with _lock:
+        _templates.clear()
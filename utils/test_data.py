@@ -7,39 +7,37 @@ Módulo para gerar dados de teste para o sistema
 
 from datetime import datetime, timedelta
 import random
+from services.equipment_import import EquipmentImporter
 
-def gerar_vasos_teste(db_models, company_id):
-    """Gera vasos de pressão fictícios para testes"""
+def gerar_vasos_teste(db_models, company_id, quantidade=5):
+    """Gera vasos de pressão fictícios para testes (gravados em lote)"""
     
-    categorias = ['I', 'II', 'III', 'IV', 'V']
+    categorias = ['Vaso de Pressão', 'Caldeira', 'Tubulação']
+    categorias_nr13 = ['Categoria I', 'Categoria II', 'Categoria III', 'Categoria IV', 'Categoria V']
     fluidos = ['Vapor d\'água', 'Ar comprimido', 'Nitrogênio', 'GLP', 'Óleo térmico']
     fabricantes = ['Metalúrgica ABC', 'Caldeiras XYZ', 'Vasos & Cia', 'PressureTech', 'IndustrialVasos']
     
     vasos = []
-    for i in range(1, 6):
-        tag = f'VP-{company_id:03d}-{i:03d}'
+    for i in range(1, quantidade + 1):
+        pressao_projeto = round(random.uniform(5.0, 30.0), 2)
         vaso = {
-            'tag': tag,
+            'tag': f'VP-{company_id:03d}-{i:04d}',
             'categoria': random.choice(categorias),
             'fluido': random.choice(fluidos),
             'volume': round(random.uniform(1.0, 10.0), 2),
-            'pressao_projeto': round(random.uniform(5.0, 30.0), 2),
-            'pressao_trabalho': round(random.uniform(3.0, 25.0), 2),
-            'temperatura_projeto': round(random.uniform(50.0, 300.0), 2),
-            'temperatura_trabalho': round(random.uniform(40.0, 250.0), 2),
-            'data_fabricacao': datetime.now() - timedelta(days=random.randint(365*5, 365*20)),
+            'pressao_projeto': pressao_projeto,
+            'pressao_trabalho': round(pressao_projeto * random.uniform(0.5, 0.95), 2),
+            'ano_fabricacao': datetime.now().year - random.randint(5, 20),
             'fabricante': random.choice(fabricantes),
-            'numero_serie': f'SN{random.randint(10000, 99999)}',
-            'company_id': company_id,
-            'ativo': True
+            'categoria_nr13': random.choice(categorias_nr13),
+            'numero_registro': f'SN{random.randint(10000, 99999)}'
         }
         vasos.append(vaso)
         
-    # Insere os vasos no banco
-    for vaso in vasos:
-        db_models.criar_equipamento(**vaso)
+    # Insere os vasos no banco pelo mesmo caminho da importação de planilhas
+    resultado = EquipmentImporter(db_models).inserir(company_id, vasos)
         
-    return len(vasos)
+    return resultado.importados
 
 def gerar_inspecoes_teste(db_models, company_id, engineer_id):
     """Gera inspeções fictícias para testes"""